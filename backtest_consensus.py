@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+Consensus Backtest
+Records full consensus responses to a compact columnar file and replays them
+against historical prices, so trading thresholds can be tuned offline
+instead of through live model calls (10-15s each).
+
+record   Calls POST /api/consensus-detailed repeatedly and stores every run:
+         consensus status/signal, vote counts, and per-analyst signal,
+         confidence, response time and status.
+import   Converts saved consensus-detailed JSON responses (one per line)
+         into the same file.
+replay   Recomputes consensus from the per-analyst votes (with the given
+         threshold / minimum confidence) and simulates, vectorized with NumPy:
+           - paper trades: shouldExecuteTrade opens a position at the run's
+             price; autoCloseOnReversal closes it at the next opposite
+             consensus (paper-trading-engine.ts). Metrics match
+             PortfolioMetrics (win rate over closed trades, pnl <= 0 loses).
+           - prediction-market rounds: one round at a time, opened on a
+             buy/sell consensus and settled at the next reversal or after
+             MAX_ROUND_DURATION, with calculateSettlement's winning-side
+             rule and fee (round-engine.ts) and a hypothetical pool split.
+         --sweep replays every threshold / min-confidence combination.
+
+Recording file (.npz, one row per run):
+    timestamp_ms [R] int64      asset_code [R] int16 (index into assets)
+    status [R] int8             signal [R] int8 (1 buy, -1 sell, 0 hold, -128 none)
+    vote_counts [R, 3] int16    BUY, SELL, HOLD
+    total_ms [R] int32          client round trip
+    cached [R] bool             response came from the consensus cache
+    analyst_signal [R, A] int8  analyst_confidence [R, A] float32
+    analyst_ms [R, A] int32     analyst_status [R, A] int8 (-1 = not in run)
+    assets [N], analysts [A]    names
+
+Price series: CSV with a timestamp column (ISO 8601, epoch seconds or epoch
+ms; header `timestamp`, `time` or `date`), a `price` or `close` column and
+optionally an `asset` column. Without an asset column the series is used for
+--asset. A local price store file (.data/prices/<coin>.bin, see
+seed_price_store.py) can be passed instead; bar closes are used.
+
+Usage:
+    python3 backtest_consensus.py record --asset BTC --runs 50 --interval 60
+    python3 backtest_consensus.py import responses.jsonl --asset BTC
+    python3 backtest_consensus.py replay --prices btc_prices.csv --asset BTC
+    python3 backtest_consensus.py replay --prices btc_prices.csv --asset BTC --sweep
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+TIMEOUT = 120
+DEFAULT_FILE = os.environ.get("CONSENSUS_RUNS_FILE", "consensus_runs.npz")
+
+# Mirrors src/lib/models.ts (calculateConsensusDetailed)
+STATUS_CODES = {"CONSENSUS_REACHED": 0, "NO_CONSENSUS": 1, "INSUFFICIENT_RESPONSES": 2}
+REACHED, NO_CONSENSUS, INSUFFICIENT = 0, 1, 2
+SIGNAL_CODES = {"buy": 1, "sell": -1, "hold": 0}
+NO_SIGNAL = -128
+VOTE_STATUS_CODES = {"success": 0, "timeout": 1, "error": 2}
+NOT_IN_RUN = -1
+CONSENSUS_THRESHOLD = 4
+MIN_VALID_RESPONSES = 3
+
+# Mirrors src/lib/prediction-market/types.ts (PredictionMarketConfig)
+FEE_PERCENTAGE = 0.02
+MAX_ROUND_DURATION_MS = 24 * 60 * 60 * 1000
+
+SWEEP_THRESHOLDS = [3, 4, 5]
+SWEEP_MIN_CONFIDENCE = [0, 50, 60, 70, 80]
+
+# Color codes for terminal output
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+BLUE = "\033[94m"
+RESET = "\033[0m"
+
+
+# ---------------------------------------------------------------------------
+# Recording file
+# ---------------------------------------------------------------------------
+
+def empty_runs():
+    return {
+        "timestamp_ms": np.zeros(0, np.int64),
+        "asset_code": np.zeros(0, np.int16),
+        "status": np.zeros(0, np.int8),
+        "signal": np.zeros(0, np.int8),
+        "vote_counts": np.zeros((0, 3), np.int16),
+        "total_ms": np.zeros(0, np.int32),
+        "cached": np.zeros(0, bool),
+        "analyst_signal": np.zeros((0, 0), np.int8),
+        "analyst_confidence": np.zeros((0, 0), np.float32),
+        "analyst_ms": np.zeros((0, 0), np.int32),
+        "analyst_status": np.zeros((0, 0), np.int8),
+        "assets": np.zeros(0, "U16"),
+        "analysts": np.zeros(0, "U64"),
+    }
+
+
+def load_runs(path):
+    if not os.path.exists(path):
+        return empty_runs()
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def save_runs(path, runs):
+    np.savez_compressed(path, **runs)
+
+
+def parse_timestamp_ms(value):
+    value = str(value).strip()
+    try:
+        number = float(value)
+        # Epoch seconds vs milliseconds
+        return int(number * 1000) if number < 1e11 else int(number)
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.timestamp() * 1000)
+
+
+def responses_to_runs(responses, asset):
+    """Columnar arrays for a list of consensus-detailed responses"""
+    analysts = sorted({vote.get("model_name", "") for r in responses for vote in r.get("individual_votes", [])})
+    column = {name: i for i, name in enumerate(analysts)}
+    count, width = len(responses), len(analysts)
+
+    runs = empty_runs()
+    runs.update({
+        "timestamp_ms": np.empty(count, np.int64),
+        "asset_code": np.zeros(count, np.int16),
+        "status": np.empty(count, np.int8),
+        "signal": np.empty(count, np.int8),
+        "vote_counts": np.empty((count, 3), np.int16),
+        "total_ms": np.empty(count, np.int32),
+        "cached": np.empty(count, bool),
+        "analyst_signal": np.full((count, width), NO_SIGNAL, np.int8),
+        "analyst_confidence": np.zeros((count, width), np.float32),
+        "analyst_ms": np.zeros((count, width), np.int32),
+        "analyst_status": np.full((count, width), NOT_IN_RUN, np.int8),
+        "assets": np.array([asset], "U16"),
+        "analysts": np.array(analysts, "U64"),
+    })
+
+    for row, response in enumerate(responses):
+        votes = response.get("vote_counts") or {}
+        runs["timestamp_ms"][row] = parse_timestamp_ms(response.get("timestamp") or time.time())
+        runs["status"][row] = STATUS_CODES.get(response.get("consensus_status"), NO_CONSENSUS)
+        runs["signal"][row] = SIGNAL_CODES.get(response.get("consensus_signal"), NO_SIGNAL)
+        runs["vote_counts"][row] = [votes.get("BUY", 0), votes.get("SELL", 0), votes.get("HOLD", 0)]
+        runs["total_ms"][row] = int(response.get("responseTimeMs") or 0)
+        runs["cached"][row] = bool(response.get("cached"))
+        for vote in response.get("individual_votes", []):
+            col = column[vote.get("model_name", "")]
+            runs["analyst_signal"][row, col] = SIGNAL_CODES.get(vote.get("signal"), NO_SIGNAL)
+            runs["analyst_confidence"][row, col] = float(vote.get("confidence") or 0)
+            runs["analyst_ms"][row, col] = int(vote.get("response_time_ms") or 0)
+            runs["analyst_status"][row, col] = VOTE_STATUS_CODES.get(vote.get("status"), 2)
+    return runs
+
+
+def merge_runs(a, b):
+    """Concatenate two recordings, aligning asset codes and analyst columns"""
+    assets = list(a["assets"]) + [name for name in b["assets"] if name not in set(a["assets"])]
+    analysts = list(a["analysts"]) + [name for name in b["analysts"] if name not in set(a["analysts"])]
+    asset_index = {name: i for i, name in enumerate(assets)}
+    analyst_index = {name: i for i, name in enumerate(analysts)}
+
+    def widen(runs, key, fill, dtype):
+        out = np.full((len(runs["status"]), len(analysts)), fill, dtype)
+        cols = [analyst_index[name] for name in runs["analysts"]]
+        if cols:
+            out[:, cols] = runs[key]
+        return out
+
+    def recode(runs):
+        mapping = np.array([asset_index[name] for name in runs["assets"]] or [0], np.int16)
+        return mapping[runs["asset_code"]] if len(runs["asset_code"]) else runs["asset_code"]
+
+    merged = {
+        key: np.concatenate([a[key], b[key]])
+        for key in ("timestamp_ms", "status", "signal", "vote_counts", "total_ms", "cached")
+    }
+    merged["asset_code"] = np.concatenate([recode(a), recode(b)]).astype(np.int16)
+    for key, fill, dtype in (("analyst_signal", NO_SIGNAL, np.int8),
+                             ("analyst_confidence", 0, np.float32),
+                             ("analyst_ms", 0, np.int32),
+                             ("analyst_status", NOT_IN_RUN, np.int8)):
+        merged[key] = np.concatenate([widen(a, key, fill, dtype), widen(b, key, fill, dtype)])
+    merged["assets"] = np.array(assets, "U16")
+    merged["analysts"] = np.array(analysts, "U64")
+
+    order = np.argsort(merged["timestamp_ms"], kind="stable")
+    for key in merged:
+        if key not in ("assets", "analysts"):
+            merged[key] = merged[key][order]
+    return merged
+
+
+def append_responses(path, responses, asset):
+    runs = merge_runs(load_runs(path), responses_to_runs(responses, asset))
+    save_runs(path, runs)
+    return runs
+
+
+# ---------------------------------------------------------------------------
+# Prices
+# ---------------------------------------------------------------------------
+
+def load_prices(path, default_asset):
+    """{asset: (timestamps_ms, prices)} sorted by time"""
+    if path.endswith(".bin"):
+        # Price store: float64 records [time_ms, open, high, low, close]
+        bars = np.fromfile(path, dtype="<f8")
+        bars = bars[: len(bars) // 5 * 5].reshape(-1, 5)
+        return {default_asset: (bars[:, 0].astype(np.int64), bars[:, 4])}
+
+    series = {}
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        fields = {name.lower(): name for name in reader.fieldnames or []}
+        time_field = next((fields[k] for k in ("timestamp", "time", "date") if k in fields), None)
+        price_field = next((fields[k] for k in ("price", "close") if k in fields), None)
+        if not time_field or not price_field:
+            raise ValueError(f"{path}: need a timestamp/time/date column and a price/close column")
+        asset_field = fields.get("asset")
+        for row in reader:
+            asset = row[asset_field].strip() if asset_field else default_asset
+            series.setdefault(asset, ([], []))
+            series[asset][0].append(parse_timestamp_ms(row[time_field]))
+            series[asset][1].append(float(row[price_field]))
+
+    prices = {}
+    for asset, (times, values) in series.items():
+        times, values = np.array(times, np.int64), np.array(values, np.float64)
+        order = np.argsort(times, kind="stable")
+        prices[asset] = (times[order], values[order])
+    return prices
+
+
+def price_at(series, times_ms):
+    """Last price at or before each time (NaN before the series starts or after it ends)"""
+    series_times, series_prices = series
+    index = np.searchsorted(series_times, times_ms, side="right") - 1
+    out = series_prices[np.clip(index, 0, None)].astype(np.float64)
+    out[(index < 0) | (times_ms > series_times[-1])] = np.nan
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+def recompute_consensus(runs, threshold, min_confidence):
+    """Vectorized calculateConsensusDetailed over the per-analyst votes"""
+    valid = (runs["analyst_status"] == 0) & (runs["analyst_confidence"] >= min_confidence)
+    signals = runs["analyst_signal"]
+    buy = (valid & (signals == 1)).sum(axis=1)
+    sell = (valid & (signals == -1)).sum(axis=1)
+    hold = (valid & (signals == 0)).sum(axis=1)
+
+    signal = np.full(len(buy), NO_SIGNAL, np.int8)
+    # Same precedence as the live check: buy, then sell, then hold
+    signal[hold >= threshold] = 0
+    signal[sell >= threshold] = -1
+    signal[buy >= threshold] = 1
+    status = np.where(signal != NO_SIGNAL, REACHED, NO_CONSENSUS).astype(np.int8)
+    status[valid.sum(axis=1) < MIN_VALID_RESPONSES] = INSUFFICIENT
+    signal[status == INSUFFICIENT] = NO_SIGNAL
+    return status, signal
+
+
+def next_event_after(event_index, positions):
+    """Index of the first event strictly after each position (-1 if none)"""
+    k = np.searchsorted(event_index, positions, side="right")
+    return np.append(event_index, -1)[k]
+
+
+def simulate_paper_trades(times, prices, status, signal):
+    """shouldExecuteTrade + autoCloseOnReversal over one asset's runs"""
+    reached = status == REACHED
+    opened = np.flatnonzero(reached & (signal != 0) & (signal != NO_SIGNAL))
+    direction = signal[opened].astype(np.int8)  # 1 long, -1 short
+
+    sells = np.flatnonzero(reached & (signal == -1))
+    buys = np.flatnonzero(reached & (signal == 1))
+    exit_index = np.where(direction == 1, next_event_after(sells, opened), next_event_after(buys, opened))
+    closed = exit_index >= 0
+
+    entry = prices[opened]
+    exit_price = np.where(closed, prices[np.clip(exit_index, 0, None)], prices[-1] if len(prices) else np.nan)
+    pnl = direction * (exit_price - entry)  # calculatePnL, per unit
+    pnl_pct = pnl / entry * 100
+    hold_ms = np.where(closed, times[np.clip(exit_index, 0, None)] - times[opened], 0)
+    return {"closed": closed, "pnl": pnl, "pnl_pct": pnl_pct, "hold_ms": hold_ms}
+
+
+def portfolio_metrics(trades):
+    """Same fields as PortfolioMetrics (calculateMetrics), over closed trades"""
+    closed = trades["closed"]
+    pnl = trades["pnl"][closed]
+    wins, losses = pnl[pnl > 0], pnl[pnl <= 0]
+    return {
+        "totalTrades": int(len(closed)),
+        "openTrades": int((~closed).sum()),
+        "closedTrades": int(closed.sum()),
+        "winningTrades": int(len(wins)),
+        "losingTrades": int(len(losses)),
+        "totalPnL": float(pnl.sum()),
+        "totalPnLPercent": float(trades["pnl_pct"][closed].sum()),
+        "unrealizedPnL": float(trades["pnl"][~closed].sum()),
+        "winRate": float(len(wins) / len(pnl) * 100) if len(pnl) else 0.0,
+        "avgWin": float(wins.mean()) if len(wins) else 0.0,
+        "avgLoss": float(losses.mean()) if len(losses) else 0.0,
+        "largestWin": float(wins.max()) if len(wins) else 0.0,
+        "largestLoss": float(losses.min()) if len(losses) else 0.0,
+        "avgHoldMinutes": float(trades["hold_ms"][closed].mean() / 60000) if closed.any() else 0.0,
+    }
+
+
+def simulate_settlements(times, series, status, signal, pool_long, pool_short):
+    """One prediction-market round at a time, settled with calculateSettlement's rules"""
+    reached = status == REACHED
+    candidates = np.flatnonzero(reached & (signal != 0) & (signal != NO_SIGNAL))
+    if not len(candidates):
+        return {"rounds": 0}
+
+    direction = signal[candidates]
+    sells = np.flatnonzero(reached & (signal == -1))
+    buys = np.flatnonzero(reached & (signal == 1))
+    reversal = np.where(direction == 1, next_event_after(sells, candidates), next_event_after(buys, candidates))
+    forced_at = times[candidates] + MAX_ROUND_DURATION_MS
+    exit_time = np.where(reversal >= 0, np.minimum(times[np.clip(reversal, 0, None)], forced_at), forced_at)
+
+    # Rounds don't overlap: the next round opens on the first signal after the previous exit
+    chosen = []
+    position = 0
+    while position < len(candidates):
+        chosen.append(position)
+        position = int(np.searchsorted(times[candidates], exit_time[position], side="right"))
+    chosen = np.array(chosen)
+
+    entry = price_at(series, times[candidates[chosen]])
+    exit_price = price_at(series, exit_time[chosen])
+    settled = ~np.isnan(exit_price) & ~np.isnan(entry)
+    entry, exit_price, round_direction = entry[settled], exit_price[settled], direction[chosen][settled]
+
+    change = (exit_price - entry) / entry * 100
+    # calculateSettlement: long rounds are won by 'long' when price rises;
+    # short rounds are won by 'long' when price falls (as implemented there)
+    long_wins = np.where(round_direction == 1, change > 0, change < 0)
+    is_profitable = np.where(round_direction == 1, long_wins, ~long_wins)
+
+    total_pool = pool_long + pool_short
+    payout_pool = total_pool * (1 - FEE_PERCENTAGE)
+    # ROI of a bet that follows the consensus direction
+    follower_side_long = round_direction == 1
+    follower_wins = follower_side_long == long_wins
+    winning_pool = np.where(long_wins, pool_long, pool_short)
+    follower_roi = np.where(follower_wins, payout_pool / np.maximum(winning_pool, 1e-9) - 1, -1.0) * 100
+
+    return {
+        "rounds": int(settled.sum()),
+        "unsettledRounds": int((~settled).sum()),
+        "profitableRounds": int(is_profitable.sum()),
+        "longWins": int(long_wins.sum()),
+        "followerWinRate": float(follower_wins.mean() * 100) if len(follower_wins) else 0.0,
+        "followerAvgRoiPercent": float(follower_roi.mean()) if len(follower_roi) else 0.0,
+        "platformFees": float(total_pool * FEE_PERCENTAGE * settled.sum()),
+    }
+
+
+def replay(runs, prices, asset, threshold, min_confidence, pool_long, pool_short, include_cached):
+    asset_names = list(runs["assets"])
+    if asset not in asset_names:
+        raise ValueError(f"no recorded runs for {asset} (recorded: {', '.join(asset_names) or 'none'})")
+    if asset not in prices:
+        raise ValueError(f"no price series for {asset}")
+
+    mask = runs["asset_code"] == asset_names.index(asset)
+    if not include_cached:
+        mask &= ~runs["cached"]
+    times = runs["timestamp_ms"][mask]
+    run_prices = price_at(prices[asset], times)
+    priced = ~np.isnan(run_prices)
+    selected = {key: value[mask][priced] for key, value in runs.items() if key not in ("assets", "analysts")}
+    times, run_prices = times[priced], run_prices[priced]
+
+    status, signal = recompute_consensus(selected, threshold, min_confidence)
+    trades = simulate_paper_trades(times, run_prices, status, signal)
+    return {
+        "threshold": threshold,
+        "minConfidence": min_confidence,
+        "runs": int(len(times)),
+        "consensusReached": int((status == REACHED).sum()),
+        "matchesRecordedStatus": int((status == selected["status"]).sum()),
+        "paperTrading": portfolio_metrics(trades),
+        "settlement": simulate_settlements(times, prices[asset], status, signal, pool_long, pool_short),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Commands
+# ---------------------------------------------------------------------------
+
+def record(args):
+    responses = []
+    failures = 0
+    for i in range(args.runs):
+        started = time.perf_counter()
+        try:
+            response = requests.post(f"{BASE_URL}/api/consensus-detailed", json={"asset": args.asset}, timeout=TIMEOUT)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if response.status_code != 200:
+                failures += 1
+                print(f"{RED}❌ run {i + 1}: HTTP {response.status_code}{RESET}")
+            else:
+                body = response.json()
+                body.setdefault("responseTimeMs", round(elapsed_ms))
+                responses.append(body)
+                print(f"{GREEN}✅ run {i + 1}: {body.get('consensus_status')} "
+                      f"{body.get('consensus_signal')} {body.get('vote_counts')} ({elapsed_ms:.0f}ms){RESET}")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            failures += 1
+            print(f"{RED}❌ run {i + 1}: {e}{RESET}")
+
+        # Save as we go so an interrupted recording keeps its runs
+        if len(responses) >= 10:
+            append_responses(args.file, responses, args.asset)
+            responses = []
+        if i < args.runs - 1:
+            time.sleep(args.interval)
+
+    runs = append_responses(args.file, responses, args.asset) if responses else load_runs(args.file)
+    print(f"\n{GREEN}{len(runs['status'])} runs in {args.file}{RESET}")
+    return 1 if failures == args.runs else 0
+
+
+def import_responses(args):
+    responses = []
+    with open(args.source) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                responses.append(json.loads(line))
+    runs = append_responses(args.file, responses, args.asset)
+    print(f"{GREEN}Imported {len(responses)} responses; {len(runs['status'])} runs in {args.file}{RESET}")
+    return 0
+
+
+def print_replay(result):
+    paper, settlement = result["paperTrading"], result["settlement"]
+    print(f"{BLUE}threshold {result['threshold']}/5, min confidence {result['minConfidence']}{RESET}: "
+          f"{result['runs']} runs, {result['consensusReached']} reached "
+          f"({result['matchesRecordedStatus']} match recorded status)")
+    print(f"  paper trades: {paper['totalTrades']} ({paper['closedTrades']} closed)  "
+          f"win rate {paper['winRate']:.1f}%  PnL {paper['totalPnL']:+.2f} ({paper['totalPnLPercent']:+.2f}%)  "
+          f"avg hold {paper['avgHoldMinutes']:.0f}m")
+    if settlement.get("rounds"):
+        print(f"  rounds: {settlement['rounds']}  profitable {settlement['profitableRounds']}  "
+              f"follower win rate {settlement['followerWinRate']:.1f}%  "
+              f"follower ROI {settlement['followerAvgRoiPercent']:+.1f}%")
+
+
+def replay_command(args):
+    runs = load_runs(args.file)
+    if not len(runs["status"]):
+        print(f"{RED}❌ No recorded runs in {args.file}{RESET}")
+        return 1
+    prices = load_prices(args.prices, args.asset)
+
+    if args.sweep:
+        grid = [(t, c) for t in SWEEP_THRESHOLDS for c in SWEEP_MIN_CONFIDENCE]
+    else:
+        grid = [(args.threshold, args.min_confidence)]
+
+    started = time.perf_counter()
+    try:
+        results = [
+            replay(runs, prices, args.asset, threshold, min_confidence,
+                   args.pool_long, args.pool_short, args.include_cached)
+            for threshold, min_confidence in grid
+        ]
+    except ValueError as e:
+        print(f"{RED}❌ {e}{RESET}")
+        return 1
+    elapsed = time.perf_counter() - started
+
+    for result in results:
+        print_replay(result)
+    if args.sweep:
+        best = max(results, key=lambda r: r["paperTrading"]["totalPnLPercent"])
+        print(f"\n{GREEN}Best PnL: threshold {best['threshold']}, min confidence {best['minConfidence']} "
+              f"({best['paperTrading']['totalPnLPercent']:+.2f}%){RESET}")
+    print(f"\n{len(grid)} replay(s) over {results[0]['runs']} runs in {elapsed:.2f}s")
+
+    out_file = os.environ.get("RESULTS_FILE", "backtest_results.json")
+    with open(out_file, "w") as f:
+        json.dump({"timestamp": datetime.utcnow().isoformat(), "asset": args.asset, "runs_file": args.file,
+                   "prices_file": args.prices, "elapsed_seconds": round(elapsed, 3), "results": results}, f, indent=2)
+    print(f"{GREEN}Results saved to: {out_file}{RESET}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay consensus runs")
+    parser.add_argument("--file", default=DEFAULT_FILE, help="recording file (.npz)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="record live consensus runs")
+    rec.add_argument("--asset", default="BTC")
+    rec.add_argument("--runs", type=int, default=10)
+    rec.add_argument("--interval", type=float, default=60, help="seconds between runs")
+
+    imp = sub.add_parser("import", help="import consensus-detailed responses (JSON lines)")
+    imp.add_argument("source")
+    imp.add_argument("--asset", default="BTC")
+
+    rep = sub.add_parser("replay", help="replay recorded runs against a price series")
+    rep.add_argument("--prices", required=True, help="price CSV or price store .bin file")
+    rep.add_argument("--asset", default="BTC")
+    rep.add_argument("--threshold", type=int, default=CONSENSUS_THRESHOLD, help="votes needed for consensus")
+    rep.add_argument("--min-confidence", type=float, default=0, help="ignore votes below this confidence")
+    rep.add_argument("--sweep", action="store_true", help="replay every threshold / min-confidence pair")
+    rep.add_argument("--pool-long", type=float, default=1000, help="hypothetical long pool per round")
+    rep.add_argument("--pool-short", type=float, default=1000, help="hypothetical short pool per round")
+    rep.add_argument("--include-cached", action="store_true", help="keep runs served from the consensus cache")
+
+    args = parser.parse_args()
+    commands = {"record": record, "import": import_responses, "replay": replay_command}
+    return commands[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
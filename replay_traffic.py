@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Traffic Replay
+Rebuilds a request stream from API logs (or a HAR capture) and replays it
+against a server with the original inter-arrival timing, then compares the
+replayed latency distribution per route with the original one.
+
+Inputs:
+  - ApiLogger output (src/lib/api-logger.ts), production JSON lines or
+    development lines (`[ts] [LEVEL] [requestId] message {json}`); other
+    lines in the file are ignored. Per request id, the
+    "Incoming ..." entry gives the time, method, path and query, a debug
+    "Request body ..." entry (if logged) the body, and the "Response ..." /
+    "Error in ..." entry the original status and duration.
+  - HAR files (*.har): log.entries[] with startedDateTime, request and time.
+
+Replay is deterministic: requests are sent in original order, each at
+(original offset / SPEED) from the start, from a fixed-size pool. Gaps
+longer than --max-gap seconds are shortened to --max-gap. Streaming
+responses (text/event-stream) are timed to the first byte, like the logged
+durations of streaming routes.
+
+The run fails if any route's replayed p95 exceeds its original p95 by more
+than --max-p95-ratio (routes with at least --min-samples on both sides).
+
+Usage:
+    python3 replay_traffic.py prod-logs.jsonl
+    python3 replay_traffic.py prod-logs.jsonl --speed 4 --route /api/consensus
+    BASE_URL=http://localhost:3000 python3 replay_traffic.py capture.har --max-gap 5
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlencode, urlsplit
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+TIMEOUT = 60
+
+DEV_LINE = re.compile(r"^\[([^\]]+)\] \[(DEBUG|INFO|WARN|ERROR)\] \[([^\]]+)\] (.*?)(?: (\{.*\}))?$")
+INCOMING = re.compile(r"^Incoming (\w+) request to (\S+)")
+# Headers worth sending again (logged headers are sanitized anyway)
+REPLAY_HEADERS = ("user-agent", "accept", "content-type", "last-event-id")
+
+# Color codes for terminal output
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+BLUE = "\033[94m"
+RESET = "\033[0m"
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 1)
+
+
+def parse_time_ms(value):
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp() * 1000
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+def parse_log_line(line):
+    """An ApiLogger entry as a dict, or None for unrelated lines"""
+    line = line.strip()
+    match = DEV_LINE.match(line)
+    if match:
+        timestamp, level, request_id, message, rest = match.groups()
+        try:
+            extra = json.loads(rest) if rest else {}
+        except ValueError:
+            extra = {}
+        return {"timestamp": timestamp, "level": level.lower(), "requestId": request_id,
+                "message": message, "data": extra.get("data") or {}}
+
+    # JSON, possibly behind a log collector's prefix
+    start = line.find("{")
+    if start < 0:
+        return None
+    try:
+        entry = json.loads(line[start:])
+    except ValueError:
+        return None
+    if not isinstance(entry, dict) or "requestId" not in entry or "message" not in entry:
+        return None
+    entry.setdefault("data", {})
+    return entry
+
+
+def load_api_logs(path):
+    requests_by_id = {}
+    order = []
+    with open(path, errors="replace") as f:
+        for line in f:
+            entry = parse_log_line(line)
+            if not entry or entry["requestId"] == "system":
+                continue
+            request_id, message, data = entry["requestId"], entry["message"], entry.get("data") or {}
+
+            record = requests_by_id.get(request_id)
+            incoming = INCOMING.match(message)
+            if incoming:
+                if record is None:
+                    record = requests_by_id[request_id] = {"id": request_id}
+                    order.append(request_id)
+                headers = {k.lower(): v for k, v in (data.get("headers") or {}).items()}
+                record.update({
+                    "t_ms": parse_time_ms(entry["timestamp"]),
+                    "method": data.get("method") or incoming.group(1),
+                    "path": data.get("url") or incoming.group(2),
+                    "query": data.get("query") or {},
+                    "headers": {k: v for k, v in headers.items() if k in REPLAY_HEADERS and v != "[REDACTED]"},
+                })
+            elif record is None:
+                continue
+            elif message.startswith("Request body for") and "body" in data:
+                record["body"] = data["body"]
+            elif message.startswith("Response for"):
+                record["orig_status"] = data.get("status")
+                record["orig_ms"] = data.get("durationMs")
+            elif message.startswith("Error in") and "orig_ms" not in record:
+                record["orig_status"] = 500
+                record["orig_ms"] = data.get("durationMs")
+
+    return [requests_by_id[i] for i in order if "t_ms" in requests_by_id[i]]
+
+
+def load_har(path):
+    with open(path) as f:
+        har = json.load(f)
+    records = []
+    for i, entry in enumerate(har.get("log", {}).get("entries", [])):
+        request = entry.get("request", {})
+        url = urlsplit(request.get("url", ""))
+        body = None
+        text = (request.get("postData") or {}).get("text")
+        if text:
+            try:
+                body = json.loads(text)
+            except ValueError:
+                body = text
+        headers = {h["name"].lower(): h["value"] for h in request.get("headers", [])
+                   if h.get("name", "").lower() in REPLAY_HEADERS}
+        record = {
+            "id": f"har-{i}",
+            "t_ms": parse_time_ms(entry["startedDateTime"]),
+            "method": request.get("method", "GET"),
+            "path": url.path,
+            "query": {k: v for k, v in (pair.split("=", 1) if "=" in pair else (pair, "")
+                                        for pair in url.query.split("&") if pair)},
+            "headers": headers,
+            "orig_status": (entry.get("response") or {}).get("status"),
+            "orig_ms": entry.get("time"),
+        }
+        if body is not None:
+            record["body"] = body
+        records.append(record)
+    return records
+
+
+def build_schedule(records, speed, max_gap_s):
+    """(offset seconds, record) in original order, gaps capped and scaled"""
+    records = sorted(records, key=lambda r: r["t_ms"])  # stable: ties keep log order
+    schedule = []
+    offset = 0.0
+    previous = None
+    for record in records:
+        if previous is not None:
+            gap = (record["t_ms"] - previous) / 1000
+            if max_gap_s is not None:
+                gap = min(gap, max_gap_s)
+            offset += max(gap, 0) / speed
+        previous = record["t_ms"]
+        schedule.append((offset, record))
+    return schedule
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+def send(session, record):
+    url = f"{BASE_URL}{record['path']}"
+    if record["query"]:
+        url += "?" + urlencode(record["query"])
+    headers = dict(record.get("headers") or {})
+    headers["X-Replay-Of"] = record["id"]
+
+    kwargs = {"headers": headers, "timeout": TIMEOUT, "stream": True}
+    if "body" in record:
+        if isinstance(record["body"], (dict, list)):
+            kwargs["json"] = record["body"]
+        else:
+            kwargs["data"] = record["body"]
+
+    started = time.perf_counter()
+    try:
+        response = session.request(record["method"], url, **kwargs)
+        try:
+            if response.headers.get("content-type", "").startswith("text/event-stream"):
+                next(response.iter_content(chunk_size=1), None)
+                streamed = True
+            else:
+                response.content
+                streamed = False
+        finally:
+            response.close()
+        return {"status": response.status_code, "ms": (time.perf_counter() - started) * 1000, "streamed": streamed}
+    except requests.exceptions.RequestException as e:
+        return {"status": None, "ms": (time.perf_counter() - started) * 1000, "error": str(e)}
+
+
+def replay(schedule, concurrency):
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    results = [None] * len(schedule)
+
+    def run(index, scheduled_at, start, record):
+        lag_ms = (time.perf_counter() - start - scheduled_at) * 1000
+        result = send(session(), record)
+        result["lag_ms"] = lag_ms
+        results[index] = result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for index, (offset, record) in enumerate(schedule):
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run, index, offset, start, record)
+    return results, time.perf_counter() - start
+
+
+def route_key(record):
+    return f"{record['method']} {record['path']}"
+
+
+def compare(schedule, results, max_ratio, min_samples):
+    routes = {}
+    for (_, record), result in zip(schedule, results):
+        route = routes.setdefault(route_key(record), {"orig": [], "replay": [], "orig_status": {},
+                                                     "replay_status": {}, "errors": 0, "no_body": 0})
+        if record.get("orig_ms") is not None:
+            route["orig"].append(float(record["orig_ms"]))
+        status = str(record.get("orig_status"))
+        route["orig_status"][status] = route["orig_status"].get(status, 0) + 1
+        if record["method"] in ("POST", "PUT", "PATCH") and "body" not in record:
+            route["no_body"] += 1
+        if result.get("error"):
+            route["errors"] += 1
+            continue
+        route["replay"].append(result["ms"])
+        status = str(result["status"])
+        route["replay_status"][status] = route["replay_status"].get(status, 0) + 1
+
+    report = []
+    for key, route in sorted(routes.items(), key=lambda item: -len(item[1]["replay"])):
+        entry = {
+            "route": key,
+            "requests": len(route["replay"]) + route["errors"],
+            "errors": route["errors"],
+            "bodyless_writes": route["no_body"],
+            "original": {"samples": len(route["orig"]), "p50_ms": percentile(route["orig"], 50),
+                         "p95_ms": percentile(route["orig"], 95), "p99_ms": percentile(route["orig"], 99),
+                         "statuses": route["orig_status"]},
+            "replay": {"samples": len(route["replay"]), "p50_ms": percentile(route["replay"], 50),
+                       "p95_ms": percentile(route["replay"], 95), "p99_ms": percentile(route["replay"], 99),
+                       "statuses": route["replay_status"]},
+        }
+        comparable = len(route["orig"]) >= min_samples and len(route["replay"]) >= min_samples
+        ratio = None
+        if comparable and entry["original"]["p95_ms"]:
+            ratio = round(entry["replay"]["p95_ms"] / entry["original"]["p95_ms"], 2)
+        entry["p95_ratio"] = ratio
+        entry["regressed"] = ratio is not None and ratio > max_ratio
+        report.append(entry)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay logged API traffic and compare latencies")
+    parser.add_argument("source", help="ApiLogger log file or .har capture")
+    parser.add_argument("--speed", type=float, default=float(os.environ.get("SPEED", "1")),
+                        help="replay speed factor (2 = twice as fast)")
+    parser.add_argument("--max-gap", type=float, default=None, help="cap idle gaps at this many seconds")
+    parser.add_argument("--route", action="append", default=[], help="only replay paths with this prefix")
+    parser.add_argument("--limit", type=int, default=None, help="replay at most this many requests")
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("CONCURRENCY", "64")))
+    parser.add_argument("--max-p95-ratio", type=float, default=1.5)
+    parser.add_argument("--min-samples", type=int, default=5)
+    args = parser.parse_args()
+
+    records = load_har(args.source) if args.source.endswith(".har") else load_api_logs(args.source)
+    if args.route:
+        records = [r for r in records if any(r["path"].startswith(prefix) for prefix in args.route)]
+    records = sorted(records, key=lambda r: r["t_ms"])[: args.limit]
+    if not records:
+        print(f"{RED}❌ No requests found in {args.source}{RESET}")
+        return 1
+
+    schedule = build_schedule(records, args.speed, args.max_gap)
+    print(f"{BLUE}{'=' * 80}{RESET}")
+    print(f"{BLUE}Traffic Replay - {len(schedule)} requests from {args.source} → {BASE_URL} "
+          f"(speed {args.speed}x, {schedule[-1][0]:.1f}s){RESET}")
+    print(f"{BLUE}{'=' * 80}{RESET}")
+
+    results, elapsed = replay(schedule, args.concurrency)
+    report = compare(schedule, results, args.max_p95_ratio, args.min_samples)
+    lags = [r["lag_ms"] for r in results]
+
+    for entry in report:
+        orig, rep = entry["original"], entry["replay"]
+        icon = f"{RED}❌{RESET}" if entry["regressed"] else f"{GREEN}✅{RESET}"
+        ratio = f"x{entry['p95_ratio']}" if entry["p95_ratio"] is not None else "n/a"
+        print(f"{icon} {entry['route']:40} n={entry['requests']:5}  "
+              f"p50 {orig['p50_ms']} → {rep['p50_ms']}ms  p95 {orig['p95_ms']} → {rep['p95_ms']}ms ({ratio})  "
+              f"statuses {rep['statuses']}")
+        if entry["errors"]:
+            print(f"   {YELLOW}⚠️  {entry['errors']} connection error(s){RESET}")
+        if entry["bodyless_writes"]:
+            print(f"   {YELLOW}⚠️  {entry['bodyless_writes']} write(s) replayed without a body (not logged){RESET}")
+
+    print(f"\nReplayed in {elapsed:.1f}s (schedule {schedule[-1][0]:.1f}s); "
+          f"send lag p50 {percentile(lags, 50)}ms, p99 {percentile(lags, 99)}ms")
+
+    out_file = os.environ.get("RESULTS_FILE", "traffic_replay_results.json")
+    with open(out_file, "w") as f:
+        json.dump({"timestamp": datetime.utcnow().isoformat(), "base_url": BASE_URL, "source": args.source,
+                   "speed": args.speed, "requests": len(schedule), "elapsed_seconds": round(elapsed, 2),
+                   "send_lag_ms": {"p50": percentile(lags, 50), "p99": percentile(lags, 99)},
+                   "routes": report}, f, indent=2)
+    print(f"{GREEN}Results saved to: {out_file}{RESET}")
+
+    regressed = [entry["route"] for entry in report if entry["regressed"]]
+    if regressed:
+        print(f"{RED}❌ p95 regressed more than {args.max_p95_ratio}x on: {', '.join(regressed)}{RESET}")
+        return 1
+    if all(result.get("error") for result in results):
+        print(f"{RED}❌ Every replayed request failed to connect{RESET}")
+        return 1
+    print(f"{GREEN}✅ Replayed latencies within {args.max_p95_ratio}x of the originals{RESET}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
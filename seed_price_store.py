@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Price Store Seeder
+Writes OHLC bars into the local price store (src/lib/price-store.ts) for
+offline test fixtures, backtests and charts.
+
+Sources:
+    --csv FILE        timestamp + open/high/low/close (or a single price/close
+                      column); timestamps in ISO 8601, epoch seconds or ms
+    --coingecko       CoinGecko OHLC history for the last --days days (1, 7,
+                      14, 30, 90, 180 or 365); its 30m/4h/4d candles are split
+                      into PRICE_STORE_BAR_MS bars so lookups stay within
+                      PRICE_STORE_MAX_GAP_MS
+    --synthetic       deterministic random walk (--seed, --start-price,
+                      --volatility) over the last --days days, one bar per
+                      PRICE_STORE_BAR_MS
+
+Store format: one file per asset (<coingecko id>.bin, e.g. bitcoin.bin) of
+little-endian float64 records [time_ms, open, high, low, close] in ascending
+time order. The store is append-only: bars at or before the last stored bar
+are skipped.
+
+Usage:
+    python3 seed_price_store.py --asset BTC --synthetic --days 30
+    python3 seed_price_store.py --asset ETH --coingecko --days 7
+    python3 seed_price_store.py --asset BTC --csv btc_prices.csv
+    PRICE_STORE_DIR=/tmp/prices python3 seed_price_store.py --asset SOL --synthetic --days 1
+"""
+
+import argparse
+import csv
+import math
+import os
+import random
+import struct
+import sys
+import time
+from datetime import datetime, timezone
+
+import requests
+
+COINGECKO_API = "https://api.coingecko.com/api/v3"
+TIMEOUT = 30
+PRICE_STORE_DIR = os.environ.get("PRICE_STORE_DIR", os.path.join(".data", "prices"))
+BAR_MS = int(os.environ.get("PRICE_STORE_BAR_MS", "60000"))
+
+RECORD = struct.Struct("<5d")
+
+# The only ranges /coins/{id}/ohlc accepts
+COINGECKO_OHLC_DAYS = (1, 7, 14, 30, 90, 180, 365)
+
+# Mirrors ASSET_ID_MAP in src/lib/price-service.ts
+ASSET_ID_MAP = {
+    "BTC": "bitcoin",
+    "ETH": "ethereum",
+    "SOL": "solana",
+    "BTC/USD": "bitcoin",
+    "ETH/USD": "ethereum",
+    "SOL/USD": "solana",
+}
+
+# Color codes for terminal output
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+BLUE = "\033[94m"
+RESET = "\033[0m"
+
+
+def store_path(coin_id):
+    return os.path.join(PRICE_STORE_DIR, f"{coin_id}.bin")
+
+
+def last_stored_time(path):
+    if not os.path.exists(path):
+        return None
+    size = os.path.getsize(path)
+    count = size // RECORD.size
+    if count == 0:
+        return None
+    with open(path, "rb") as f:
+        f.seek((count - 1) * RECORD.size)
+        return RECORD.unpack(f.read(RECORD.size))[0]
+
+
+def append_bars(coin_id, bars):
+    """Append (time_ms, open, high, low, close) bars; returns how many were written"""
+    os.makedirs(PRICE_STORE_DIR, exist_ok=True)
+    path = store_path(coin_id)
+    if os.path.exists(path):
+        partial = os.path.getsize(path) % RECORD.size
+        if partial:
+            # A writer died mid-record; appending after it would shift every later bar
+            with open(path, "r+b") as f:
+                f.truncate(os.path.getsize(path) - partial)
+            print(f"{YELLOW}⚠️  Truncated {partial} byte(s) of a partial record from {path}{RESET}")
+    last = last_stored_time(path)
+
+    written = 0
+    previous = last
+    with open(path, "ab") as f:
+        for bar in sorted(bars):
+            if previous is not None and bar[0] <= previous:
+                continue
+            f.write(RECORD.pack(*map(float, bar)))
+            previous = bar[0]
+            written += 1
+    return written
+
+
+def parse_timestamp_ms(value):
+    value = str(value).strip()
+    try:
+        number = float(value)
+        # Epoch seconds vs milliseconds
+        return int(number * 1000) if number < 1e11 else int(number)
+    except ValueError:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.timestamp() * 1000)
+
+
+def bars_from_csv(path):
+    bars = []
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        fields = {name.lower(): name for name in reader.fieldnames or []}
+        time_field = next((fields[k] for k in ("timestamp", "time", "date") if k in fields), None)
+        close_field = next((fields[k] for k in ("close", "price") if k in fields), None)
+        if not time_field or not close_field:
+            raise ValueError(f"{path}: need a timestamp/time/date column and a close/price column")
+        for row in reader:
+            close = float(row[close_field])
+            bars.append((
+                parse_timestamp_ms(row[time_field]),
+                float(row[fields["open"]]) if "open" in fields else close,
+                float(row[fields["high"]]) if "high" in fields else close,
+                float(row[fields["low"]]) if "low" in fields else close,
+                close,
+            ))
+    return bars
+
+
+def candle_interval_ms(candles):
+    """Most common spacing between candles (CoinGecko picks it from --days)"""
+    gaps = sorted(b[0] - a[0] for a, b in zip(candles, candles[1:]) if b[0] > a[0])
+    return gaps[len(gaps) // 2] if gaps else BAR_MS
+
+
+def resample_candles(candles, interval_ms):
+    """Split each candle into PRICE_STORE_BAR_MS bars
+
+    Bars inside a candle hold its open, and the candle's high, low and close
+    go on its last bar, so a lookup never sees a price before the time it
+    was observed. Candles are time-stamped at their close.
+    """
+    bars = []
+    for close_time, open_price, high, low, close in candles:
+        close_time = int(close_time)
+        start = (close_time - interval_ms) // BAR_MS * BAR_MS
+        last = (close_time - 1) // BAR_MS * BAR_MS
+        for bar_time in range(start, last, BAR_MS):
+            bars.append((bar_time, open_price, open_price, open_price, open_price))
+        bars.append((last, open_price, high, low, close))
+    return bars
+
+
+def bars_from_coingecko(coin_id, days):
+    response = requests.get(
+        f"{COINGECKO_API}/coins/{coin_id}/ohlc",
+        params={"vs_currency": "usd", "days": days},
+        headers={"Accept": "application/json"},
+        timeout=TIMEOUT,
+    )
+    response.raise_for_status()
+    # [[time_ms, open, high, low, close], ...] (candle close time); 30m
+    # candles for 1 day, 4h for 7-30 days, 4 days beyond that
+    candles = sorted(tuple(candle) for candle in response.json())
+    interval = candle_interval_ms(candles)
+    if interval > BAR_MS:
+        print(f"{YELLOW}⚠️  CoinGecko returned {interval // 60000}-minute candles; resampled to "
+              f"{BAR_MS // 1000}s bars (prices inside a candle are its open){RESET}")
+        return resample_candles(candles, interval)
+    return candles
+
+
+def synthetic_bars(days, start_price, volatility, seed):
+    rng = random.Random(seed)
+    now = int(time.time() * 1000) // BAR_MS * BAR_MS
+    count = int(days * 24 * 60 * 60 * 1000 // BAR_MS)
+    price = start_price
+    bars = []
+    for i in range(count):
+        bar_time = now - (count - i) * BAR_MS
+        open_price = price
+        high = low = price
+        for _ in range(4):
+            price *= math.exp(rng.gauss(0, volatility / 2))
+            high, low = max(high, price), min(low, price)
+        bars.append((bar_time, open_price, high, low, price))
+    return bars
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the local price store")
+    parser.add_argument("--asset", default="BTC", help="BTC, ETH, SOL (or BTC/USD etc.)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="CSV of timestamps and prices/OHLC")
+    source.add_argument("--coingecko", action="store_true", help="fetch CoinGecko OHLC history")
+    source.add_argument("--synthetic", action="store_true", help="deterministic random walk")
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--start-price", type=float, default=45000)
+    parser.add_argument("--volatility", type=float, default=0.001, help="per-bar log-return stddev")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.coingecko:
+        if not args.days.is_integer() or int(args.days) not in COINGECKO_OHLC_DAYS:
+            parser.error(f"--coingecko needs --days in {', '.join(map(str, COINGECKO_OHLC_DAYS))}")
+        # Sent as "7", not "7.0"
+        args.days = int(args.days)
+
+    coin_id = ASSET_ID_MAP.get(args.asset.upper(), ASSET_ID_MAP["BTC"])
+    try:
+        if args.csv:
+            bars = bars_from_csv(args.csv)
+        elif args.coingecko:
+            bars = bars_from_coingecko(coin_id, args.days)
+        else:
+            bars = synthetic_bars(args.days, args.start_price, args.volatility, args.seed)
+    except (requests.exceptions.RequestException, ValueError, OSError) as e:
+        print(f"{RED}❌ Could not load bars: {e}{RESET}")
+        return 1
+
+    written = append_bars(coin_id, bars)
+    skipped = len(bars) - written
+    print(f"{GREEN}✅ {written} bars appended to {store_path(coin_id)}{RESET}")
+    if skipped:
+        print(f"{YELLOW}⚠️  {skipped} bars skipped (at or before the last stored bar){RESET}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Soak Test
+Drives a steady mixed workload against the server for hours while sampling
+its memory, event-loop delay and in-memory structure sizes from
+/api/debug/memory, then fits growth trends.
+
+The run fails when, after the warmup period:
+  - heap used or RSS grows faster than MAX_HEAP_GROWTH_MB_PER_HOUR /
+    MAX_RSS_GROWTH_MB_PER_HOUR (least-squares slope) AND keeps growing
+    (the median of each third of the run is higher than the one before), or
+  - more than LOOP_BREACH_FRACTION of the sample windows have an
+    event-loop delay p99 above MAX_LOOP_P99_MS.
+Structures that keep growing (betting pools, caches, memoizers, in-memory
+fallbacks, ...) are reported; with FAIL_ON_STRUCTURE_GROWTH=true they fail
+the run too.
+
+Each sample asks the server for a full GC first, so heap trends reflect
+retained memory. That needs the server started with --expose-gc:
+    NODE_OPTIONS=--expose-gc DEBUG_ENDPOINTS_ENABLED=true npm run start
+
+The workload mix is MIX (name=weight, ...); requests are chosen from a
+seeded random sequence, so two runs send the same stream.
+
+Usage:
+    python3 soak_test.py
+    DURATION_SECONDS=14400 RATE=10 python3 soak_test.py
+    DURATION_SECONDS=600 SAMPLE_INTERVAL_SECONDS=15 MIX="health=1,bet=1" python3 soak_test.py
+"""
+
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+TIMEOUT = 30
+DURATION_SECONDS = float(os.environ.get("DURATION_SECONDS", "7200"))
+RATE = float(os.environ.get("RATE", "5"))  # requests per second
+CONCURRENCY = int(os.environ.get("CONCURRENCY", "16"))
+SAMPLE_INTERVAL_SECONDS = float(os.environ.get("SAMPLE_INTERVAL_SECONDS", "60"))
+WARMUP_FRACTION = float(os.environ.get("WARMUP_FRACTION", "0.2"))
+MAX_HEAP_GROWTH_MB_PER_HOUR = float(os.environ.get("MAX_HEAP_GROWTH_MB_PER_HOUR", "20"))
+MAX_RSS_GROWTH_MB_PER_HOUR = float(os.environ.get("MAX_RSS_GROWTH_MB_PER_HOUR", "50"))
+MAX_LOOP_P99_MS = float(os.environ.get("MAX_LOOP_P99_MS", "100"))
+LOOP_BREACH_FRACTION = float(os.environ.get("LOOP_BREACH_FRACTION", "0.05"))
+FAIL_ON_STRUCTURE_GROWTH = os.environ.get("FAIL_ON_STRUCTURE_GROWTH", "false").lower() == "true"
+MIX = os.environ.get("MIX", "health=4,price=3,market=2,chat_history=2,human_chat=2,bet=1,consensus=1")
+WALLETS = int(os.environ.get("WALLETS", "200"))
+SEED = int(os.environ.get("SEED", "42"))
+DEBUG_METRICS_SECRET = os.environ.get("DEBUG_METRICS_SECRET")
+RESULTS_FILE = os.environ.get("RESULTS_FILE", "soak_test_results.json")
+MB = 1024 * 1024
+
+# Color codes for terminal output
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+BLUE = "\033[94m"
+RESET = "\033[0m"
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 1)
+
+
+def wallet(i):
+    return "0x" + f"{i:040x}"[-40:]
+
+
+# ---------------------------------------------------------------------------
+# Workload
+# ---------------------------------------------------------------------------
+
+ASSETS = ["BTC", "ETH", "SOL"]
+
+
+def workload_request(name, rng):
+    """(method, path, params, json body) for one request of the given kind"""
+    asset = rng.choice(ASSETS)
+    if name == "health":
+        return "GET", "/api/health", None, None
+    if name == "price":
+        return "GET", "/api/price", {"asset": f"{asset}/USD"}, None
+    if name == "market":
+        return "GET", "/api/market-data", {"asset": asset}, None
+    if name == "chat_history":
+        return "GET", "/api/chatroom/history", {"limitMessages": 20}, None
+    if name == "human_chat":
+        user = wallet(rng.randrange(WALLETS))
+        return "POST", "/api/human-chat/post", None, {
+            "userId": user, "handle": user[-8:], "content": f"soak {rng.randrange(10 ** 6)}"}
+    if name == "bet":
+        return "POST", "/api/prediction-market/bet", None, {
+            "address": wallet(rng.randrange(WALLETS)), "amount": 100 + rng.randrange(900),
+            "side": rng.choice(["up", "down"])}
+    if name == "consensus":
+        return "GET", "/api/consensus", {"asset": asset}, None
+    raise ValueError(f"unknown workload kind: {name}")
+
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name:
+            weights[name] = float(weight or 1)
+    for name in weights:
+        workload_request(name, random.Random(0))  # validate names up front
+    return weights
+
+
+class Workload:
+    def __init__(self, weights):
+        self.names = list(weights)
+        self.weights = [weights[n] for n in self.names]
+        self.rng = random.Random(SEED)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.window = {}
+        self.totals = {}
+
+    def session(self):
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def next_request(self):
+        name = self.rng.choices(self.names, self.weights)[0]
+        return name, workload_request(name, self.rng)
+
+    def send(self, name, request):
+        method, path, params, body = request
+        started = time.perf_counter()
+        try:
+            response = self.session().request(method, f"{BASE_URL}{path}", params=params, json=body,
+                                              timeout=TIMEOUT, stream=True)
+            try:
+                if response.headers.get("content-type", "").startswith("text/event-stream"):
+                    next(response.iter_content(chunk_size=1), None)
+                else:
+                    response.content
+            finally:
+                response.close()
+            status = response.status_code
+        except requests.exceptions.RequestException:
+            status = None
+        elapsed = (time.perf_counter() - started) * 1000
+        with self.lock:
+            for bucket in (self.window, self.totals):
+                entry = bucket.setdefault(name, {"latencies": [], "statuses": {}})
+                entry["latencies"].append(elapsed)
+                key = str(status)
+                entry["statuses"][key] = entry["statuses"].get(key, 0) + 1
+
+    def take_window(self):
+        with self.lock:
+            window, self.window = self.window, {}
+        return window
+
+
+def run_workload(workload, stop, pool):
+    interval = 1 / RATE
+    start = time.perf_counter()
+    sent = 0
+    while not stop.is_set():
+        delay = start + sent * interval - time.perf_counter()
+        if delay > 0:
+            stop.wait(delay)
+            continue
+        name, request = workload.next_request()
+        pool.submit(workload.send, name, request)
+        sent += 1
+
+
+# ---------------------------------------------------------------------------
+# Sampling and trends
+# ---------------------------------------------------------------------------
+
+def read_metrics(session):
+    headers = {"Authorization": f"Bearer {DEBUG_METRICS_SECRET}"} if DEBUG_METRICS_SECRET else {}
+    response = session.get(f"{BASE_URL}/api/debug/memory",
+                           params={"gc": "true", "reset": "true", "history": "false"},
+                           headers=headers, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def slope_per_hour(points):
+    """Least-squares slope of (seconds, value) points, per hour"""
+    if len(points) < 2:
+        return 0.0
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    mean_x, mean_y = statistics.mean(xs), statistics.mean(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if var_x == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x * 3600
+
+
+def keeps_growing(values):
+    """Median of each third is higher than the previous third's"""
+    if len(values) < 6:
+        return False
+    third = len(values) // 3
+    medians = [statistics.median(values[i * third:(i + 1) * third]) for i in range(3)]
+    return medians[0] < medians[1] < medians[2]
+
+
+def trend(points, budget):
+    slope = slope_per_hour(points)
+    growing = slope > 0 and keeps_growing([p[1] for p in points])
+    return {"slope_per_hour": round(slope, 2), "keeps_growing": growing,
+            "budget_per_hour": budget, "failed": budget is not None and growing and slope > budget}
+
+
+def main():
+    weights = parse_mix(MIX)
+    session = requests.Session()
+
+    print(f"{BLUE}{'=' * 80}{RESET}")
+    print(f"{BLUE}Soak Test - {BASE_URL} ({DURATION_SECONDS / 3600:.2f}h at {RATE} req/s, "
+          f"sample every {SAMPLE_INTERVAL_SECONDS:.0f}s){RESET}")
+    print(f"{BLUE}Mix: {weights}{RESET}")
+    print(f"{BLUE}{'=' * 80}{RESET}")
+
+    try:
+        first = read_metrics(session)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"{RED}❌ Cannot read /api/debug/memory: {e}{RESET}")
+        print(f"{YELLOW}   Start the server with DEBUG_ENDPOINTS_ENABLED=true (and --expose-gc){RESET}")
+        return 1
+    if not first.get("gcRan"):
+        print(f"{YELLOW}⚠️  Server not started with --expose-gc; heap trends include garbage{RESET}")
+
+    workload = Workload(weights)
+    stop = threading.Event()
+    samples = []
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        driver = threading.Thread(target=run_workload, args=(workload, stop, pool), daemon=True)
+        driver.start()
+        try:
+            while time.perf_counter() - start < DURATION_SECONDS:
+                time.sleep(min(SAMPLE_INTERVAL_SECONDS, max(0, DURATION_SECONDS - (time.perf_counter() - start))))
+                window = workload.take_window()
+                try:
+                    metrics = read_metrics(session)
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    print(f"{RED}❌ Metrics read failed: {e}{RESET}")
+                    samples.append({"t": time.perf_counter() - start, "error": str(e)})
+                    continue
+
+                memory, loop = metrics.get("memory") or {}, metrics.get("eventLoopDelay") or {}
+                requests_in_window = sum(len(w["latencies"]) for w in window.values())
+                errors = sum(c for w in window.values() for s, c in w["statuses"].items()
+                             if s == "None" or s.startswith("5"))
+                sample = {
+                    "t": round(time.perf_counter() - start, 1),
+                    "rss_mb": round(memory.get("rssBytes", 0) / MB, 2),
+                    "heap_used_mb": round(memory.get("heapUsedBytes", 0) / MB, 2),
+                    "external_mb": round(memory.get("externalBytes", 0) / MB, 2),
+                    "loop_p99_ms": loop.get("p99Ms"),
+                    "loop_max_ms": loop.get("maxMs"),
+                    "sizes": metrics.get("sizes", {}),
+                    "requests": requests_in_window,
+                    "errors": errors,
+                    "p95_ms": percentile([l for w in window.values() for l in w["latencies"]], 95),
+                }
+                samples.append(sample)
+                print(f"[{sample['t'] / 60:6.1f}m] rss {sample['rss_mb']:7.1f}MB  heap {sample['heap_used_mb']:7.1f}MB  "
+                      f"loop p99 {sample['loop_p99_ms']}ms  {requests_in_window} req  p95 {sample['p95_ms']}ms  "
+                      f"{errors} errors")
+        except KeyboardInterrupt:
+            print(f"{YELLOW}Interrupted; analysing what was collected{RESET}")
+        finally:
+            stop.set()
+            driver.join()
+
+    good = [s for s in samples if "error" not in s]
+    steady = [s for s in good if s["t"] >= DURATION_SECONDS * WARMUP_FRACTION] or good
+    failures = []
+
+    heap = trend([(s["t"], s["heap_used_mb"]) for s in steady], MAX_HEAP_GROWTH_MB_PER_HOUR)
+    rss = trend([(s["t"], s["rss_mb"]) for s in steady], MAX_RSS_GROWTH_MB_PER_HOUR)
+    for label, result in (("heap used", heap), ("RSS", rss)):
+        color = RED if result["failed"] else (YELLOW if result["keeps_growing"] else GREEN)
+        print(f"{color}{label}: {result['slope_per_hour']:+.1f} MB/h "
+              f"(budget {result['budget_per_hour']} MB/h, keeps growing: {result['keeps_growing']}){RESET}")
+        if result["failed"]:
+            failures.append(f"{label} grows {result['slope_per_hour']:+.1f} MB/h")
+
+    loop_p99s = [s["loop_p99_ms"] for s in good if s["loop_p99_ms"] is not None]
+    breaches = [p for p in loop_p99s if p > MAX_LOOP_P99_MS]
+    loop = {"p99_median_ms": percentile(loop_p99s, 50), "p99_worst_ms": max(loop_p99s) if loop_p99s else None,
+            "windows": len(loop_p99s), "breaches": len(breaches), "budget_ms": MAX_LOOP_P99_MS}
+    loop_failed = bool(loop_p99s) and len(breaches) / len(loop_p99s) > LOOP_BREACH_FRACTION
+    print(f"{RED if loop_failed else GREEN}event-loop p99: median {loop['p99_median_ms']}ms, worst "
+          f"{loop['p99_worst_ms']}ms, {len(breaches)}/{len(loop_p99s)} windows over {MAX_LOOP_P99_MS}ms{RESET}")
+    if loop_failed:
+        failures.append(f"event-loop p99 over {MAX_LOOP_P99_MS}ms in {len(breaches)}/{len(loop_p99s)} windows")
+
+    structures = {}
+    for name in sorted({n for s in steady for n in s["sizes"]}):
+        points = [(s["t"], s["sizes"][name]) for s in steady if s["sizes"].get(name) is not None]
+        if not points:
+            continue
+        result = trend(points, None)
+        result.update({"first": points[0][1], "last": points[-1][1]})
+        structures[name] = result
+        if result["keeps_growing"]:
+            print(f"{YELLOW}⚠️  {name}: {result['first']} → {result['last']} entries "
+                  f"({result['slope_per_hour']:+.0f}/h, keeps growing){RESET}")
+            if FAIL_ON_STRUCTURE_GROWTH:
+                failures.append(f"{name} keeps growing")
+
+    totals = {name: {"requests": len(entry["latencies"]), "p50_ms": percentile(entry["latencies"], 50),
+                     "p95_ms": percentile(entry["latencies"], 95), "statuses": entry["statuses"]}
+              for name, entry in workload.totals.items()}
+    for name, entry in sorted(totals.items()):
+        print(f"   {name:14} {entry['requests']:7} req  p50 {entry['p50_ms']}ms  p95 {entry['p95_ms']}ms  "
+              f"{entry['statuses']}")
+
+    with open(RESULTS_FILE, "w") as f:
+        json.dump({"timestamp": datetime.utcnow().isoformat(), "base_url": BASE_URL,
+                   "duration_seconds": DURATION_SECONDS, "rate": RATE, "mix": weights,
+                   "heap": heap, "rss": rss, "event_loop": loop, "structures": structures,
+                   "workload": totals, "samples": samples, "failures": failures}, f, indent=2)
+    print(f"{GREEN}Results saved to: {RESULTS_FILE}{RESET}")
+
+    if len(steady) < 6:
+        print(f"{YELLOW}⚠️  Only {len(steady)} samples after warmup; growth trends are unreliable{RESET}")
+    if failures:
+        print(f"{RED}❌ Soak test failed: {'; '.join(failures)}{RESET}")
+        return 1
+    print(f"{GREEN}✅ Memory and event-loop lag stayed within budget{RESET}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,11 +6,13 @@
  * - View model statistics
  * - Enable/disable models
  * - Change model priorities
- * - Reload configuration
+ * - Reload configuration (non-blocking, atomic snapshot swap)
  */
 
 import { NextRequest, NextResponse } from 'next/server';
-import { modelFactory, getModelStatistics, validateModelConfigs } from '@/lib/model-factory';
+import { loadModelFactory, trackRouteRequest } from '@/lib/cold-start';
+
+const ROUTE = '/api/admin/models';
 
 /**
  * GET /api/admin/models
@@ -18,18 +20,21 @@ import { modelFactory, getModelStatistics, validateModelConfigs } from '@/lib/mo
  * Returns detailed statistics and configuration for all models.
  */
 export async function GET(request: NextRequest) {
+  trackRouteRequest(ROUTE);
+
   try {
+    const { modelFactory, getModelStatistics, validateModelConfigs } = await loadModelFactory(ROUTE);
     const { searchParams } = new URL(request.url);
     const includeValidation = searchParams.get('validate') === 'true';
 
-    // Initialize factory
-    modelFactory.initialize();
+    // Read one consistent snapshot for the whole response
+    const snapshot = modelFactory.getSnapshot();
 
     // Get statistics
     const statistics = getModelStatistics();
 
     // Get all models (including disabled)
-    const allModels = Array.from(modelFactory['configCache'].values()).map(model => ({
+    const allModels = Array.from(snapshot.models.values()).map(model => ({
       id: model.id,
       name: model.name,
       role: model.role,
@@ -60,6 +65,12 @@ export async function GET(request: NextRequest) {
     return NextResponse.json({
       success: true,
       timestamp: new Date().toISOString(),
+      config: {
+        version: snapshot.version,
+        loadedAt: new Date(snapshot.loadedAt).toISOString(),
+        source: snapshot.source,
+        watching: modelFactory.isWatching(),
+      },
       statistics,
       models: allModels,
       fallbackChains,
@@ -86,7 +97,10 @@ export async function GET(request: NextRequest) {
  * { "modelId": "deepseek", "updates": { "enabled": false, "priority": "fallback" } }
  */
 export async function PATCH(request: NextRequest) {
+  trackRouteRequest(ROUTE);
+
   try {
+    const { modelFactory } = await loadModelFactory(ROUTE);
     const body = await request.json();
     const { modelId, updates } = body;
 
@@ -163,34 +177,65 @@ export async function PATCH(request: NextRequest) {
 }
 
 /**
- * POST /api/admin/models/reload
+ * POST /api/admin/models
  * 
  * Reload model configuration from disk and environment variables.
  * Useful for picking up changes without restarting the server.
+ * The file is read asynchronously and the new config is swapped in as a
+ * single snapshot; consensus runs already in flight keep the old one.
+ * 
+ * Body: { action: 'reload' | 'watch' | 'unwatch' }
  */
 export async function POST(request: NextRequest) {
+  trackRouteRequest(ROUTE);
+
   try {
+    const { modelFactory, getModelStatistics } = await loadModelFactory(ROUTE);
     const body = await request.json().catch(() => ({}));
     const { action } = body;
 
     if (action === 'reload') {
+      const previousVersion = modelFactory.getSnapshotVersion();
+
       // Reload configuration
-      modelFactory.reload();
+      const snapshot = await modelFactory.reloadAsync();
 
       // Get new statistics
       const statistics = getModelStatistics();
 
       return NextResponse.json({
         success: true,
-        message: 'Configuration reloaded successfully',
+        message: snapshot.version !== previousVersion
+          ? 'Configuration reloaded successfully'
+          : 'Configuration unchanged (reload rejected, see server logs)',
         timestamp: new Date().toISOString(),
+        config: {
+          version: snapshot.version,
+          previousVersion,
+          source: snapshot.source,
+        },
         statistics,
       });
     }
 
+    if (action === 'watch' || action === 'unwatch') {
+      if (action === 'watch') {
+        await modelFactory.watchConfigFile();
+      } else {
+        modelFactory.stopWatching();
+      }
+
+      return NextResponse.json({
+        success: true,
+        message: `Config watcher ${modelFactory.isWatching() ? 'running' : 'stopped'}`,
+        timestamp: new Date().toISOString(),
+        watching: modelFactory.isWatching(),
+      });
+    }
+
     return NextResponse.json({
       success: false,
-      error: 'Invalid action. Use: { "action": "reload" }',
+      error: 'Invalid action. Use: { "action": "reload" | "watch" | "unwatch" }',
     }, { status: 400 });
 
   } catch (error) {
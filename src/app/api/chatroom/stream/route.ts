@@ -1,39 +1,50 @@
 import { NextRequest } from 'next/server';
 import {
-  getMessages,
   getRollingHistory,
-  appendMessage,
   getState,
-  setState,
   acquireLock,
   releaseLock,
   getMessageIndex,
   initializeIfEmpty,
   getPersuasionStates,
-  setPersuasionStates,
-  saveDebateSummary,
-  clearDebateSummary,
-  getDebateHistory,
-  saveConsensusSnapshot,
   getConsensusSnapshots,
-  cleanupRollingHistory,
+  beginChatroomTurn,
 } from '@/lib/chatroom/kv-store';
 import { extractDebateSummary } from '@/lib/chatroom/argument-extractor';
-import {
-  generateNextMessageEnhanced,
-  initializeEnhancedState,
-} from '@/lib/chatroom/chatroom-engine-enhanced';
-import { PERSONAS_BY_ID } from '@/lib/chatroom/personas';
-import { ChatRoomState, ConsensusSnapshot, MessageSentiment } from '@/lib/chatroom/types';
+import { loadChatroomEngine, loadPersonas, trackRouteRequest } from '@/lib/cold-start';
+import { ChatMessage, ChatRoomState, ConsensusSnapshot, MessageSentiment } from '@/lib/chatroom/types';
 import { precomputeTypingDuration } from '@/lib/chatroom/typing-duration';
+import { encodeSseFrame, getLastEventId } from '@/lib/sse-channel';
+import { beginWork, measureBlock, trackSseConnection } from '@/lib/runtime-metrics';
 
 // Message interval ranges (ms)
+const ROUTE = '/api/chatroom/stream';
+
 const DEBATE_INTERVAL_MIN = 60_000;  // 60s
 const DEBATE_INTERVAL_MAX = 90_000;  // 90s
 const COOLDOWN_INTERVAL_MIN = 120_000; // 120s
 const COOLDOWN_INTERVAL_MAX = 180_000; // 180s
 const POLL_INTERVAL = 5_000;  // 5s poll for messages from other generators
 const KEEPALIVE_INTERVAL = 15_000; // 15s
+const MESSAGE_FRAME_CACHE_SIZE = 64;
+
+// Every connection on this instance polls and sends the same messages:
+// encode each message frame once and share the bytes
+const messageFrameCache = new Map<string, Uint8Array>();
+
+function encodeMessageFrame(message: ChatMessage, id: string): Uint8Array {
+  const key = `${id}:${message.id}`;
+  let frame = messageFrameCache.get(key);
+  if (!frame) {
+    frame = encodeSseFrame('message', message, id);
+    messageFrameCache.set(key, frame);
+    if (messageFrameCache.size > MESSAGE_FRAME_CACHE_SIZE) {
+      // Map keeps insertion order: drop the oldest frame
+      messageFrameCache.delete(messageFrameCache.keys().next().value!);
+    }
+  }
+  return frame;
+}
 
 function randomInterval(min: number, max: number): number {
   return min + Math.random() * (max - min);
@@ -56,18 +67,43 @@ function getPrimaryStanceForSnapshot(sentiments: MessageSentiment[]): MessageSen
 export const dynamic = 'force-dynamic';
 export const maxDuration = 300;
 
+/**
+ * Message index a reconnecting client has already seen.
+ * `message` events carry the shared KV message index as their SSE id, so the
+ * rolling history in KV doubles as the replay buffer across instances.
+ */
+function parseResumeIndex(request: NextRequest): number | null {
+  const lastEventId = getLastEventId(request);
+  if (!lastEventId || !/^\d+$/.test(lastEventId)) return null;
+  return Number(lastEventId);
+}
+
+/**
+ * Ids for the newest `count` messages, ending at the current message index
+ */
+function messageIdsFor(count: number, currentIndex: number): string[] {
+  return Array.from({ length: count }, (_, i) => String(currentIndex - count + 1 + i));
+}
+
 export async function GET(request: NextRequest) {
+  trackRouteRequest(ROUTE);
   const encoder = new TextEncoder();
+  const resumeIndex = parseResumeIndex(request);
   const lockId = `sse_${Date.now()}_${Math.random().toString(36).slice(2, 8)}`;
   const connectionStartTime = Date.now();
 
   const stream = new ReadableStream({
     async start(controller) {
-      const send = (eventType: string, data: unknown) => {
+      trackSseConnection(ROUTE, request.signal);
+
+      const send = (eventType: string, data: unknown, id?: string) => {
         try {
-          controller.enqueue(
-            encoder.encode(`event: ${eventType}\ndata: ${JSON.stringify(data)}\n\n`)
-          );
+          // Large payloads (history) are serialized here, on the event loop
+          controller.enqueue(measureBlock(`${ROUTE} encode`, () =>
+            eventType === 'message' && id
+              ? encodeMessageFrame(data as ChatMessage, id)
+              : encodeSseFrame(eventType, data, id)
+          ));
         } catch {
           // Controller closed
         }
@@ -81,6 +117,11 @@ export async function GET(request: NextRequest) {
         }
       };
 
+      // The persona tables and chatroom engine load (first connection only)
+      // while the history is read and sent
+      const chatroomModules = Promise.all([loadPersonas(ROUTE), loadChatroomEngine(ROUTE)]);
+      chatroomModules.catch(() => undefined);
+
       // Initialize state if first connection ever
       await initializeIfEmpty();
 
@@ -90,23 +131,39 @@ export async function GET(request: NextRequest) {
       // Send connection confirmation with timing metrics
       send('connected', {
         timestamp: Date.now(),
-        connectionTimeMs: connectionEstablishmentTime
+        connectionTimeMs: connectionEstablishmentTime,
+        resumed: resumeIndex !== null,
       });
 
       // CVAULT-217: Use rolling history (1-hour window) for initial load
       // This ensures clients only see messages from the last hour
       const history = await getRollingHistory();
       const state = await getState();
-      
-      // CVAULT-217: Also fetch consensus snapshots for historical context
-      const consensusSnapshots = await getConsensusSnapshots();
-      
-      send('history', { 
-        messages: history, 
-        phase: state.phase, 
-        cooldownEndsAt: state.cooldownEndsAt,
-        consensusSnapshots: consensusSnapshots.slice(-5), // Send last 5 snapshots
-      });
+
+      // Track last known message index for change detection
+      let lastKnownIndex = await getMessageIndex();
+
+      // A reconnecting client whose gap is still in the rolling history only
+      // gets the messages it missed; the client merges history by message id
+      const missedCount = resumeIndex === null ? -1 : lastKnownIndex - resumeIndex;
+      if (missedCount >= 0 && missedCount <= history.length) {
+        send('history', {
+          messages: missedCount > 0 ? history.slice(-missedCount) : [],
+          phase: state.phase,
+          cooldownEndsAt: state.cooldownEndsAt,
+          resumed: true,
+        }, String(lastKnownIndex));
+      } else {
+        // CVAULT-217: Also fetch consensus snapshots for historical context
+        const consensusSnapshots = await getConsensusSnapshots();
+
+        send('history', { 
+          messages: history, 
+          phase: state.phase, 
+          cooldownEndsAt: state.cooldownEndsAt,
+          consensusSnapshots: consensusSnapshots.slice(-5), // Send last 5 snapshots
+        }, String(lastKnownIndex));
+      }
 
       // Send current consensus if any
       if (state.consensusDirection !== null) {
@@ -116,6 +173,8 @@ export async function GET(request: NextRequest) {
         });
       }
 
+      const [{ PERSONAS_BY_ID }, { generateNextMessageEnhanced, initializeEnhancedState }] = await chatroomModules;
+
       // Send typing indicator if next speaker is pre-selected
       // CVAULT-178: Include estimated typing duration based on persona
       if (state.nextSpeakerId) {
@@ -135,30 +194,11 @@ export async function GET(request: NextRequest) {
       // Keepalive interval
       const keepaliveTimer = setInterval(sendKeepalive, KEEPALIVE_INTERVAL);
 
-      // Track last known message index for change detection
-      let lastKnownIndex = await getMessageIndex();
-
-      // CVAULT-217: Track last cleanup time for periodic rolling history cleanup
-      let lastCleanupTime = Date.now();
-      
-      // Main loop
+      // Main loop (rolling history cleanup runs in the cleanup scheduler)
       const runLoop = async () => {
         while (!request.signal.aborted) {
           const currentState = await getState();
           const now = Date.now();
-          
-          // CVAULT-217: Periodic cleanup of rolling history (every 5 minutes)
-          if (now - lastCleanupTime >= 5 * 60 * 1000) {
-            try {
-              const cleanupResult = await cleanupRollingHistory();
-              if (cleanupResult.removed > 0) {
-                console.log(`[CVAULT-217] Periodic cleanup: removed ${cleanupResult.removed} old messages`);
-              }
-              lastCleanupTime = now;
-            } catch (cleanupError) {
-              console.error('[CVAULT-217] Error during periodic cleanup:', cleanupError);
-            }
-          }
 
           // Determine interval based on phase
           const isDebate = currentState.phase === 'DEBATE' || currentState.phase === 'CONSENSUS';
@@ -174,6 +214,8 @@ export async function GET(request: NextRequest) {
             const gotLock = await acquireLock(lockId);
 
             if (gotLock) {
+              // The turn's writes are committed in one batch (see ChatroomTurn)
+              const turn = beginChatroomTurn();
               try {
                 // Re-verify state after acquiring lock (prevent duplicate generation)
                 const freshState = await getState();
@@ -235,6 +277,7 @@ export async function GET(request: NextRequest) {
 
                   let result;
 
+                  const endGeneration = beginWork('chatroom.generate');
                   try {
                     // CVAULT-185: Call enhanced engine with BTC market data
                     result = await generateNextMessageEnhanced(currentHistory, enhancedState, 'BTC');
@@ -242,7 +285,8 @@ export async function GET(request: NextRequest) {
                     // Check if this is a system message (empty content) indicating cooldown
                     if (result.message.personaId === 'system' && !result.message.content) {
                       // Just update state, don't append empty message
-                      await setState(result.state);
+                      await turn.setState(result.state);
+                      await turn.commit();
 
                       // Broadcast phase change if any
                       if (result.phaseChange) {
@@ -253,15 +297,16 @@ export async function GET(request: NextRequest) {
                         });
                       }
 
-                      lastKnownIndex = await getMessageIndex();
+                      lastKnownIndex = await turn.getMessageIndex();
                       return; // Skip normal message flow
                     }
 
                     // CVAULT-184: Check for skipped messages (silent persona failures)
                     // Don't append or broadcast skipped messages - just update state
                     if ((result.message as any).skipped) {
-                      await setState(result.state);
-                      lastKnownIndex = await getMessageIndex();
+                      await turn.setState(result.state);
+                      await turn.commit();
+                      lastKnownIndex = await turn.getMessageIndex();
                       return; // Skip normal message flow
                     }
 
@@ -274,6 +319,8 @@ export async function GET(request: NextRequest) {
 
                     // Release lock and continue to next iteration WITHOUT sending error to frontend
                     continue;
+                  } finally {
+                    endGeneration();
                   }
 
                   // CVAULT-178: Wait for typing duration before showing message
@@ -302,10 +349,10 @@ export async function GET(request: NextRequest) {
                       lastStanceChangeAt: pState.stanceHistory[pState.stanceHistory.length - 1]?.timestamp,
                     };
                   }
-                  await setPersuasionStates(newPersuasionStates);
+                  await turn.setPersuasionStates(newPersuasionStates);
 
                   // Store message and state
-                  await appendMessage(result.message);
+                  await turn.appendMessage(result.message);
 
                   // Convert enhanced state to basic state for storage
                   const basicState: ChatRoomState = {
@@ -318,29 +365,16 @@ export async function GET(request: NextRequest) {
                     messageCount: result.state.messageCount,
                     nextSpeakerId: result.state.nextSpeakerId,
                   };
-                  await setState(basicState);
-
-                  // Broadcast message
-                  send('message', result.message);
-
-                  // CVAULT-185: Broadcast stance change if it occurred
-                  if (result.stanceChanged && result.previousStance) {
-                    send('stance_change', {
-                      personaId: result.message.personaId,
-                      handle: result.message.handle,
-                      from: result.previousStance,
-                      to: result.persuasionState.currentStance,
-                      convictionScore: result.persuasionState.convictionScore,
-                    });
-                  }
+                  await turn.setState(basicState);
 
                   // CVAULT-190: Capture debate summary when consensus is reached
                   // CVAULT-217: Also create a persistent consensus snapshot
+                  let consensusSnapshot: ConsensusSnapshot | null = null;
                   if (result.phaseChange?.to === 'CONSENSUS' && result.consensusUpdate) {
                     try {
-                      const debateHistory = await getMessages();
+                      const debateHistory = await turn.getMessages();
                       const persuasionStates = result.state.persuasionStore.getAllStates();
-                      const debateHistorySummaries = await getDebateHistory();
+                      const debateHistorySummaries = await turn.getDebateHistory();
                       const roundNumber = debateHistorySummaries.length + 1;
                       
                       const summary = extractDebateSummary(
@@ -351,7 +385,7 @@ export async function GET(request: NextRequest) {
                         result.consensusUpdate.strength
                       );
                       
-                      await saveDebateSummary(summary);
+                      await turn.saveDebateSummary(summary);
                       console.log(`[CVAULT-190] Debate summary captured for round ${roundNumber}: ${summary.consensusDirection} @ ${summary.consensusStrength}%`);
                       
                       // CVAULT-217: Create persistent consensus snapshot
@@ -395,7 +429,7 @@ export async function GET(request: NextRequest) {
                         .sort((a, b) => b.messageCount - a.messageCount)
                         .slice(0, 5);
                       
-                      const consensusSnapshot: ConsensusSnapshot = {
+                      consensusSnapshot = {
                         id: `consensus_${Date.now()}_${roundNumber}`,
                         timestamp: Date.now(),
                         timestampRange: {
@@ -414,12 +448,7 @@ export async function GET(request: NextRequest) {
                         snapshotReason: 'consensus_reached',
                       };
                       
-                      await saveConsensusSnapshot(consensusSnapshot);
-                      
-                      // Broadcast the new snapshot to all connected clients
-                      send('consensus_snapshot', consensusSnapshot);
-                      
-                      console.log(`[CVAULT-217] Consensus snapshot created: ${consensusSnapshot.consensusDirection} @ ${consensusSnapshot.consensusStrength}%`);
+                      await turn.saveConsensusSnapshot(consensusSnapshot);
                     } catch (summaryError) {
                       // Non-blocking: log error but don't break consensus flow
                       console.error('[CVAULT-190/217] Failed to capture debate summary or consensus snapshot:', summaryError);
@@ -429,12 +458,36 @@ export async function GET(request: NextRequest) {
                   // CVAULT-190: Clear debate summary when starting new debate round
                   if (result.phaseChange?.from === 'COOLDOWN' && result.phaseChange?.to === 'DEBATE') {
                     try {
-                      await clearDebateSummary();
+                      await turn.clearDebateSummary();
                     } catch (clearError) {
                       console.error('[CVAULT-190] Failed to clear debate summary:', clearError);
                     }
                   }
 
+                  // Write the turn, then broadcast what was stored
+                  await turn.commit();
+                  const messageIndex = await turn.getMessageIndex();
+
+                  // Broadcast message
+                  send('message', result.message, String(messageIndex));
+
+                  // CVAULT-185: Broadcast stance change if it occurred
+                  if (result.stanceChanged && result.previousStance) {
+                    send('stance_change', {
+                      personaId: result.message.personaId,
+                      handle: result.message.handle,
+                      from: result.previousStance,
+                      to: result.persuasionState.currentStance,
+                      convictionScore: result.persuasionState.convictionScore,
+                    });
+                  }
+
+                  if (consensusSnapshot) {
+                    // Broadcast the new snapshot to all connected clients
+                    send('consensus_snapshot', consensusSnapshot);
+                    console.log(`[CVAULT-217] Consensus snapshot created: ${consensusSnapshot.consensusDirection} @ ${consensusSnapshot.consensusStrength}%`);
+                  }
+
                   // Broadcast phase change if any
                   if (result.phaseChange) {
                     send('phase_change', {
@@ -469,7 +522,7 @@ export async function GET(request: NextRequest) {
                     }
                   }
 
-                  lastKnownIndex = await getMessageIndex();
+                  lastKnownIndex = messageIndex;
                 }
               } catch (error) {
                 // CVAULT-184: Log errors internally but NEVER send to frontend
@@ -533,7 +586,7 @@ export async function GET(request: NextRequest) {
  * CVAULT-217: Uses rolling history to only send recent messages
  */
 async function pollForNewMessages(
-  send: (eventType: string, data: unknown) => void,
+  send: (eventType: string, data: unknown, id?: string) => void,
   lastKnownIndex: number,
   signal: AbortSignal
 ) {
@@ -551,11 +604,12 @@ async function pollForNewMessages(
 
     if (newCount > 0 && messages.length > 0) {
       const newMessages = messages.slice(-Math.min(newCount, messages.length));
-      for (const msg of newMessages) {
+      const ids = messageIdsFor(newMessages.length, currentIndex);
+      newMessages.forEach((msg, i) => {
         if (!signal.aborted) {
-          send('message', msg);
+          send('message', msg, ids[i]);
         }
-      }
+      });
     }
 
     // Also send latest state
@@ -0,0 +1,261 @@
+/**
+ * API Route: Batch Consensus Analysis
+ * POST /api/consensus-batch   { "assets": ["BTC", "ETH", "SOL"], "context": "optional" }
+ * GET  /api/consensus-batch?assets=BTC,ETH,SOL&context=optional
+ *
+ * Runs detailed (4/5) consensus for several assets in one request and
+ * streams each asset's result as Server-Sent Events as soon as it is ready,
+ * instead of dashboards issuing one full request per asset.
+ *
+ * - Counts as ONE request against CONSENSUS_RATE_LIMIT
+ * - Only assets with market data (isSupportedMarketAsset) are accepted
+ * - Market data for all assets is fetched once, up front, in parallel; it
+ *   is sent to the client and keys each asset's lookup in the same
+ *   market-state cache as /api/consensus-detailed
+ *   (src/lib/consensus-cache.ts), so a batch and a concurrent single-asset
+ *   request share the model calls
+ *
+ * Events:
+ *   { type: 'connected', assets, requestId }
+ *   { type: 'market_data', markets: { BTC: { price, priceChangePercentage24h, lastUpdated } } }
+ *   { type: 'asset_result', asset, ...ConsensusResponse, market, cached, responseTimeMs }
+ *   { type: 'asset_error', asset, message }
+ *   { type: 'complete', completed, failed, totalTimeMs }
+ */
+
+import { NextRequest } from 'next/server';
+import { loadConsensusEngine, trackRouteRequest } from '@/lib/cold-start';
+import {
+  checkRateLimit,
+  createRateLimitResponse,
+  CONSENSUS_RATE_LIMIT,
+} from '@/lib/rate-limit';
+import { getNoCacheHeaders } from '@/lib/cache';
+import { getCachedConsensusResult } from '@/lib/consensus-cache';
+import { createApiLogger } from '@/lib/api-logger';
+import { fetchMultipleMarketData, isSupportedMarketAsset, MarketData } from '@/lib/chatroom/market-data';
+import type { ConsensusResponse } from '@/lib/models';
+
+const ROUTE = '/api/consensus-batch';
+
+// The consensus engine is loaded on first use (see cold-start.ts)
+async function runDetailedConsensusAnalysis(asset: string, context?: string) {
+  const engine = await loadConsensusEngine(ROUTE);
+  return engine.runDetailedConsensusAnalysis(asset, context);
+}
+
+// Upper bound on assets per batch: each asset is a full analyst fan-out
+const MAX_BATCH_ASSETS = 10;
+
+interface MarketSnapshot {
+  price: number;
+  priceChangePercentage24h: number;
+  lastUpdated: string;
+}
+
+/**
+ * Normalize the requested asset list (uppercase, trimmed, de-duplicated)
+ */
+function parseAssets(raw: unknown): string[] | null {
+  const list = typeof raw === 'string' ? raw.split(',') : raw;
+  if (!Array.isArray(list)) return null;
+
+  const assets = [...new Set(
+    list
+      .filter((a): a is string => typeof a === 'string')
+      .map(a => a.trim().toUpperCase())
+      .filter(Boolean)
+  )];
+
+  return assets.length > 0 ? assets : null;
+}
+
+function toSnapshot(data: MarketData): MarketSnapshot {
+  return {
+    price: data.price,
+    priceChangePercentage24h: data.priceChangePercentage24h,
+    lastUpdated: data.lastUpdated,
+  };
+}
+
+function errorResponse(message: string, status: number): Response {
+  const response = Response.json({ error: message }, { status });
+  Object.entries(getNoCacheHeaders()).forEach(([key, value]) => {
+    response.headers.set(key, value);
+  });
+  return response;
+}
+
+/**
+ * Stream consensus for every asset, in completion order
+ */
+async function handleBatch(
+  request: NextRequest,
+  rawAssets: unknown,
+  context: string | undefined
+): Promise<Response> {
+  trackRouteRequest(ROUTE);
+  const logger = createApiLogger(request);
+  // The stream is logged when its headers go out (time to first byte)
+  const response = await streamBatch(request, logger, rawAssets, context);
+  logger.logResponse(response);
+  return response;
+}
+
+async function streamBatch(
+  request: NextRequest,
+  logger: ReturnType<typeof createApiLogger>,
+  rawAssets: unknown,
+  context: string | undefined
+): Promise<Response> {
+  logger.logRequest();
+
+  // One batch = one rate limit hit, however many assets it contains
+  const rateLimitResult = await checkRateLimit(request, CONSENSUS_RATE_LIMIT);
+  if (!rateLimitResult.success) {
+    return createRateLimitResponse(
+      rateLimitResult.limit,
+      rateLimitResult.remaining,
+      rateLimitResult.reset
+    );
+  }
+
+  const assets = parseAssets(rawAssets);
+  if (!assets) {
+    return errorResponse('Missing or invalid assets parameter', 400);
+  }
+  if (assets.length > MAX_BATCH_ASSETS) {
+    return errorResponse(`Too many assets (max ${MAX_BATCH_ASSETS} per batch)`, 400);
+  }
+  // Reject unknown symbols before fanning out a full consensus run for each
+  const unsupported = assets.filter(asset => !isSupportedMarketAsset(asset));
+  if (unsupported.length > 0) {
+    return errorResponse(`Unsupported asset(s): ${unsupported.join(', ')}`, 400);
+  }
+
+  logger.info('Starting batch consensus stream', { assets, hasContext: !!context });
+
+  const startTime = Date.now();
+  const encoder = new TextEncoder();
+  const signal = request.signal;
+
+  const stream = new ReadableStream({
+    async start(controller) {
+      const sendEvent = (data: object) => {
+        if (signal.aborted) return;
+        try {
+          controller.enqueue(encoder.encode(`data: ${JSON.stringify(data)}\n\n`));
+        } catch {
+          // Stream already closed by the client
+        }
+      };
+
+      sendEvent({ type: 'connected', assets, requestId: logger.getRequestId() });
+
+      // Single market data fetch for the whole batch, shared by every asset
+      const marketsPromise: Promise<Record<string, MarketData>> = fetchMultipleMarketData(assets)
+        .catch(error => {
+          logger.warn('Batch market data fetch failed', { error: String(error) });
+          return {};
+        });
+
+      marketsPromise.then(markets => sendEvent({
+        type: 'market_data',
+        markets: Object.fromEntries(
+          Object.entries(markets).map(([asset, md]) => [asset, toSnapshot(md)])
+        ),
+      }));
+
+      let completed = 0;
+      let failed = 0;
+
+      await Promise.all(assets.map(async (asset) => {
+        const assetStart = Date.now();
+        try {
+          const markets = await marketsPromise;
+          const { value: result, status } = await getCachedConsensusResult<ConsensusResponse>(
+            asset,
+            context,
+            () => runDetailedConsensusAnalysis(asset, context),
+            markets[asset]
+          );
+
+          completed++;
+          sendEvent({
+            type: 'asset_result',
+            asset,
+            ...result,
+            market: markets[asset] ? toSnapshot(markets[asset]) : null,
+            cached: status !== 'miss',
+            responseTimeMs: Date.now() - assetStart,
+          });
+        } catch (error) {
+          failed++;
+          logger.logError(error instanceof Error ? error : new Error(String(error)), {
+            endpoint: 'consensus-batch',
+            asset,
+          });
+          sendEvent({
+            type: 'asset_error',
+            asset,
+            message: error instanceof Error ? error.message : 'Unknown error',
+          });
+        }
+      }));
+
+      sendEvent({ type: 'complete', completed, failed, totalTimeMs: Date.now() - startTime });
+      logger.info('Batch consensus stream complete', {
+        assets: assets.length,
+        completed,
+        failed,
+        totalTimeMs: Date.now() - startTime,
+      });
+
+      try {
+        controller.close();
+      } catch {
+        // Already closed
+      }
+    },
+  });
+
+  return new Response(stream, {
+    headers: {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache',
+      Connection: 'keep-alive',
+      'X-Request-ID': logger.getRequestId(),
+      'X-RateLimit-Limit': String(rateLimitResult.limit),
+      'X-RateLimit-Remaining': String(rateLimitResult.remaining),
+      'X-RateLimit-Reset': String(rateLimitResult.reset),
+    },
+  });
+}
+
+/**
+ * POST /api/consensus-batch
+ */
+export async function POST(request: NextRequest) {
+  let body: { assets?: unknown; context?: unknown };
+  try {
+    body = await request.json();
+  } catch {
+    return errorResponse('Invalid JSON body', 400);
+  }
+
+  const context = typeof body.context === 'string' && body.context.trim() ? body.context : undefined;
+  return handleBatch(request, body.assets, context);
+}
+
+/**
+ * GET /api/consensus-batch?assets=BTC,ETH,SOL
+ * Same as POST, for EventSource clients
+ */
+export async function GET(request: NextRequest) {
+  const { searchParams } = new URL(request.url);
+  return handleBatch(
+    request,
+    searchParams.get('assets') ?? '',
+    searchParams.get('context') || undefined
+  );
+}
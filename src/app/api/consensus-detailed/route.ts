@@ -5,7 +5,9 @@
  * 
  * CVAULT-118/139: Caching Strategy
  * - GET: Edge caching with 60s TTL using Next.js unstable_cache
- * - POST: Request memoization only (no HTTP caching for mutations)
+ * - POST: No HTTP caching; results are reused while the market-state
+ *   fingerprint (price, 24h change, chatroom mood buckets) is unchanged
+ *   (see src/lib/consensus-cache.ts)
  * - Rate limiting preserved to prevent API abuse
  * - Cache key includes asset and context hash for precise invalidation
  * - Dynamic content (real-time debate) is NOT cached - see /api/chatroom/stream
@@ -13,21 +15,28 @@
  */
 
 import { NextRequest } from 'next/server';
-import { runDetailedConsensusAnalysis } from '@/lib/consensus-engine';
+import { loadConsensusEngine, trackRouteRequest } from '@/lib/cold-start';
 import { 
   checkRateLimit, 
   createRateLimitResponse, 
   CONSENSUS_RATE_LIMIT 
 } from '@/lib/rate-limit';
 import {
-  consensusMemoizer,
-  generateCacheKeySync,
   getCacheHeaders,
   getNoCacheHeaders,
   logCacheEvent,
   CACHE_TTL,
   withEdgeCache,
 } from '@/lib/cache';
+import { getCachedConsensusResult } from '@/lib/consensus-cache';
+
+const ROUTE = '/api/consensus-detailed';
+
+// The consensus engine is loaded on first use (see cold-start.ts)
+async function runDetailedConsensusAnalysis(asset: string, context?: string) {
+  const engine = await loadConsensusEngine(ROUTE);
+  return engine.runDetailedConsensusAnalysis(asset, context);
+}
 
 // Use edge runtime for global caching on GET requests
 export const runtime = 'edge';
@@ -67,6 +76,7 @@ export const runtime = 'edge';
  * }
  */
 export async function POST(request: NextRequest) {
+  trackRouteRequest(ROUTE);
   const startTime = Date.now();
   
   // Check rate limit
@@ -96,13 +106,12 @@ export async function POST(request: NextRequest) {
       return response;
     }
 
-    // Generate cache key from asset + context
-    const cacheKey = generateCacheKeySync('consensus', { asset, context: context || '' });
-
-    // Use memoization to prevent duplicate concurrent requests
-    const consensusResponse = await consensusMemoizer.execute(cacheKey, () =>
+    // Reuse the result while the market state is unchanged; concurrent
+    // identical requests share one analysis
+    const cacheResult = await getCachedConsensusResult(asset, context, () =>
       runDetailedConsensusAnalysis(asset, context)
     );
+    const consensusResponse = cacheResult.value;
 
     // Ensure consensusResponse is an object
     if (!consensusResponse || typeof consensusResponse !== 'object') {
@@ -119,12 +128,12 @@ export async function POST(request: NextRequest) {
     }
 
     const responseTime = Date.now() - startTime;
-    const isCached = responseTime < 100; // Likely cached if very fast
 
     const response = Response.json(
       { 
         ...consensusResponse, 
-        cached: isCached,
+        cached: cacheResult.status !== 'miss',
+        cacheAgeMs: cacheResult.ageMs,
         responseTimeMs: responseTime 
       }, 
       { status: 200 }
@@ -181,6 +190,7 @@ const getCachedConsensus = withEdgeCache(
  * Includes edge caching with 60s TTL (CVAULT-139)
  */
 export async function GET(request: NextRequest) {
+  trackRouteRequest(ROUTE);
   const startTime = Date.now();
   
   // Check rate limit
@@ -223,12 +233,12 @@ export async function GET(request: NextRequest) {
     }
 
     const responseTime = Date.now() - startTime;
-    const isCached = responseTime < 100; // Likely cached if very fast
 
     const response = Response.json(
       { 
         ...consensusResponse, 
-        cached: isCached,
+        cached: cacheResult.status !== 'miss',
+        cacheAgeMs: cacheResult.ageMs,
         responseTimeMs: responseTime 
       }, 
       { status: 200 }
@@ -1,7 +1,6 @@
 import { NextRequest } from 'next/server';
-import { runConsensusAnalysis } from '@/lib/consensus-engine';
 import {
-  prepareCouncilContext,
+  formatCouncilContext,
   getChatroomConsensus,
   calculateAlignmentScore,
   generateAlignmentCommentary,
@@ -13,6 +12,11 @@ import {
   CONSENSUS_RATE_LIMIT,
 } from '@/lib/rate-limit';
 import { createApiLogger } from '@/lib/api-logger';
+import { getDebateContext } from '@/lib/prompt-context';
+import { TaskGraph } from '@/lib/task-graph';
+import { loadConsensusEngine, trackRouteRequest } from '@/lib/cold-start';
+
+const ROUTE = '/api/consensus-enhanced';
 
 /**
  * Enhanced Consensus API
@@ -25,15 +29,59 @@ import { createApiLogger } from '@/lib/api-logger';
  * - Alignment scoring between both systems
  *
  * Returns comprehensive analysis with both perspectives.
+ *
+ * The rate limit check runs first, alongside loading the consensus engine
+ * (lazy, first request only). Once the request is allowed, the chatroom
+ * consensus and debate context KV reads run concurrently; a rate-limited
+ * request makes neither. The council fan-out starts once all are in. Task
+ * timings are returned in the Server-Timing header.
  */
 export async function GET(request: NextRequest) {
+  trackRouteRequest(ROUTE);
   const logger = createApiLogger(request);
+  const response = await handleEnhancedConsensus(request, logger);
+  logger.logResponse(response);
+  return response;
+}
 
+async function handleEnhancedConsensus(
+  request: NextRequest,
+  logger: ReturnType<typeof createApiLogger>
+): Promise<Response> {
   try {
     logger.logRequest();
 
-    // Check rate limit
-    const rateLimitResult = await checkRateLimit(request, CONSENSUS_RATE_LIMIT);
+    const { searchParams } = new URL(request.url);
+    const asset = searchParams.get('asset') || 'BTC';
+    const userContext = searchParams.get('context') || undefined;
+
+    const graph = new TaskGraph();
+    const rateLimit = graph.run('rate_limit', () => checkRateLimit(request, CONSENSUS_RATE_LIMIT));
+    const engine = graph.run('load_engine', () => loadConsensusEngine(ROUTE));
+    // Step 1: Fetch chatroom consensus (only for requests within the limit)
+    const chatroom = graph.after('chatroom', [rateLimit], async limit =>
+      limit.success ? getChatroomConsensus() : null
+    );
+    // Warm the debate context the analyst prompt is built from
+    const debate = graph.after('debate_context', [rateLimit], async limit =>
+      limit.success ? getDebateContext().catch(() => null) : null
+    );
+
+    // Step 2 + 3: Combine contexts and run the trading council
+    const council = graph.after('council', [rateLimit, chatroom, debate, engine], async (limit, chatroomConsensus, _debate, { runConsensusAnalysis }) => {
+      if (!limit.success || !chatroomConsensus) return null;
+
+      logger.info('Enhanced consensus analysis request', {
+        asset,
+        hasUserContext: !!userContext,
+      });
+
+      const { combinedContext } = formatCouncilContext(chatroomConsensus, userContext);
+      const analysis = await runConsensusAnalysis(asset, combinedContext || userContext);
+      return { ...analysis, combinedContext };
+    });
+
+    const rateLimitResult = await rateLimit;
     if (!rateLimitResult.success) {
       logger.warn('Rate limit exceeded', {
         limit: rateLimitResult.limit,
@@ -47,24 +95,8 @@ export async function GET(request: NextRequest) {
       );
     }
 
-    const { searchParams } = new URL(request.url);
-    const asset = searchParams.get('asset') || 'BTC';
-    const userContext = searchParams.get('context') || undefined;
-
-    logger.info('Enhanced consensus analysis request', {
-      asset,
-      hasUserContext: !!userContext,
-    });
-
-    // Step 1: Fetch chatroom consensus
-    const chatroomConsensus = await getChatroomConsensus();
-
-    // Step 2: Prepare combined context for trading council
-    const { combinedContext } = await prepareCouncilContext(userContext);
-
-    // Step 3: Run trading council analysis with chatroom context
-    const { analysts, consensus, partialFailures } =
-      await runConsensusAnalysis(asset, combinedContext || userContext);
+    const chatroomConsensus = (await chatroom)!;
+    const { analysts, consensus, partialFailures, combinedContext } = (await council)!;
 
     // Step 4: Calculate alignment between chatroom and council
     const councilSignal = consensus.signal || 'hold';
@@ -148,6 +180,7 @@ export async function GET(request: NextRequest) {
         'X-RateLimit-Limit': String(rateLimitResult.limit),
         'X-RateLimit-Remaining': String(rateLimitResult.remaining),
         'X-RateLimit-Reset': String(rateLimitResult.reset),
+        'Server-Timing': graph.serverTiming(),
       },
     });
   } catch (error) {
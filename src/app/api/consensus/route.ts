@@ -1,5 +1,4 @@
 import { NextRequest } from 'next/server';
-import { runConsensusAnalysis } from '@/lib/consensus-engine';
 import { AnalystResult, ANALYST_MODELS, ModelConfig, ModelResponse } from '@/lib/models';
 import {
   checkRateLimit,
@@ -10,7 +9,27 @@ import { createApiLogger } from '@/lib/api-logger';
 import type { ProgressUpdate } from '@/lib/types';
 import { proxyFetch, isProxyConfigured, ProxyError, isRetryableProxyError } from '@/lib/proxy-fetch';
 import { withAICaching, AI_CACHE_TTL } from '@/lib/ai-cache';
-import { ConsensusError } from '@/lib/consensus-engine';
+import { loadConsensusEngine, trackRouteRequest } from '@/lib/cold-start';
+import { encodeSseFrame, getLastEventId, type SseSubscription } from '@/lib/sse-channel';
+import { trackSseConnection } from '@/lib/runtime-metrics';
+import {
+  createConsensusRun,
+  completeConsensusRun,
+  findConsensusRun,
+  subscribeToConsensusRun,
+  type ConsensusRun,
+} from '@/lib/consensus-runs';
+
+const ROUTE = '/api/consensus';
+
+/**
+ * ConsensusError with type MISSING_API_KEY. The engine is loaded lazily;
+ * if it has not loaded, it cannot have thrown.
+ */
+function isMissingApiKeyError(error: unknown): boolean {
+  const ConsensusError = loadConsensusEngine.peek()?.ConsensusError;
+  return !!ConsensusError && error instanceof ConsensusError && error.type === 'MISSING_API_KEY';
+}
 
 // Use mock data when API keys aren't available (development mode)
 const USE_MOCK = process.env.NODE_ENV === 'development' && !process.env.DEEPSEEK_API_KEY;
@@ -18,12 +37,34 @@ const USE_MOCK = process.env.NODE_ENV === 'development' && !process.env.DEEPSEEK
 /**
  * SSE endpoint for streaming consensus analysis
  * GET /api/consensus?asset=BTC&context=optional context
+ *
+ * Events carry ids. A client reconnecting with Last-Event-ID (or
+ * ?lastEventId=) while its run is still retained is re-attached to that run
+ * and only receives the events it missed; no new analysis is started.
  */
 export async function GET(request: NextRequest) {
+  trackRouteRequest(ROUTE);
   const logger = createApiLogger(request);
-  
+  // Streams are logged when their headers go out (time to first byte)
+  const response = await handleConsensusRequest(request, logger);
+  logger.logResponse(response);
+  return response;
+}
+
+async function handleConsensusRequest(
+  request: NextRequest,
+  logger: ReturnType<typeof createApiLogger>
+): Promise<Response> {
   try {
     logger.logRequest();
+
+    // Resuming a known run costs no model calls, so it skips the rate limit
+    const lastEventId = getLastEventId(request);
+    const resumedRun = lastEventId ? findConsensusRun(lastEventId) : null;
+    if (resumedRun) {
+      logger.info('Resuming SSE consensus stream', { runId: resumedRun.runId, lastEventId });
+      return streamConsensusRun(request, logger, resumedRun, lastEventId, true);
+    }
     
     // Check rate limit
     const rateLimitResult = await checkRateLimit(request, CONSENSUS_RATE_LIMIT);
@@ -50,79 +91,54 @@ export async function GET(request: NextRequest) {
       useMock: USE_MOCK,
     });
 
-    const encoder = new TextEncoder();
+    const run = createConsensusRun(asset);
 
-    const stream = new ReadableStream({
-      async start(controller) {
-        const sendEvent = (data: object) => {
-          controller.enqueue(encoder.encode(`data: ${JSON.stringify(data)}\n\n`));
-        };
-
-        // Send initial connection message
-        sendEvent({ 
-          type: 'connected', 
-          asset,
-          requestId: logger.getRequestId(),
-        });
+    // The run publishes to its channel even if this client drops, so a
+    // reconnect can pick up where it left off (it is aborted if nobody
+    // reconnects within CONSENSUS_RUN_ORPHAN_GRACE_MS)
+    const sendEvent = (data: object) => {
+      run.channel.publish('message', data);
+    };
 
-        try {
-          if (USE_MOCK) {
-            logger.info('Using mock data for development');
-            await streamMockAnalysis(sendEvent, request.signal);
-          } else {
-            // Real API calls
-            await streamRealAnalysis(asset, context, sendEvent, request.signal);
-          }
-        } catch (error) {
-          logger.logError(error instanceof Error ? error : new Error(String(error)), {
-            endpoint: 'consensus',
-            method: 'GET',
-            streamType: 'SSE',
-          });
-          
-          // Check if this is a retryable proxy error
-          const isRetryable = error instanceof ProxyError ? error.retryable : false;
-          const errorType = error instanceof ProxyError ? error.type : 'UNKNOWN_ERROR';
-          
-          sendEvent({
-            type: 'error',
-            message: error instanceof Error ? error.message : 'Unknown error',
-            retryable: isRetryable,
-            errorType,
-            requestId: logger.getRequestId(),
-          });
+    const runAnalysis = async () => {
+      try {
+        if (USE_MOCK) {
+          logger.info('Using mock data for development');
+          await streamMockAnalysis(sendEvent, run.signal);
+        } else {
+          // Real API calls
+          await streamRealAnalysis(asset, context, sendEvent, run.signal);
         }
-
-        // Set up keepalive
-        const keepAliveInterval = setInterval(() => {
-          try {
-            controller.enqueue(encoder.encode(': keepalive\n\n'));
-          } catch {
-            clearInterval(keepAliveInterval);
-          }
-        }, 30000);
-
-        // Clean up on close
-        request.signal.addEventListener('abort', () => {
-          logger.info('SSE stream aborted by client');
-          clearInterval(keepAliveInterval);
-          controller.close();
+      } catch (error) {
+        logger.logError(error instanceof Error ? error : new Error(String(error)), {
+          endpoint: 'consensus',
+          method: 'GET',
+          streamType: 'SSE',
         });
-      },
-    });
+        
+        // Check if this is a retryable proxy error
+        const isRetryable = error instanceof ProxyError ? error.retryable : false;
+        const errorType = error instanceof ProxyError ? error.type : 'UNKNOWN_ERROR';
+        
+        sendEvent({
+          type: 'error',
+          message: error instanceof Error ? error.message : 'Unknown error',
+          retryable: isRetryable,
+          errorType,
+          requestId: logger.getRequestId(),
+        });
+      } finally {
+        completeConsensusRun(run.runId);
+      }
+    };
 
-    const response = new Response(stream, {
-      headers: {
-        'Content-Type': 'text/event-stream',
-        'Cache-Control': 'no-cache',
-        Connection: 'keep-alive',
-        'X-Request-ID': logger.getRequestId(),
-      },
-    });
+    const response = streamConsensusRun(request, logger, run, null, false);
+    runAnalysis();
 
     // Log response start (streaming responses are logged differently)
     logger.info('SSE stream started', {
       asset,
+      runId: run.runId,
       requestId: logger.getRequestId(),
       responseType: 'stream',
     });
@@ -182,7 +198,7 @@ export async function GET(request: NextRequest) {
     }
     
     // Handle missing API key errors (configuration issues)
-    if (error instanceof ConsensusError && error.type === 'MISSING_API_KEY') {
+    if (isMissingApiKeyError(error)) {
       return Response.json(
         {
           error: 'API configuration error. Please contact support.',
@@ -209,6 +225,64 @@ export async function GET(request: NextRequest) {
   }
 }
 
+/**
+ * Attach a connection to a run's channel.
+ * The channel replays anything after `lastEventId` and sends keepalives.
+ */
+function streamConsensusRun(
+  request: NextRequest,
+  logger: ReturnType<typeof createApiLogger>,
+  run: ConsensusRun,
+  lastEventId: string | null,
+  resumed: boolean
+): Response {
+  let subscription: SseSubscription | null = null;
+  let closeTracking: (() => void) | null = null;
+
+  const stream = new ReadableStream({
+    start(controller) {
+      closeTracking = trackSseConnection(ROUTE, request.signal);
+      const write = (bytes: Uint8Array) => controller.enqueue(bytes);
+
+      // Per-connection event: no id, so it never moves the client's Last-Event-ID
+      write(encodeSseFrame('message', {
+        type: 'connected',
+        asset: run.asset,
+        requestId: logger.getRequestId(),
+        runId: run.runId,
+        resumed,
+      }));
+
+      subscription = subscribeToConsensusRun(run, write, lastEventId);
+
+      // Clean up on close
+      request.signal.addEventListener('abort', () => {
+        logger.info('SSE stream aborted by client');
+        subscription?.unsubscribe();
+        try {
+          controller.close();
+        } catch {
+          // Already closed
+        }
+      });
+    },
+    cancel() {
+      subscription?.unsubscribe();
+      closeTracking?.();
+    },
+  });
+
+  return new Response(stream, {
+    headers: {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache',
+      Connection: 'keep-alive',
+      'X-Request-ID': logger.getRequestId(),
+      'X-Consensus-Run': run.runId,
+    },
+  });
+}
+
 /**
  * Stream real API analysis results
  * Enhanced with progress updates and user-facing error messages
@@ -238,6 +312,7 @@ async function streamRealAnalysis(
   };
 
   // Use the consensus engine with progress callback
+  const { runConsensusAnalysis } = await loadConsensusEngine(ROUTE);
   const { consensus, partialFailures } = await runConsensusAnalysis(
     asset,
     context,
@@ -278,7 +353,8 @@ async function streamRealAnalysis(
         }
       }
     },
-    handleProgress
+    handleProgress,
+    signal
   );
 
   // Send final consensus with enhanced information
@@ -440,6 +516,8 @@ async function streamMockAnalysis(
  * Returns all results at once
  */
 export async function POST(request: NextRequest) {
+  trackRouteRequest(ROUTE);
+
   // Check rate limit
   const rateLimitResult = await checkRateLimit(request, CONSENSUS_RATE_LIMIT);
   if (!rateLimitResult.success) {
@@ -627,7 +705,7 @@ export async function POST(request: NextRequest) {
     }
     
     // Handle missing API key errors (configuration issues)
-    if (error instanceof ConsensusError && error.type === 'MISSING_API_KEY') {
+    if (isMissingApiKeyError(error)) {
       return Response.json(
         {
           error: 'API configuration error. Please contact support.',
@@ -1,8 +1,12 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { runConsensusAnalysis } from '@/lib/consensus-engine';
 import { buildCouncilContext, recordCouncilResult } from '@/lib/chatroom-council-bridge';
 import type { MessageSentiment } from '@/lib/chatroom/types';
 import type { ConsensusData, Analyst } from '@/lib/types';
+import { getDebateContext } from '@/lib/prompt-context';
+import { TaskGraph } from '@/lib/task-graph';
+import { loadConsensusEngine, trackRouteRequest } from '@/lib/cold-start';
+
+const ROUTE = '/api/council/evaluate';
 
 /**
  * Council Evaluation API
@@ -36,12 +40,24 @@ import type { ConsensusData, Analyst } from '@/lib/types';
  *     chatroomContext?: { direction, strength };
  *   }
  * }
+ *
+ * The (lazy, first request only) consensus engine load starts alongside
+ * body parsing; the debate context read starts once the body has parsed,
+ * so a bad request never reaches KV. The council fan-out starts as soon as
+ * both are in. Task timings are returned in the
+ * Server-Timing header.
  */
 export async function POST(request: NextRequest) {
+  trackRouteRequest(ROUTE);
   const startTime = Date.now();
 
+  const graph = new TaskGraph();
+
   try {
-    const body = await request.json();
+    const engine = graph.run('load_engine', () => loadConsensusEngine(ROUTE));
+    const body = await graph.run('parse_body', () => request.json());
+    // Warm the debate context the analyst prompt is built from
+    const debate = graph.run('debate_context', () => getDebateContext().catch(() => null));
     const {
       asset = 'BTC',
       chatroomContext,
@@ -66,9 +82,8 @@ export async function POST(request: NextRequest) {
     });
 
     // Run the 5-agent consensus analysis
-    const { analysts, consensus, partialFailures } = await runConsensusAnalysis(
-      asset,
-      context
+    const { analysts, consensus, partialFailures } = await graph.after('council', [debate, engine], (_debate, { runConsensusAnalysis }) =>
+      runConsensusAnalysis(asset, context)
     );
 
     // Transform analysts to UI format
@@ -118,6 +133,8 @@ export async function POST(request: NextRequest) {
         triggeredBy,
         chatroomContext: chatroomContext || null,
       },
+    }, {
+      headers: { 'Server-Timing': graph.serverTiming() },
     });
   } catch (error) {
     const totalTimeMs = Date.now() - startTime;
@@ -0,0 +1,50 @@
+/**
+ * Process Memory Debug API Route
+ * GET /api/debug/memory
+ *
+ * Reports process.memoryUsage(), the sampled memory history, event-loop
+ * delay percentiles and the sizes of registered in-memory structures
+ * (see src/lib/process-metrics.ts). Used by soak_test.py to detect memory
+ * growth and event-loop lag over long runs.
+ *
+ * Security: see src/lib/debug-access.ts (off in production unless enabled).
+ *
+ * Query Parameters:
+ * - gc=true: run a full GC first (server started with `node --expose-gc`)
+ * - reset=true: start a new event-loop delay window after reading
+ * - history=false: omit the memory history
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { checkDebugAccess } from '@/lib/debug-access';
+import { getProcessMetrics, startProcessMetrics } from '@/lib/process-metrics';
+
+export const dynamic = 'force-dynamic';
+
+export async function GET(request: NextRequest) {
+  const denied = checkDebugAccess(request, 'debug/memory');
+  if (denied) return denied;
+
+  // No-op when instrumentation already started it
+  await startProcessMetrics();
+
+  const params = request.nextUrl.searchParams;
+  const gc = (globalThis as { gc?: () => void }).gc;
+  let gcRan = false;
+  if (params.get('gc') === 'true' && typeof gc === 'function') {
+    gc();
+    gcRan = true;
+  }
+
+  const metrics = getProcessMetrics({ resetLoopDelay: params.get('reset') === 'true' });
+  const body = {
+    timestamp: new Date().toISOString(),
+    gcRan,
+    ...metrics,
+    history: params.get('history') === 'false' ? undefined : metrics.history,
+  };
+
+  return NextResponse.json(body, {
+    headers: { 'Cache-Control': 'no-cache, no-store, must-revalidate' },
+  });
+}
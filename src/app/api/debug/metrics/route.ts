@@ -0,0 +1,40 @@
+/**
+ * Runtime Metrics Debug API Route
+ * GET /api/debug/metrics
+ *
+ * Event-loop delay and utilization, recent stalls with the work that was
+ * running when the loop was blocked, GC pause stats, active handles, open
+ * SSE connections and approximate per-route CPU time
+ * (see src/lib/runtime-metrics.ts). test_event_loop_stalls.py polls it
+ * during load runs.
+ *
+ * Security: see src/lib/debug-access.ts (off in production unless enabled).
+ *
+ * Query Parameters:
+ * - reset=true: start a new event-loop delay window after reading
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+import { checkDebugAccess } from '@/lib/debug-access';
+import { resetEventLoopDelay } from '@/lib/process-metrics';
+import { getRuntimeMetrics, startRuntimeMetrics } from '@/lib/runtime-metrics';
+
+export const dynamic = 'force-dynamic';
+
+export async function GET(request: NextRequest) {
+  const denied = checkDebugAccess(request, 'debug/metrics');
+  if (denied) return denied;
+
+  // No-op when instrumentation already started it
+  await startRuntimeMetrics();
+
+  const metrics = getRuntimeMetrics();
+  if (request.nextUrl.searchParams.get('reset') === 'true') {
+    resetEventLoopDelay();
+  }
+
+  return NextResponse.json(
+    { timestamp: new Date().toISOString(), ...metrics },
+    { headers: { 'Cache-Control': 'no-cache, no-store, must-revalidate' } }
+  );
+}
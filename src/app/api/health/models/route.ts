@@ -7,8 +7,9 @@
  */
 
 import { NextRequest, NextResponse } from 'next/server';
-import { modelFactory, getModelStatistics, validateModelConfigs } from '@/lib/model-factory';
-import { ANALYST_MODELS } from '@/lib/models';
+import { loadModelFactory, loadModels, trackRouteRequest } from '@/lib/cold-start';
+
+const ROUTE = '/api/health/models';
 
 /**
  * GET /api/health/models
@@ -28,7 +29,13 @@ import { ANALYST_MODELS } from '@/lib/models';
  * }
  */
 export async function GET(request: NextRequest) {
+  trackRouteRequest(ROUTE);
+
   try {
+    const [{ modelFactory, getModelStatistics, validateModelConfigs }, { ANALYST_MODELS }] = await Promise.all([
+      loadModelFactory(ROUTE),
+      loadModels(ROUTE),
+    ]);
     const { searchParams } = new URL(request.url);
     const validate = searchParams.get('validate') === 'true';
     const includeDefaults = searchParams.get('includeDefaults') === 'true';
@@ -1,7 +1,14 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { getSystemHealthSummary, getPerformanceMetrics as getConsensusMetrics } from '@/lib/consensus-engine';
 import { getPerformanceMetrics as getAIPerformanceMetrics } from '@/lib/ai-cache';
-import { checkAndCleanupIfNeeded, getLastCleanupTimestamp } from '@/lib/stale-trade-handler';
+import { getLastCleanupTimestamp } from '@/lib/stale-trade-handler';
+import { getCleanupSchedulerStats } from '@/lib/cleanup-scheduler';
+import { getColdStartStats, loadConsensusEngine, trackRouteRequest } from '@/lib/cold-start';
+import { getLogPipelineStats } from '@/lib/log-pipeline';
+import { getConsensusCacheStats } from '@/lib/consensus-cache';
+import { getTieredCacheStats } from '@/lib/tiered-cache';
+import { getChatroomStoreStats } from '@/lib/chatroom/kv-store';
+
+const ROUTE = '/api/health';
 
 /**
  * Health check endpoint for monitoring system status
@@ -20,11 +27,24 @@ import { checkAndCleanupIfNeeded, getLastCleanupTimestamp } from '@/lib/stale-tr
  * - SRE monitoring
  *
  * CVAULT-165: Enhanced with detailed cache metrics and response time tracking
+ *
+ * Only reads in-memory state: maintenance jobs (stale trade cleanup etc.) run
+ * in the cleanup scheduler, and their last results are reported here.
+ * `coldStart` reports lazy module load times per route against the budget.
+ * `logging` reports log pipeline volume, sampling and per-line emit cost.
+ * `runtime` summarizes event-loop delay, stalls, GC pauses and open SSE
+ * connections (details on /api/debug/metrics). `performance.consensus_cache`
+ * reports hit ratio, invalidations and result age of the market-state keyed
+ * consensus cache; `performance.tiered_cache` the L1/L2 hit rates of the
+ * shared price, market data and AI response caches. `chatroomStore` reports
+ * chatroom generation lock hold times and KV round trips per turn.
  */
 export async function GET(_request: NextRequest) {
+  trackRouteRequest(ROUTE);
   const startTime = Date.now();
 
   try {
+    const { getSystemHealthSummary, getPerformanceMetrics: getConsensusMetrics } = await loadConsensusEngine(ROUTE);
     const healthData = getSystemHealthSummary();
     const consensusMetrics = getConsensusMetrics();
     const aiCacheMetrics = getAIPerformanceMetrics();
@@ -99,10 +119,7 @@ export async function GET(_request: NextRequest) {
     });
 
     const responseTime = Date.now() - startTime;
-
-    // CVAULT-181: Trigger stale trade cleanup check on health endpoint visits
-    // This runs asynchronously and won't block the health response
-    const staleCheckTriggered = await checkAndCleanupIfNeeded();
+    const lastCleanupTimestamp = getLastCleanupTimestamp();
 
     const response = {
       status: healthData.overall.status,
@@ -141,26 +158,35 @@ export async function GET(_request: NextRequest) {
           per_model: Object.entries(aiCacheMetrics.cache).reduce((acc, [modelId, metrics]) => {
             acc[modelId] = {
               hits: metrics.hits,
+              l2_hits: metrics.l2Hits,
               misses: metrics.misses,
               hit_rate: metrics.hitRate,
               avg_response_time_ms: Math.round(metrics.avgResponseTime),
             };
             return acc;
-          }, {} as Record<string, { hits: number; misses: number; hit_rate: number; avg_response_time_ms: number }>),
+          }, {} as Record<string, { hits: number; l2_hits: number; misses: number; hit_rate: number; avg_response_time_ms: number }>),
           // Performance tracking
           performance_tracking: aiCacheMetrics.performance,
         },
+        // Consensus results reused while the market state is unchanged
+        consensus_cache: getConsensusCacheStats(),
+        // In-process (L1) and shared KV (L2) hit rates
+        tiered_cache: getTieredCacheStats(),
         // Endpoint response times by category
         endpoint_response_times: endpointResponseTimes,
       },
       version: process.env.npm_package_version || 'unknown',
       uptime: process.uptime(),
       staleTradeCleanup: {
-        lastCleanupAt: getLastCleanupTimestamp() > 0 
-          ? new Date(getLastCleanupTimestamp()).toISOString() 
+        lastCleanupAt: lastCleanupTimestamp > 0
+          ? new Date(lastCleanupTimestamp).toISOString()
           : null,
-        cleanupTriggeredThisRequest: staleCheckTriggered,
       },
+      cleanupScheduler: getCleanupSchedulerStats(),
+      coldStart: getColdStartStats(),
+      logging: getLogPipelineStats(),
+      chatroomStore: getChatroomStoreStats(),
+      runtime: healthData.runtime,
       responseTimeMs: responseTime,
     };
 
@@ -197,6 +223,8 @@ export async function GET(_request: NextRequest) {
  * Returns just the basic status without detailed metrics
  */
 export async function HEAD(request: NextRequest) {
+  trackRouteRequest(ROUTE);
+  const { getSystemHealthSummary } = await loadConsensusEngine(ROUTE);
   const healthData = getSystemHealthSummary();
   
   let statusCode = 200;
@@ -2,14 +2,13 @@ import { NextRequest, NextResponse } from 'next/server';
 import { HumanChatMessage, MAX_MESSAGE_LENGTH } from '@/lib/human-chat/types';
 import {
   appendMessage,
-  getState,
-  setState,
   updateUser,
-  getUsers,
-  checkRateLimit,
-  recordPost,
+  getUser,
+  incrementUserPostCount,
+  reservePostSlot,
 } from '@/lib/human-chat/kv-store';
 import { broadcastToAll } from '@/lib/human-chat/utils';
+import { beginWork } from '@/lib/runtime-metrics';
 import { geminiModerator } from '@/lib/chatroom/gemini-moderator';
 import { ModerationResult } from '@/lib/chatroom/types';
 
@@ -30,6 +29,7 @@ interface PostMessageRequest {
  * Rate limited: 1 message per 5 seconds per user.
  */
 export async function POST(request: NextRequest) {
+  const endWork = beginWork('/api/human-chat/post');
   try {
     const body: PostMessageRequest = await request.json();
     const { userId, handle, avatar = '👤', content } = body;
@@ -64,8 +64,8 @@ export async function POST(request: NextRequest) {
       );
     }
 
-    // Check rate limit
-    const rateLimit = await checkRateLimit(userId);
+    // Check rate limit and take this post's slot in one step
+    const rateLimit = await reservePostSlot(userId);
     if (!rateLimit.allowed) {
       return NextResponse.json(
         {
@@ -91,32 +91,23 @@ export async function POST(request: NextRequest) {
       },
     };
 
-    // Post message
+    // Post message (also bumps the room message count)
     await appendMessage(message);
 
-    // Record rate limit
-    await recordPost(userId);
-
-    // Update user stats
-    const users = await getUsers();
-    const existingUser = users[userId];
+    // Update user stats; only this user's keys are touched
+    const [existingUser, messageCount] = await Promise.all([
+      getUser(userId),
+      incrementUserPostCount(userId),
+    ]);
     await updateUser({
       userId,
       handle,
       avatar,
       lastSeenAt: Date.now(),
-      messageCount: (existingUser?.messageCount || 0) + 1,
+      messageCount,
       joinedAt: existingUser?.joinedAt || Date.now(),
     });
 
-    // Update state
-    const state = await getState();
-    await setState({
-      ...state,
-      messageCount: state.messageCount + 1,
-      lastMessageAt: message.timestamp,
-    });
-
     // Broadcast to all connected clients
     broadcastToAll('message', message);
 
@@ -143,6 +134,8 @@ export async function POST(request: NextRequest) {
       },
       { status: 500 }
     );
+  } finally {
+    endWork();
   }
 }
 
@@ -2,22 +2,22 @@ import { NextRequest } from 'next/server';
 import {
   getMessages,
   getState,
-  getUsers,
+  getUser,
+  getOnlineCount,
   updateUser,
   removeUser,
-  cleanupInactiveUsers,
 } from '@/lib/human-chat/kv-store';
 import { HumanChatMessage, HumanChatUser } from '@/lib/human-chat/types';
 import { registerConnection, unregisterConnection, broadcastToAll } from '@/lib/human-chat/utils';
-
-const KEEPALIVE_INTERVAL = 15_000; // 15s
+import { encodeSseFrame, getLastEventId } from '@/lib/sse-channel';
+import { trackSseConnection } from '@/lib/runtime-metrics';
 
 export const dynamic = 'force-dynamic';
 export const maxDuration = 300;
 
 export async function GET(request: NextRequest) {
-  const encoder = new TextEncoder();
   const connectionId = `conn_${Date.now()}_${Math.random().toString(36).slice(2, 8)}`;
+  const lastEventId = getLastEventId(request);
   
   // Get user info from query params (optional - for tracking active users)
   const url = new URL(request.url);
@@ -27,53 +27,49 @@ export async function GET(request: NextRequest) {
 
   const stream = new ReadableStream({
     async start(controller) {
-      const send = (eventType: string, data: unknown) => {
-        try {
-          controller.enqueue(
-            encoder.encode(`event: ${eventType}\ndata: ${JSON.stringify(data)}\n\n`)
-          );
-        } catch {
-          // Controller closed
-        }
-      };
+      trackSseConnection('/api/human-chat/stream', request.signal);
 
-      const sendKeepalive = () => {
+      const send = (eventType: string, data: unknown, id?: string | null) => {
         try {
-          controller.enqueue(encoder.encode(': keepalive\n\n'));
+          controller.enqueue(encodeSseFrame(eventType, data, id ?? undefined));
         } catch {
           // Controller closed
         }
       };
 
-      // Register connection
-      registerConnection(connectionId, controller);
-
       // Send connection confirmation
       send('connected', {
         timestamp: Date.now(),
         connectionId,
+        resumed: !!lastEventId,
       });
 
-      // Load and send history
-      const messages = await getMessages();
-      const state = await getState();
-      const users = await getUsers();
-      
-      send('history', { 
-        messages, 
-        state,
-        activeUsers: Object.keys(users).length,
-      });
+      // Register connection; a resuming client gets the missed broadcasts
+      // replayed here (the channel also handles keepalives)
+      const subscription = registerConnection(connectionId, controller, lastEventId);
+
+      // Full history only for fresh connections or gaps older than the buffer
+      if (!lastEventId || subscription.missedEvents) {
+        const [messages, state] = await Promise.all([getMessages(), getState()]);
+
+        // Tagged with the subscribe-time id so a later resume starts here
+        send('history', { 
+          messages, 
+          state,
+          activeUsers: state.activeUsers,
+        }, subscription.lastEventId);
+      }
 
       // Register user if provided
       if (userId && handle) {
+        const existingUser = await getUser(userId);
         const user: HumanChatUser = {
           userId,
           handle,
           avatar,
           lastSeenAt: Date.now(),
-          messageCount: users[userId]?.messageCount || 0,
-          joinedAt: users[userId]?.joinedAt || Date.now(),
+          messageCount: existingUser?.messageCount || 0,
+          joinedAt: existingUser?.joinedAt || Date.now(),
         };
         await updateUser(user);
         
@@ -82,26 +78,21 @@ export async function GET(request: NextRequest) {
           userId,
           handle,
           avatar,
-          activeUsers: Object.keys(users).length + 1,
+          activeUsers: await getOnlineCount(),
         });
       }
 
-      // Keepalive interval
-      const keepaliveTimer = setInterval(sendKeepalive, KEEPALIVE_INTERVAL);
-
       // Cleanup on abort
       request.signal.addEventListener('abort', async () => {
-        clearInterval(keepaliveTimer);
         unregisterConnection(connectionId);
         
         // Remove user from active users
         if (userId) {
           await removeUser(userId);
-          const remainingUsers = await getUsers();
           broadcastToAll('user_left', {
             userId,
             handle,
-            activeUsers: Object.keys(remainingUsers).length,
+            activeUsers: await getOnlineCount(),
           });
         }
         
@@ -27,6 +27,7 @@
 
 import { NextRequest, NextResponse } from 'next/server';
 import { RoundPhase } from '@/lib/prediction-market/types';
+import { beginWork } from '@/lib/runtime-metrics';
 import {
   getCurrentRound,
   getCurrentPool,
@@ -50,6 +51,7 @@ export const dynamic = 'force-dynamic';
  */
 export async function POST(request: NextRequest) {
   const startTime = Date.now();
+  const endWork = beginWork('/api/prediction-market/bet');
   
   try {
     // Parse request body
@@ -314,6 +316,8 @@ export async function POST(request: NextRequest) {
     });
     
     return response;
+  } finally {
+    endWork();
   }
 }
 
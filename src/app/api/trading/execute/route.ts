@@ -11,10 +11,19 @@
 
 import { NextRequest, NextResponse } from 'next/server';
 import { executePaperTrade, shouldExecuteTrade } from '@/lib/paper-trading-engine';
-import { runDetailedConsensusAnalysis } from '@/lib/consensus-engine';
+import { loadConsensusEngine, trackRouteRequest } from '@/lib/cold-start';
 import { getNoCacheHeaders } from '@/lib/cache';
 
+const ROUTE = '/api/trading/execute';
+
+// The consensus engine is loaded on first use (see cold-start.ts)
+async function runDetailedConsensusAnalysis(asset: string, context?: string) {
+  const engine = await loadConsensusEngine(ROUTE);
+  return engine.runDetailedConsensusAnalysis(asset, context);
+}
+
 export async function POST(request: NextRequest) {
+  trackRouteRequest(ROUTE);
   const startTime = Date.now();
 
   try {
@@ -13,6 +13,7 @@ import {
   getCachedSummary,
   cacheSummary
 } from '@/lib/chatroom/local-storage';
+import { trackLastEventId, withLastEventId } from '@/lib/sse-resume';
 
 interface TypingPersona {
   id: string;
@@ -78,6 +79,7 @@ export function useChatroomStream(): ChatroomStreamState & ChatroomStreamActions
   const [consensusSnapshots, setConsensusSnapshots] = useState<ConsensusSnapshot[]>([]);
 
   const retryCountRef = useRef(0);
+  const lastEventIdRef = useRef<string | null>(null);
   const maxRetries = 5;
   const eventSourceRef = useRef<EventSource | null>(null);
   const typingTimeoutRef = useRef<NodeJS.Timeout | null>(null);
@@ -302,8 +304,12 @@ export function useChatroomStream(): ChatroomStreamState & ChatroomStreamActions
         eventSourceRef.current.close();
       }
 
-      const es = new EventSource('/api/chatroom/stream');
+      // Resume from the last message index seen; the server sends only the gap
+      const es = new EventSource(withLastEventId('/api/chatroom/stream', lastEventIdRef.current));
       eventSourceRef.current = es;
+      trackLastEventId(es, ['history', 'message'], (id) => {
+        lastEventIdRef.current = id;
+      });
 
       es.addEventListener('connected', () => {
         setIsConnected(true);
@@ -2,6 +2,7 @@
 
 import { useState, useEffect, useRef, useCallback } from 'react';
 import { HumanChatMessage, HumanChatState } from '@/lib/human-chat/types';
+import { trackLastEventId, withLastEventId } from '@/lib/sse-resume';
 
 interface HumanChatUser {
   userId: string;
@@ -40,6 +41,7 @@ export function useHumanChat(
   const retryCountRef = useRef(0);
   const maxRetries = 5;
   const eventSourceRef = useRef<EventSource | null>(null);
+  const lastEventIdRef = useRef<string | null>(null);
   const messageIdsRef = useRef<Set<string>>(new Set());
   const rateLimitTimerRef = useRef<NodeJS.Timeout | null>(null);
 
@@ -65,8 +67,12 @@ export function useHumanChat(
       url += `?${params.toString()}`;
     }
 
-    const es = new EventSource(url);
+    // Resume from the last event seen so only missed events are replayed
+    const es = new EventSource(withLastEventId(url, lastEventIdRef.current));
     eventSourceRef.current = es;
+    trackLastEventId(es, ['history', 'message', 'user_joined', 'user_left'], (id) => {
+      lastEventIdRef.current = id;
+    });
 
     es.addEventListener('connected', () => {
       setIsConnected(true);
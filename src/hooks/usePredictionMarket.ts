@@ -9,6 +9,8 @@ import {
   isBettingPhase,
   PredictionMarketConfig 
 } from '@/lib/prediction-market/types';
+import { applyRoundDelta, type RoundStateDelta } from '@/lib/prediction-market/round-delta';
+import { trackLastEventId, withLastEventId } from '@/lib/sse-resume';
 
 interface LatestConsensus {
   level: number;
@@ -60,6 +62,7 @@ export function usePredictionMarket(): PredictionMarketState {
   // Refs for EventSource and retry management
   const retryCountRef = useRef(0);
   const eventSourceRef = useRef<EventSource | null>(null);
+  const lastEventIdRef = useRef<string | null>(null);
 
   // Update derived state
   const isInBettingWindow = round ? isBettingPhase(round.phase) : false;
@@ -154,6 +157,18 @@ export function usePredictionMarket(): PredictionMarketState {
     }
   }, []);
 
+  // Only the changed fields of the current round
+  const handleRoundDelta = useCallback((event: MessageEvent) => {
+    try {
+      const delta: RoundStateDelta = JSON.parse(event.data);
+      setRound(prev => applyRoundDelta(prev, delta));
+      if (delta.changes.bettingPool) setPool(delta.changes.bettingPool);
+      if (delta.changes.currentPrice !== undefined) setCurrentPrice(delta.changes.currentPrice);
+    } catch (e) {
+      console.error('[prediction-market] Failed to parse round_delta:', e);
+    }
+  }, []);
+
   const handleConsensusUpdate = useCallback((event: MessageEvent) => {
     try {
       const data = JSON.parse(event.data);
@@ -245,12 +260,19 @@ export function usePredictionMarket(): PredictionMarketState {
       }
 
       try {
-        const es = new EventSource('/api/prediction-market/stream');
+        // Resume from the last event seen so only missed events are replayed
+        const es = new EventSource(withLastEventId('/api/prediction-market/stream', lastEventIdRef.current));
         eventSourceRef.current = es;
+        trackLastEventId(
+          es,
+          ['round_state', 'round_delta', 'consensus_update', 'phase_change', 'pool_update', 'price_update', 'settlement_complete', 'round_complete'],
+          (id) => { lastEventIdRef.current = id; }
+        );
 
         // Register event listeners
         es.addEventListener('connected', handleConnected);
         es.addEventListener('round_state', handleRoundState);
+        es.addEventListener('round_delta', handleRoundDelta);
         es.addEventListener('consensus_update', handleConsensusUpdate);
         es.addEventListener('phase_change', handlePhaseChange);
         es.addEventListener('pool_update', handlePoolUpdate);
@@ -0,0 +1,22 @@
+/**
+ * Next.js instrumentation hook — runs once when a server instance starts.
+ *
+ * Starts the background cleanup scheduler (Node.js runtime only; the edge
+ * runtime has no long-lived timers) and compiles the persona prompt
+ * templates so the first chatroom turn does not pay for it. Memory,
+ * event-loop delay, stall and GC instrumentation (/api/debug/memory,
+ * /api/debug/metrics) starts here too, so it covers the whole process
+ * lifetime.
+ */
+export async function register() {
+  if (process.env.NEXT_RUNTIME === 'nodejs') {
+    const { startRuntimeMetrics } = await import('./lib/runtime-metrics');
+    await startRuntimeMetrics();
+
+    const { startCleanupScheduler } = await import('./lib/cleanup-scheduler');
+    startCleanupScheduler();
+
+    const { compilePersonaPrompts } = await import('./lib/chatroom/prompt-templates');
+    compilePersonaPrompts();
+  }
+}
@@ -0,0 +1,164 @@
+/**
+ * Write-Behind Chatroom Turn Tests (in-memory backend)
+ */
+
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
+import {
+  ChatroomTurn,
+  acquireLock,
+  releaseLock,
+  getMessages,
+  getMessageIndex,
+  getState,
+  getPersuasionStates,
+  getDebateSummary,
+  getDebateHistory,
+  getConsensusSnapshots,
+  getDebateSummaryVersion,
+  getChatroomStoreStats,
+  resetChatroomStore,
+} from '../chatroom/kv-store';
+import type { ChatMessage, ChatRoomState, ConsensusSnapshot, DebateSummary } from '../chatroom/types';
+
+function message(id: string): ChatMessage {
+  return {
+    id,
+    personaId: 'moonboy',
+    handle: 'MoonBoy',
+    avatar: '🚀',
+    content: `message ${id}`,
+    sentiment: 'bullish',
+    timestamp: Date.now(),
+    phase: 'DEBATE',
+  };
+}
+
+function state(messageCount: number): ChatRoomState {
+  return {
+    phase: 'CONSENSUS',
+    phaseStartedAt: Date.now(),
+    cooldownEndsAt: null,
+    lastMessageAt: Date.now(),
+    lastSpeakerId: 'moonboy',
+    messageCount,
+    nextSpeakerId: 'bearwhale',
+    consensusDirection: 'bullish',
+    consensusStrength: 82,
+    recentSpeakers: ['moonboy'],
+  };
+}
+
+function summary(roundNumber: number): DebateSummary {
+  return {
+    roundNumber,
+    timestamp: Date.now(),
+    consensusDirection: 'bullish',
+    consensusStrength: 82,
+    keyBullishArguments: ['ETF inflows'],
+    keyBearishArguments: [],
+    stanceChanges: [],
+    topDataPoints: [],
+    messageCount: 2,
+  };
+}
+
+function snapshot(id: string): ConsensusSnapshot {
+  return {
+    id,
+    timestamp: Date.now(),
+    timestampRange: { start: Date.now(), end: Date.now() },
+    consensusDirection: 'bullish',
+    consensusStrength: 82,
+    keyArgumentsSummary: { bullish: [], bearish: [], neutral: [] },
+    topPersonaContributions: [],
+    messageCount: 2,
+    snapshotReason: 'consensus_reached',
+  };
+}
+
+describe('Chatroom write-behind turn', () => {
+  beforeEach(() => {
+    delete process.env.KV_REST_API_URL;
+    delete process.env.KV_REST_API_TOKEN;
+    resetChatroomStore();
+    vi.spyOn(console, 'log').mockImplementation(() => {});
+  });
+
+  afterEach(() => {
+    vi.restoreAllMocks();
+  });
+
+  it('should let the turn read its own staged writes before commit', async () => {
+    const turn = new ChatroomTurn(true);
+    await turn.appendMessage(message('m1'));
+    await turn.setState(state(1));
+    await turn.saveDebateSummary(summary(1));
+
+    expect((await turn.getMessages()).map(m => m.id)).toEqual(['m1']);
+    expect(await turn.getMessageIndex()).toBe(1);
+    expect((await turn.getState()).messageCount).toBe(1);
+    expect(await turn.getDebateHistory()).toHaveLength(1);
+
+    // Nothing is visible outside the turn yet
+    expect(await getMessages()).toEqual([]);
+    expect(await getMessageIndex()).toBe(0);
+    expect((await getState()).messageCount).toBe(0);
+  });
+
+  it('should apply every staged mutation on commit', async () => {
+    const version = getDebateSummaryVersion();
+    const turn = new ChatroomTurn(true);
+    await turn.setPersuasionStates({ moonboy: { currentStance: 'bullish', convictionLevel: 'strong', convictionScore: 90, stanceChanges: 0 } });
+    await turn.appendMessage(message('m1'));
+    await turn.appendMessage(message('m2'));
+    await turn.setState(state(2));
+    await turn.saveDebateSummary(summary(1));
+    await turn.saveConsensusSnapshot(snapshot('s1'));
+    await turn.commit();
+
+    expect((await getMessages()).map(m => m.id)).toEqual(['m1', 'm2']);
+    expect(await getMessageIndex()).toBe(2);
+    expect(await turn.getMessageIndex()).toBe(2);
+    expect((await getState()).messageCount).toBe(2);
+    expect(Object.keys(await getPersuasionStates())).toEqual(['moonboy']);
+    expect((await getDebateSummary())?.roundNumber).toBe(1);
+    expect(await getDebateHistory()).toHaveLength(1);
+    expect((await getConsensusSnapshots()).map(s => s.id)).toEqual(['s1']);
+    expect(getDebateSummaryVersion()).toBe(version + 1);
+
+    const clear = new ChatroomTurn(true);
+    await clear.clearDebateSummary();
+    await clear.commit();
+    expect(await getDebateSummary()).toBeNull();
+    expect(getChatroomStoreStats().commits.count).toBe(2);
+  });
+
+  it('should write through immediately when write-behind is off', async () => {
+    const turn = new ChatroomTurn(false);
+    await turn.appendMessage(message('m1'));
+    await turn.setState(state(1));
+
+    expect((await getMessages()).map(m => m.id)).toEqual(['m1']);
+    expect((await getState()).messageCount).toBe(1);
+    await turn.commit();
+    expect(getChatroomStoreStats().commits.count).toBe(0);
+  });
+
+  it('should record how long the generation lock was held', async () => {
+    let now = 1_000_000;
+    vi.spyOn(Date, 'now').mockImplementation(() => now);
+
+    expect(await acquireLock('sse_a')).toBe(true);
+    now += 250;
+    await releaseLock('sse_a');
+    expect(await acquireLock('sse_b')).toBe(true);
+    now += 50;
+    await releaseLock('sse_b');
+    // Releasing a lock this holder never acquired is not a hold
+    await releaseLock('sse_c');
+
+    const { lock, backend } = getChatroomStoreStats();
+    expect(backend).toBe('memory');
+    expect(lock).toMatchObject({ holds: 2, avgHoldMs: 150, maxHoldMs: 250, p95HoldMs: 250, avgRoundTripsPerHold: 0 });
+  });
+});
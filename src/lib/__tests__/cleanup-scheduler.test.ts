@@ -0,0 +1,117 @@
+/**
+ * Cleanup Scheduler Tests
+ */
+
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
+import {
+  startCleanupScheduler,
+  stopCleanupScheduler,
+  runCleanupJob,
+  getCleanupSchedulerStats,
+  resetCleanupSchedulerState,
+  type CleanupJob,
+} from '../cleanup-scheduler';
+
+function jobStats(name: string) {
+  return getCleanupSchedulerStats().jobs.find(job => job.name === name)!;
+}
+
+describe('Cleanup scheduler', () => {
+  beforeEach(() => {
+    resetCleanupSchedulerState();
+  });
+
+  afterEach(() => {
+    resetCleanupSchedulerState();
+    vi.restoreAllMocks();
+  });
+
+  function makeJob(name: string, run: CleanupJob['run']): CleanupJob {
+    return { name, intervalMs: 60_000, run };
+  }
+
+  it('should run a job and record its metrics', async () => {
+    const run = vi.fn(async () => ({ removed: 3 }));
+    startCleanupScheduler([makeJob('history', run)]);
+
+    await runCleanupJob('history');
+
+    const stats = jobStats('history');
+    expect(run).toHaveBeenCalledTimes(1);
+    expect(stats.runs).toBe(1);
+    expect(stats.failures).toBe(0);
+    expect(stats.lastResult).toEqual({ removed: 3 });
+    expect(stats.lastRunAt).not.toBeNull();
+    expect(stats.running).toBe(false);
+  });
+
+  it('should not start a second run while one is in flight', async () => {
+    let finish: () => void = () => {};
+    const run = vi.fn(() => new Promise<void>(resolve => { finish = resolve; }));
+    startCleanupScheduler([makeJob('slow', run)]);
+
+    const first = runCleanupJob('slow');
+    const second = runCleanupJob('slow');
+    expect(second).toBe(first);
+
+    await Promise.resolve();
+    await Promise.resolve();
+    finish();
+    await first;
+
+    expect(run).toHaveBeenCalledTimes(1);
+    expect(jobStats('slow').skippedRunning).toBe(1);
+  });
+
+  it('should hold the job lock for the rest of the interval', async () => {
+    const run = vi.fn(async () => undefined);
+    startCleanupScheduler([makeJob('mutes', run)]);
+
+    await runCleanupJob('mutes');
+    await runCleanupJob('mutes');
+    expect(run).toHaveBeenCalledTimes(1);
+    expect(jobStats('mutes').skippedLocked).toBe(1);
+
+    // The lock expires before the next (jittered) tick
+    vi.spyOn(Date, 'now').mockReturnValue(Date.now() + 60_000);
+    await runCleanupJob('mutes');
+    expect(run).toHaveBeenCalledTimes(2);
+  });
+
+  it('should release the lock when a run fails so it can be retried', async () => {
+    let calls = 0;
+    const run = vi.fn(async () => {
+      if (calls++ === 0) throw new Error('KV unavailable');
+    });
+    startCleanupScheduler([makeJob('trades', run)]);
+
+    await runCleanupJob('trades');
+    expect(jobStats('trades').failures).toBe(1);
+    expect(jobStats('trades').lastError).toBe('KV unavailable');
+
+    await runCleanupJob('trades');
+    expect(run).toHaveBeenCalledTimes(2);
+    expect(jobStats('trades').runs).toBe(1);
+    expect(jobStats('trades').lastError).toBeNull();
+  });
+
+  it('should reject unknown jobs', async () => {
+    await expect(runCleanupJob('nope')).rejects.toThrow('Unknown cleanup job');
+  });
+
+  it('should start once and schedule the first run within one interval', () => {
+    const before = Date.now();
+    expect(startCleanupScheduler([makeJob('users', async () => undefined)])).toBe(true);
+    expect(startCleanupScheduler([makeJob('users', async () => undefined)])).toBe(false);
+
+    const stats = getCleanupSchedulerStats();
+    expect(stats.running).toBe(true);
+    expect(stats.lockBackend).toBe('memory');
+    expect(stats.jobs[0].nextRunAt).toBeGreaterThanOrEqual(before);
+    expect(stats.jobs[0].nextRunAt).toBeLessThanOrEqual(Date.now() + 60_000);
+
+    stopCleanupScheduler();
+    expect(getCleanupSchedulerStats().running).toBe(false);
+    expect(jobStats('users').nextRunAt).toBeNull();
+  });
+});
@@ -0,0 +1,108 @@
+/**
+ * Cold-Start Tracking Tests
+ */
+
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import {
+  COLD_START_CONFIG,
+  lazyModule,
+  trackRouteRequest,
+  getColdStartStats,
+  resetColdStartState,
+} from '../cold-start';
+
+const originalBudget = COLD_START_CONFIG.ROUTE_BUDGET_MS;
+
+function delay(ms: number): Promise<void> {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+describe('cold-start', () => {
+  beforeEach(() => {
+    resetColdStartState();
+  });
+
+  afterEach(() => {
+    COLD_START_CONFIG.ROUTE_BUDGET_MS = originalBudget;
+  });
+
+  it('loads a module once and shares the pending load', async () => {
+    let loads = 0;
+    const load = lazyModule('test-module', async () => {
+      loads++;
+      await delay(5);
+      return { value: 42 };
+    });
+
+    expect(load.peek()).toBeNull();
+    const [a, b] = await Promise.all([load('/api/a'), load('/api/b')]);
+    const c = await load('/api/a');
+
+    expect(loads).toBe(1);
+    expect(a).toBe(b);
+    expect(c).toBe(a);
+    expect(load.peek()).toBe(a);
+
+    const { modules } = getColdStartStats();
+    expect(modules).toHaveLength(1);
+    expect(modules[0].name).toBe('test-module');
+    expect(modules[0].loadedBy).toBe('/api/a');
+  });
+
+  it('attributes load waits to the routes that waited', async () => {
+    const load = lazyModule('slow-module', async () => {
+      await delay(20);
+      return {};
+    });
+
+    trackRouteRequest('/api/cold');
+    await load('/api/cold');
+    trackRouteRequest('/api/cold');
+    await load('/api/cold');
+    trackRouteRequest('/api/warm');
+    await load('/api/warm');
+
+    const routes = Object.fromEntries(getColdStartStats().routes.map(r => [r.route, r]));
+    expect(routes['/api/cold'].requests).toBe(2);
+    expect(routes['/api/cold'].moduleLoadMs).toBeGreaterThanOrEqual(15);
+    expect(routes['/api/cold'].modules).toEqual(['slow-module']);
+    // Already loaded: no wait, no module attributed
+    expect(routes['/api/warm'].moduleLoadMs).toBe(0);
+    expect(routes['/api/warm'].modules).toEqual([]);
+  });
+
+  it('flags routes whose cold module loads exceed the budget', async () => {
+    COLD_START_CONFIG.ROUTE_BUDGET_MS = 5;
+    const load = lazyModule('heavy-module', async () => {
+      await delay(20);
+      return {};
+    });
+
+    trackRouteRequest('/api/heavy');
+    await load('/api/heavy');
+
+    const stats = getColdStartStats();
+    expect(stats.routesOverBudget).toEqual(['/api/heavy']);
+    expect(stats.routes[0].budgetMs).toBe(5);
+  });
+
+  it('retries a failed import on the next call', async () => {
+    let attempts = 0;
+    const load = lazyModule('flaky-module', async () => {
+      attempts++;
+      if (attempts === 1) throw new Error('chunk load failed');
+      return { ok: true };
+    });
+
+    let failed = false;
+    try {
+      await load();
+    } catch {
+      failed = true;
+    }
+
+    expect(failed).toBe(true);
+    expect(await load()).toEqual({ ok: true });
+    expect(attempts).toBe(2);
+  });
+});
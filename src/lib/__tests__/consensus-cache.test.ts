@@ -0,0 +1,155 @@
+/**
+ * Market-State Fingerprint Consensus Cache Tests
+ */
+
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
+import {
+  CONSENSUS_CACHE_CONFIG,
+  ConsensusResultCache,
+  quantizeMarketState,
+  fingerprintKey,
+  assessConsensusResult,
+  readMarketFingerprint,
+} from '../consensus-cache';
+import type { MarketData } from '../chatroom/market-data';
+import { CACHE_TTL } from '../cache';
+
+const originalConfig = { ...CONSENSUS_CACHE_CONFIG };
+
+function fingerprint(price: number, change = 1.2, direction: string | null = 'bullish', strength = 65) {
+  return fingerprintKey(quantizeMarketState({
+    price,
+    priceChangePercentage24h: change,
+    chatroomDirection: direction,
+    chatroomStrength: strength,
+  }));
+}
+
+describe('consensus-cache', () => {
+  let now: number;
+  let cache: ConsensusResultCache<string>;
+
+  beforeEach(() => {
+    now = 1_000_000;
+    vi.spyOn(Date, 'now').mockImplementation(() => now);
+    cache = new ConsensusResultCache<string>();
+  });
+
+  afterEach(() => {
+    vi.restoreAllMocks();
+    Object.assign(CONSENSUS_CACHE_CONFIG, originalConfig);
+  });
+
+  it('quantizes small moves into the same buckets and larger ones into new buckets', () => {
+    expect(fingerprint(45000)).toBe(fingerprint(45050));
+    expect(fingerprint(45000)).not.toBe(fingerprint(45500));
+    expect(fingerprint(45000, 1.2)).toBe(fingerprint(45000, 1.9));
+    expect(fingerprint(45000, 1.2)).not.toBe(fingerprint(45000, 2.1));
+    expect(fingerprint(45000, 1.2, 'bullish', 65)).toBe(fingerprint(45000, 1.2, 'bullish', 70));
+    expect(fingerprint(45000, 1.2, 'bullish', 65)).not.toBe(fingerprint(45000, 1.2, 'bullish', 85));
+    expect(fingerprint(45000, 1.2, 'bullish')).not.toBe(fingerprint(45000, 1.2, 'bearish'));
+    // Strength without a direction is ignored
+    expect(fingerprint(45000, 1.2, null, 10)).toBe(fingerprint(45000, 1.2, null, 90));
+  });
+
+  it('reuses a result past the old TTL while the fingerprint is unchanged', async () => {
+    const fn = vi.fn(async () => 'buy');
+    const fp = fingerprint(45000);
+
+    expect((await cache.execute('BTC', fp, fn)).status).toBe('miss');
+    now += CACHE_TTL.CONSENSUS * 1000 * 5;
+    const hit = await cache.execute('BTC', fingerprint(45020), fn);
+
+    expect(hit).toMatchObject({ value: 'buy', status: 'hit', ageMs: CACHE_TTL.CONSENSUS * 5000 });
+    expect(fn).toHaveBeenCalledTimes(1);
+
+    now += CONSENSUS_CACHE_CONFIG.MAX_AGE_MS;
+    expect((await cache.execute('BTC', fp, fn)).status).toBe('miss');
+    expect(cache.getStats().invalidations.maxAge).toBe(1);
+  });
+
+  it('invalidates immediately when a bucket changes', async () => {
+    let signal = 'buy';
+    const fn = vi.fn(async () => signal);
+
+    await cache.execute('BTC', fingerprint(45000), fn);
+    now += 1000;
+    signal = 'sell';
+    const result = await cache.execute('BTC', fingerprint(45000, 1.2, 'bearish'), fn);
+
+    expect(result).toMatchObject({ value: 'sell', status: 'miss' });
+    const stats = cache.getStats();
+    expect(stats.invalidations.fingerprint).toBe(1);
+    expect(stats.avgLifetimeBeforeChangeMs).toBe(1000);
+    expect(stats.hitRatio).toBe(0);
+  });
+
+  it('falls back to the wall-clock TTL without a fingerprint', async () => {
+    const fn = vi.fn(async () => 'hold');
+
+    await cache.execute('ETH', null, fn);
+    now += CACHE_TTL.CONSENSUS * 1000 - 1;
+    expect((await cache.execute('ETH', null, fn)).status).toBe('hit');
+    now += 1;
+    expect((await cache.execute('ETH', null, fn)).status).toBe('miss');
+    expect(cache.getStats().invalidations.ttl).toBe(1);
+  });
+
+  it('shares concurrent computations and evicts the oldest entries', async () => {
+    CONSENSUS_CACHE_CONFIG.MAX_ENTRIES = 2;
+    const fn = vi.fn(async () => 'buy');
+    const fp = fingerprint(45000);
+
+    const [first, second] = await Promise.all([
+      cache.execute('BTC', fp, fn),
+      cache.execute('BTC', fp, fn),
+    ]);
+    expect(first.status).toBe('miss');
+    expect(second.status).toBe('shared');
+    expect(fn).toHaveBeenCalledTimes(1);
+
+    await cache.execute('ETH', fp, fn);
+    await cache.execute('SOL', fp, fn);
+    expect(cache.size).toBe(2);
+    expect((await cache.execute('BTC', fp, fn)).status).toBe('miss');
+
+    const stats = cache.getStats();
+    expect(stats.invalidations.evicted).toBeGreaterThanOrEqual(1);
+    expect(stats.shared).toBe(1);
+  });
+
+  it('keeps degraded results for the wall-clock TTL only and never caches unusable ones', async () => {
+    const degraded = new ConsensusResultCache<string>({
+      assess: value => (value === 'partial' ? 'degraded' : value === 'none' ? 'unusable' : 'ok'),
+    });
+    const fp = fingerprint(45000);
+
+    await degraded.execute('BTC', fp, async () => 'partial');
+    now += CACHE_TTL.CONSENSUS * 1000 - 1;
+    expect((await degraded.execute('BTC', fp, async () => 'buy')).status).toBe('hit');
+    now += 1;
+    expect((await degraded.execute('BTC', fp, async () => 'buy'))).toMatchObject({ value: 'buy', status: 'miss' });
+
+    const none = vi.fn(async () => 'none');
+    await degraded.execute('ETH', fp, none);
+    await degraded.execute('ETH', fp, none);
+    expect(none).toHaveBeenCalledTimes(2);
+    expect(degraded.getStats()).toMatchObject({ degraded: 1, notCached: 2 });
+  });
+
+  it('classifies consensus responses with failed analysts', () => {
+    const vote = (status: string) => ({ model_name: 'm', signal: 'BUY', response_time_ms: 1, confidence: 80, status });
+    expect(assessConsensusResult({ consensus_status: 'CONSENSUS_REACHED', individual_votes: [vote('success')] })).toBe('ok');
+    expect(assessConsensusResult({ consensus_status: 'CONSENSUS_REACHED', individual_votes: [vote('success'), vote('timeout')] })).toBe('degraded');
+    expect(assessConsensusResult({ consensus_status: 'INSUFFICIENT_RESPONSES', individual_votes: [] })).toBe('unusable');
+  });
+
+  it('has no fingerprint for stale market data', async () => {
+    delete process.env.KV_REST_API_URL;
+    delete process.env.KV_REST_API_TOKEN;
+    const market = { price: 45000, priceChangePercentage24h: 1.2 } as MarketData;
+
+    expect(await readMarketFingerprint('BTC', market)).not.toBeNull();
+    expect(await readMarketFingerprint('BTC', { ...market, stale: true })).toBeNull();
+  });
+});
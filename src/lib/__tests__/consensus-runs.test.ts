@@ -0,0 +1,118 @@
+/**
+ * Replayable Consensus Run Tests
+ */
+
+import { describe, it, expect, beforeEach, vi, afterEach } from 'vitest';
+import {
+  CONSENSUS_RUN_CONFIG,
+  createConsensusRun,
+  completeConsensusRun,
+  findConsensusRun,
+  getConsensusRunStats,
+  resetConsensusRuns,
+  subscribeToConsensusRun,
+} from '../consensus-runs';
+
+const decoder = new TextDecoder();
+
+const originalConfig = { ...CONSENSUS_RUN_CONFIG };
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+describe('Consensus runs', () => {
+  beforeEach(() => {
+    resetConsensusRuns();
+  });
+
+  afterEach(() => {
+    vi.restoreAllMocks();
+    Object.assign(CONSENSUS_RUN_CONFIG, originalConfig);
+  });
+
+  function advanceClock(ms: number) {
+    const now = Date.now() + ms;
+    vi.spyOn(Date, 'now').mockReturnValue(now);
+  }
+
+  it('should re-attach a reconnecting client to its run and replay the gap', () => {
+    const run = createConsensusRun('BTC');
+    const first = run.channel.publish('message', { id: 'deepseek' });
+    run.channel.publish('message', { id: 'kimi' });
+    run.channel.publish('message', { type: 'complete' });
+
+    const lastEventId = `${run.runId}-${first.seq}`;
+    const resumed = findConsensusRun(lastEventId);
+    expect(resumed).toBe(run);
+
+    const frames: string[] = [];
+    const sub = resumed!.channel.subscribe(bytes => frames.push(decoder.decode(bytes)), lastEventId);
+
+    expect(sub.replayed).toBe(2);
+    const replayed = frames.join('');
+    expect(replayed).toContain('"kimi"');
+    expect(replayed).toContain('"complete"');
+    expect(replayed).not.toContain('"deepseek"');
+    expect(getConsensusRunStats().resumed).toBe(1);
+  });
+
+  it('should not resume ids from unknown runs', () => {
+    createConsensusRun('BTC');
+
+    expect(findConsensusRun('rununknown-3')).toBeNull();
+    expect(findConsensusRun('not-an-id')).toBeNull();
+    expect(getConsensusRunStats().resumeMisses).toBe(2);
+  });
+
+  it('should expire completed runs after the retention window', () => {
+    const run = createConsensusRun('ETH');
+    completeConsensusRun(run.runId);
+
+    advanceClock(CONSENSUS_RUN_CONFIG.RUN_RETENTION_MS + 1);
+
+    expect(findConsensusRun(`${run.runId}-1`)).toBeNull();
+    expect(run.signal.aborted).toBe(true);
+    expect(getConsensusRunStats().evicted).toBe(1);
+  });
+
+  it('should keep in-flight runs past the completed-run retention', () => {
+    const run = createConsensusRun('SOL');
+
+    advanceClock(CONSENSUS_RUN_CONFIG.RUN_RETENTION_MS + 1);
+
+    expect(findConsensusRun(`${run.runId}-1`)).toBe(run);
+    expect(getConsensusRunStats().active).toBe(1);
+  });
+
+  it('should abort an in-flight run once its last subscriber has been gone for the grace period', async () => {
+    CONSENSUS_RUN_CONFIG.ORPHAN_GRACE_MS = 10;
+    vi.spyOn(console, 'log').mockImplementation(() => {});
+    const run = createConsensusRun('BTC');
+
+    const first = subscribeToConsensusRun(run, () => {});
+    first.unsubscribe();
+    // A reconnect within the grace period keeps the run going
+    const second = subscribeToConsensusRun(run, () => {}, `${run.runId}-0`);
+    await sleep(20);
+    expect(run.signal.aborted).toBe(false);
+
+    second.unsubscribe();
+    second.unsubscribe();
+    await sleep(20);
+    expect(run.signal.aborted).toBe(true);
+    expect(findConsensusRun(`${run.runId}-1`)).toBeNull();
+    expect(getConsensusRunStats().orphaned).toBe(1);
+  });
+
+  it('should keep completed runs resumable after their subscribers leave', async () => {
+    CONSENSUS_RUN_CONFIG.ORPHAN_GRACE_MS = 10;
+    const run = createConsensusRun('ETH');
+
+    const subscription = subscribeToConsensusRun(run, () => {});
+    completeConsensusRun(run.runId);
+    subscription.unsubscribe();
+    await sleep(20);
+
+    expect(run.signal.aborted).toBe(false);
+    expect(findConsensusRun(`${run.runId}-1`)).toBe(run);
+  });
+});
@@ -0,0 +1,75 @@
+/**
+ * Bucketed Error-Rate Ring Tests
+ */
+
+import { describe, it, expect } from 'vitest';
+import { ErrorRateRing } from '../error-rate-ring';
+
+const SECOND = 1000;
+const MINUTE = 60 * SECOND;
+const T0 = 1_700_000_000_000;
+
+describe('ErrorRateRing', () => {
+  it('sums outcomes and error types within a window', () => {
+    const ring = new ErrorRateRing();
+    ring.record(true, undefined, T0);
+    ring.record(false, 'TIMEOUT', T0 + SECOND);
+    ring.record(false, 'TIMEOUT', T0 + 2 * SECOND);
+    ring.record(false, 'RATE_LIMIT', T0 + 3 * SECOND);
+
+    const summary = ring.window(5 * MINUTE, T0 + 4 * SECOND);
+    expect(summary.totalRequests).toBe(4);
+    expect(summary.errorCount).toBe(3);
+    expect(summary.errorRate).toBe(0.75);
+    expect(summary.errorTypes).toEqual({ TIMEOUT: 2, RATE_LIMIT: 1 });
+  });
+
+  it('keeps a full hour of history regardless of request volume', () => {
+    const ring = new ErrorRateRing();
+    // 6,000 requests spread over the hour, failures only in the first minutes
+    for (let i = 0; i < 6000; i++) {
+      const at = T0 + i * 600;
+      ring.record(at >= T0 + 10 * MINUTE, 'API_ERROR', at);
+    }
+    const now = T0 + 6000 * 600;
+
+    const hour = ring.window(60 * MINUTE, now);
+    expect(hour.totalRequests).toBe(6000);
+    expect(hour.errorCount).toBe(1000);
+
+    const recent = ring.window(5 * MINUTE, now);
+    expect(recent.errorCount).toBe(0);
+    expect(recent.totalRequests).toBeGreaterThanOrEqual(500);
+    expect(recent.totalRequests).toBeLessThanOrEqual(500 + 17); // + one partial bucket
+  });
+
+  it('drops buckets older than the window', () => {
+    const ring = new ErrorRateRing();
+    ring.record(false, 'TIMEOUT', T0);
+    ring.record(true, undefined, T0 + 10 * MINUTE);
+
+    expect(ring.window(5 * MINUTE, T0 + 10 * MINUTE).totalRequests).toBe(1);
+    expect(ring.window(15 * MINUTE, T0 + 10 * MINUTE).totalRequests).toBe(2);
+  });
+
+  it('ignores slots left over from an earlier lap of the ring', () => {
+    const ring = new ErrorRateRing();
+    ring.record(false, 'TIMEOUT', T0);
+
+    // Exactly one ring length later the same slot is reused
+    const later = T0 + 361 * 10 * SECOND;
+    expect(ring.window(60 * MINUTE, later).totalRequests).toBe(0);
+
+    ring.record(true, undefined, later);
+    const summary = ring.window(60 * MINUTE, later);
+    expect(summary.totalRequests).toBe(1);
+    expect(summary.errorTypes).toEqual({});
+  });
+
+  it('clears all buckets', () => {
+    const ring = new ErrorRateRing();
+    ring.record(false, 'TIMEOUT', T0);
+    ring.clear();
+    expect(ring.window(60 * MINUTE, T0).totalRequests).toBe(0);
+  });
+});
@@ -0,0 +1,96 @@
+/**
+ * Hedged Request Tests
+ */
+
+import { describe, it, expect, beforeEach } from 'vitest';
+import { hedgedRequest, getHedgeStats, resetHedgeState, HEDGE_CONFIG } from '../hedged-request';
+
+function after<T>(ms: number, value: T, signal?: AbortSignal): Promise<T> {
+  return new Promise((resolve, reject) => {
+    const timer = setTimeout(() => resolve(value), ms);
+    signal?.addEventListener('abort', () => {
+      clearTimeout(timer);
+      reject(new Error('aborted'));
+    });
+  });
+}
+
+function failAfter(ms: number, message: string): Promise<never> {
+  return new Promise((_, reject) => setTimeout(() => reject(new Error(message)), ms));
+}
+
+describe('hedgedRequest', () => {
+  beforeEach(() => {
+    resetHedgeState();
+  });
+
+  it('should not hedge a fast primary', async () => {
+    const result = await hedgedRequest(
+      (signal) => after(5, 'primary', signal),
+      (signal) => after(5, 'backup', signal),
+      50
+    );
+
+    expect(result).toEqual({ value: 'primary', winner: 'primary', hedged: false });
+    expect(getHedgeStats().hedgesStarted).toBe(0);
+  });
+
+  it('should take the backup when the primary straggles', async () => {
+    let primaryAborted = false;
+    const result = await hedgedRequest(
+      (signal) => {
+        signal.addEventListener('abort', () => { primaryAborted = true; });
+        return after(500, 'primary', signal);
+      },
+      (signal) => after(5, 'backup', signal),
+      20
+    );
+
+    expect(result.winner).toBe('backup');
+    expect(result.hedged).toBe(true);
+    expect(primaryAborted).toBe(true);
+    expect(getHedgeStats().hedgesWon).toBe(1);
+  });
+
+  it('should reject immediately when the primary fails before hedging', async () => {
+    let backupCalled = false;
+    await expect(hedgedRequest(
+      () => failAfter(5, 'primary down'),
+      (signal) => { backupCalled = true; return after(5, 'backup', signal); },
+      50
+    )).rejects.toThrow('primary down');
+
+    expect(backupCalled).toBe(false);
+  });
+
+  it('should wait for the hedge if the primary fails after hedging', async () => {
+    const result = await hedgedRequest(
+      () => failAfter(30, 'primary down'),
+      (signal) => after(40, 'backup', signal),
+      10
+    );
+
+    expect(result.value).toBe('backup');
+  });
+
+  it('should reject with the primary error when both fail', async () => {
+    await expect(hedgedRequest(
+      () => failAfter(30, 'primary down'),
+      () => failAfter(5, 'backup down'),
+      10
+    )).rejects.toThrow('primary down');
+  });
+
+  it('should stop hedging once the budget is spent', async () => {
+    const slowPrimary = (signal: AbortSignal) => after(30, 'primary', signal);
+    const backup = (signal: AbortSignal) => after(1, 'backup', signal);
+
+    for (let i = 0; i < HEDGE_CONFIG.BURST + 2; i++) {
+      await hedgedRequest(slowPrimary, backup, 5);
+    }
+
+    const stats = getHedgeStats();
+    expect(stats.hedgesStarted).toBe(HEDGE_CONFIG.BURST);
+    expect(stats.hedgesSkippedBudget).toBe(2);
+  });
+});
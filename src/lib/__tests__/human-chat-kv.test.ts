@@ -0,0 +1,65 @@
+/**
+ * Human Chat Store Tests (in-memory backend)
+ */
+
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
+import {
+  appendMessage,
+  cleanupInactiveUsers,
+  getOnlineCount,
+  getState,
+  getUser,
+  incrementUserPostCount,
+  reservePostSlot,
+  resetHumanChatStore,
+  updateUser,
+  HUMAN_CHAT_STORE_CONFIG,
+} from '../human-chat/kv-store';
+import { RATE_LIMIT_MS, type HumanChatUser } from '../human-chat/types';
+
+function user(userId: string, lastSeenAt: number = Date.now()): HumanChatUser {
+  return { userId, handle: userId.slice(0, 8), lastSeenAt, messageCount: 0, joinedAt: lastSeenAt };
+}
+
+describe('Human chat store', () => {
+  beforeEach(() => {
+    delete process.env.KV_REST_API_URL;
+    delete process.env.KV_REST_API_TOKEN;
+    resetHumanChatStore();
+  });
+
+  afterEach(() => {
+    vi.restoreAllMocks();
+  });
+
+  it('should let only one of several simultaneous posts take the rate limit slot', async () => {
+    const results = await Promise.all(Array.from({ length: 5 }, () => reservePostSlot('0xabc')));
+
+    expect(results.filter(r => r.allowed)).toHaveLength(1);
+    expect(results.find(r => !r.allowed)?.remainingTimeMs).toBeGreaterThan(0);
+
+    vi.spyOn(Date, 'now').mockReturnValue(Date.now() + RATE_LIMIT_MS);
+    expect((await reservePostSlot('0xabc')).allowed).toBe(true);
+  });
+
+  it('should count online users and expire them after the presence TTL', async () => {
+    await updateUser(user('0x1'));
+    await updateUser(user('0x2'));
+    expect(await getOnlineCount()).toBe(2);
+
+    vi.spyOn(Date, 'now').mockReturnValue(Date.now() + HUMAN_CHAT_STORE_CONFIG.PRESENCE_TTL_MS + 1);
+    expect(await getOnlineCount()).toBe(0);
+    expect(await getUser('0x1')).toBeNull();
+    expect(await cleanupInactiveUsers()).toEqual({ removed: 2 });
+  });
+
+  it('should keep per-user post counts and room totals without a shared map', async () => {
+    await updateUser(user('0x1'));
+    await Promise.all([incrementUserPostCount('0x1'), incrementUserPostCount('0x1')]);
+    await appendMessage({ id: 'm1', userId: '0x1', handle: '0x1', content: 'gm', timestamp: 1000 });
+    await appendMessage({ id: 'm2', userId: '0x2', handle: '0x2', content: 'gm', timestamp: 2000 });
+
+    expect((await getUser('0x1'))?.messageCount).toBe(2);
+    expect(await getState()).toEqual({ messageCount: 2, activeUsers: 1, lastMessageAt: 2000 });
+  });
+});
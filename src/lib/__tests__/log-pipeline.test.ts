@@ -0,0 +1,138 @@
+/**
+ * Log Pipeline Tests
+ */
+
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import {
+  LOG_PIPELINE_CONFIG,
+  CorrelationLogBuffer,
+  emitLog,
+  flushLogs,
+  isLogSampled,
+  setLogSink,
+  getLogPipelineStats,
+  resetLogPipelineState,
+} from '../log-pipeline';
+
+const originalConfig = { ...LOG_PIPELINE_CONFIG };
+
+describe('log-pipeline', () => {
+  let batches: string[][];
+
+  beforeEach(() => {
+    resetLogPipelineState();
+    batches = [];
+    setLogSink({ write: lines => { batches.push(lines.map(entry => entry.line)); } });
+  });
+
+  afterEach(() => {
+    Object.assign(LOG_PIPELINE_CONFIG, originalConfig);
+    setLogSink(null);
+    resetLogPipelineState();
+  });
+
+  it('queues lines and writes them in one batch', async () => {
+    LOG_PIPELINE_CONFIG.FLUSH_INTERVAL_MS = 1000;
+    emitLog('info', () => 'one');
+    emitLog('info', () => 'two');
+    expect(batches).toEqual([]);
+
+    await flushLogs();
+    expect(batches).toEqual([['one', 'two']]);
+    expect(getLogPipelineStats()).toMatchObject({ emitted: 2, written: 2, pending: 0, flushes: 1 });
+  });
+
+  it('flushes queued lines immediately on warn and error', () => {
+    LOG_PIPELINE_CONFIG.FLUSH_INTERVAL_MS = 1000;
+    emitLog('info', () => 'one');
+    emitLog('warn', () => 'two');
+    expect(batches).toEqual([['one', 'two']]);
+
+    emitLog('info', () => 'three');
+    emitLog('error', () => 'four');
+    expect(batches).toEqual([['one', 'two'], ['three', 'four']]);
+    expect(getLogPipelineStats()).toMatchObject({ written: 4, pending: 0, flushes: 2 });
+  });
+
+  it('flushes early once the batch size is reached', async () => {
+    LOG_PIPELINE_CONFIG.FLUSH_INTERVAL_MS = 1000;
+    LOG_PIPELINE_CONFIG.FLUSH_BATCH_SIZE = 2;
+    emitLog('info', () => 'a');
+    emitLog('info', () => 'b');
+    await flushLogs();
+    expect(batches[0]).toEqual(['a', 'b']);
+  });
+
+  it('writes synchronously when the flush interval is 0', () => {
+    LOG_PIPELINE_CONFIG.FLUSH_INTERVAL_MS = 0;
+    emitLog('info', () => 'now');
+    expect(batches).toEqual([['now']]);
+  });
+
+  it('samples by level and route, consistently per correlation id', () => {
+    LOG_PIPELINE_CONFIG.SAMPLE_RATES = { debug: 0 };
+    LOG_PIPELINE_CONFIG.ROUTE_SAMPLE_RATES = { '/api/health': 0.5, '/api/health/models': 0 };
+
+    expect(isLogSampled('debug', '/api/consensus', 'req-1')).toBe(false);
+    expect(isLogSampled('info', '/api/consensus', 'req-1')).toBe(true);
+    expect(isLogSampled('info', '/api/health/models', 'req-1')).toBe(false);
+    // warn and error are never sampled out
+    expect(isLogSampled('warn', '/api/health/models', 'req-1')).toBe(true);
+    expect(isLogSampled('error', '/api/health/models', 'req-1')).toBe(true);
+
+    let kept = 0;
+    for (let i = 0; i < 2000; i++) {
+      const id = `req-${i}`;
+      const first = isLogSampled('info', '/api/health', id);
+      expect(isLogSampled('info', '/api/health', id)).toBe(first);
+      if (first) kept++;
+    }
+    expect(kept).toBeGreaterThan(850);
+    expect(kept).toBeLessThan(1150);
+  });
+
+  it('does not format sampled-out lines and drops info when the queue is full', async () => {
+    LOG_PIPELINE_CONFIG.FLUSH_INTERVAL_MS = 1000;
+    LOG_PIPELINE_CONFIG.SAMPLE_RATES = { debug: 0 };
+    LOG_PIPELINE_CONFIG.MAX_PENDING = 1;
+
+    let formatted = 0;
+    expect(emitLog('debug', () => { formatted++; return 'x'; })).toBe(false);
+    expect(formatted).toBe(0);
+
+    expect(emitLog('info', () => 'kept')).toBe(true);
+    expect(emitLog('info', () => 'dropped')).toBe(false);
+    expect(emitLog('error', () => 'error always written')).toBe(true);
+
+    expect(batches).toEqual([['kept', 'error always written']]);
+    expect(getLogPipelineStats()).toMatchObject({ sampledOut: 1, dropped: 1 });
+  });
+});
+
+describe('CorrelationLogBuffer', () => {
+  it('keeps the most recent entries per correlation id in order', () => {
+    const buffer = new CorrelationLogBuffer<number>(3, 10);
+    for (let i = 1; i <= 5; i++) buffer.push('a', i);
+    buffer.push('b', 100);
+
+    expect(buffer.get('a')).toEqual([3, 4, 5]);
+    expect(buffer.get('b')).toEqual([100]);
+    expect(buffer.get('missing')).toEqual([]);
+    expect(buffer.all()).toEqual([3, 4, 5, 100]);
+  });
+
+  it('evicts the least recently written correlation id', () => {
+    const buffer = new CorrelationLogBuffer<string>(5, 2);
+    buffer.push('a', 'a1');
+    buffer.push('b', 'b1');
+    buffer.push('a', 'a2');
+    buffer.push('c', 'c1');
+
+    expect(buffer.size).toBe(2);
+    expect(buffer.get('b')).toEqual([]);
+    expect(buffer.get('a')).toEqual(['a1', 'a2']);
+
+    buffer.clear();
+    expect(buffer.all()).toEqual([]);
+  });
+});
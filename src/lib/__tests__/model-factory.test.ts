@@ -331,6 +331,45 @@ describe('ModelFactory', () => {
     });
   });
 
+  describe('Config Snapshots', () => {
+    beforeEach(() => {
+      modelFactory.initialize();
+    });
+
+    it('should keep a held snapshot unchanged after runtime updates', () => {
+      const before = modelFactory.getSnapshot();
+      expect(before.models.get('deepseek')?.enabled).not.toBe(false);
+
+      modelFactory.setModelEnabled('deepseek', false);
+
+      const after = modelFactory.getSnapshot();
+      expect(after.version).toBeGreaterThan(before.version);
+      expect(after.models.get('deepseek')?.enabled).toBe(false);
+      expect(before.models.get('deepseek')?.enabled).not.toBe(false);
+
+      modelFactory.setModelEnabled('deepseek', true);
+    });
+
+    it('should freeze published model configs', () => {
+      const snapshot = modelFactory.getSnapshot();
+      expect(Object.isFrozen(snapshot.models.get('deepseek'))).toBe(true);
+    });
+
+    it('should swap in a new snapshot on async reload', async () => {
+      const before = modelFactory.getSnapshotVersion();
+
+      const snapshot = await modelFactory.reloadAsync();
+
+      expect(snapshot.version).toBeGreaterThan(before);
+      expect(snapshot.models.size).toBeGreaterThan(0);
+    });
+
+    it('should share one reload between concurrent callers', async () => {
+      const [a, b] = await Promise.all([modelFactory.reloadAsync(), modelFactory.reloadAsync()]);
+      expect(a.version).toBe(b.version);
+    });
+  });
+
   describe('Fallback Chains', () => {
     beforeEach(() => {
       modelFactory.initialize();
@@ -0,0 +1,100 @@
+/**
+ * Adaptive Model Router Tests
+ */
+
+import { describe, it, expect, beforeEach } from 'vitest';
+import {
+  recordModelLatency,
+  getLatencyPercentile,
+  getLatencyStats,
+  scoreModel,
+  rankModels,
+  getAdaptiveTimeout,
+  resetRouterState,
+  ROUTER_CONFIG,
+  type ModelRoutingSignals,
+} from '../model-router';
+
+const healthy: ModelRoutingSignals = { errorRate: 0, circuitOpen: false, halfOpen: false };
+
+function recordMany(modelId: string, latencies: number[]) {
+  latencies.forEach(ms => recordModelLatency(modelId, ms, true));
+}
+
+describe('ModelRouter', () => {
+  beforeEach(() => {
+    resetRouterState();
+  });
+
+  describe('Latency tracking', () => {
+    it('should not report percentiles before MIN_SAMPLES', () => {
+      recordMany('deepseek', [1000, 1000]);
+      expect(getLatencyPercentile('deepseek', 95)).toBeUndefined();
+    });
+
+    it('should compute percentiles from recent samples', () => {
+      recordMany('deepseek', [100, 200, 300, 400, 500, 600, 700, 800, 900, 1000]);
+
+      expect(getLatencyPercentile('deepseek', 50)).toBe(500);
+      expect(getLatencyPercentile('deepseek', 95)).toBe(1000);
+    });
+
+    it('should only keep SAMPLE_WINDOW samples', () => {
+      recordMany('deepseek', new Array(ROUTER_CONFIG.SAMPLE_WINDOW).fill(10000));
+      recordMany('deepseek', new Array(ROUTER_CONFIG.SAMPLE_WINDOW).fill(1000));
+
+      expect(getLatencyStats('deepseek').samples).toBe(ROUTER_CONFIG.SAMPLE_WINDOW);
+      expect(getLatencyPercentile('deepseek', 99)).toBe(1000);
+    });
+
+    it('should move EWMA on failures without polluting percentiles', () => {
+      recordMany('kimi', [1000, 1000, 1000, 1000, 1000]);
+      recordModelLatency('kimi', 30000, false);
+
+      const stats = getLatencyStats('kimi');
+      expect(stats.ewmaMs).toBeGreaterThan(1000);
+      expect(stats.p99Ms).toBe(1000);
+    });
+  });
+
+  describe('Scoring and ranking', () => {
+    it('should never prefer a model with an open circuit', () => {
+      expect(scoreModel('glm', { ...healthy, circuitOpen: true })).toBe(Number.POSITIVE_INFINITY);
+    });
+
+    it('should penalize recent errors', () => {
+      recordMany('glm', [2000, 2000, 2000, 2000, 2000]);
+      expect(scoreModel('glm', { ...healthy, errorRate: 0.5 })).toBeGreaterThan(scoreModel('glm', healthy));
+    });
+
+    it('should rank faster models first', () => {
+      recordMany('slow', new Array(10).fill(20000));
+      recordMany('fast', new Array(10).fill(2000));
+
+      expect(rankModels(['slow', 'fast'], () => healthy)).toEqual(['fast', 'slow']);
+    });
+
+    it('should keep the input order when there is no data', () => {
+      expect(rankModels(['minimax', 'glm', 'kimi'], () => healthy)).toEqual(['minimax', 'glm', 'kimi']);
+    });
+  });
+
+  describe('Adaptive timeouts', () => {
+    it('should use the configured timeout without history', () => {
+      expect(getAdaptiveTimeout('gemini', 30000, 5000)).toBe(30000);
+    });
+
+    it('should tighten the timeout for a consistently fast model', () => {
+      recordMany('gemini', new Array(10).fill(3000));
+      const timeout = getAdaptiveTimeout('gemini', 30000, 5000);
+
+      expect(timeout).toBeLessThan(30000);
+      expect(timeout).toBeGreaterThanOrEqual(5000);
+    });
+
+    it('should never exceed the configured timeout', () => {
+      recordMany('gemini', new Array(10).fill(25000));
+      expect(getAdaptiveTimeout('gemini', 30000, 5000)).toBe(30000);
+    });
+  });
+});
@@ -0,0 +1,92 @@
+/**
+ * Sharded Moderation Store Tests (in-memory backend)
+ */
+
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
+import {
+  canUserPost,
+  executeModerationAction,
+  getModerationStore,
+  getModerationStoreStats,
+  isUserMuted,
+  checkAutoModeration,
+  getUserViolations,
+  resetModerationStoreState,
+} from '../chatroom/moderation-kv';
+import type { ModerationAction } from '../chatroom/types';
+
+function action(type: ModerationAction['type'], userId: string, duration?: number): ModerationAction {
+  return {
+    type,
+    targetUserId: userId,
+    targetHandle: `handle-${userId}`,
+    duration,
+    reason: 'Test moderation action',
+    moderatorId: 'mod-1',
+    timestamp: Date.now(),
+  };
+}
+
+describe('Moderation store', () => {
+  beforeEach(() => {
+    delete process.env.KV_REST_API_URL;
+    delete process.env.KV_REST_API_TOKEN;
+    resetModerationStoreState();
+  });
+
+  afterEach(() => {
+    vi.restoreAllMocks();
+  });
+
+  it('should serve repeat checks for clean users from the negative cache', async () => {
+    expect(await canUserPost('alice')).toEqual({ allowed: true });
+    expect(await canUserPost('alice')).toEqual({ allowed: true });
+
+    const stats = getModerationStoreStats();
+    expect(stats.checks).toBe(2);
+    expect(stats.negativeCacheHits).toBe(1);
+  });
+
+  it('should block a user muted after being cached as clean', async () => {
+    await canUserPost('bob');
+    await executeModerationAction(action('mute', 'bob', 60_000));
+
+    const result = await canUserPost('bob');
+    expect(result.allowed).toBe(false);
+    expect(result.reason).toContain('You are muted until');
+  });
+
+  it('should let timed mutes expire without a cleanup sweep', async () => {
+    await executeModerationAction(action('mute', 'carol', 60_000));
+    expect((await isUserMuted('carol')).muted).toBe(true);
+
+    vi.spyOn(Date, 'now').mockReturnValue(Date.now() + 61_000);
+    expect((await isUserMuted('carol')).muted).toBe(false);
+    expect(await canUserPost('carol')).toEqual({ allowed: true });
+    expect((await getModerationStore()).mutedUsers).toEqual({});
+  });
+
+  it('should replace a mute with a ban and log every action', async () => {
+    await executeModerationAction(action('mute', 'dave'));
+    await executeModerationAction(action('ban', 'dave'));
+
+    const store = await getModerationStore();
+    expect(store.mutedUsers.dave).toBeUndefined();
+    expect(store.bannedUsers.dave.handle).toBe('handle-dave');
+    expect(store.moderationLog.map(a => a.type)).toEqual(['mute', 'ban']);
+    expect((await canUserPost('dave')).reason).toContain('You are banned');
+  });
+
+  it('should count violations per user and reset them on unban', async () => {
+    await checkAutoModeration('erin', 'erin');
+    await checkAutoModeration('erin', 'erin');
+    const third = await checkAutoModeration('erin', 'erin');
+
+    expect(third?.action.type).toBe('mute');
+    expect(await getUserViolations('erin')).toBe(3);
+    expect(await getUserViolations('frank')).toBe(0);
+
+    await executeModerationAction(action('unban', 'erin'));
+    expect(await getUserViolations('erin')).toBe(0);
+  });
+});
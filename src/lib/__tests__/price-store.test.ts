@@ -0,0 +1,99 @@
+/**
+ * Local Price Store Tests
+ */
+
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import {
+  PRICE_STORE_CONFIG,
+  appendBars,
+  recordPrice,
+  getPriceAt,
+  getPriceRange,
+  flushPriceStore,
+  resetPriceStoreState,
+  type PriceBar,
+} from '../price-store';
+
+const MINUTE = 60 * 1000;
+const T0 = 1_700_000_040_000 - (1_700_000_040_000 % MINUTE);
+const originalConfig = { ...PRICE_STORE_CONFIG };
+
+function bar(time: number, close: number): PriceBar {
+  return { time, open: close, high: close, low: close, close };
+}
+
+describe('price-store', () => {
+  beforeEach(async () => {
+    await resetPriceStoreState();
+    PRICE_STORE_CONFIG.DIR = fs.mkdtempSync(path.join(os.tmpdir(), 'price-store-'));
+    PRICE_STORE_CONFIG.BAR_MS = MINUTE;
+    PRICE_STORE_CONFIG.MAX_GAP_MS = 5 * MINUTE;
+  });
+
+  afterEach(async () => {
+    await resetPriceStoreState();
+    fs.rmSync(PRICE_STORE_CONFIG.DIR, { recursive: true, force: true });
+    Object.assign(PRICE_STORE_CONFIG, originalConfig);
+  });
+
+  it('aggregates samples into OHLC bars and appends finished bars', async () => {
+    recordPrice('bitcoin', 100, T0);
+    recordPrice('bitcoin', 105, T0 + 10_000);
+    recordPrice('bitcoin', 98, T0 + 20_000);
+    recordPrice('bitcoin', 101, T0 + 30_000);
+    recordPrice('bitcoin', 110, T0 + MINUTE); // Next bar starts
+
+    // Appends for one asset run in order, so this waits for the finished bar
+    expect(await appendBars('bitcoin', [bar(T0, 1)])).toBe(0);
+    const file = path.join(PRICE_STORE_CONFIG.DIR, 'bitcoin.bin');
+    expect(fs.statSync(file).size).toBe(40);
+    expect(await getPriceAt('bitcoin', T0 + 45_000)).toEqual({ time: T0, open: 100, high: 105, low: 98, close: 101 });
+    // The in-progress bar answers lookups too
+    expect((await getPriceAt('bitcoin', T0 + MINUTE + 5_000))!.close).toBe(110);
+  });
+
+  it('finds the bar covering a point in time across a large file', async () => {
+    const bars = Array.from({ length: 10_000 }, (_, i) => bar(T0 + i * MINUTE, 1000 + i));
+    expect(await appendBars('ethereum', bars)).toBe(10_000);
+
+    expect((await getPriceAt('ethereum', T0 + 1234 * MINUTE + 30_000))!.close).toBe(2234);
+    expect(await getPriceAt('ethereum', T0 - 1)).toBeNull();
+    // Past the last bar by more than the allowed gap
+    expect(await getPriceAt('ethereum', T0 + 10_000 * MINUTE + 10 * MINUTE)).toBeNull();
+  });
+
+  it('returns bars in a range, including the in-progress bar', async () => {
+    await appendBars('solana', [bar(T0, 1), bar(T0 + MINUTE, 2), bar(T0 + 2 * MINUTE, 3)]);
+    recordPrice('solana', 4, T0 + 3 * MINUTE);
+
+    expect((await getPriceRange('solana', T0 + MINUTE, T0 + 3 * MINUTE)).map(b => b.close)).toEqual([2, 3, 4]);
+    expect((await getPriceRange('solana', T0, T0 + 3 * MINUTE, 2)).map(b => b.close)).toEqual([1, 2]);
+    expect(await getPriceRange('missing', T0, T0 + MINUTE)).toEqual([]);
+  });
+
+  it('never appends out of order and persists across restarts', async () => {
+    // Not awaited: the second append still sees the first one's bars
+    void appendBars('bitcoin', [bar(T0 + MINUTE, 2), bar(T0, 1)]);
+    expect(await appendBars('bitcoin', [bar(T0, 99), bar(T0 + 2 * MINUTE, 3)])).toBe(1);
+
+    recordPrice('bitcoin', 4, T0 + 3 * MINUTE);
+    await flushPriceStore();
+    await resetPriceStoreState();
+
+    expect((await getPriceRange('bitcoin', T0, T0 + 10 * MINUTE)).map(b => b.close)).toEqual([1, 2, 3, 4]);
+  });
+
+  it('drops a partial trailing record before appending', async () => {
+    await appendBars('bitcoin', [bar(T0, 1)]);
+    await resetPriceStoreState();
+    const file = path.join(PRICE_STORE_CONFIG.DIR, 'bitcoin.bin');
+    fs.appendFileSync(file, Buffer.alloc(13, 0xff));
+
+    expect(await appendBars('bitcoin', [bar(T0 + MINUTE, 2)])).toBe(1);
+    expect(fs.statSync(file).size).toBe(80);
+    expect((await getPriceRange('bitcoin', T0, T0 + MINUTE)).map(b => b.close)).toEqual([1, 2]);
+  });
+});
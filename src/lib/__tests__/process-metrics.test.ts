@@ -0,0 +1,77 @@
+/**
+ * Process Memory and Event-Loop Metrics Tests
+ */
+
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import {
+  PROCESS_METRICS_CONFIG,
+  registerSizeGauge,
+  readSizeGauges,
+  startProcessMetrics,
+  getProcessMetrics,
+  resetProcessMetricsState,
+} from '../process-metrics';
+
+const originalConfig = { ...PROCESS_METRICS_CONFIG };
+
+function busyWait(ms: number) {
+  const end = Date.now() + ms;
+  while (Date.now() < end) {
+    // Block the event loop
+  }
+}
+
+describe('process-metrics', () => {
+  beforeEach(() => {
+    resetProcessMetricsState();
+  });
+
+  afterEach(() => {
+    resetProcessMetricsState();
+    Object.assign(PROCESS_METRICS_CONFIG, originalConfig);
+  });
+
+  it('reads registered structure sizes', () => {
+    const items: number[] = [1, 2, 3];
+    registerSizeGauge('test.items', () => items.length);
+    registerSizeGauge('test.broken', () => {
+      throw new Error('not loaded');
+    });
+
+    items.push(4);
+    const sizes = readSizeGauges();
+    expect(sizes['test.items']).toBe(4);
+    expect(sizes['test.broken']).toBeNull();
+  });
+
+  it('reports memory and event-loop delay after starting', async () => {
+    PROCESS_METRICS_CONFIG.LOOP_RESOLUTION_MS = 1;
+    await startProcessMetrics();
+    // Let the histogram tick, then block the loop
+    await new Promise(resolve => setTimeout(resolve, 20));
+    busyWait(60);
+    await new Promise(resolve => setTimeout(resolve, 10));
+
+    const metrics = getProcessMetrics({ resetLoopDelay: true });
+    expect(metrics.runtime).toBe('nodejs');
+    expect(metrics.memory!.heapUsedBytes).toBeGreaterThan(0);
+    expect(metrics.memory!.rssBytes).toBeGreaterThanOrEqual(metrics.memory!.heapUsedBytes);
+    expect(metrics.eventLoopDelay!.maxMs).toBeGreaterThanOrEqual(40);
+    expect(metrics.history.length).toBe(1);
+
+    // Reset started a fresh window
+    expect(getProcessMetrics().eventLoopDelay!.maxMs).toBeLessThan(40);
+  });
+
+  it('keeps a bounded, oldest-first memory history', async () => {
+    PROCESS_METRICS_CONFIG.SAMPLE_INTERVAL_MS = 5;
+    PROCESS_METRICS_CONFIG.HISTORY_SIZE = 3;
+    await startProcessMetrics();
+    await new Promise(resolve => setTimeout(resolve, 60));
+
+    const { history } = getProcessMetrics();
+    expect(history).toHaveLength(3);
+    expect(history[0].at).toBeLessThanOrEqual(history[1].at);
+    expect(history[1].at).toBeLessThanOrEqual(history[2].at);
+  });
+});
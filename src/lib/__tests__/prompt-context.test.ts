@@ -0,0 +1,132 @@
+/**
+ * Shared Prompt Context Tests
+ */
+
+import { describe, it, expect, beforeEach } from 'vitest';
+import {
+  getPromptContext,
+  getDebateContext,
+  getMarketPromptSection,
+  getPromptContextStats,
+  invalidatePromptContext,
+  resetPromptContextState,
+} from '../prompt-context';
+import { saveDebateSummary, clearDebateSummary } from '../chatroom/kv-store';
+import type { MarketData } from '../chatroom/market-data';
+import type { DebateSummary } from '../chatroom/types';
+
+const marketData: MarketData = {
+  price: 45000,
+  priceChange24h: 500,
+  priceChangePercentage24h: 1.12,
+  volume24h: 25_000_000_000,
+  volumeChange24h: 1_000_000_000,
+  marketCap: 880_000_000_000,
+  high24h: 46000,
+  low24h: 44000,
+  ath: 69000,
+  athChangePercentage: -34.8,
+  atl: 67,
+  atlChangePercentage: 67000,
+  circulatingSupply: 19_500_000,
+  totalSupply: 21_000_000,
+  maxSupply: 21_000_000,
+  lastUpdated: '2026-01-01T00:00:00.000Z',
+  volatility24h: 4.5,
+  volumeToMarketCapRatio: 0.028,
+};
+
+function strongBullishSummary(): DebateSummary {
+  return {
+    roundNumber: 1,
+    timestamp: Date.now(),
+    consensusDirection: 'bullish',
+    consensusStrength: 85,
+    keyBullishArguments: ['ETF inflows accelerating'],
+    keyBearishArguments: ['Funding rates elevated'],
+    stanceChanges: [],
+    topDataPoints: ['$2.1B inflows'],
+    messageCount: 40,
+  };
+}
+
+describe('PromptContext', () => {
+  beforeEach(async () => {
+    delete process.env.KV_REST_API_URL;
+    delete process.env.KV_REST_API_TOKEN;
+    await clearDebateSummary();
+    resetPromptContextState();
+  });
+
+  it('should build the prompt once for concurrent analysts', async () => {
+    const contexts = await Promise.all(
+      Array.from({ length: 5 }, () => getPromptContext('btc', 'Breakout watch'))
+    );
+
+    expect(new Set(contexts).size).toBe(1);
+    expect(contexts[0].userPrompt).toContain('Analyze BTC for a trading signal.');
+    expect(contexts[0].userPrompt).toContain('Breakout watch');
+
+    const stats = getPromptContextStats();
+    expect(stats.misses).toBe(1);
+    expect(stats.sharedBuilds).toBe(4);
+  });
+
+  it('should reuse a built context across runs within the TTL', async () => {
+    const first = await getPromptContext('ETH');
+    const second = await getPromptContext('eth');
+
+    expect(second).toBe(first);
+    expect(getPromptContextStats().hits).toBe(1);
+  });
+
+  it('should key on the caller context', async () => {
+    const plain = await getPromptContext('BTC');
+    const withContext = await getPromptContext('BTC', 'Fed meeting today');
+
+    expect(withContext).not.toBe(plain);
+    expect(withContext.userPrompt).toContain('Fed meeting today');
+  });
+
+  it('should rebuild when a new debate summary is saved', async () => {
+    const before = await getPromptContext('BTC');
+    expect(before.debateIncluded).toBe(false);
+
+    await saveDebateSummary(strongBullishSummary());
+    const after = await getPromptContext('BTC');
+
+    expect(after).not.toBe(before);
+    expect(after.debateIncluded).toBe(true);
+    expect(after.userPrompt).toContain('AI PANEL DEBATE INSIGHTS');
+  });
+
+  it('should let a prefetched debate context serve the prompt build', async () => {
+    await saveDebateSummary(strongBullishSummary());
+    await Promise.all([getDebateContext(), getDebateContext()]);
+    const context = await getPromptContext('BTC', 'Fed meeting today');
+
+    expect(context.debateIncluded).toBe(true);
+    expect(getPromptContextStats().debateContextReads).toBe(1);
+  });
+
+  it('should rebuild after invalidation', async () => {
+    const first = await getPromptContext('SOL');
+    invalidatePromptContext('sol');
+
+    expect(await getPromptContext('SOL')).not.toBe(first);
+  });
+
+  it('should format the market section once per market data update', () => {
+    const first = getMarketPromptSection(marketData, 'BTC', true);
+    const second = getMarketPromptSection({ ...marketData }, 'BTC', true);
+    const updated = getMarketPromptSection({ ...marketData, price: 46000, lastUpdated: '2026-01-01T00:01:00.000Z' }, 'BTC', true);
+
+    expect(second).toBe(first);
+    expect(updated).not.toBe(first);
+    expect(updated).toContain('46,000');
+
+    const stats = getPromptContextStats();
+    expect(stats.marketSectionHits).toBe(1);
+    expect(stats.marketSectionMisses).toBe(2);
+  });
+});
@@ -0,0 +1,104 @@
+/**
+ * Persona Prompt Template Tests
+ */
+
+import { describe, it, expect, beforeEach } from 'vitest';
+import {
+  compilePersonaPrompts,
+  getPersonaSystemPrompt,
+  getPromptTemplateStats,
+  resetPromptTemplateState,
+} from '../chatroom/prompt-templates';
+import { renderDebatePrompt, renderConsensusPrompt, buildDebatePrompt } from '../chatroom/prompts';
+import { PERSONAS } from '../chatroom/personas';
+import { ArgumentTracker } from '../chatroom/argument-tracker';
+import type { ChatMessage } from '../chatroom/types';
+import type { MarketData } from '../chatroom/market-data';
+
+const persona = PERSONAS[0];
+
+const marketData: MarketData = {
+  price: 45000,
+  priceChange24h: 500,
+  priceChangePercentage24h: 1.12,
+  volume24h: 25_000_000_000,
+  volumeChange24h: 1_000_000_000,
+  marketCap: 880_000_000_000,
+  high24h: 46000,
+  low24h: 44000,
+  ath: 69000,
+  athChangePercentage: -34.8,
+  atl: 67,
+  atlChangePercentage: 67000,
+  circulatingSupply: 19_500_000,
+  totalSupply: 21_000_000,
+  maxSupply: 21_000_000,
+  lastUpdated: '2026-01-01T00:00:00.000Z',
+  volatility24h: 4.5,
+  volumeToMarketCapRatio: 0.028,
+};
+
+function message(id: string, content: string, sentiment: 'bullish' | 'bearish'): ChatMessage {
+  return {
+    id,
+    personaId: PERSONAS[1].id,
+    handle: PERSONAS[1].handle,
+    avatar: PERSONAS[1].avatar,
+    content,
+    sentiment,
+    confidence: 70,
+    timestamp: Date.now(),
+    phase: 'DEBATE',
+  };
+}
+
+describe('prompt-templates', () => {
+  beforeEach(() => {
+    resetPromptTemplateState();
+  });
+
+  it('compiles every persona once', () => {
+    expect(compilePersonaPrompts()).toBe(PERSONAS.length);
+    compilePersonaPrompts();
+    expect(getPromptTemplateStats().compiled).toBe(PERSONAS.length);
+  });
+
+  it('keeps the debate system prompt byte-stable across turns', () => {
+    const tracker = new ArgumentTracker();
+    const first = renderDebatePrompt(persona, [], undefined, undefined, 'BTC', undefined, tracker);
+
+    const history = [message('m1', 'Funding flipped negative while spot bids hold 44k', 'bullish')];
+    tracker.addMessage(history[0]);
+    const second = renderDebatePrompt(persona, history, marketData, undefined, 'ETH', undefined, tracker);
+
+    expect(second.systemPrompt).toBe(first.systemPrompt);
+    expect(second.systemPrompt).toBe(getPersonaSystemPrompt(persona, 'debate'));
+    expect(second.systemPrompt.startsWith(persona.personalityPrompt)).toBe(true);
+    // Per-turn context lives in the user prompt
+    expect(second.userPrompt).toContain('Funding flipped negative');
+    expect(second.userPrompt).not.toBe(first.userPrompt);
+  });
+
+  it('puts the consensus direction in the user prompt only', () => {
+    const bullish = renderConsensusPrompt(persona, [], 'bullish', 85, marketData);
+    const bearish = renderConsensusPrompt(persona, [], 'bearish', 90, marketData);
+
+    expect(bullish.systemPrompt).toBe(bearish.systemPrompt);
+    expect(bullish.userPrompt).toContain('[SENTIMENT: bullish, CONFIDENCE: 85]');
+    expect(bearish.userPrompt).toContain('[SENTIMENT: bearish, CONFIDENCE: 90]');
+  });
+
+  it('recompiles when a persona prompt changes', () => {
+    const original = getPersonaSystemPrompt(persona, 'cooldown');
+    const edited = { ...persona, personalityPrompt: 'You are a test persona.' };
+
+    expect(getPersonaSystemPrompt(edited, 'cooldown')).not.toBe(original);
+    expect(getPersonaSystemPrompt(edited, 'cooldown').startsWith('You are a test persona.')).toBe(true);
+  });
+
+  it('keeps the string builders equivalent to the render functions', () => {
+    const rendered = renderDebatePrompt(persona, [], marketData);
+    expect(JSON.parse(buildDebatePrompt(persona, [], marketData))).toEqual(rendered);
+    expect(getPromptTemplateStats().builds).toBe(2);
+  });
+});
@@ -0,0 +1,44 @@
+/**
+ * Rolling History Benchmark
+ *
+ * Head-trim window vs the previous filter passes, at 10k and 100k messages
+ * with 10% of the list expired. Run with `npm run bench`.
+ */
+
+import { bench, describe } from 'vitest';
+import { findWindowStart, rollingWindow } from '../chatroom/rolling-window';
+
+function buildHistory(count: number) {
+  const now = Date.now();
+  return Array.from({ length: count }, (_, i) => ({
+    id: `msg-${i}`,
+    timestamp: now - (count - i) * 1000,
+  }));
+}
+
+for (const size of [10_000, 100_000]) {
+  const messages = buildHistory(size);
+  const cutoff = messages[Math.floor(size / 10)].timestamp;
+  const freshCutoff = messages[0].timestamp;
+
+  describe(`read window (${size} messages, nothing expired)`, () => {
+    bench('filter', () => {
+      messages.filter(msg => msg.timestamp >= freshCutoff);
+    });
+    bench('head-trim', () => {
+      rollingWindow(messages, freshCutoff);
+    });
+  });
+
+  describe(`cleanup (${size} messages, 10% expired)`, () => {
+    bench('filter (expired + live passes)', () => {
+      messages.filter(msg => msg.timestamp < cutoff);
+      messages.filter(msg => msg.timestamp >= cutoff);
+    });
+    bench('head-trim (expired + live slices)', () => {
+      const start = findWindowStart(messages, cutoff);
+      messages.slice(0, start);
+      messages.slice(start);
+    });
+  });
+}
@@ -0,0 +1,76 @@
+/**
+ * Rolling History Window Tests
+ */
+
+import { describe, it, expect, beforeEach } from 'vitest';
+import { findWindowStart, rollingWindow, trimExpiredHead } from '../chatroom/rolling-window';
+import { appendMessage, getRollingHistory, cleanupRollingHistory, getMessages } from '../chatroom/kv-store';
+import { ROLLING_HISTORY_CONFIG, type ChatMessage } from '../chatroom/types';
+
+function messagesAt(timestamps: number[]) {
+  return timestamps.map((timestamp, i) => ({ id: `m${i}`, timestamp }));
+}
+
+describe('Rolling history window', () => {
+  it('should find the first live message by binary search', () => {
+    const messages = messagesAt([10, 20, 20, 30, 40]);
+
+    expect(findWindowStart(messages, 5)).toBe(0);
+    expect(findWindowStart(messages, 20)).toBe(1);
+    expect(findWindowStart(messages, 21)).toBe(3);
+    expect(findWindowStart(messages, 41)).toBe(5);
+    expect(findWindowStart([], 100)).toBe(0);
+  });
+
+  it('should return the same array when nothing has expired', () => {
+    const messages = messagesAt([10, 20, 30]);
+
+    expect(rollingWindow(messages, 10)).toBe(messages);
+    expect(rollingWindow(messages, 25).map(m => m.timestamp)).toEqual([30]);
+  });
+
+  it('should trim the expired head in place', () => {
+    const messages = messagesAt([10, 20, 30, 40]);
+    const expired = trimExpiredHead(messages, 25);
+
+    expect(expired.map(m => m.timestamp)).toEqual([10, 20]);
+    expect(messages.map(m => m.timestamp)).toEqual([30, 40]);
+    expect(trimExpiredHead(messages, 25)).toEqual([]);
+  });
+});
+
+describe('Rolling history store (in-memory)', () => {
+  beforeEach(async () => {
+    delete process.env.KV_REST_API_URL;
+    delete process.env.KV_REST_API_TOKEN;
+    // Expire everything left over from other tests
+    const messages = await getMessages();
+    messages.splice(0, messages.length);
+  });
+
+  function chatMessage(id: string, ageMs: number): ChatMessage {
+    return {
+      id,
+      personaId: 'moonboi',
+      handle: 'MoonBoi',
+      avatar: '🚀',
+      content: `message ${id}`,
+      timestamp: Date.now() - ageMs,
+      sentiment: 'bullish',
+      confidence: 70,
+      phase: 'DEBATE',
+    };
+  }
+
+  it('should drop expired messages on read and trim them from the store', async () => {
+    const maxAge = ROLLING_HISTORY_CONFIG.MAX_MESSAGE_AGE_MS;
+    await appendMessage(chatMessage('old-1', maxAge + 60_000));
+    await appendMessage(chatMessage('old-2', maxAge + 30_000));
+    await appendMessage(chatMessage('fresh', 1_000));
+
+    const history = await getRollingHistory();
+    expect(history.map(m => m.id)).toEqual(['fresh']);
+    expect((await getMessages()).map(m => m.id)).toEqual(['fresh']);
+    expect(await cleanupRollingHistory()).toEqual({ removed: 0, remaining: 1 });
+  });
+});
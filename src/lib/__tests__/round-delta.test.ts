@@ -0,0 +1,57 @@
+/**
+ * Round State Delta Encoding Tests
+ */
+
+import { describe, it, expect } from 'vitest';
+import { diffRoundState, applyRoundDelta } from '../prediction-market/round-delta';
+import { RoundPhase, type RoundState } from '../prediction-market/types';
+
+function baseRound(): RoundState {
+  return {
+    id: 'round_1',
+    phase: RoundPhase.BETTING_WINDOW,
+    asset: 'BTC',
+    entryPrice: 45000,
+    direction: 'long',
+    consensusLevel: 80,
+    consensusVotes: 4,
+    totalVotes: 5,
+    createdAt: '2026-01-01T00:00:00.000Z',
+  } as RoundState;
+}
+
+describe('Round state deltas', () => {
+  it('should only carry the fields that changed', () => {
+    const previous = baseRound();
+    const next = { ...previous, phase: RoundPhase.POSITION_OPEN, currentPrice: 45100 };
+
+    const delta = diffRoundState(previous, next);
+
+    expect(delta).toEqual({
+      roundId: 'round_1',
+      changes: { phase: RoundPhase.POSITION_OPEN, currentPrice: 45100 },
+      removed: [],
+    });
+  });
+
+  it('should return null when nothing changed', () => {
+    const previous = baseRound();
+    expect(diffRoundState(previous, { ...previous })).toBeNull();
+  });
+
+  it('should rebuild the full state from a delta', () => {
+    const previous = { ...baseRound(), currentPrice: 45100 };
+    const next = { ...baseRound(), exitPrice: 47000 };
+
+    const delta = diffRoundState(previous, next)!;
+    expect(delta.removed).toEqual(['currentPrice']);
+    expect(applyRoundDelta(previous, delta)).toEqual(next);
+  });
+
+  it('should ignore deltas for another round', () => {
+    const round = baseRound();
+    const delta = { roundId: 'round_2', changes: { consensusLevel: 10 }, removed: [] };
+
+    expect(applyRoundDelta(round, delta)).toBe(round);
+  });
+});
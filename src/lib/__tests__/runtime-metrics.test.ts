@@ -0,0 +1,103 @@
+/**
+ * Event-Loop Stall, GC and CPU Instrumentation Tests
+ */
+
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import {
+  RUNTIME_METRICS_CONFIG,
+  beginWork,
+  trackSseConnection,
+  measureBlock,
+  startRuntimeMetrics,
+  getRuntimeMetrics,
+  getRuntimeSummary,
+  resetRuntimeMetricsState,
+} from '../runtime-metrics';
+import { resetProcessMetricsState } from '../process-metrics';
+
+const originalConfig = { ...RUNTIME_METRICS_CONFIG };
+
+function busyWait(ms: number) {
+  const end = Date.now() + ms;
+  while (Date.now() < end) {
+    // Block the event loop
+  }
+}
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+describe('runtime-metrics', () => {
+  beforeEach(() => {
+    resetRuntimeMetricsState();
+    resetProcessMetricsState();
+  });
+
+  afterEach(() => {
+    resetRuntimeMetricsState();
+    resetProcessMetricsState();
+    Object.assign(RUNTIME_METRICS_CONFIG, originalConfig);
+  });
+
+  it('counts work in flight and open SSE connections', () => {
+    const endA = beginWork('/api/a');
+    const endB = beginWork('/api/a');
+    const controller = new AbortController();
+    trackSseConnection('/api/stream', controller.signal);
+
+    let metrics = getRuntimeMetrics();
+    expect(metrics.inFlight).toEqual({ '/api/a': 2, '/api/stream': 1 });
+    expect(metrics.sseConnections).toEqual({ total: 1, byRoute: { '/api/stream': 1 } });
+
+    endA();
+    endA(); // Idempotent
+    controller.abort();
+
+    metrics = getRuntimeMetrics();
+    expect(metrics.inFlight).toEqual({ '/api/a': 1 });
+    expect(metrics.sseConnections.total).toBe(0);
+
+    endB();
+    expect(getRuntimeSummary().inFlight).toBe(0);
+  });
+
+  it('records wall and CPU time of measured blocks', () => {
+    const value = measureBlock('encode', () => {
+      busyWait(20);
+      return 42;
+    });
+    expect(value).toBe(42);
+
+    const work = getRuntimeMetrics().work.encode;
+    expect(work.blocks).toBe(1);
+    expect(work.blockMs).toBeGreaterThanOrEqual(19);
+    expect(work.blockCpuMs).toBeGreaterThan(10);
+    expect(work.maxBlockMs).toBe(work.blockMs);
+  });
+
+  it('attributes a stall to the blocking work and what was in flight', async () => {
+    RUNTIME_METRICS_CONFIG.PROBE_INTERVAL_MS = 10;
+    RUNTIME_METRICS_CONFIG.STALL_THRESHOLD_MS = 50;
+    await startRuntimeMetrics();
+    await sleep(30);
+
+    const endRequest = beginWork('/api/chatroom/stream');
+    measureBlock('settlement', () => busyWait(150));
+    await sleep(30);
+    endRequest();
+
+    const metrics = getRuntimeMetrics();
+    expect(metrics.probing).toBe(true);
+    expect(metrics.eventLoop.stalls).toBeGreaterThanOrEqual(1);
+
+    const stall = metrics.recentStalls.find(s => s.blocks.some(b => b.label === 'settlement'))!;
+    expect(stall).toBeDefined();
+    expect(stall.lagMs).toBeGreaterThan(100);
+    expect(stall.inFlight['/api/chatroom/stream']).toBe(1);
+    expect(metrics.work.settlement.stalls).toBeGreaterThanOrEqual(1);
+    expect(metrics.work['/api/chatroom/stream'].attributedCpuMs).toBeGreaterThan(50);
+
+    const summary = getRuntimeSummary();
+    expect(summary.stalls).toBe(metrics.eventLoop.stalls);
+    expect(summary.maxStallMs).toBeGreaterThan(100);
+  });
+});
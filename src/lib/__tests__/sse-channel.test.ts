@@ -0,0 +1,171 @@
+/**
+ * SSE Broadcast Channel Tests
+ */
+
+import { describe, it, expect } from 'vitest';
+import { SseChannel, encodeSseFrame, getLastEventId, parseSseEventId } from '../sse-channel';
+
+const decoder = new TextDecoder();
+
+function collector() {
+  const frames: string[] = [];
+  const subscriber = (bytes: Uint8Array) => { frames.push(decoder.decode(bytes)); };
+  return { frames, subscriber };
+}
+
+function idOf(frame: string): string {
+  return frame.split('\n')[0].replace('id: ', '');
+}
+
+describe('SseChannel', () => {
+  it('should serialize each event once for all subscribers', () => {
+    const channel = new SseChannel('test', { keepaliveMs: 0 });
+    const received: Uint8Array[] = [];
+    channel.subscribe(bytes => received.push(bytes));
+    channel.subscribe(bytes => received.push(bytes));
+
+    channel.publish('round_state', { phase: 'SCANNING' });
+
+    expect(received).toHaveLength(2);
+    expect(received[0]).toBe(received[1]);
+    expect(decoder.decode(received[0])).toMatch(/^id: .+-1\nevent: round_state\ndata: \{"phase":"SCANNING"\}\n\n$/);
+  });
+
+  it('should replay only the events after Last-Event-ID', () => {
+    const channel = new SseChannel('test', { keepaliveMs: 0 });
+    const first = collector();
+    const sub = channel.subscribe(first.subscriber);
+
+    channel.publish('tick', 1);
+    channel.publish('tick', 2);
+    sub.unsubscribe();
+    channel.publish('tick', 3);
+    channel.publish('tick', 4);
+
+    const resumed = collector();
+    const resumedSub = channel.subscribe(resumed.subscriber, idOf(first.frames[1]));
+
+    expect(resumedSub.replayed).toBe(2);
+    expect(resumedSub.missedEvents).toBe(false);
+    // The gap is written as one chunk
+    expect(resumed.frames).toHaveLength(1);
+    expect(resumed.frames[0].split('\n\n').filter(Boolean).map(f => f.split('data: ')[1])).toEqual(['3', '4']);
+  });
+
+  it('should flag a gap older than the replay buffer', () => {
+    const channel = new SseChannel('test', { replaySize: 2, keepaliveMs: 0 });
+    const first = collector();
+    const sub = channel.subscribe(first.subscriber);
+    channel.publish('tick', 1);
+    sub.unsubscribe();
+    channel.publish('tick', 2);
+    channel.publish('tick', 3);
+    channel.publish('tick', 4);
+
+    const resumed = collector();
+    const resumedSub = channel.subscribe(resumed.subscriber, idOf(first.frames[0]));
+
+    expect(resumedSub.missedEvents).toBe(true);
+    expect(resumedSub.replayed).toBe(2);
+  });
+
+  it('should ask clients from another server epoch to resync', () => {
+    const channel = new SseChannel('test', { keepaliveMs: 0 });
+    channel.publish('tick', 1);
+
+    const resumed = collector();
+    const sub = channel.subscribe(resumed.subscriber, 'oldepoch-1');
+
+    expect(sub.missedEvents).toBe(true);
+    expect(resumed.frames).toHaveLength(0);
+  });
+
+  it('should report the newest id at subscribe time for snapshots', () => {
+    const channel = new SseChannel('test', { keepaliveMs: 0, epoch: 'run1' });
+    expect(channel.subscribe(() => {}).lastEventId).toBeNull();
+
+    channel.publish('tick', 1);
+    channel.publish('tick', 2);
+
+    expect(channel.subscribe(() => {}).lastEventId).toBe('run1-2');
+  });
+
+  it('should drop subscribers whose connection is closed', () => {
+    const channel = new SseChannel('test', { keepaliveMs: 0 });
+    channel.subscribe(() => { throw new Error('Controller closed'); });
+    channel.publish('tick', 1);
+
+    expect(channel.subscriberCount).toBe(0);
+  });
+});
+
+describe('SseChannel coalescing', () => {
+  it('should write up to maxEvents frames as one chunk', () => {
+    const channel = new SseChannel('test', { keepaliveMs: 0, coalesce: { flushMs: 60_000, maxEvents: 3 } });
+    const writes: string[] = [];
+    channel.subscribe(bytes => writes.push(decoder.decode(bytes)));
+
+    channel.publish('tick', 1);
+    channel.publish('tick', 2);
+    expect(writes).toHaveLength(0);
+
+    channel.publish('tick', 3);
+    expect(writes).toHaveLength(1);
+    expect(writes[0].match(/event: tick/g)).toHaveLength(3);
+
+    const stats = channel.getStats();
+    expect(stats.writes).toBe(1);
+    expect(stats.framesWritten).toBe(3);
+    expect(stats.framesPerWrite).toBe(3);
+    channel.close();
+  });
+
+  it('should flush pending frames after flushMs', async () => {
+    const channel = new SseChannel('test', { keepaliveMs: 0, coalesce: { flushMs: 5, maxEvents: 100 } });
+    const writes: string[] = [];
+    channel.subscribe(bytes => writes.push(decoder.decode(bytes)));
+
+    channel.publish('tick', 1);
+    channel.publish('tick', 2);
+    await new Promise(resolve => setTimeout(resolve, 30));
+
+    expect(writes).toHaveLength(1);
+    expect(channel.getStats().batches).toBe(1);
+    channel.close();
+  });
+
+  it('should deliver pending frames before a new subscriber replays', () => {
+    const channel = new SseChannel('test', { keepaliveMs: 0, coalesce: { flushMs: 60_000, maxEvents: 100 } });
+    const existing = collector();
+    channel.subscribe(existing.subscriber);
+    const first = channel.publish('tick', 1);
+    channel.publish('tick', 2);
+
+    const resumed = collector();
+    const sub = channel.subscribe(resumed.subscriber, `${channel.epoch}-${first.seq}`);
+
+    expect(existing.frames).toHaveLength(1);
+    expect(sub.replayed).toBe(1);
+    expect(resumed.frames[0]).toContain('data: 2');
+    channel.close();
+  });
+});
+
+describe('SSE helpers', () => {
+  it('should encode per-connection frames without an id', () => {
+    expect(decoder.decode(encodeSseFrame('connected', { ok: true }))).toBe('event: connected\ndata: {"ok":true}\n\n');
+  });
+
+  it('should split event ids into epoch and sequence', () => {
+    expect(parseSseEventId('run1abc-12')).toEqual({ epoch: 'run1abc', seq: 12 });
+    expect(parseSseEventId('a-b-3')).toEqual({ epoch: 'a-b', seq: 3 });
+    expect(parseSseEventId('42')).toBeNull();
+    expect(parseSseEventId('abc-x')).toBeNull();
+  });
+
+  it('should read Last-Event-ID from the header or query string', () => {
+    expect(getLastEventId(new Request('http://x/stream', { headers: { 'Last-Event-ID': 'abc-5' } }))).toBe('abc-5');
+    expect(getLastEventId(new Request('http://x/stream?lastEventId=abc-7'))).toBe('abc-7');
+    expect(getLastEventId(new Request('http://x/stream'))).toBeNull();
+  });
+});
@@ -15,6 +15,7 @@ import { setStoredTrades, getStoredTrades } from '../storage';
 // Mock price service
 vi.mock('../price-service', () => ({
   getCurrentPrice: vi.fn().mockResolvedValue(45000),
+  getHistoricalPrice: vi.fn().mockResolvedValue(45000),
 }));
 
 describe('Stale Trade Handler', () => {
@@ -0,0 +1,71 @@
+/**
+ * Request Task Graph Tests
+ */
+
+import { describe, it, expect } from 'vitest';
+import { TaskGraph } from '../task-graph';
+
+function delay<T>(ms: number, value: T): Promise<T> {
+  return new Promise(resolve => setTimeout(() => resolve(value), ms));
+}
+
+describe('TaskGraph', () => {
+  it('should run independent tasks concurrently', async () => {
+    const graph = new TaskGraph();
+    const started = Date.now();
+    const a = graph.run('a', () => delay(40, 1));
+    const b = graph.run('b', () => delay(40, 2));
+
+    expect(await Promise.all([a, b])).toEqual([1, 2]);
+    expect(Date.now() - started).toBeLessThan(75);
+  });
+
+  it('should start a dependent task only once its inputs exist', async () => {
+    const graph = new TaskGraph();
+    const order: string[] = [];
+    const chatroom = graph.run('chatroom', async () => { await delay(20, null); order.push('chatroom'); return 'bullish'; });
+    const limit = graph.run('rate_limit', async () => { order.push('rate_limit'); return { success: true }; });
+    const council = graph.after('council', [limit, chatroom], (l, c) => {
+      order.push('council');
+      return `${l.success}:${c}`;
+    });
+
+    expect(await council).toBe('true:bullish');
+    expect(order).toEqual(['rate_limit', 'chatroom', 'council']);
+    expect(graph.criticalPath()).toEqual(['chatroom', 'council']);
+  });
+
+  it('should skip a task whose dependency failed and not leak the rejection', async () => {
+    const graph = new TaskGraph();
+    let ran = false;
+    const failing = graph.run('kv', async () => { throw new Error('KV down'); });
+    const dependent = graph.after('council', [failing], () => { ran = true; });
+
+    await expect(dependent).rejects.toThrow('KV down');
+    expect(ran).toBe(false);
+    const tasks = graph.getTimings().tasks;
+    expect(tasks.map(task => [task.name, task.failed])).toEqual([['kv', true]]);
+  });
+
+  it('should report total, serial and critical path in Server-Timing', async () => {
+    const graph = new TaskGraph();
+    const a = graph.run('chatroom', () => delay(30, 'x'));
+    const b = graph.run('debate_context', () => delay(30, 'y'));
+    await graph.after('council', [a, b], () => delay(10, 'z'));
+
+    const { totalMs, serialMs } = graph.getTimings();
+    expect(serialMs).toBeGreaterThan(totalMs);
+
+    const header = graph.serverTiming();
+    expect(header).toMatch(/chatroom;dur=\d+/);
+    expect(header).toMatch(/council;dur=\d+/);
+    expect(header).toMatch(/total;dur=\d+;desc="(chatroom|debate_context)>council"/);
+    expect(header).toMatch(/serial;dur=\d+/);
+  });
+
+  it('should reject duplicate task names', () => {
+    const graph = new TaskGraph();
+    graph.run('a', () => 1);
+    expect(() => graph.run('a', () => 2)).toThrow('Duplicate task name');
+  });
+});
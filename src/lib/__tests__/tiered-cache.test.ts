@@ -0,0 +1,123 @@
+/**
+ * Two-Tier (L1 + shared L2) Cache Tests
+ *
+ * Two TieredCache objects with the same name over one in-memory L2 stand
+ * in for two serverless instances sharing KV.
+ */
+
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
+import {
+  TIERED_CACHE_CONFIG,
+  TieredCache,
+  CachedFailureError,
+  createMemoryL2Store,
+  setL2Store,
+  getTieredCacheStats,
+  resetTieredCacheState,
+} from '../tiered-cache';
+
+const originalConfig = { ...TIERED_CACHE_CONFIG };
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+describe('tiered-cache', () => {
+  beforeEach(() => {
+    resetTieredCacheState();
+    TIERED_CACHE_CONFIG.LOCK_POLL_MS = 5;
+  });
+
+  afterEach(() => {
+    resetTieredCacheState();
+    Object.assign(TIERED_CACHE_CONFIG, originalConfig);
+    vi.restoreAllMocks();
+  });
+
+  it('serves a value computed on one instance from L2 on another', async () => {
+    setL2Store(createMemoryL2Store());
+    const instanceA = new TieredCache<{ price: number }>('quotes', { ttlMs: 60_000 });
+    const instanceB = new TieredCache<{ price: number }>('quotes', { ttlMs: 60_000 });
+    const fetchQuote = vi.fn(async () => ({ price: 45000 }));
+
+    expect(await instanceA.getOrCompute('BTC', fetchQuote)).toEqual({ value: { price: 45000 }, source: 'computed' });
+    expect(await instanceB.getOrCompute('BTC', fetchQuote)).toEqual({ value: { price: 45000 }, source: 'l2' });
+    expect(await instanceB.getOrCompute('BTC', fetchQuote)).toEqual({ value: { price: 45000 }, source: 'l1' });
+    expect(fetchQuote).toHaveBeenCalledTimes(1);
+
+    const stats = instanceB.getStats();
+    expect(stats.l1).toEqual({ hits: 1, misses: 1, hitRate: 0.5 });
+    expect(stats.l2).toMatchObject({ hits: 1, misses: 0, hitRate: 1 });
+    expect(getTieredCacheStats().l2).toBe('memory');
+  });
+
+  it('lets only one instance recompute while the others wait for its result', async () => {
+    setL2Store(createMemoryL2Store());
+    const instances = [1, 2, 3].map(() => new TieredCache<string>('models', { ttlMs: 60_000 }));
+    const callModel = vi.fn(async () => {
+      await sleep(40);
+      return 'buy';
+    });
+
+    const results = await Promise.all(instances.map(cache => cache.getOrCompute('deepseek:BTC', callModel)));
+
+    expect(callModel).toHaveBeenCalledTimes(1);
+    expect(results.map(r => r.value)).toEqual(['buy', 'buy', 'buy']);
+    expect(results.filter(r => r.source === 'computed')).toHaveLength(1);
+    expect(results.filter(r => r.source === 'l2')).toHaveLength(2);
+    expect(instances.reduce((sum, cache) => sum + cache.getStats().lockWaits, 0)).toBe(2);
+  });
+
+  it('computes locally when the lock holder does not finish in time', async () => {
+    setL2Store(createMemoryL2Store());
+    TIERED_CACHE_CONFIG.LOCK_WAIT_MS = 20;
+    const slow = new TieredCache<string>('models', { ttlMs: 60_000 });
+    const impatient = new TieredCache<string>('models', { ttlMs: 60_000 });
+
+    const first = slow.getOrCompute('k', async () => {
+      await sleep(80);
+      return 'slow';
+    });
+    await sleep(5);
+    const second = await impatient.getOrCompute('k', async () => 'fast');
+
+    expect(second).toEqual({ value: 'fast', source: 'computed' });
+    expect(impatient.getStats().lockTimeouts).toBe(1);
+    expect((await first).value).toBe('slow');
+  });
+
+  it('caches upstream failures across instances for the negative TTL', async () => {
+    setL2Store(createMemoryL2Store());
+    const instanceA = new TieredCache<number>('prices', { ttlMs: 30_000, negativeTtlMs: 50 });
+    const instanceB = new TieredCache<number>('prices', { ttlMs: 30_000, negativeTtlMs: 50 });
+    const failing = vi.fn(async () => {
+      throw new Error('CoinGecko API error: 429');
+    });
+
+    await expect(instanceA.getOrCompute('bitcoin', failing)).rejects.toThrow('CoinGecko API error: 429');
+    await expect(instanceB.getOrCompute('bitcoin', failing)).rejects.toBeInstanceOf(CachedFailureError);
+    await expect(instanceA.getOrCompute('bitcoin', failing)).rejects.toBeInstanceOf(CachedFailureError);
+    expect(failing).toHaveBeenCalledTimes(1);
+    expect(instanceB.getStats().negativeHits).toBe(1);
+
+    await sleep(60);
+    expect(await instanceB.getOrCompute('bitcoin', async () => 45000)).toEqual({ value: 45000, source: 'computed' });
+  });
+
+  it('falls back to L1 only when L2 fails and keeps stale values for fallbacks', async () => {
+    const broken = createMemoryL2Store();
+    vi.spyOn(broken, 'get').mockImplementation(async () => {
+      throw new Error('KV unreachable');
+    });
+    vi.spyOn(console, 'warn').mockImplementation(() => {});
+    setL2Store(broken);
+    const cache = new TieredCache<number>('prices', { ttlMs: 1 });
+
+    expect(await cache.getOrCompute('bitcoin', async () => 45000)).toEqual({ value: 45000, source: 'computed' });
+    expect(cache.getStats().l2.errors).toBe(1);
+
+    await sleep(5);
+    await expect(cache.getOrCompute('bitcoin', async () => {
+      throw new Error('CoinGecko API error: 503');
+    })).rejects.toThrow('503');
+    expect(cache.peekStale('bitcoin')).toBe(45000);
+  });
+});
@@ -8,9 +8,15 @@
  * - Cache key based on prompt hash + model config
  * 
  * This reduces API costs and improves response times for repeated queries.
+ *
+ * Responses are stored in a TieredCache (tiered-cache.ts): in-process, and
+ * in the shared KV tier when configured, so an identical query on another
+ * instance reuses the response and only one instance calls the model.
+ * A failed model call is cached for CACHE_NEGATIVE_TTL_MS.
  */
 
 import { logCacheEvent } from './cache';
+import { TieredCache, CachedFailureError } from './tiered-cache';
 
 // AI Cache TTL configurations (in seconds)
 export const AI_CACHE_TTL = {
@@ -19,20 +25,11 @@ export const AI_CACHE_TTL = {
   PRICE_DATA: 30,          // 30 seconds for price data
 } as const;
 
-// In-memory cache for AI responses
-interface CacheEntry<T> {
-  value: T;
-  timestamp: number;
-  modelId: string;
-  promptHash: string;
-  responseTimeMs: number;
-}
-
 class AIResponseCache {
-  private cache = new Map<string, CacheEntry<unknown>>();
-  private pending = new Map<string, Promise<unknown>>();
+  private cache = new TieredCache<unknown>('ai-response', { ttlMs: AI_CACHE_TTL.MODEL_RESPONSE * 1000 });
   private metrics = new Map<string, {
     hits: number;
+    l2Hits: number;
     misses: number;
     totalResponseTime: number;
     avgResponseTime: number;
@@ -64,6 +61,7 @@ class AIResponseCache {
   /**
    * Get cached response or execute function
    * Implements request deduplication for concurrent identical requests
+   * (within the instance and, through the shared tier, across instances)
    */
   async getOrExecute<T>(
     modelId: string,
@@ -73,86 +71,54 @@ class AIResponseCache {
     ttlSeconds: number = AI_CACHE_TTL.MODEL_RESPONSE
   ): Promise<{ result: T; cached: boolean; responseTimeMs: number }> {
     const key = this.generateKey(modelId, asset, context);
-    const now = Date.now();
-    const ttlMs = ttlSeconds * 1000;
-
-    // Check cache
-    const cached = this.cache.get(key) as CacheEntry<T> | undefined;
-    if (cached && now - cached.timestamp < ttlMs) {
-      this.recordMetric(modelId, 'hit', 0);
-      logCacheEvent(`ai-${modelId}`, 'hit', { asset, context: context ? 'yes' : 'no' });
+    const startTime = Date.now();
+    const { value, source } = await this.cache.getOrCompute(key, fn, ttlSeconds * 1000);
+    const result = value as T;
+    const responseTimeMs = Date.now() - startTime;
+
+    if (source === 'l1' || source === 'l2') {
+      this.recordMetric(modelId, source === 'l2' ? 'l2Hit' : 'hit', 0);
+      logCacheEvent(`ai-${modelId}`, 'hit', { asset, context: context ? 'yes' : 'no', tier: source });
       return {
-        result: cached.value,
+        result,
         cached: true,
         responseTimeMs: 0, // Cached responses are instant
       };
     }
 
-    // Check for pending request (deduplication)
-    const pending = this.pending.get(key) as Promise<T> | undefined;
-    if (pending) {
-      // Log as cache hit since we're reusing an in-flight request
+    if (source === 'shared') {
+      // Reused an in-flight request
       if (process.env.NODE_ENV === 'development') {
         console.log(`[AI-Cache] 🔄 Request deduplication: ai-${modelId}`, { asset, context: context ? 'yes' : 'no' });
       }
-      const startTime = Date.now();
-      const result = await pending;
-      return {
-        result,
-        cached: false, // Not from cache, but deduplicated
-        responseTimeMs: Date.now() - startTime,
-      };
-    }
-
-    // Execute and cache
-    logCacheEvent(`ai-${modelId}`, 'miss', { asset, context: context ? 'yes' : 'no' });
-    const startTime = Date.now();
-    
-    const promise = fn().then(result => {
-      const responseTimeMs = Date.now() - startTime;
-      
-      // Store in cache
-      this.cache.set(key, {
-        value: result,
-        timestamp: Date.now(),
-        modelId,
-        promptHash: this.simpleHash(asset + (context || '')),
-        responseTimeMs,
-      });
-
+    } else {
+      logCacheEvent(`ai-${modelId}`, 'miss', { asset, context: context ? 'yes' : 'no' });
       this.recordMetric(modelId, 'miss', responseTimeMs);
-      this.pending.delete(key);
-      
-      return result;
-    }).catch(error => {
-      this.pending.delete(key);
-      throw error;
-    });
+    }
 
-    this.pending.set(key, promise);
-    const result = await promise;
-    
     return {
       result,
-      cached: false,
-      responseTimeMs: Date.now() - startTime,
+      cached: false, // Not from cache (computed or deduplicated)
+      responseTimeMs,
     };
   }
 
   /**
    * Record cache metric for a model
    */
-  private recordMetric(modelId: string, event: 'hit' | 'miss', responseTimeMs: number): void {
+  private recordMetric(modelId: string, event: 'hit' | 'l2Hit' | 'miss', responseTimeMs: number): void {
     const existing = this.metrics.get(modelId);
     if (!existing) {
       this.metrics.set(modelId, {
-        hits: event === 'hit' ? 1 : 0,
+        hits: event !== 'miss' ? 1 : 0,
+        l2Hits: event === 'l2Hit' ? 1 : 0,
         misses: event === 'miss' ? 1 : 0,
         totalResponseTime: responseTimeMs,
         avgResponseTime: responseTimeMs,
       });
     } else {
-      existing.hits += event === 'hit' ? 1 : 0;
+      existing.hits += event !== 'miss' ? 1 : 0;
+      existing.l2Hits += event === 'l2Hit' ? 1 : 0;
       existing.misses += event === 'miss' ? 1 : 0;
       if (responseTimeMs > 0) {
         existing.totalResponseTime += responseTimeMs;
@@ -166,12 +132,14 @@ class AIResponseCache {
    */
   getMetrics(): Record<string, {
     hits: number;
+    l2Hits: number;
     misses: number;
     hitRate: number;
     avgResponseTime: number;
   }> {
     const result: Record<string, {
       hits: number;
+      l2Hits: number;
       misses: number;
       hitRate: number;
       avgResponseTime: number;
@@ -181,6 +149,7 @@ class AIResponseCache {
       const total = metrics.hits + metrics.misses;
       result[modelId] = {
         hits: metrics.hits,
+        l2Hits: metrics.l2Hits,
         misses: metrics.misses,
         hitRate: total > 0 ? metrics.hits / total : 0,
         avgResponseTime: metrics.avgResponseTime,
@@ -192,23 +161,13 @@ class AIResponseCache {
 
   /**
    * Invalidate cache for a specific model/asset combination
+   * (in this instance; shared entries expire with their TTL)
    */
   invalidate(modelId: string, asset?: string): void {
-    if (asset) {
-      // Invalidate specific asset
-      for (const [key, entry] of this.cache.entries()) {
-        if (entry.modelId === modelId && key.includes(asset.toUpperCase())) {
-          this.cache.delete(key);
-        }
-      }
-    } else {
-      // Invalidate all entries for this model
-      for (const [key, entry] of this.cache.entries()) {
-        if (entry.modelId === modelId) {
-          this.cache.delete(key);
-        }
-      }
-    }
+    const prefix = `ai:${modelId}:`;
+    this.cache.invalidateWhere(key =>
+      key.startsWith(prefix) && (!asset || key.includes(asset.toUpperCase()))
+    );
   }
 
   /**
@@ -216,7 +175,6 @@ class AIResponseCache {
    */
   clear(): void {
     this.cache.clear();
-    this.pending.clear();
   }
 
   /**
@@ -406,7 +364,8 @@ export async function withAICaching<T>(
 
     return { result, cached, responseTimeMs };
   } catch (error) {
-    if (trackPerformance) {
+    // A cached failure was already counted when the model failed
+    if (trackPerformance && !(error instanceof CachedFailureError)) {
       performanceTracker.recordError(modelId);
     }
     throw error;
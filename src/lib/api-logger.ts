@@ -9,14 +9,25 @@
  * - Response timing and body size tracking
  * - Error logging with stack traces
  * - CORS headers and metadata logging
+ *
+ * Entries go through the log pipeline (log-pipeline.ts): they are built and
+ * sanitized lazily, only once level and sampling checks pass, and written in
+ * batches off the request path. Body sizes come from the serialized length
+ * (content-length, or a size the caller already has) instead of
+ * re-serializing the body.
  */
 
 import { NextRequest, NextResponse } from 'next/server';
+import { emitLog, isLogSampled } from './log-pipeline';
+import { beginWork } from './runtime-metrics';
 
 // Environment configuration
 const NODE_ENV = process.env.NODE_ENV || 'development';
 const LOG_LEVEL = process.env.LOG_LEVEL || (NODE_ENV === 'production' ? 'info' : 'debug');
 
+// Request id for entries not tied to a request
+const SYSTEM_REQUEST_ID = 'system';
+
 // Log levels
 type LogLevel = 'debug' | 'info' | 'warn' | 'error';
 
@@ -70,29 +81,31 @@ function sanitizeHeaders(headers: Record<string, string>): Record<string, string
   return sanitized;
 }
 
+const SENSITIVE_BODY_FIELDS = [
+  'apiKey',
+  'api_key',
+  'token',
+  'password',
+  'secret',
+  'privateKey',
+  'private_key',
+  'authorization',
+  'credentials',
+];
+
 /**
- * Sanitize request/response body to remove sensitive information
+ * Sanitize request/response body to remove sensitive information.
+ * The body is only copied when it actually contains a sensitive field.
  */
 function sanitizeBody(body: any): any {
   if (!body || typeof body !== 'object') {
     return body;
   }
 
-  const sensitiveFields = [
-    'apiKey',
-    'api_key',
-    'token',
-    'password',
-    'secret',
-    'privateKey',
-    'private_key',
-    'authorization',
-    'credentials',
-  ];
-
-  const sanitized = { ...body };
-  for (const field of sensitiveFields) {
-    if (sanitized[field] !== undefined) {
+  let sanitized: any = body;
+  for (const field of SENSITIVE_BODY_FIELDS) {
+    if (body[field] !== undefined) {
+      if (sanitized === body) sanitized = { ...body };
       sanitized[field] = '[REDACTED]';
     }
   }
@@ -101,16 +114,38 @@ function sanitizeBody(body: any): any {
 }
 
 /**
- * Calculate response body size in bytes
+ * Body size in bytes from what is already known about the serialized body:
+ * an explicit size, the content-length header, or the string itself.
+ * Never re-serializes; returns undefined when the size is not known.
  */
-function calculateBodySize(body: any): number {
-  if (!body) return 0;
-  try {
-    const jsonString = JSON.stringify(body);
-    return new Blob([jsonString]).size;
-  } catch {
-    return 0;
+function resolveBodySize(body: any, knownSize?: number, headers?: Headers): number | undefined {
+  if (knownSize !== undefined) return knownSize;
+
+  const contentLength = headers?.get('content-length');
+  if (contentLength) {
+    const parsed = parseInt(contentLength, 10);
+    if (!isNaN(parsed)) return parsed;
   }
+
+  if (typeof body === 'string') return utf8Length(body);
+  return undefined;
+}
+
+/**
+ * UTF-8 byte length of a string without encoding it
+ */
+function utf8Length(value: string): number {
+  let bytes = 0;
+  for (let i = 0; i < value.length; i++) {
+    const code = value.charCodeAt(i);
+    if (code < 0x80) bytes += 1;
+    else if (code < 0x800) bytes += 2;
+    else if (code >= 0xd800 && code <= 0xdbff) {
+      bytes += 4;
+      i++; // Surrogate pair
+    } else bytes += 3;
+  }
+  return bytes;
 }
 
 /**
@@ -130,35 +165,45 @@ interface LogEntry {
 }
 
 /**
- * Write a structured log entry
+ * Serialize a log entry: JSON in production, a readable line in development
  */
-function writeLog(entry: LogEntry): void {
-  if (!shouldLog(entry.level)) {
-    return;
-  }
-
+function formatLogEntry(entry: LogEntry): string {
   const logOutput = {
     ...entry,
     environment: NODE_ENV,
     service: 'consensus-vault-api',
   };
 
-  // Use appropriate console method based on level
-  const logMethod = {
-    debug: console.debug,
-    info: console.info,
-    warn: console.warn,
-    error: console.error,
-  }[entry.level];
-
   // In production, log as JSON for easier parsing
   if (NODE_ENV === 'production') {
-    logMethod(JSON.stringify(logOutput));
-  } else {
-    // In development, pretty print for readability
-    const { timestamp, requestId, level, message, ...rest } = logOutput;
-    logMethod(`[${timestamp}] [${level.toUpperCase()}] [${requestId}] ${message}`, rest);
+    return JSON.stringify(logOutput);
   }
+
+  // In development, keep the header readable
+  const { timestamp, requestId, level, message, ...rest } = logOutput;
+  return `[${timestamp}] [${level.toUpperCase()}] [${requestId}] ${message} ${JSON.stringify(rest)}`;
+}
+
+/**
+ * Write a structured log entry. `build` only runs if the entry passes the
+ * level and sampling checks.
+ */
+function writeLog(
+  level: LogLevel,
+  requestId: string,
+  route: string | undefined,
+  build: () => Pick<LogEntry, 'message' | 'data' | 'error'>
+): void {
+  if (!shouldLog(level)) {
+    return;
+  }
+
+  emitLog(
+    level,
+    () => formatLogEntry({ timestamp: new Date().toISOString(), requestId, level, ...build() }),
+    // System entries have no request to sample consistently by
+    { route, correlationId: requestId === SYSTEM_REQUEST_ID ? undefined : requestId }
+  );
 }
 
 /**
@@ -169,97 +214,102 @@ export class ApiLogger {
   private startTime: number;
   private request: NextRequest;
   private url: URL;
+  private endWork: () => void;
 
   constructor(request: NextRequest) {
     this.requestId = generateRequestId();
     this.startTime = Date.now();
     this.request = request;
     this.url = new URL(request.url);
+    // In flight (for stall attribution) until the response or error is logged
+    this.endWork = beginWork(this.url.pathname);
   }
 
   /**
    * Log incoming request
    */
   logRequest(): void {
-    const headers = Object.fromEntries(this.request.headers.entries());
-    const sanitizedHeaders = sanitizeHeaders(headers);
-
-    const requestData: Record<string, any> = {
-      method: this.request.method,
-      url: this.url.pathname,
-      query: Object.fromEntries(this.url.searchParams.entries()),
-      headers: sanitizedHeaders,
-      ip: this.request.headers.get('x-forwarded-for') || this.request.headers.get('x-real-ip') || 'unknown',
-      userAgent: this.request.headers.get('user-agent') || 'unknown',
-    };
-
-    // Try to parse and log request body for POST/PUT/PATCH requests
-    if (['POST', 'PUT', 'PATCH'].includes(this.request.method)) {
-      // Note: Body will be logged after it's read in the route handler
-      requestData.hasBody = true;
-    }
+    writeLog('info', this.requestId, this.url.pathname, () => {
+      const headers = Object.fromEntries(this.request.headers.entries());
+
+      const requestData: Record<string, any> = {
+        method: this.request.method,
+        url: this.url.pathname,
+        query: Object.fromEntries(this.url.searchParams.entries()),
+        headers: sanitizeHeaders(headers),
+        ip: this.request.headers.get('x-forwarded-for') || this.request.headers.get('x-real-ip') || 'unknown',
+        userAgent: this.request.headers.get('user-agent') || 'unknown',
+      };
+
+      // Try to parse and log request body for POST/PUT/PATCH requests
+      if (['POST', 'PUT', 'PATCH'].includes(this.request.method)) {
+        // Note: Body will be logged after it's read in the route handler
+        requestData.hasBody = true;
+      }
 
-    writeLog({
-      timestamp: new Date().toISOString(),
-      requestId: this.requestId,
-      level: 'info',
-      message: `Incoming ${this.request.method} request to ${this.url.pathname}`,
-      data: requestData,
+      return {
+        message: `Incoming ${this.request.method} request to ${this.url.pathname}`,
+        data: requestData,
+      };
     });
   }
 
   /**
-   * Log request body (call this after reading the body in route handler)
+   * Whether debug entries (request/response bodies) for this request will
+   * be emitted; lets callers skip reading bodies that would not be logged
    */
-  logRequestBody(body: any): void {
-    const sanitizedBody = sanitizeBody(body);
-    
-    writeLog({
-      timestamp: new Date().toISOString(),
-      requestId: this.requestId,
-      level: 'debug',
+  isDebugEnabled(): boolean {
+    return shouldLog('debug') && isLogSampled('debug', this.url.pathname, this.requestId);
+  }
+
+  /**
+   * Log request body (call this after reading the body in route handler).
+   * Pass `bodySize` if the raw body length is known; otherwise the
+   * content-length header is used.
+   */
+  logRequestBody(body: any, bodySize?: number): void {
+    writeLog('debug', this.requestId, this.url.pathname, () => ({
       message: `Request body for ${this.request.method} ${this.url.pathname}`,
       data: {
-        body: sanitizedBody,
-        bodySize: calculateBodySize(body),
+        body: sanitizeBody(body),
+        bodySize: resolveBodySize(body, bodySize, this.request.headers),
       },
-    });
+    }));
   }
 
   /**
-   * Log outgoing response
+   * Log outgoing response. Pass `bodySize` if the serialized length is
+   * known; otherwise the content-length header is used.
    */
-  logResponse(response: NextResponse | Response, responseBody?: any): void {
-    const endTime = Date.now();
-    const duration = endTime - this.startTime;
+  logResponse(response: NextResponse | Response, responseBody?: any, bodySize?: number): void {
+    this.endWork();
+    const duration = Date.now() - this.startTime;
     const status = response.status;
     const statusText = response.statusText;
+    const level = status >= 400 ? 'warn' : 'info';
 
-    const headers = Object.fromEntries(response.headers.entries());
-    const sanitizedHeaders = sanitizeHeaders(headers);
-
-    const responseData: Record<string, any> = {
-      status,
-      statusText,
-      durationMs: duration,
-      headers: sanitizedHeaders,
-    };
+    writeLog(level, this.requestId, this.url.pathname, () => {
+      const headers = Object.fromEntries(response.headers.entries());
 
-    if (responseBody !== undefined) {
-      const sanitizedResponseBody = sanitizeBody(responseBody);
-      responseData.body = sanitizedResponseBody;
-      responseData.bodySize = calculateBodySize(responseBody);
-    }
+      const responseData: Record<string, any> = {
+        status,
+        statusText,
+        durationMs: duration,
+        headers: sanitizeHeaders(headers),
+      };
 
-    const level = status >= 400 ? 'warn' : 'info';
-    const message = `Response for ${this.request.method} ${this.url.pathname}: ${status} ${statusText} (${duration}ms)`;
+      if (responseBody !== undefined) {
+        responseData.body = sanitizeBody(responseBody);
+      }
+      const size = resolveBodySize(responseBody, bodySize, response.headers);
+      if (size !== undefined) {
+        responseData.bodySize = size;
+      }
 
-    writeLog({
-      timestamp: new Date().toISOString(),
-      requestId: this.requestId,
-      level,
-      message,
-      data: responseData,
+      return {
+        message: `Response for ${this.request.method} ${this.url.pathname}: ${status} ${statusText} (${duration}ms)`,
+        data: responseData,
+      };
     });
   }
 
@@ -267,31 +317,29 @@ export class ApiLogger {
    * Log error with stack trace
    */
   logError(error: Error, context?: Record<string, any>): void {
-    const errorData: Record<string, any> = {
-      error: {
-        message: error.message,
-        name: error.name,
-        stack: NODE_ENV === 'production' ? undefined : error.stack, // Don't log stack in prod
-      },
-      context: {
-        method: this.request.method,
-        url: this.url.pathname,
-        ...context,
-      },
-      durationMs: Date.now() - this.startTime,
-    };
+    this.endWork();
+    const durationMs = Date.now() - this.startTime;
 
-    writeLog({
-      timestamp: new Date().toISOString(),
-      requestId: this.requestId,
-      level: 'error',
+    writeLog('error', this.requestId, this.url.pathname, () => ({
       message: `Error in ${this.request.method} ${this.url.pathname}: ${error.message}`,
-      data: errorData,
+      data: {
+        error: {
+          message: error.message,
+          name: error.name,
+          stack: NODE_ENV === 'production' ? undefined : error.stack, // Don't log stack in prod
+        },
+        context: {
+          method: this.request.method,
+          url: this.url.pathname,
+          ...context,
+        },
+        durationMs,
+      },
       error: {
         message: error.message,
         stack: error.stack,
       },
-    });
+    }));
   }
 
   /**
@@ -312,39 +360,30 @@ export class ApiLogger {
    * Log informational message
    */
   info(message: string, data?: Record<string, any>): void {
-    writeLog({
-      timestamp: new Date().toISOString(),
-      requestId: this.requestId,
-      level: 'info',
+    writeLog('info', this.requestId, this.url.pathname, () => ({
       message: `[${this.request.method} ${this.url.pathname}] ${message}`,
       data,
-    });
+    }));
   }
 
   /**
    * Log warning message
    */
   warn(message: string, data?: Record<string, any>): void {
-    writeLog({
-      timestamp: new Date().toISOString(),
-      requestId: this.requestId,
-      level: 'warn',
+    writeLog('warn', this.requestId, this.url.pathname, () => ({
       message: `[${this.request.method} ${this.url.pathname}] ${message}`,
       data,
-    });
+    }));
   }
 
   /**
    * Log debug message
    */
   debug(message: string, data?: Record<string, any>): void {
-    writeLog({
-      timestamp: new Date().toISOString(),
-      requestId: this.requestId,
-      level: 'debug',
+    writeLog('debug', this.requestId, this.url.pathname, () => ({
       message: `[${this.request.method} ${this.url.pathname}] ${message}`,
       data,
-    });
+    }));
   }
 }
 
@@ -379,13 +418,17 @@ export async function withApiLogging(
   try {
     logger.logRequest();
     
+    // Bodies are only logged at debug level: skip cloning and parsing them
+    // unless this request's debug entries will actually be emitted
+    const logBodies = logger.isDebugEnabled();
+
     // Read and log request body for POST/PUT/PATCH
-    if (['POST', 'PUT', 'PATCH'].includes(request.method)) {
+    if (logBodies && ['POST', 'PUT', 'PATCH'].includes(request.method)) {
       try {
-        const clone = request.clone();
-        const body = await clone.json().catch(() => null);
+        const text = await request.clone().text();
+        const body = text ? JSON.parse(text) : null;
         if (body) {
-          logger.logRequestBody(body);
+          logger.logRequestBody(body, utf8Length(text));
         }
       } catch {
         // Ignore body parsing errors for logging
@@ -395,11 +438,14 @@ export async function withApiLogging(
     const response = await handler(logger);
     
     // Try to extract response body for logging
-    try {
-      const clone = response.clone();
-      const body = await clone.json().catch(() => null);
-      logger.logResponse(response, body);
-    } catch {
+    if (logBodies) {
+      try {
+        const text = await response.clone().text();
+        logger.logResponse(response, text ? JSON.parse(text) : null, utf8Length(text));
+      } catch {
+        logger.logResponse(response);
+      }
+    } else {
       logger.logResponse(response);
     }
     
@@ -415,40 +461,19 @@ export async function withApiLogging(
  */
 export const apiLogger = {
   debug: (message: string, data?: Record<string, any>) => {
-    writeLog({
-      timestamp: new Date().toISOString(),
-      requestId: 'system',
-      level: 'debug',
-      message,
-      data,
-    });
+    writeLog('debug', SYSTEM_REQUEST_ID, undefined, () => ({ message, data }));
   },
 
   info: (message: string, data?: Record<string, any>) => {
-    writeLog({
-      timestamp: new Date().toISOString(),
-      requestId: 'system',
-      level: 'info',
-      message,
-      data,
-    });
+    writeLog('info', SYSTEM_REQUEST_ID, undefined, () => ({ message, data }));
   },
 
   warn: (message: string, data?: Record<string, any>) => {
-    writeLog({
-      timestamp: new Date().toISOString(),
-      requestId: 'system',
-      level: 'warn',
-      message,
-      data,
-    });
+    writeLog('warn', SYSTEM_REQUEST_ID, undefined, () => ({ message, data }));
   },
 
   error: (message: string, error?: Error, data?: Record<string, any>) => {
-    writeLog({
-      timestamp: new Date().toISOString(),
-      requestId: 'system',
-      level: 'error',
+    writeLog('error', SYSTEM_REQUEST_ID, undefined, () => ({
       message,
       data: {
         ...data,
@@ -461,6 +486,6 @@ export const apiLogger = {
         message: error.message,
         stack: error.stack,
       } : undefined,
-    });
+    }));
   },
 };
\ No newline at end of file
@@ -15,6 +15,7 @@
  */
 
 import { unstable_cache } from 'next/cache';
+import { registerSizeGauge } from './process-metrics';
 
 // Cache TTL configurations (in seconds)
 export const CACHE_TTL = {
@@ -161,11 +162,19 @@ class RequestMemoizer<T> {
     this.results.clear();
     this.pending.clear();
   }
+
+  /**
+   * Number of cached results (expired results stay until invalidated)
+   */
+  get size(): number {
+    return this.results.size;
+  }
 }
 
 // Singleton instances for different cache types
 export const priceMemoizer = new RequestMemoizer<number>(CACHE_TTL.PRICE);
-export const consensusMemoizer = new RequestMemoizer<unknown>(CACHE_TTL.CONSENSUS);
+
+registerSizeGauge('cache.priceMemoizer', () => priceMemoizer.size);
 
 /**
  * Wrap a function with Next.js unstable_cache
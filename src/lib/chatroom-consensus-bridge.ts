@@ -37,8 +37,7 @@ export interface BridgedAnalysisContext {
  */
 export async function getChatroomConsensus(): Promise<ChatroomConsensusSnapshot | null> {
   try {
-    const state = await getState();
-    const messages = await getMessages();
+    const [state, messages] = await Promise.all([getState(), getMessages()]);
 
     // Calculate fresh consensus from messages
     const consensus = calculateRollingConsensus(messages);
@@ -102,8 +101,17 @@ function formatConsensusSummary(
 export async function prepareCouncilContext(
   userContext?: string
 ): Promise<BridgedAnalysisContext> {
-  const chatroomConsensus = await getChatroomConsensus();
+  return formatCouncilContext(await getChatroomConsensus(), userContext);
+}
 
+/**
+ * Build the combined council context from an already fetched chatroom
+ * consensus (lets routes fetch it once and use it for both)
+ */
+export function formatCouncilContext(
+  chatroomConsensus: ChatroomConsensusSnapshot | null,
+  userContext?: string
+): BridgedAnalysisContext {
   // Build combined context string
   let combinedParts: string[] = [];
 
@@ -7,7 +7,7 @@ import { ChatMessage, ChatRoomState, ChatPhase, MessageSentiment } from './types
 import { PERSONAS, PERSONAS_BY_ID } from './personas';
 import { callModelRaw } from './model-caller';
 import { ChatroomError, createUserFacingError } from './error-types';
-import { buildDebatePrompt, buildCooldownPrompt, buildModeratorPrompt, buildConsensusPrompt } from './prompts';
+import { renderDebatePrompt, renderCooldownPrompt, buildModeratorPrompt, renderConsensusPrompt } from './prompts';
 import { 
   buildDebateContextForConsensus, 
   applyInfluenceWeighting,
@@ -183,7 +183,7 @@ export async function generateNextMessageEnhanced(
   let promptData: { systemPrompt: string; userPrompt: string };
 
   if (currentState.phase === 'COOLDOWN') {
-    promptData = JSON.parse(buildCooldownPrompt(persona, history));
+    promptData = renderCooldownPrompt(persona, history);
   } else if (currentState.phase === 'CONSENSUS') {
     // CVAULT-190: Build consensus prompt with debate context
     // First, try to get the actual debate summary from storage
@@ -207,7 +207,7 @@ export async function generateNextMessageEnhanced(
       console.warn('[CVAULT-190] Error fetching debate summary for consensus prompt:', error);
     }
     
-    promptData = JSON.parse(buildConsensusPrompt(
+    promptData = renderConsensusPrompt(
       persona,
       history,
       currentState.consensusDirection || 'neutral',
@@ -215,10 +215,10 @@ export async function generateNextMessageEnhanced(
       marketData,
       asset,
       debateContext
-    ));
+    );
   } else {
     // CVAULT-208: Pass argument tracker to debate prompt for anti-repetition
-    promptData = JSON.parse(buildDebatePrompt(
+    promptData = renderDebatePrompt(
       persona,
       history,
       marketData,
@@ -226,7 +226,7 @@ export async function generateNextMessageEnhanced(
       asset,
       undefined, // previousDebateSummary - handled separately via getDebateSummary in buildDebatePrompt
       currentState.argumentTracker
-    ));
+    );
   }
 
   // 8. Call model
@@ -2,7 +2,7 @@ import { ChatMessage, ChatRoomState, ChatPhase, MessageSentiment, DebateSummary,
 import { PERSONAS, PERSONAS_BY_ID } from './personas';
 import { callModelRaw } from './model-caller';
 import { ChatroomError, ChatroomErrorType, createUserFacingError } from './error-types';
-import { buildDebatePrompt, buildCooldownPrompt, buildModeratorPrompt, buildConsensusPrompt } from './prompts';
+import { renderDebatePrompt, renderCooldownPrompt, buildModeratorPrompt, renderConsensusPrompt } from './prompts';
 import { calculateRollingConsensus } from './consensus-calc';
 import { fetchMarketData, MarketData } from './market-data';
 import { PersuasionStore, initializePersuasionState, PersuasionState } from './persuasion';
@@ -92,7 +92,7 @@ export async function generateNextMessage(
   let promptData: { systemPrompt: string; userPrompt: string };
 
   if (currentState.phase === 'COOLDOWN') {
-    promptData = JSON.parse(buildCooldownPrompt(persona, history));
+    promptData = renderCooldownPrompt(persona, history);
   } else if (currentState.phase === 'CONSENSUS') {
     // CVAULT-190: Build consensus prompt with debate context
     let debateContext: DebateContextForConsensus | undefined;
@@ -113,7 +113,7 @@ export async function generateNextMessage(
       console.warn('[CVAULT-190] Error fetching debate summary for consensus prompt in regular engine:', error);
     }
     
-    promptData = JSON.parse(buildConsensusPrompt(
+    promptData = renderConsensusPrompt(
       persona,
       history,
       currentState.consensusDirection || 'neutral',
@@ -121,16 +121,16 @@ export async function generateNextMessage(
       marketData,
       currentState.currentAsset || 'BTC',
       debateContext
-    ));
+    );
   } else {
-    promptData = JSON.parse(buildDebatePrompt(
+    promptData = renderDebatePrompt(
       persona,
       history,
       marketData,
       persuasionState,
       currentState.currentAsset || 'BTC',
       currentState.previousDebateSummary
-    ));
+    );
   }
 
   // 5. Call persona's model with error handling - silently skip on failure
@@ -1,7 +1,9 @@
 import { ChatMessage, ChatRoomState, ChatPhase, PersonaPersuasionState, DebateSummary, ConsensusSnapshot, ROLLING_HISTORY_CONFIG, MessageSentiment } from './types';
+import { findWindowStart, rollingWindow, trimExpiredHead } from './rolling-window';
 
-// Static import for @vercel/kv to avoid Turbopack issues
-import { kv } from '@vercel/kv';
+// @vercel/kv is loaded on first use (see cold-start.ts)
+import { loadKV } from '../cold-start';
+import { registerSizeGauge } from '../process-metrics';
 
 const KEYS = {
   messages: 'chatroom:messages',
@@ -30,11 +32,68 @@ let memState: ChatRoomState | null = null;
 let memLock: { holder: string; expiresAt: number } | null = null;
 let memMsgIndex = 0;
 let memPersuasionStates: Record<string, PersonaPersuasionState> = {};
+registerSizeGauge('chatroom.memMessages', () => memMessages.length);
 
 function isKVAvailable(): boolean {
   return !!(process.env.KV_REST_API_URL && process.env.KV_REST_API_TOKEN);
 }
 
+type KVClient = Awaited<ReturnType<typeof loadKV>>['kv'];
+
+// KV round trips made by this instance, and lock hold times
+// (see getChatroomStoreStats)
+const storeStats = {
+  kvRoundTrips: 0,
+  lockHolds: 0,
+  lockHoldMsTotal: 0,
+  lockHoldMsMax: 0,
+  lockRoundTripsTotal: 0,
+  commits: 0,
+  commitMsTotal: 0,
+  commitMsMax: 0,
+  commitRoundTripsTotal: 0,
+};
+const RECENT_HOLDS = 100;
+let recentLockHoldsMs: number[] = [];
+const heldLocks = new Map<string, { acquiredAt: number; roundTrips: number }>();
+
+let countedKV: { client: KVClient; proxy: KVClient } | null = null;
+
+/**
+ * Wrap the KV client so every command (and every pipeline/multi exec)
+ * counts as one round trip
+ */
+function countRoundTrips(client: KVClient): KVClient {
+  if (countedKV?.client === client) return countedKV.proxy;
+  const proxy = new Proxy(client, {
+    get(target, prop, receiver) {
+      const value = Reflect.get(target, prop, receiver);
+      if (typeof value !== 'function') return value;
+      if (prop === 'multi' || prop === 'pipeline') {
+        return (...args: unknown[]) => {
+          const batch = value.apply(target, args);
+          const exec = batch.exec.bind(batch);
+          batch.exec = (...execArgs: unknown[]) => {
+            storeStats.kvRoundTrips++;
+            return exec(...execArgs);
+          };
+          return batch;
+        };
+      }
+      return (...args: unknown[]) => {
+        storeStats.kvRoundTrips++;
+        return value.apply(target, args);
+      };
+    },
+  });
+  countedKV = { client, proxy };
+  return proxy;
+}
+
+async function getKV() {
+  return countRoundTrips((await loadKV()).kv);
+}
+
 function defaultState(): ChatRoomState {
   return {
     phase: 'DEBATE',
@@ -53,7 +112,7 @@ function defaultState(): ChatRoomState {
 export async function getMessages(): Promise<ChatMessage[]> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       const messages = await kv.get<ChatMessage[]>(KEYS.messages);
       return messages || [];
     } catch (error) {
@@ -63,17 +122,18 @@ export async function getMessages(): Promise<ChatMessage[]> {
   return memMessages;
 }
 
+/** Keep only the last MAX_MESSAGES */
+function trimMessages(messages: ChatMessage[]): ChatMessage[] {
+  return messages.length > MAX_MESSAGES ? messages.slice(messages.length - MAX_MESSAGES) : messages;
+}
+
 export async function appendMessage(message: ChatMessage): Promise<void> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       const messages = (await kv.get<ChatMessage[]>(KEYS.messages)) || [];
       messages.push(message);
-      // Keep only the last MAX_MESSAGES
-      const trimmed = messages.length > MAX_MESSAGES
-        ? messages.slice(messages.length - MAX_MESSAGES)
-        : messages;
-      await kv.set(KEYS.messages, trimmed);
+      await kv.set(KEYS.messages, trimMessages(messages));
       await kv.incr(KEYS.msgIndex);
       return;
     } catch (error) {
@@ -81,16 +141,14 @@ export async function appendMessage(message: ChatMessage): Promise<void> {
     }
   }
   memMessages.push(message);
-  if (memMessages.length > MAX_MESSAGES) {
-    memMessages = memMessages.slice(memMessages.length - MAX_MESSAGES);
-  }
+  memMessages = trimMessages(memMessages);
   memMsgIndex++;
 }
 
 export async function getState(): Promise<ChatRoomState> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       const state = await kv.get<ChatRoomState>(KEYS.state);
       return state || defaultState();
     } catch (error) {
@@ -103,7 +161,7 @@ export async function getState(): Promise<ChatRoomState> {
 export async function setState(state: ChatRoomState): Promise<void> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       await kv.set(KEYS.state, state);
       return;
     } catch (error) {
@@ -116,9 +174,10 @@ export async function setState(state: ChatRoomState): Promise<void> {
 export async function acquireLock(holderId: string): Promise<boolean> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       // SET NX EX — only sets if key doesn't exist, with TTL
       const result = await kv.set(KEYS.lock, holderId, { nx: true, ex: LOCK_TTL_SECONDS });
+      if (result === 'OK') recordLockAcquired(holderId);
       return result === 'OK';
     } catch (error) {
       console.error('[chatroom-kv] Error acquiring lock:', error);
@@ -131,18 +190,20 @@ export async function acquireLock(holderId: string): Promise<boolean> {
     return false; // Lock held by someone else
   }
   memLock = { holder: holderId, expiresAt: now + LOCK_TTL_SECONDS * 1000 };
+  recordLockAcquired(holderId);
   return true;
 }
 
 export async function releaseLock(holderId: string): Promise<void> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       // Only release if we hold it
       const current = await kv.get<string>(KEYS.lock);
       if (current === holderId) {
         await kv.del(KEYS.lock);
       }
+      recordLockReleased(holderId);
       return;
     } catch (error) {
       console.error('[chatroom-kv] Error releasing lock:', error);
@@ -151,12 +212,31 @@ export async function releaseLock(holderId: string): Promise<void> {
   if (memLock && memLock.holder === holderId) {
     memLock = null;
   }
+  recordLockReleased(holderId);
+}
+
+function recordLockAcquired(holderId: string): void {
+  heldLocks.set(holderId, { acquiredAt: Date.now(), roundTrips: storeStats.kvRoundTrips });
+}
+
+function recordLockReleased(holderId: string): void {
+  const held = heldLocks.get(holderId);
+  if (!held) return;
+  heldLocks.delete(holderId);
+  const holdMs = Date.now() - held.acquiredAt;
+  storeStats.lockHolds++;
+  storeStats.lockHoldMsTotal += holdMs;
+  storeStats.lockHoldMsMax = Math.max(storeStats.lockHoldMsMax, holdMs);
+  // Includes other KV calls this instance made during the hold
+  storeStats.lockRoundTripsTotal += storeStats.kvRoundTrips - held.roundTrips;
+  recentLockHoldsMs.push(holdMs);
+  if (recentLockHoldsMs.length > RECENT_HOLDS) recentLockHoldsMs.shift();
 }
 
 export async function getMessageIndex(): Promise<number> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       const index = await kv.get<number>(KEYS.msgIndex);
       return index || 0;
     } catch (error) {
@@ -179,7 +259,7 @@ export async function initializeIfEmpty(): Promise<void> {
 export async function getPersuasionStates(): Promise<Record<string, PersonaPersuasionState>> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       const states = await kv.get<Record<string, PersonaPersuasionState>>(KEYS.persuasion);
       return states || {};
     } catch (error) {
@@ -195,7 +275,7 @@ export async function getPersuasionStates(): Promise<Record<string, PersonaPersu
 export async function setPersuasionStates(states: Record<string, PersonaPersuasionState>): Promise<void> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       await kv.set(KEYS.persuasion, states, { ex: PERSUASION_TTL_SECONDS });
       return;
     } catch (error) {
@@ -211,7 +291,7 @@ export async function setPersuasionStates(states: Record<string, PersonaPersuasi
 export async function getMarketDataCache(): Promise<any> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       return await kv.get(KEYS.marketData);
     } catch (error) {
       console.error('[chatroom-kv] Error fetching market data:', error);
@@ -226,7 +306,7 @@ export async function getMarketDataCache(): Promise<any> {
 export async function setMarketDataCache(data: any): Promise<void> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       // Cache market data for 60 seconds
       await kv.set(KEYS.marketData, data, { ex: 60 });
       return;
@@ -239,6 +319,16 @@ export async function setMarketDataCache(data: any): Promise<void> {
 // In-memory fallback for debate summaries
 let memDebateSummary: DebateSummary | null = null;
 let memDebateHistory: DebateSummary[] = [];
+// Bumped whenever this instance saves or clears a summary, so prompt
+// caches keyed on it notice the change without re-reading KV
+let debateSummaryVersion = 0;
+
+/**
+ * Local version of the debate summary (changes on save/clear)
+ */
+export function getDebateSummaryVersion(): number {
+  return debateSummaryVersion;
+}
 
 /**
  * CVAULT-190: Get the latest debate summary for consensus context
@@ -246,7 +336,7 @@ let memDebateHistory: DebateSummary[] = [];
 export async function getDebateSummary(): Promise<DebateSummary | null> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       const summary = await kv.get<DebateSummary>(KEYS.debateSummary);
       return summary;
     } catch (error) {
@@ -262,9 +352,10 @@ export async function getDebateSummary(): Promise<DebateSummary | null> {
 export async function saveDebateSummary(summary: DebateSummary): Promise<void> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       // Save as current summary
       await kv.set(KEYS.debateSummary, summary, { ex: DEBATE_SUMMARY_TTL_SECONDS });
+      debateSummaryVersion++;
       
       // Also append to history
       const history = await kv.get<DebateSummary[]>(KEYS.debateHistory) || [];
@@ -282,6 +373,7 @@ export async function saveDebateSummary(summary: DebateSummary): Promise<void> {
     }
   }
   memDebateSummary = summary;
+  debateSummaryVersion++;
   memDebateHistory.push(summary);
   if (memDebateHistory.length > MAX_DEBATE_HISTORY) {
     memDebateHistory.shift();
@@ -295,7 +387,7 @@ export async function saveDebateSummary(summary: DebateSummary): Promise<void> {
 export async function getDebateHistory(): Promise<DebateSummary[]> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       const history = await kv.get<DebateSummary[]>(KEYS.debateHistory);
       return history || [];
     } catch (error) {
@@ -311,8 +403,9 @@ export async function getDebateHistory(): Promise<DebateSummary[]> {
 export async function clearDebateSummary(): Promise<void> {
   if (isKVAvailable()) {
     try {
-      // Using kv from @vercel/kv import
+      const kv = await getKV();
       await kv.del(KEYS.debateSummary);
+      debateSummaryVersion++;
       console.log('[CVAULT-190] Debate summary cleared for new round');
       return;
     } catch (error) {
@@ -320,6 +413,7 @@ export async function clearDebateSummary(): Promise<void> {
     }
   }
   memDebateSummary = null;
+  debateSummaryVersion++;
   console.log('[CVAULT-190] Debate summary cleared (memory) for new round');
 }
 
@@ -458,6 +552,7 @@ function getPrimaryStance(sentiments: MessageSentiment[]): MessageSentiment {
 export async function saveConsensusSnapshot(snapshot: ConsensusSnapshot): Promise<void> {
   if (isKVAvailable()) {
     try {
+      const kv = await getKV();
       const snapshots = await kv.get<ConsensusSnapshot[]>(KEYS.consensusSnapshots) || [];
       snapshots.push(snapshot);
       
@@ -487,6 +582,7 @@ export async function saveConsensusSnapshot(snapshot: ConsensusSnapshot): Promis
 export async function getConsensusSnapshots(): Promise<ConsensusSnapshot[]> {
   if (isKVAvailable()) {
     try {
+      const kv = await getKV();
       const snapshots = await kv.get<ConsensusSnapshot[]>(KEYS.consensusSnapshots);
       return snapshots || [];
     } catch (error) {
@@ -498,7 +594,8 @@ export async function getConsensusSnapshots(): Promise<ConsensusSnapshot[]> {
 
 /**
  * CVAULT-217: Clean up old messages from rolling history (lazy evaluation)
- * Messages older than 1 hour are removed, but consensus snapshots are preserved
+ * Messages older than 1 hour are removed, but consensus snapshots are preserved.
+ * Messages are stored in timestamp order, so expiry trims the head of the list.
  */
 export async function cleanupRollingHistory(): Promise<{ removed: number; remaining: number }> {
   const now = Date.now();
@@ -506,79 +603,67 @@ export async function cleanupRollingHistory(): Promise<{ removed: number; remain
   
   if (isKVAvailable()) {
     try {
+      const kv = await getKV();
       // Check if we need to run cleanup (throttle to avoid excessive operations)
       const lastCleanup = await kv.get<number>(KEYS.lastCleanup) || 0;
+      const messages = await kv.get<ChatMessage[]>(KEYS.messages) || [];
       if (now - lastCleanup < ROLLING_HISTORY_CONFIG.CLEANUP_INTERVAL_MS) {
         // Cleanup ran recently, skip
-        const messages = await kv.get<ChatMessage[]>(KEYS.messages) || [];
         return { removed: 0, remaining: messages.length };
       }
       
-      const messages = await kv.get<ChatMessage[]>(KEYS.messages) || [];
-      const originalCount = messages.length;
-      
-      // Filter out messages older than 1 hour
-      const filteredMessages = messages.filter(msg => msg.timestamp >= cutoffTime);
-      const removed = originalCount - filteredMessages.length;
+      const start = findWindowStart(messages, cutoffTime);
+      const remaining = messages.length - start;
       
-      if (removed > 0) {
+      if (start > 0) {
         // Create snapshot of aged-out messages before removing them
-        const agedOutMessages = messages.filter(msg => msg.timestamp < cutoffTime);
-        if (agedOutMessages.length > 0) {
-          const state = await getState();
-          const snapshot = await createConsensusSnapshot(agedOutMessages, state, 'time_window_rollover');
-          await saveConsensusSnapshot(snapshot);
-        }
+        const state = await getState();
+        const snapshot = await createConsensusSnapshot(messages.slice(0, start), state, 'time_window_rollover');
+        await saveConsensusSnapshot(snapshot);
         
-        await kv.set(KEYS.messages, filteredMessages);
+        await kv.set(KEYS.messages, messages.slice(start));
         await kv.set(KEYS.lastCleanup, now);
-        console.log(`[CVAULT-217] Rolling history cleanup: removed ${removed} old messages, ${filteredMessages.length} remaining`);
+        console.log(`[CVAULT-217] Rolling history cleanup: removed ${start} old messages, ${remaining} remaining`);
       } else {
         // Still update last cleanup time even if nothing was removed
         await kv.set(KEYS.lastCleanup, now);
       }
       
-      return { removed, remaining: filteredMessages.length };
+      return { removed: start, remaining };
     } catch (error) {
       console.error('[chatroom-kv] Error cleaning up rolling history:', error);
     }
   }
   
   // In-memory cleanup
-  const originalCount = memMessages.length;
+  const agedOutMessages = trimExpiredHead(memMessages, cutoffTime);
   
-  // Create snapshot of aged-out messages before removing them
-  const agedOutMessages = memMessages.filter(msg => msg.timestamp < cutoffTime);
   if (agedOutMessages.length > 0) {
+    // Create snapshot of aged-out messages
     const state = await getState();
     const snapshot = await createConsensusSnapshot(agedOutMessages, state, 'time_window_rollover');
     await saveConsensusSnapshot(snapshot);
+    console.log(`[CVAULT-217] Rolling history cleanup (memory): removed ${agedOutMessages.length} old messages, ${memMessages.length} remaining`);
   }
   
-  memMessages = memMessages.filter(msg => msg.timestamp >= cutoffTime);
-  const removed = originalCount - memMessages.length;
-  
-  if (removed > 0) {
-    console.log(`[CVAULT-217] Rolling history cleanup (memory): removed ${removed} old messages, ${memMessages.length} remaining`);
-  }
-  
-  return { removed, remaining: memMessages.length };
+  return { removed: agedOutMessages.length, remaining: memMessages.length };
 }
 
 /**
  * CVAULT-217: Get messages within the rolling window (last 1 hour)
- * Automatically triggers cleanup if needed
+ * Triggers cleanup only when the stored list has an expired head
  */
 export async function getRollingHistory(): Promise<ChatMessage[]> {
-  // Trigger lazy cleanup
-  await cleanupRollingHistory();
-  
   const messages = await getMessages();
-  const now = Date.now();
-  const cutoffTime = now - ROLLING_HISTORY_CONFIG.MAX_MESSAGE_AGE_MS;
+  const cutoffTime = Date.now() - ROLLING_HISTORY_CONFIG.MAX_MESSAGE_AGE_MS;
+  const window = rollingWindow(messages, cutoffTime);
   
-  // Double-check filtering (in case cleanup didn't run or failed)
-  return messages.filter(msg => msg.timestamp >= cutoffTime);
+  if (window !== messages) {
+    // Trigger lazy cleanup
+    await cleanupRollingHistory();
+  }
+  
+  return window;
 }
 
 /**
@@ -590,9 +675,7 @@ export async function getHistoryWithSnapshots(): Promise<{
   snapshots: ConsensusSnapshot[];
   currentState: ChatRoomState;
 }> {
-  // Run cleanup first to ensure fresh data
-  await cleanupRollingHistory();
-  
+  // Runs cleanup first if anything has expired
   const recentMessages = await getRollingHistory();
   const snapshots = await getConsensusSnapshots();
   const currentState = await getState();
@@ -615,7 +698,7 @@ export async function getRollingHistoryStatus(): Promise<{
   snapshotCount: number;
 }> {
   const allMessages = await getMessages();
-  const rollingMessages = await getRollingHistory();
+  const rollingMessages = rollingWindow(allMessages, Date.now() - ROLLING_HISTORY_CONFIG.MAX_MESSAGE_AGE_MS);
   const snapshots = await getConsensusSnapshots();
   
   const now = Date.now();
@@ -630,3 +713,260 @@ export async function getRollingHistoryStatus(): Promise<{
     snapshotCount: snapshots.length,
   };
 }
+
+// ============================================================================
+// Write-behind chatroom turns
+// ============================================================================
+
+/**
+ * A generation turn used to write its message, state, persuasion states and
+ * (on consensus) debate summary and snapshot as separate awaited KV round
+ * trips while holding the generation lock. A ChatroomTurn stages those
+ * mutations and commit() writes them in one MULTI (plus at most one MGET
+ * for the lists it appends to). Reads through the turn see its staged
+ * writes.
+ *
+ * With CHATROOM_WRITE_BEHIND=false every call writes through immediately,
+ * as before (for comparing lock hold times and round trips).
+ */
+export const CHATROOM_STORE_CONFIG = {
+  WRITE_BEHIND: process.env.CHATROOM_WRITE_BEHIND !== 'false',
+};
+
+export class ChatroomTurn {
+  private baseMessages: ChatMessage[] | null = null;
+  private baseIndex: number | null = null;
+  private baseDebateHistory: DebateSummary[] | null = null;
+  private appended: ChatMessage[] = [];
+  private state: ChatRoomState | null = null;
+  private persuasion: Record<string, PersonaPersuasionState> | null = null;
+  // undefined: untouched; null: cleared
+  private debateSummary: DebateSummary | null | undefined = undefined;
+  private summaries: DebateSummary[] = [];
+  private snapshots: ConsensusSnapshot[] = [];
+  private committedIndex: number | null = null;
+
+  constructor(readonly writeBehind: boolean = CHATROOM_STORE_CONFIG.WRITE_BEHIND) {}
+
+  async appendMessage(message: ChatMessage): Promise<void> {
+    if (!this.writeBehind) return appendMessage(message);
+    this.appended.push(message);
+  }
+
+  async setState(state: ChatRoomState): Promise<void> {
+    if (!this.writeBehind) return setState(state);
+    this.state = state;
+  }
+
+  async setPersuasionStates(states: Record<string, PersonaPersuasionState>): Promise<void> {
+    if (!this.writeBehind) return setPersuasionStates(states);
+    this.persuasion = states;
+  }
+
+  async saveDebateSummary(summary: DebateSummary): Promise<void> {
+    if (!this.writeBehind) return saveDebateSummary(summary);
+    this.debateSummary = summary;
+    this.summaries.push(summary);
+  }
+
+  async clearDebateSummary(): Promise<void> {
+    if (!this.writeBehind) return clearDebateSummary();
+    this.debateSummary = null;
+  }
+
+  async saveConsensusSnapshot(snapshot: ConsensusSnapshot): Promise<void> {
+    if (!this.writeBehind) return saveConsensusSnapshot(snapshot);
+    this.snapshots.push(snapshot);
+  }
+
+  async getMessages(): Promise<ChatMessage[]> {
+    if (!this.writeBehind) return getMessages();
+    this.baseMessages ??= await getMessages();
+    return this.appended.length > 0
+      ? trimMessages([...this.baseMessages, ...this.appended])
+      : this.baseMessages;
+  }
+
+  async getMessageIndex(): Promise<number> {
+    if (!this.writeBehind) return getMessageIndex();
+    if (this.committedIndex !== null) return this.committedIndex;
+    this.baseIndex ??= await getMessageIndex();
+    return this.baseIndex + this.appended.length;
+  }
+
+  async getState(): Promise<ChatRoomState> {
+    if (!this.writeBehind) return getState();
+    return this.state ?? getState();
+  }
+
+  async getDebateHistory(): Promise<DebateSummary[]> {
+    if (!this.writeBehind) return getDebateHistory();
+    this.baseDebateHistory ??= await getDebateHistory();
+    return [...this.baseDebateHistory, ...this.summaries].slice(-MAX_DEBATE_HISTORY);
+  }
+
+  /**
+   * Write the staged mutations (no-op when writing through)
+   */
+  async commit(): Promise<void> {
+    if (!this.writeBehind) return;
+    const started = Date.now();
+    const roundTrips = storeStats.kvRoundTrips;
+
+    if (isKVAvailable()) {
+      try {
+        await this.commitToKV();
+        this.finishCommit(started, roundTrips);
+        return;
+      } catch (error) {
+        console.error('[chatroom-kv] Error committing chatroom turn:', error);
+      }
+    }
+    this.commitToMemory();
+    this.finishCommit(started, roundTrips);
+  }
+
+  private async commitToKV(): Promise<void> {
+    const kv = await getKV();
+
+    // Lists this turn appends to and has not read yet: one MGET
+    const needMessages = this.appended.length > 0 && !this.baseMessages;
+    const needHistory = this.summaries.length > 0 && !this.baseDebateHistory;
+    const needSnapshots = this.snapshots.length > 0;
+    let storedSnapshots: ConsensusSnapshot[] = [];
+    if (needMessages || needHistory || needSnapshots) {
+      const [messages, history, snapshots] = await kv.mget<[
+        ChatMessage[] | null,
+        DebateSummary[] | null,
+        ConsensusSnapshot[] | null,
+      ]>(KEYS.messages, KEYS.debateHistory, KEYS.consensusSnapshots);
+      if (needMessages) this.baseMessages = messages || [];
+      if (needHistory) this.baseDebateHistory = history || [];
+      storedSnapshots = snapshots || [];
+    }
+
+    const tx = kv.multi();
+    if (this.persuasion) tx.set(KEYS.persuasion, this.persuasion, { ex: PERSUASION_TTL_SECONDS });
+    if (this.appended.length > 0) {
+      tx.set(KEYS.messages, trimMessages([...this.baseMessages!, ...this.appended]));
+      tx.incrby(KEYS.msgIndex, this.appended.length);
+    }
+    if (this.state) tx.set(KEYS.state, this.state);
+    if (this.debateSummary) {
+      tx.set(KEYS.debateSummary, this.debateSummary, { ex: DEBATE_SUMMARY_TTL_SECONDS });
+    } else if (this.debateSummary === null) {
+      tx.del(KEYS.debateSummary);
+    }
+    if (this.summaries.length > 0) {
+      const history = [...this.baseDebateHistory!, ...this.summaries].slice(-MAX_DEBATE_HISTORY);
+      tx.set(KEYS.debateHistory, history, { ex: DEBATE_SUMMARY_TTL_SECONDS });
+    }
+    if (needSnapshots) {
+      // No TTL - these persist indefinitely
+      tx.set(KEYS.consensusSnapshots, [...storedSnapshots, ...this.snapshots].slice(-MAX_CONSENSUS_SNAPSHOTS));
+    }
+
+    const results = await tx.exec();
+    if (this.appended.length > 0) {
+      // Result of the INCRBY (after the persuasion and messages writes)
+      this.committedIndex = Number(results[this.persuasion ? 2 : 1]);
+    }
+  }
+
+  private commitToMemory(): void {
+    if (this.persuasion) memPersuasionStates = this.persuasion;
+    if (this.appended.length > 0) {
+      memMessages = trimMessages([...memMessages, ...this.appended]);
+      memMsgIndex += this.appended.length;
+      this.committedIndex = memMsgIndex;
+    }
+    if (this.state) memState = this.state;
+    if (this.debateSummary !== undefined) memDebateSummary = this.debateSummary;
+    if (this.summaries.length > 0) {
+      memDebateHistory = [...memDebateHistory, ...this.summaries].slice(-MAX_DEBATE_HISTORY);
+    }
+    if (this.snapshots.length > 0) {
+      memConsensusSnapshots = [...memConsensusSnapshots, ...this.snapshots].slice(-MAX_CONSENSUS_SNAPSHOTS);
+    }
+  }
+
+  private finishCommit(started: number, roundTrips: number): void {
+    if (this.debateSummary !== undefined) debateSummaryVersion++;
+    for (const summary of this.summaries) {
+      console.log(`[CVAULT-190] Debate summary saved: Round ${summary.roundNumber}, ${summary.consensusDirection} @ ${summary.consensusStrength}%`);
+    }
+    for (const snapshot of this.snapshots) {
+      console.log(`[CVAULT-217] Consensus snapshot saved: ${snapshot.consensusDirection} @ ${snapshot.consensusStrength}% (${snapshot.id})`);
+    }
+
+    const commitMs = Date.now() - started;
+    storeStats.commits++;
+    storeStats.commitMsTotal += commitMs;
+    storeStats.commitMsMax = Math.max(storeStats.commitMsMax, commitMs);
+    storeStats.commitRoundTripsTotal += storeStats.kvRoundTrips - roundTrips;
+
+    // Staged writes are now in the store; later reads go to it
+    this.baseMessages = null;
+    this.baseDebateHistory = null;
+    this.appended = [];
+    this.state = null;
+    this.persuasion = null;
+    this.debateSummary = undefined;
+    this.summaries = [];
+    this.snapshots = [];
+  }
+}
+
+/**
+ * Start a generation turn (write-behind unless CHATROOM_WRITE_BEHIND=false)
+ */
+export function beginChatroomTurn(): ChatroomTurn {
+  return new ChatroomTurn();
+}
+
+const round = (value: number) => Math.round(value * 10) / 10;
+
+/**
+ * Generation lock hold times and KV round trips on this instance
+ */
+export function getChatroomStoreStats() {
+  const holds = storeStats.lockHolds;
+  const sorted = [...recentLockHoldsMs].sort((a, b) => a - b);
+  return {
+    writeBehind: CHATROOM_STORE_CONFIG.WRITE_BEHIND,
+    backend: isKVAvailable() ? 'kv' : 'memory',
+    kvRoundTrips: storeStats.kvRoundTrips,
+    lock: {
+      holds,
+      avgHoldMs: holds > 0 ? round(storeStats.lockHoldMsTotal / holds) : 0,
+      p95HoldMs: sorted.length > 0 ? sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * 0.95))] : 0,
+      maxHoldMs: storeStats.lockHoldMsMax,
+      avgRoundTripsPerHold: holds > 0 ? round(storeStats.lockRoundTripsTotal / holds) : 0,
+    },
+    commits: {
+      count: storeStats.commits,
+      avgMs: storeStats.commits > 0 ? round(storeStats.commitMsTotal / storeStats.commits) : 0,
+      maxMs: storeStats.commitMsMax,
+      avgRoundTrips: storeStats.commits > 0 ? round(storeStats.commitRoundTripsTotal / storeStats.commits) : 0,
+    },
+  };
+}
+
+/**
+ * Reset the in-memory store and stats (for testing)
+ */
+export function resetChatroomStore(): void {
+  memMessages = [];
+  memState = null;
+  memLock = null;
+  memMsgIndex = 0;
+  memPersuasionStates = {};
+  memDebateSummary = null;
+  memDebateHistory = [];
+  memConsensusSnapshots = [];
+  heldLocks.clear();
+  recentLockHoldsMs = [];
+  for (const key of Object.keys(storeStats) as (keyof typeof storeStats)[]) {
+    storeStats[key] = 0;
+  }
+}
@@ -5,6 +5,7 @@
  */
 
 import { withEdgeCache, CACHE_TTL, CACHE_TAGS } from '@/lib/cache';
+import { TieredCache } from '@/lib/tiered-cache';
 
 const COINGECKO_API = 'https://api.coingecko.com/api/v3';
 
@@ -24,13 +25,9 @@ const ASSET_ID_MAP: Record<string, string> = {
   'SOL/USD': 'solana',
 };
 
-// In-memory cache for fallback
-interface CacheEntry {
-  data: MarketData;
-  timestamp: number;
-}
-const memoryCache = new Map<string, CacheEntry>();
+// In-process + shared KV cache (tiered-cache.ts); its last value is the fallback
 const MEMORY_CACHE_TTL = 60000; // 1 minute
+const marketDataCache = new TieredCache<MarketData>('market-data', { ttlMs: MEMORY_CACHE_TTL });
 
 export interface MarketData {
   price: number;
@@ -52,6 +49,8 @@ export interface MarketData {
   // Additional metrics for richer arguments
   volatility24h?: number;
   volumeToMarketCapRatio?: number;
+  /** CoinGecko failed: an older cached value or the built-in fallback */
+  stale?: boolean;
 }
 
 export interface MarketMetrics {
@@ -61,6 +60,53 @@ export interface MarketMetrics {
   marketCapTier: 'large' | 'mid' | 'small';
 }
 
+/**
+ * Fetch and derive market data for a CoinGecko coin
+ */
+async function fetchCoinMarketData(coinId: string): Promise<MarketData> {
+  const response = await fetch(
+    `${COINGECKO_API}/coins/${coinId}?localization=false&tickers=false&market_data=true&community_data=false&developer_data=false&sparkline=false`,
+    {
+      headers: { 'Accept': 'application/json' },
+      next: { revalidate: 60 }, // Next.js revalidation
+    }
+  );
+
+  if (!response.ok) {
+    throw new Error(`CoinGecko API error: ${response.status}`);
+  }
+
+  const data = await response.json();
+  const md = data.market_data;
+
+  const marketData: MarketData = {
+    price: safeNum(md.current_price?.usd),
+    priceChange24h: safeNum(md.price_change_24h_in_currency?.usd),
+    priceChangePercentage24h: safeNum(md.price_change_percentage_24h),
+    volume24h: safeNum(md.total_volume?.usd),
+    volumeChange24h: calculateVolumeChange(md),
+    marketCap: safeNum(md.market_cap?.usd),
+    high24h: safeNum(md.high_24h?.usd),
+    low24h: safeNum(md.low_24h?.usd),
+    ath: safeNum(md.ath?.usd),
+    athChangePercentage: safeNum(md.ath_change_percentage?.usd),
+    atl: safeNum(md.atl?.usd),
+    atlChangePercentage: safeNum(md.atl_change_percentage?.usd),
+    circulatingSupply: safeNum(md.circulating_supply),
+    totalSupply: md.total_supply != null ? safeNum(md.total_supply) : null,
+    maxSupply: md.max_supply != null ? safeNum(md.max_supply) : null,
+    lastUpdated: md.last_updated || new Date().toISOString(),
+  };
+
+  // Calculate derived metrics
+  marketData.volatility24h = calculateVolatility(marketData);
+  marketData.volumeToMarketCapRatio = marketData.marketCap > 0
+    ? marketData.volume24h / marketData.marketCap
+    : 0;
+
+  return marketData;
+}
+
 /**
  * Fetch comprehensive market data for an asset
  */
@@ -68,54 +114,15 @@ async function fetchMarketDataRaw(asset: string): Promise<MarketData> {
   const coinId = ASSET_ID_MAP[asset] || ASSET_ID_MAP['BTC'];
 
   try {
-    const response = await fetch(
-      `${COINGECKO_API}/coins/${coinId}?localization=false&tickers=false&market_data=true&community_data=false&developer_data=false&sparkline=false`,
-      {
-        headers: { 'Accept': 'application/json' },
-        next: { revalidate: 60 }, // Next.js revalidation
-      }
-    );
-
-    if (!response.ok) {
-      throw new Error(`CoinGecko API error: ${response.status}`);
-    }
-
-    const data = await response.json();
-    const md = data.market_data;
-
-    const marketData: MarketData = {
-      price: safeNum(md.current_price?.usd),
-      priceChange24h: safeNum(md.price_change_24h_in_currency?.usd),
-      priceChangePercentage24h: safeNum(md.price_change_percentage_24h),
-      volume24h: safeNum(md.total_volume?.usd),
-      volumeChange24h: calculateVolumeChange(md),
-      marketCap: safeNum(md.market_cap?.usd),
-      high24h: safeNum(md.high_24h?.usd),
-      low24h: safeNum(md.low_24h?.usd),
-      ath: safeNum(md.ath?.usd),
-      athChangePercentage: safeNum(md.ath_change_percentage?.usd),
-      atl: safeNum(md.atl?.usd),
-      atlChangePercentage: safeNum(md.atl_change_percentage?.usd),
-      circulatingSupply: safeNum(md.circulating_supply),
-      totalSupply: md.total_supply != null ? safeNum(md.total_supply) : null,
-      maxSupply: md.max_supply != null ? safeNum(md.max_supply) : null,
-      lastUpdated: md.last_updated || new Date().toISOString(),
-    };
-
-    // Calculate derived metrics
-    marketData.volatility24h = calculateVolatility(marketData);
-    marketData.volumeToMarketCapRatio = marketData.marketCap > 0
-      ? marketData.volume24h / marketData.marketCap
-      : 0;
-
-    return marketData;
+    const { value } = await marketDataCache.getOrCompute(coinId, () => fetchCoinMarketData(coinId));
+    return value;
   } catch (error) {
     console.error('[market-data] Error fetching data:', error);
     // Return cached data if available
-    const cached = memoryCache.get(coinId);
+    const cached = marketDataCache.peekStale(coinId);
     if (cached) {
       console.warn('[market-data] Using stale cached data');
-      return cached.data;
+      return { ...cached, stale: true };
     }
     // Return fallback data
     return getFallbackMarketData();
@@ -314,9 +321,17 @@ function getFallbackMarketData(): MarketData {
     lastUpdated: new Date().toISOString(),
     volatility24h: 4.5,
     volumeToMarketCapRatio: 0.028,
+    stale: true,
   };
 }
 
+/**
+ * Whether market data is available for an asset (unknown assets fall back to BTC)
+ */
+export function isSupportedMarketAsset(asset: string): boolean {
+  return asset.toUpperCase() in ASSET_ID_MAP;
+}
+
 /**
  * Fetch multiple assets at once (batch request)
  */
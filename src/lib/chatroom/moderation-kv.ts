@@ -1,12 +1,38 @@
 // CVAULT-188: Server-side moderation storage using Vercel KV
 import { ModerationStore, MutedUser, BannedUser, ModerationAction } from './types';
 
+/**
+ * Moderation state is sharded per user so the post path never loads the
+ * whole store:
+ * - mute:<userId> / ban:<userId> hold one record each; timed mutes use a
+ *   native KV TTL, so they expire without a cleanup sweep
+ * - violations:<userId> is an INCR counter
+ * - muted / banned index sets back the admin listings
+ * - the action log is an append-only list trimmed to MAX_LOG_ENTRIES
+ *
+ * Users with no mute or ban are remembered in a small in-process negative
+ * cache, so repeat posters cost no KV read at all. An action executed on
+ * another instance reaches this one within NEGATIVE_CACHE_TTL_MS.
+ */
 const KEYS = {
-  moderation: 'chatroom:moderation_store',
-  userViolations: 'chatroom:user_violations',
+  mute: (userId: string) => `chatroom:mod:mute:${userId}`,
+  ban: (userId: string) => `chatroom:mod:ban:${userId}`,
+  violations: (userId: string) => `chatroom:mod:violations:${userId}`,
+  mutedIndex: 'chatroom:mod:muted',
+  bannedIndex: 'chatroom:mod:banned',
+  log: 'chatroom:mod:log',
+  // Pre-sharding single-blob keys, migrated on first use
+  legacyModeration: 'chatroom:moderation_store',
+  legacyUserViolations: 'chatroom:user_violations',
   moderationQueue: 'chatroom:moderation_queue', // Flagged messages pending review
 };
 
+export const MODERATION_STORE_CONFIG = {
+  MAX_LOG_ENTRIES: 500,
+  NEGATIVE_CACHE_TTL_MS: 30 * 1000,
+  NEGATIVE_CACHE_MAX_USERS: 10_000,
+};
+
 const AUTO_MUTE_THRESHOLD = 3; // Mute after 3 flagged messages
 const AUTO_BAN_THRESHOLD = 5; // Ban after 5 flagged messages
 const AUTO_MUTE_DURATIONS = [
@@ -17,51 +43,165 @@ const AUTO_MUTE_DURATIONS = [
 ];
 
 // In-memory fallback
-let memModerationStore: ModerationStore = {
-  mutedUsers: {},
-  bannedUsers: {},
-  moderationLog: [],
+const memMutes = new Map<string, MutedUser>();
+const memBans = new Map<string, BannedUser>();
+const memUserViolations = new Map<string, number>();
+let memModerationLog: ModerationAction[] = [];
+
+// userId -> expiry of "has no mute or ban"
+const negativeCache = new Map<string, number>();
+let legacyMigration: Promise<void> | null = null;
+
+const moderationStats = {
+  checks: 0,
+  negativeCacheHits: 0,
+  kvReads: 0,
 };
-let memUserViolations: Record<string, number> = {};
 
 function isKVAvailable(): boolean {
   return !!(process.env.KV_REST_API_URL && process.env.KV_REST_API_TOKEN);
 }
 
+function isMuteActive(mute: MutedUser, now: number = Date.now()): boolean {
+  return mute.mutedUntil === null || mute.mutedUntil >= now;
+}
+
+function rememberClean(userId: string): void {
+  if (negativeCache.size >= MODERATION_STORE_CONFIG.NEGATIVE_CACHE_MAX_USERS) {
+    // Map iteration is insertion order: drop the oldest entry
+    const oldest = negativeCache.keys().next().value;
+    if (oldest !== undefined) negativeCache.delete(oldest);
+  }
+  negativeCache.set(userId, Date.now() + MODERATION_STORE_CONFIG.NEGATIVE_CACHE_TTL_MS);
+}
+
 /**
- * Get moderation store
+ * Move records from the old single-key store to per-user keys (once per process)
  */
-export async function getModerationStore(): Promise<ModerationStore> {
+async function migrateLegacyStore(): Promise<void> {
+  const { kv } = await import('@vercel/kv');
+  const [legacy, legacyViolations] = await Promise.all([
+    kv.get<ModerationStore>(KEYS.legacyModeration),
+    kv.get<Record<string, number>>(KEYS.legacyUserViolations),
+  ]);
+  if (!legacy && !legacyViolations) return;
+
+  const now = Date.now();
+  const writes: Promise<unknown>[] = [];
+  for (const mute of Object.values(legacy?.mutedUsers ?? {})) {
+    if (!isMuteActive(mute, now)) continue;
+    writes.push(writeMute(mute));
+  }
+  for (const ban of Object.values(legacy?.bannedUsers ?? {})) {
+    writes.push(kv.set(KEYS.ban(ban.userId), ban), kv.sadd(KEYS.bannedIndex, ban.userId));
+  }
+  for (const [userId, count] of Object.entries(legacyViolations ?? {})) {
+    writes.push(kv.set(KEYS.violations(userId), count));
+  }
+  if (legacy?.moderationLog?.length) {
+    writes.push(kv.rpush(KEYS.log, ...legacy.moderationLog));
+  }
+  await Promise.all(writes);
+  await kv.del(KEYS.legacyModeration, KEYS.legacyUserViolations);
+  console.log('[moderation-kv] Migrated legacy moderation store to per-user keys');
+}
+
+async function getKV() {
+  const { kv } = await import('@vercel/kv');
+  if (!legacyMigration) {
+    legacyMigration = migrateLegacyStore().catch(error => {
+      legacyMigration = null;
+      console.error('[moderation-kv] Error migrating legacy moderation store:', error);
+    });
+  }
+  await legacyMigration;
+  return kv;
+}
+
+async function writeMute(mute: MutedUser): Promise<void> {
+  const { kv } = await import('@vercel/kv');
+  if (mute.mutedUntil !== null) {
+    const ttlMs = Math.max(1, mute.mutedUntil - Date.now());
+    await kv.set(KEYS.mute(mute.userId), mute, { px: ttlMs });
+  } else {
+    await kv.set(KEYS.mute(mute.userId), mute);
+  }
+  await kv.sadd(KEYS.mutedIndex, mute.userId);
+}
+
+/**
+ * Mute and ban records for one user (one KV round trip)
+ */
+async function getUserRecords(userId: string): Promise<{ mute: MutedUser | null; ban: BannedUser | null }> {
   if (isKVAvailable()) {
     try {
-      const { kv } = await import('@vercel/kv');
-      const store = await kv.get<ModerationStore>(KEYS.moderation);
-      return store || {
-        mutedUsers: {},
-        bannedUsers: {},
-        moderationLog: [],
-      };
+      const kv = await getKV();
+      moderationStats.kvReads++;
+      const [mute, ban] = await kv.mget<[MutedUser | null, BannedUser | null]>(KEYS.mute(userId), KEYS.ban(userId));
+      return { mute, ban };
     } catch (error) {
-      console.error('[moderation-kv] Error fetching moderation store:', error);
+      console.error('[moderation-kv] Error fetching moderation records:', error);
     }
   }
-  return { ...memModerationStore };
+
+  const mute = memMutes.get(userId) ?? null;
+  if (mute && !isMuteActive(mute)) {
+    // Expired, same as a KV TTL running out
+    memMutes.delete(userId);
+    return { mute: null, ban: memBans.get(userId) ?? null };
+  }
+  return { mute, ban: memBans.get(userId) ?? null };
 }
 
 /**
- * Save moderation store
+ * Get moderation store (all muted and banned users plus the action log).
+ * For admin listings only; post-path checks use the per-user records.
  */
-export async function saveModerationStore(store: ModerationStore): Promise<void> {
+export async function getModerationStore(): Promise<ModerationStore> {
   if (isKVAvailable()) {
     try {
-      const { kv } = await import('@vercel/kv');
-      await kv.set(KEYS.moderation, store);
-      return;
+      const kv = await getKV();
+      const [mutedIds, bannedIds, moderationLog] = await Promise.all([
+        kv.smembers(KEYS.mutedIndex),
+        kv.smembers(KEYS.bannedIndex),
+        kv.lrange<ModerationAction>(KEYS.log, 0, -1),
+      ]);
+      const [mutes, bans] = await Promise.all([
+        mutedIds.length > 0 ? kv.mget<(MutedUser | null)[]>(...mutedIds.map(KEYS.mute)) : [],
+        bannedIds.length > 0 ? kv.mget<(BannedUser | null)[]>(...bannedIds.map(KEYS.ban)) : [],
+      ]);
+
+      const store: ModerationStore = { mutedUsers: {}, bannedUsers: {}, moderationLog };
+      const expiredIds: string[] = [];
+      mutedIds.forEach((userId, i) => {
+        const mute = mutes[i];
+        if (mute) store.mutedUsers[userId] = mute;
+        else expiredIds.push(userId);
+      });
+      bans.forEach(ban => {
+        if (ban) store.bannedUsers[ban.userId] = ban;
+      });
+      if (expiredIds.length > 0) {
+        // Timed mutes expired by TTL; drop them from the index too
+        await kv.srem(KEYS.mutedIndex, ...expiredIds);
+      }
+      return store;
     } catch (error) {
-      console.error('[moderation-kv] Error saving moderation store:', error);
+      console.error('[moderation-kv] Error fetching moderation store:', error);
     }
   }
-  memModerationStore = { ...store };
+
+  const now = Date.now();
+  const mutedUsers: Record<string, MutedUser> = {};
+  for (const [userId, mute] of memMutes) {
+    if (isMuteActive(mute, now)) mutedUsers[userId] = mute;
+    else memMutes.delete(userId);
+  }
+  return {
+    mutedUsers,
+    bannedUsers: Object.fromEntries(memBans),
+    moderationLog: [...memModerationLog],
+  };
 }
 
 /**
@@ -70,14 +210,13 @@ export async function saveModerationStore(store: ModerationStore): Promise<void>
 export async function getUserViolations(userId: string): Promise<number> {
   if (isKVAvailable()) {
     try {
-      const { kv } = await import('@vercel/kv');
-      const violations = await kv.get<Record<string, number>>(KEYS.userViolations);
-      return violations?.[userId] || 0;
+      const kv = await getKV();
+      return (await kv.get<number>(KEYS.violations(userId))) || 0;
     } catch (error) {
       console.error('[moderation-kv] Error fetching user violations:', error);
     }
   }
-  return memUserViolations[userId] || 0;
+  return memUserViolations.get(userId) || 0;
 }
 
 /**
@@ -86,17 +225,15 @@ export async function getUserViolations(userId: string): Promise<number> {
 export async function incrementUserViolations(userId: string): Promise<number> {
   if (isKVAvailable()) {
     try {
-      const { kv } = await import('@vercel/kv');
-      const violations = (await kv.get<Record<string, number>>(KEYS.userViolations)) || {};
-      violations[userId] = (violations[userId] || 0) + 1;
-      await kv.set(KEYS.userViolations, violations);
-      return violations[userId];
+      const kv = await getKV();
+      return await kv.incr(KEYS.violations(userId));
     } catch (error) {
       console.error('[moderation-kv] Error incrementing user violations:', error);
     }
   }
-  memUserViolations[userId] = (memUserViolations[userId] || 0) + 1;
-  return memUserViolations[userId];
+  const count = (memUserViolations.get(userId) || 0) + 1;
+  memUserViolations.set(userId, count);
+  return count;
 }
 
 /**
@@ -105,16 +242,14 @@ export async function incrementUserViolations(userId: string): Promise<number> {
 export async function resetUserViolations(userId: string): Promise<void> {
   if (isKVAvailable()) {
     try {
-      const { kv } = await import('@vercel/kv');
-      const violations = (await kv.get<Record<string, number>>(KEYS.userViolations)) || {};
-      delete violations[userId];
-      await kv.set(KEYS.userViolations, violations);
+      const kv = await getKV();
+      await kv.del(KEYS.violations(userId));
       return;
     } catch (error) {
       console.error('[moderation-kv] Error resetting user violations:', error);
     }
   }
-  delete memUserViolations[userId];
+  memUserViolations.delete(userId);
 }
 
 /**
@@ -166,52 +301,88 @@ export async function checkAutoModeration(
  * Execute a moderation action
  */
 export async function executeModerationAction(action: ModerationAction): Promise<void> {
-  const store = await getModerationStore();
-
-  switch (action.type) {
-    case 'mute':
-      store.mutedUsers[action.targetUserId] = {
-        userId: action.targetUserId,
-        handle: action.targetHandle,
-        mutedAt: action.timestamp,
-        mutedUntil: action.duration ? action.timestamp + action.duration : null,
-        reason: action.reason,
-        moderatorId: action.moderatorId,
-      };
-      break;
-
-    case 'unmute':
-      delete store.mutedUsers[action.targetUserId];
-      break;
-
-    case 'ban':
-      store.bannedUsers[action.targetUserId] = {
-        userId: action.targetUserId,
-        handle: action.targetHandle,
-        bannedAt: action.timestamp,
-        reason: action.reason,
-        moderatorId: action.moderatorId,
-      };
-      // Also remove from muted users if present
-      delete store.mutedUsers[action.targetUserId];
-      break;
-
-    case 'unban':
-      delete store.bannedUsers[action.targetUserId];
-      // Reset violation count when unbanning
-      await resetUserViolations(action.targetUserId);
-      break;
-  }
+  const userId = action.targetUserId;
+  negativeCache.delete(userId);
+
+  const mute: MutedUser = {
+    userId,
+    handle: action.targetHandle,
+    mutedAt: action.timestamp,
+    mutedUntil: action.duration ? action.timestamp + action.duration : null,
+    reason: action.reason,
+    moderatorId: action.moderatorId,
+  };
+  const ban: BannedUser = {
+    userId,
+    handle: action.targetHandle,
+    bannedAt: action.timestamp,
+    reason: action.reason,
+    moderatorId: action.moderatorId,
+  };
 
-  // Log the action
-  store.moderationLog.push(action);
+  let applied = false;
+  if (isKVAvailable()) {
+    try {
+      const kv = await getKV();
+      switch (action.type) {
+        case 'mute':
+          await writeMute(mute);
+          break;
+
+        case 'unmute':
+          await Promise.all([kv.del(KEYS.mute(userId)), kv.srem(KEYS.mutedIndex, userId)]);
+          break;
+
+        case 'ban':
+          // Also remove from muted users if present
+          await Promise.all([
+            kv.set(KEYS.ban(userId), ban),
+            kv.sadd(KEYS.bannedIndex, userId),
+            kv.del(KEYS.mute(userId)),
+            kv.srem(KEYS.mutedIndex, userId),
+          ]);
+          break;
+
+        case 'unban':
+          await Promise.all([kv.del(KEYS.ban(userId)), kv.srem(KEYS.bannedIndex, userId)]);
+          break;
+      }
+
+      // Log the action, keeping only the last MAX_LOG_ENTRIES
+      await kv.rpush(KEYS.log, action);
+      await kv.ltrim(KEYS.log, -MODERATION_STORE_CONFIG.MAX_LOG_ENTRIES, -1);
+      applied = true;
+    } catch (error) {
+      console.error('[moderation-kv] Error executing moderation action:', error);
+    }
+  }
 
-  // Keep only last 500 log entries
-  if (store.moderationLog.length > 500) {
-    store.moderationLog = store.moderationLog.slice(-500);
+  if (!applied) {
+    switch (action.type) {
+      case 'mute':
+        memMutes.set(userId, mute);
+        break;
+      case 'unmute':
+        memMutes.delete(userId);
+        break;
+      case 'ban':
+        memBans.set(userId, ban);
+        memMutes.delete(userId);
+        break;
+      case 'unban':
+        memBans.delete(userId);
+        break;
+    }
+    memModerationLog.push(action);
+    if (memModerationLog.length > MODERATION_STORE_CONFIG.MAX_LOG_ENTRIES) {
+      memModerationLog = memModerationLog.slice(-MODERATION_STORE_CONFIG.MAX_LOG_ENTRIES);
+    }
   }
 
-  await saveModerationStore(store);
+  if (action.type === 'unban') {
+    // Reset violation count when unbanning
+    await resetUserViolations(userId);
+  }
 
   console.log(
     `[moderation-kv] Executed ${action.type} on user ${action.targetHandle} by ${action.moderatorId}`
@@ -224,24 +395,10 @@ export async function executeModerationAction(action: ModerationAction): Promise
 export async function isUserMuted(
   userId: string
 ): Promise<{ muted: boolean; reason?: string; mutedUntil?: number | null }> {
-  const store = await getModerationStore();
-  const mute = store.mutedUsers[userId];
+  const { mute } = await getUserRecords(userId);
 
-  if (!mute) {
-    return { muted: false };
-  }
-
-  // Check if temporary mute has expired
-  if (mute.mutedUntil !== null && mute.mutedUntil < Date.now()) {
-    // Expired, auto-unmute
-    await executeModerationAction({
-      type: 'unmute',
-      targetUserId: userId,
-      targetHandle: mute.handle,
-      reason: 'Mute period expired',
-      moderatorId: 'system',
-      timestamp: Date.now(),
-    });
+  // Expired mutes are gone (KV TTL), but a record read just before expiry may still be returned
+  if (!mute || !isMuteActive(mute)) {
     return { muted: false };
   }
 
@@ -256,8 +413,7 @@ export async function isUserMuted(
  * Check if user is banned
  */
 export async function isUserBanned(userId: string): Promise<{ banned: boolean; reason?: string }> {
-  const store = await getModerationStore();
-  const ban = store.bannedUsers[userId];
+  const { ban } = await getUserRecords(userId);
 
   if (!ban) {
     return { banned: false };
@@ -270,52 +426,65 @@ export async function isUserBanned(userId: string): Promise<{ banned: boolean; r
 }
 
 /**
- * Check if user can post (not muted or banned)
+ * Check if user can post (not muted or banned).
+ * One KV read for both records, none for users recently seen with neither.
  */
 export async function canUserPost(
   userId: string
 ): Promise<{ allowed: boolean; reason?: string }> {
+  moderationStats.checks++;
+  const cachedUntil = negativeCache.get(userId);
+  if (cachedUntil !== undefined && cachedUntil > Date.now()) {
+    moderationStats.negativeCacheHits++;
+    return { allowed: true };
+  }
+
+  const { mute, ban } = await getUserRecords(userId);
+
   // Check banned first
-  const banStatus = await isUserBanned(userId);
-  if (banStatus.banned) {
+  if (ban) {
     return {
       allowed: false,
-      reason: `You are banned: ${banStatus.reason}`,
+      reason: `You are banned: ${ban.reason}`,
     };
   }
 
   // Check muted
-  const muteStatus = await isUserMuted(userId);
-  if (muteStatus.muted) {
-    const until = muteStatus.mutedUntil
-      ? new Date(muteStatus.mutedUntil).toLocaleString()
+  if (mute && isMuteActive(mute)) {
+    const until = mute.mutedUntil
+      ? new Date(mute.mutedUntil).toLocaleString()
       : 'permanently';
     return {
       allowed: false,
-      reason: `You are muted until ${until}: ${muteStatus.reason}`,
+      reason: `You are muted until ${until}: ${mute.reason}`,
     };
   }
 
+  rememberClean(userId);
   return { allowed: true };
 }
 
 /**
- * Clean up expired mutes
+ * Post-path moderation check counters
  */
-export async function cleanupExpiredMutes(): Promise<void> {
-  const store = await getModerationStore();
-  const now = Date.now();
-  let modified = false;
-
-  for (const [userId, mute] of Object.entries(store.mutedUsers)) {
-    if (mute.mutedUntil !== null && mute.mutedUntil < now) {
-      delete store.mutedUsers[userId];
-      modified = true;
-      console.log(`[moderation-kv] Auto-unmuted user ${mute.handle} (mute expired)`);
-    }
-  }
+export function getModerationStoreStats() {
+  return {
+    ...moderationStats,
+    negativeCacheSize: negativeCache.size,
+  };
+}
 
-  if (modified) {
-    await saveModerationStore(store);
-  }
+/**
+ * Clear in-memory moderation state and caches (for testing)
+ */
+export function resetModerationStoreState(): void {
+  memMutes.clear();
+  memBans.clear();
+  memUserViolations.clear();
+  memModerationLog = [];
+  negativeCache.clear();
+  legacyMigration = null;
+  moderationStats.checks = 0;
+  moderationStats.negativeCacheHits = 0;
+  moderationStats.kvReads = 0;
 }
@@ -0,0 +1,165 @@
+/**
+ * Persona Prompt Templates
+ *
+ * Most of a persona's turn prompt never changes: the personality text from
+ * personas.ts and the room rules for each phase. Those system prompts are
+ * compiled once per persona (at startup via compilePersonaPrompts(), or on
+ * first use) and reused verbatim every turn. Everything that changes per
+ * turn — anti-repetition list, market data, persuasion state, debate
+ * context, recent messages — goes in the user prompt.
+ *
+ * Keeping the system prompt byte-identical across turns lets providers with
+ * prefix caching (DeepSeek, Kimi, GLM, MiniMax) reuse it instead of billing
+ * and processing it again, and removes the per-turn string assembly.
+ */
+
+import { Persona } from './types';
+import { PERSONAS } from './personas';
+
+export type PromptPhase = 'debate' | 'cooldown' | 'consensus';
+
+export interface PromptPair {
+  systemPrompt: string;
+  userPrompt: string;
+}
+
+export interface PersonaPromptTemplates {
+  personaId: string;
+  /** personalityPrompt the templates were compiled from */
+  source: string;
+  debate: string;
+  cooldown: string;
+  consensus: string;
+}
+
+const DEBATE_RULES = `You are in a live crypto chat room debating the current market. Stay in character at all times. Respond naturally as if chatting — no greetings, no "I think", just jump into your take.
+
+🚨 ABSOLUTE CHARACTER LIMIT: Your response MUST be 280 characters or less. This is non-negotiable and enforced automatically. Plan your message length accordingly.
+
+CRITICAL: You MUST reference actual market data in your arguments. Use specific numbers, percentages, and metrics from the market data given with each turn. Instead of saying "I think it will go up", say something like "The 24h volume spike of 340% combined with holding above $45k support suggests..."
+
+ANTI-REPETITION RULES (MANDATORY):
+- Do NOT repeat arguments already made by others in this conversation or listed as forbidden in the turn context
+- If you reference what someone said, add a NEW angle or perspective
+- Bring fresh analysis, different data points, or unique insights
+- If you agree with someone, cite DIFFERENT supporting evidence; if you disagree, use DIFFERENT analysis or metrics
+- Rewording an existing argument is NOT allowed - each message must add information that wasn't already stated
+
+Core Guidelines:
+- Cite specific numbers from the market data (prices, percentages, volumes)
+- If you disagree with someone, explain why using data
+- If the data supports your view, highlight the key metrics
+- Be willing to acknowledge strong arguments from others if your conviction is low
+- If there's a previous debate summary, build on those arguments or counter them with new data
+
+IMPORTANT: End your message with a sentiment tag in this exact format:
+[SENTIMENT: bullish|bearish|neutral, CONFIDENCE: 0-100]
+
+The sentiment tag should reflect YOUR genuine assessment based on your persona's perspective AND the market data. The confidence is how strongly you feel about it (0-100).
+
+Example response:
+BTC holding 44k support cleanly, volume profile showing accumulation with $28B in 24h volume. Next leg up targets 48k if we clear the 45.5k resistance.
+[SENTIMENT: bullish, CONFIDENCE: 72]`;
+
+const COOLDOWN_RULES = `You are in a crypto chat room during a chill period. A trade signal just fired and the room is winding down. No market analysis needed — just hang out. Talk about crypto culture, memes, past experiences, hot takes, or banter with others. Keep it fun and casual. Stay in character. No sentiment tags needed.`;
+
+const CONSENSUS_RULES = `You are in a live crypto chat room whose debate phase is concluding because the room has reached a consensus. React to the consensus — do you agree with the group's assessment? Did the market data support this conclusion? Reference specific arguments from the debate context if provided. Stay in character. CRITICAL: Keep your response under 280 characters — tweet-length only. Be punchy and direct.
+
+End with the sentiment tag given in the turn context.`;
+
+const templates = new Map<string, PersonaPromptTemplates>();
+
+const templateStats = {
+  compiled: 0,
+  builds: 0,
+  buildMsTotal: 0,
+  staticChars: 0, // System prompt characters reused across builds
+  dynamicChars: 0, // User prompt characters built per turn
+};
+
+function now(): number {
+  return typeof performance !== 'undefined' ? performance.now() : Date.now();
+}
+
+function compile(persona: Persona): PersonaPromptTemplates {
+  const compiled: PersonaPromptTemplates = {
+    personaId: persona.id,
+    source: persona.personalityPrompt,
+    debate: `${persona.personalityPrompt}\n\n${DEBATE_RULES}`,
+    cooldown: `${persona.personalityPrompt}\n\n${COOLDOWN_RULES}`,
+    consensus: `${persona.personalityPrompt}\n\n${CONSENSUS_RULES}`,
+  };
+  templates.set(persona.id, compiled);
+  templateStats.compiled++;
+  return compiled;
+}
+
+/**
+ * Compile the static system prompts for every persona (call once at startup)
+ */
+export function compilePersonaPrompts(personas: readonly Persona[] = PERSONAS): number {
+  for (const persona of personas) {
+    const existing = templates.get(persona.id);
+    if (!existing || existing.source !== persona.personalityPrompt) compile(persona);
+  }
+  return templates.size;
+}
+
+/**
+ * Static system prompt for a persona and phase; identical on every call
+ */
+export function getPersonaSystemPrompt(persona: Persona, phase: PromptPhase): string {
+  let compiled = templates.get(persona.id);
+  if (!compiled || compiled.source !== persona.personalityPrompt) {
+    compiled = compile(persona);
+  }
+  return compiled[phase];
+}
+
+/**
+ * Join the non-empty per-turn sections of a user prompt
+ */
+export function joinPromptSections(sections: readonly (string | undefined)[]): string {
+  return sections
+    .map(section => section?.trim())
+    .filter(Boolean)
+    .join('\n\n');
+}
+
+/**
+ * Record one prompt build for the metrics
+ */
+export function recordPromptBuild(startedAt: number, prompt: PromptPair): void {
+  templateStats.builds++;
+  templateStats.buildMsTotal += now() - startedAt;
+  templateStats.staticChars += prompt.systemPrompt.length;
+  templateStats.dynamicChars += prompt.userPrompt.length;
+}
+
+export function promptBuildStart(): number {
+  return now();
+}
+
+export function getPromptTemplateStats() {
+  const { builds } = templateStats;
+  return {
+    personas: templates.size,
+    compiled: templateStats.compiled,
+    builds,
+    avgBuildMs: builds > 0 ? templateStats.buildMsTotal / builds : 0,
+    avgStaticChars: builds > 0 ? Math.round(templateStats.staticChars / builds) : 0,
+    avgDynamicChars: builds > 0 ? Math.round(templateStats.dynamicChars / builds) : 0,
+  };
+}
+
+/**
+ * Drop compiled templates and counters (for tests)
+ */
+export function resetPromptTemplateState(): void {
+  templates.clear();
+  templateStats.compiled = 0;
+  templateStats.builds = 0;
+  templateStats.buildMsTotal = 0;
+  templateStats.staticChars = 0;
+  templateStats.dynamicChars = 0;
+}
@@ -1,9 +1,17 @@
 import { Persona, ChatMessage, MessageSentiment, DebateSummary } from './types';
-import { MarketData, formatMarketDataForPrompt, getMarketTalkingPoints } from './market-data';
+import { MarketData } from './market-data';
 import { PersuasionState, getPersuasionSummary, shouldAcknowledgeOpposingView, generateAcknowledgmentPrompt } from './persuasion';
 import { formatDebateSummaryForPrompt } from './argument-extractor';
 import { DebateContextForConsensus, formatDebateContextForPrompt } from './debate-consensus-bridge';
 import { ArgumentTracker, buildAntiRepetitionSection } from './argument-tracker';
+import { getMarketPromptSection } from '../prompt-context';
+import {
+  PromptPair,
+  getPersonaSystemPrompt,
+  joinPromptSections,
+  promptBuildStart,
+  recordPromptBuild,
+} from './prompt-templates';
 
 function formatRecentMessages(messages: ChatMessage[], limit: number = 10): string {
   const recent = messages.slice(-limit);
@@ -23,8 +31,11 @@ function formatRecentMessages(messages: ChatMessage[], limit: number = 10): stri
  * CVAULT-185: Enhanced with real market data and persuadability
  * CVAULT-190: Enhanced with previous debate context
  * CVAULT-208: Enhanced with anti-repetition logic
+ *
+ * The system prompt is the persona's precompiled debate template; all
+ * per-turn context goes in the user prompt.
  */
-export function buildDebatePrompt(
+export function renderDebatePrompt(
   persona: Persona, 
   recentMessages: ChatMessage[],
   marketData?: MarketData,
@@ -32,26 +43,20 @@ export function buildDebatePrompt(
   asset: string = 'BTC',
   previousDebateSummary?: DebateSummary,
   argumentTracker?: ArgumentTracker
-): string {
-  // Build market data context
+): PromptPair {
+  const startedAt = promptBuildStart();
+
+  // Build market data context (with talking points), shared across turns
+  // until the market data updates
   let marketContext = '';
   if (marketData) {
-    marketContext = formatMarketDataForPrompt(marketData, asset);
-    
-    // Add talking points specific to this persona's style
-    const talkingPoints = getMarketTalkingPoints(marketData);
-    if (talkingPoints.length > 0) {
-      marketContext += '\nKey observations you might reference:\n';
-      talkingPoints.slice(0, 3).forEach(point => {
-        marketContext += `- ${point}\n`;
-      });
-    }
+    marketContext = getMarketPromptSection(marketData, asset, true);
   }
 
   // Build persuasion context
   let persuasionContext = '';
   if (persuasionState) {
-    persuasionContext = '\n' + getPersuasionSummary(persuasionState);
+    persuasionContext = getPersuasionSummary(persuasionState);
     
     // Check if we should acknowledge an opposing view
     const lastOpposingMessage = recentMessages
@@ -67,7 +72,7 @@ export function buildDebatePrompt(
   // Build previous debate context (CVAULT-190)
   let previousDebateContext = '';
   if (previousDebateSummary) {
-    previousDebateContext = '\n\n=== PREVIOUS DEBATE ROUND CONTEXT ===\n';
+    previousDebateContext = '=== PREVIOUS DEBATE ROUND CONTEXT ===\n';
     previousDebateContext += formatDebateSummaryForPrompt(previousDebateSummary);
     previousDebateContext += '\n\nUse this context to build on strong arguments, counter weak ones, or bring new data that shifts the debate. You can reference specific points made previously or introduce fresh analysis.';
   }
@@ -98,73 +103,34 @@ export function buildDebatePrompt(
     antiRepetitionContext = buildAntiRepetitionSection(argumentTracker, personaSentiment);
   }
 
-  // CVAULT-208: Place anti-repetition context FIRST for highest priority
-  const systemPrompt = `${antiRepetitionContext}
-
-${persona.personalityPrompt}
-
-${marketContext}
-
-You are in a live crypto chat room debating the current market. Stay in character at all times. Respond naturally as if chatting — no greetings, no "I think", just jump into your take.
-
-🚨 ABSOLUTE CHARACTER LIMIT: Your response MUST be 280 characters or less. This is non-negotiable and enforced automatically. Plan your message length accordingly.
-
-CRITICAL: You MUST reference actual market data in your arguments. Use specific numbers, percentages, and metrics from the market data provided above. Instead of saying "I think it will go up", say something like "The 24h volume spike of 340% combined with holding above $45k support suggests..."
-
-${persuasionContext}
-${previousDebateContext}
-
-ANTI-REPETITION RULES (MANDATORY):
-- Do NOT repeat arguments already made by others in this conversation
-- If you reference what someone said, add a NEW angle or perspective
-- Bring fresh analysis, different data points, or unique insights
-- Challenge existing points with new evidence rather than restating them
-- Make each message add distinct value to the discussion
-- If an argument was already made (see above), saying it differently doesn't count as new
-
-IMPORTANT: End your message with a sentiment tag in this exact format:
-[SENTIMENT: bullish|bearish|neutral, CONFIDENCE: 0-100]
-
-The sentiment tag should reflect YOUR genuine assessment based on your persona's perspective AND the market data. The confidence is how strongly you feel about it (0-100).
-
-Example response:
-BTC holding 44k support cleanly, volume profile showing accumulation with $28B in 24h volume. Next leg up targets 48k if we clear the 45.5k resistance.
-[SENTIMENT: bullish, CONFIDENCE: 72]`;
-
-  const userPrompt = `Recent chat:
+  // CVAULT-208: Anti-repetition context leads the turn context for highest priority
+  const userPrompt = joinPromptSections([
+    antiRepetitionContext,
+    marketContext,
+    persuasionContext,
+    previousDebateContext,
+    `Recent chat:
 ${formatRecentMessages(recentMessages)}
 
-Your turn to speak. React to what others have said, add your perspective using the market data provided, or bring up something new.
-
-🚨 ABSOLUTE CHARACTER LIMIT: Your response MUST be 280 characters or less. This is non-negotiable. If your response is longer, it will be automatically truncated. Plan your message accordingly.
-
-Be punchy and direct. No filler words. One clear point per message. Remember to end with [SENTIMENT: ..., CONFIDENCE: ...].
+Your turn to speak. React to what others have said, add your perspective using the market data provided, or bring up something new. Do not repeat any forbidden argument above.
 
-🚫 ANTI-REPETITION MANDATORY REQUIREMENTS:
-- Check the forbidden arguments list above - DO NOT say anything similar to those
-- BRING SOMETHING COMPLETELY NEW: Different data point, different technical level, different reasoning
-- If you agree with someone, cite DIFFERENT supporting evidence, not the same data
-- If you disagree, use DIFFERENT analysis or metrics, not the same counterargument
-- Rewording an existing argument is NOT allowed - it must be genuinely distinct
-- Each response must add information that wasn't already stated
+Be punchy and direct, 280 characters max. No filler words. One clear point per message. Remember to end with [SENTIMENT: ..., CONFIDENCE: ...].`,
+  ]);
 
-Core Guidelines:
-- Cite specific numbers from the market data (prices, percentages, volumes)
-- If you disagree with someone, explain why using data
-- If the data supports your view, highlight the key metrics
-- Be willing to acknowledge strong arguments from others if your conviction is low
-- If there's a previous debate summary, build on those arguments or counter them with new data`
+  const prompt = { systemPrompt: getPersonaSystemPrompt(persona, 'debate'), userPrompt };
+  recordPromptBuild(startedAt, prompt);
+  return prompt;
+}
 
-  return JSON.stringify({ systemPrompt, userPrompt });
+export function buildDebatePrompt(...args: Parameters<typeof renderDebatePrompt>): string {
+  return JSON.stringify(renderDebatePrompt(...args));
 }
 
 /**
  * Build cooldown prompt (casual chat, no market analysis)
  */
-export function buildCooldownPrompt(persona: Persona, recentMessages: ChatMessage[]): string {
-  const systemPrompt = `${persona.personalityPrompt}
-
-You are in a crypto chat room during a chill period. A trade signal just fired and the room is winding down. No market analysis needed — just hang out. Talk about crypto culture, memes, past experiences, hot takes, or banter with others. Keep it fun and casual. Stay in character. No sentiment tags needed.`;
+export function renderCooldownPrompt(persona: Persona, recentMessages: ChatMessage[]): PromptPair {
+  const startedAt = promptBuildStart();
 
   const userPrompt = `Recent chat:
 ${formatRecentMessages(recentMessages)}
@@ -175,14 +141,20 @@ Your turn. Keep it casual and fun.
 
 Be punchy and direct. No market analysis or sentiment tags.`;
 
-  return JSON.stringify({ systemPrompt, userPrompt });
+  const prompt = { systemPrompt: getPersonaSystemPrompt(persona, 'cooldown'), userPrompt };
+  recordPromptBuild(startedAt, prompt);
+  return prompt;
+}
+
+export function buildCooldownPrompt(persona: Persona, recentMessages: ChatMessage[]): string {
+  return JSON.stringify(renderCooldownPrompt(persona, recentMessages));
 }
 
 /**
  * Build consensus phase prompt (acknowledging the consensus)
  * CVAULT-190: Enhanced with debate context injection
  */
-export function buildConsensusPrompt(
+export function renderConsensusPrompt(
   persona: Persona,
   recentMessages: ChatMessage[],
   consensusDirection: MessageSentiment,
@@ -190,37 +162,41 @@ export function buildConsensusPrompt(
   marketData?: MarketData,
   asset: string = 'BTC',
   debateContext?: DebateContextForConsensus
-): string {
+): PromptPair {
+  const startedAt = promptBuildStart();
+
   let marketContext = '';
   if (marketData) {
-    marketContext = formatMarketDataForPrompt(marketData, asset);
+    marketContext = getMarketPromptSection(marketData, asset);
   }
 
   // CVAULT-190: Inject debate context into consensus prompt
   let debateContextSection = '';
   if (debateContext) {
-    debateContextSection = '\n\n' + formatDebateContextForPrompt(debateContext);
+    debateContextSection = formatDebateContextForPrompt(debateContext);
     debateContextSection += '\n\nAs you form your consensus reaction, consider the arguments made during the debate. Reference specific points that influenced the outcome or that you found particularly compelling.';
   }
 
-  const systemPrompt = `${persona.personalityPrompt}
-
-${marketContext}${debateContextSection}
-
-The chat room has reached a ${consensusDirection.toUpperCase()} consensus with ${consensusStrength}% agreement. The debate phase is concluding. React to the consensus — do you agree with the group's assessment? Did the market data support this conclusion? Reference specific arguments from the debate context if provided. Stay in character. CRITICAL: Keep your response under 280 characters — tweet-length only. Be punchy and direct.
-
-End with [SENTIMENT: ${consensusDirection}, CONFIDENCE: ${consensusStrength}]`;
-
-  const userPrompt = `Recent chat:
+  const userPrompt = joinPromptSections([
+    marketContext,
+    debateContextSection,
+    `Recent chat:
 ${formatRecentMessages(recentMessages)}
 
 The room has reached consensus: ${consensusDirection.toUpperCase()} (${consensusStrength}% strength). Give your final thoughts on whether this consensus is justified by the data and debate arguments.
 
 🚨 ABSOLUTE CHARACTER LIMIT: Your response MUST be 280 characters or less. This is non-negotiable. If your response is longer, it will be automatically truncated. Plan your message accordingly.
 
-Be punchy and direct.`;
+End with [SENTIMENT: ${consensusDirection}, CONFIDENCE: ${consensusStrength}]`,
+  ]);
 
-  return JSON.stringify({ systemPrompt, userPrompt });
+  const prompt = { systemPrompt: getPersonaSystemPrompt(persona, 'consensus'), userPrompt };
+  recordPromptBuild(startedAt, prompt);
+  return prompt;
+}
+
+export function buildConsensusPrompt(...args: Parameters<typeof renderConsensusPrompt>): string {
+  return JSON.stringify(renderConsensusPrompt(...args));
 }
 
 /**
@@ -302,7 +278,7 @@ export function buildStanceChangePrompt(
 ): string {
   let marketContext = '';
   if (marketData) {
-    marketContext = formatMarketDataForPrompt(marketData, asset);
+    marketContext = getMarketPromptSection(marketData, asset);
   }
 
   const systemPrompt = `${persona.personalityPrompt}
@@ -0,0 +1,50 @@
+/**
+ * CVAULT-217: Rolling history window helpers
+ *
+ * Chat messages are appended in timestamp order, so the expired messages are
+ * always a prefix of the list. Finding where the live window starts is a
+ * binary search, expiry is a head trim, and a list whose oldest message is
+ * still live is returned as-is without a filter pass.
+ */
+
+interface Timestamped {
+  timestamp: number;
+}
+
+/**
+ * Index of the first message at or after `cutoff`
+ * (messages.length if every message is older)
+ */
+export function findWindowStart(messages: readonly Timestamped[], cutoff: number): number {
+  // Common case: nothing has expired since the last trim
+  if (messages.length === 0 || messages[0].timestamp >= cutoff) return 0;
+
+  let low = 1;
+  let high = messages.length;
+  while (low < high) {
+    const mid = (low + high) >>> 1;
+    if (messages[mid].timestamp < cutoff) {
+      low = mid + 1;
+    } else {
+      high = mid;
+    }
+  }
+  return low;
+}
+
+/**
+ * Messages at or after `cutoff`. Returns the same array when nothing has
+ * expired, otherwise a copy without the expired head.
+ */
+export function rollingWindow<T extends Timestamped>(messages: T[], cutoff: number): T[] {
+  const start = findWindowStart(messages, cutoff);
+  return start === 0 ? messages : messages.slice(start);
+}
+
+/**
+ * Remove the expired head from `messages` in place and return it
+ */
+export function trimExpiredHead<T extends Timestamped>(messages: T[], cutoff: number): T[] {
+  const start = findWindowStart(messages, cutoff);
+  return start === 0 ? [] : messages.splice(0, start);
+}
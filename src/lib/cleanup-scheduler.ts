@@ -0,0 +1,277 @@
+/**
+ * Background Cleanup Scheduler
+ *
+ * Maintenance jobs (stale trades, rolling chat history, inactive human-chat
+ * users) used to run inline on request paths such as GET /api/health. They
+ * now run here on their own timers, so health probes only read the last
+ * recorded results.
+ *
+ * - Each job fires every `intervalMs`, +/- JITTER_RATIO, so instances that
+ *   start together drift apart instead of hitting KV in lockstep.
+ * - A job runs at most once at a time per process (single-flight), and at
+ *   most once per interval across instances: the run takes a KV lock
+ *   (SET NX PX) that is held for the rest of the interval. Failed runs
+ *   release the lock so another instance can retry.
+ * - Without KV the lock falls back to process memory.
+ *
+ * The scheduler is started from src/instrumentation.ts. The cron routes keep
+ * working for deployments where instances do not stay warm.
+ */
+
+import { loadKV } from './cold-start';
+import { hasStaleTradeState, runStaleTradeCleanup, STALE_TRADE_CONFIG } from './stale-trade-handler';
+import { cleanupRollingHistory } from './chatroom/kv-store';
+import { ROLLING_HISTORY_CONFIG } from './chatroom/types';
+import { cleanupInactiveUsers } from './human-chat/kv-store';
+
+export const CLEANUP_SCHEDULER_CONFIG = {
+  // Set CLEANUP_SCHEDULER=off to disable the timers (cron routes still work)
+  ENABLED: process.env.CLEANUP_SCHEDULER !== 'off',
+  // Each interval is randomized by +/- this fraction
+  JITTER_RATIO: 0.2,
+  LOCK_KEY_PREFIX: 'cleanup:lock:',
+};
+
+export interface CleanupJob {
+  name: string;
+  intervalMs: number;
+  /** Returns a short summary for the job metrics (optional) */
+  run: () => Promise<unknown>;
+}
+
+export interface CleanupJobStats {
+  name: string;
+  intervalMs: number;
+  runs: number;
+  failures: number;
+  /** Ticks skipped because another instance held the lock */
+  skippedLocked: number;
+  /** Ticks skipped because the previous run was still in progress */
+  skippedRunning: number;
+  running: boolean;
+  lastRunAt: number | null;
+  lastDurationMs: number | null;
+  lastResult: unknown;
+  lastError: string | null;
+  nextRunAt: number | null;
+}
+
+interface JobState {
+  job: CleanupJob;
+  stats: CleanupJobStats;
+  timer: ReturnType<typeof setTimeout> | null;
+  inFlight: Promise<void> | null;
+}
+
+const DEFAULT_JOBS: CleanupJob[] = [
+  {
+    name: 'stale-trades',
+    intervalMs: STALE_TRADE_CONFIG.MIN_CLEANUP_INTERVAL_MS,
+    run: async () => {
+      if (!(await hasStaleTradeState())) return { stale: false };
+      const result = await runStaleTradeCleanup();
+      return { stale: true, executed: result.executed, ...result.summary };
+    },
+  },
+  {
+    name: 'rolling-history',
+    intervalMs: ROLLING_HISTORY_CONFIG.CLEANUP_INTERVAL_MS,
+    run: () => cleanupRollingHistory(),
+  },
+  {
+    name: 'inactive-users',
+    intervalMs: 60 * 1000,
+    run: () => cleanupInactiveUsers(),
+  },
+];
+
+const jobs = new Map<string, JobState>();
+const memLocks = new Map<string, number>();
+const instanceId = `sched-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`;
+let started = false;
+
+function isKVAvailable(): boolean {
+  return !!(process.env.KV_REST_API_URL && process.env.KV_REST_API_TOKEN);
+}
+
+function jitter(intervalMs: number): number {
+  const spread = intervalMs * CLEANUP_SCHEDULER_CONFIG.JITTER_RATIO;
+  return Math.round(intervalMs - spread + Math.random() * spread * 2);
+}
+
+/**
+ * Take the job lock for (roughly) one interval
+ */
+async function acquireJobLock(job: CleanupJob): Promise<boolean> {
+  const key = `${CLEANUP_SCHEDULER_CONFIG.LOCK_KEY_PREFIX}${job.name}`;
+  // Expire a little early so the jittered next tick is not locked out by our own run
+  const ttlMs = Math.max(1000, Math.floor(job.intervalMs * (1 - CLEANUP_SCHEDULER_CONFIG.JITTER_RATIO)));
+
+  if (isKVAvailable()) {
+    try {
+      const { kv } = await loadKV();
+      const result = await kv.set(key, instanceId, { nx: true, px: ttlMs });
+      return result === 'OK';
+    } catch (error) {
+      console.error(`[cleanup-scheduler] Error acquiring lock for ${job.name}:`, error);
+      return false;
+    }
+  }
+
+  const now = Date.now();
+  const expiresAt = memLocks.get(key);
+  if (expiresAt !== undefined && expiresAt > now) return false;
+  memLocks.set(key, now + ttlMs);
+  return true;
+}
+
+async function releaseJobLock(job: CleanupJob): Promise<void> {
+  const key = `${CLEANUP_SCHEDULER_CONFIG.LOCK_KEY_PREFIX}${job.name}`;
+  if (isKVAvailable()) {
+    try {
+      const { kv } = await loadKV();
+      const holder = await kv.get<string>(key);
+      if (holder === instanceId) await kv.del(key);
+    } catch (error) {
+      console.error(`[cleanup-scheduler] Error releasing lock for ${job.name}:`, error);
+    }
+    return;
+  }
+  memLocks.delete(key);
+}
+
+async function executeJob(state: JobState): Promise<void> {
+  const { job, stats } = state;
+
+  if (!(await acquireJobLock(job))) {
+    stats.skippedLocked++;
+    return;
+  }
+
+  const startedAt = Date.now();
+  stats.running = true;
+  try {
+    stats.lastResult = (await job.run()) ?? null;
+    stats.lastError = null;
+    stats.runs++;
+  } catch (error) {
+    stats.failures++;
+    stats.lastError = error instanceof Error ? error.message : String(error);
+    console.error(`[cleanup-scheduler] Job ${job.name} failed:`, error);
+    await releaseJobLock(job);
+  } finally {
+    stats.running = false;
+    stats.lastRunAt = startedAt;
+    stats.lastDurationMs = Date.now() - startedAt;
+  }
+}
+
+/**
+ * Run a job now, unless it is already running in this process.
+ * Still subject to the cross-instance lock.
+ */
+export function runCleanupJob(name: string): Promise<void> {
+  const state = jobs.get(name);
+  if (!state) {
+    return Promise.reject(new Error(`Unknown cleanup job: ${name}`));
+  }
+  if (state.inFlight) {
+    state.stats.skippedRunning++;
+    return state.inFlight;
+  }
+  state.inFlight = executeJob(state).finally(() => {
+    state.inFlight = null;
+  });
+  return state.inFlight;
+}
+
+function scheduleNext(state: JobState, delayMs: number): void {
+  state.stats.nextRunAt = Date.now() + delayMs;
+  state.timer = setTimeout(() => {
+    state.timer = null;
+    runCleanupJob(state.job.name)
+      .catch(() => undefined)
+      .finally(() => {
+        if (started) scheduleNext(state, jitter(state.job.intervalMs));
+      });
+  }, delayMs);
+  // Timers must not keep a build worker or test process alive
+  if (typeof state.timer === 'object' && state.timer && 'unref' in state.timer) {
+    state.timer.unref();
+  }
+}
+
+function registerJob(job: CleanupJob): JobState {
+  const state: JobState = {
+    job,
+    stats: {
+      name: job.name,
+      intervalMs: job.intervalMs,
+      runs: 0,
+      failures: 0,
+      skippedLocked: 0,
+      skippedRunning: 0,
+      running: false,
+      lastRunAt: null,
+      lastDurationMs: null,
+      lastResult: null,
+      lastError: null,
+      nextRunAt: null,
+    },
+    timer: null,
+    inFlight: null,
+  };
+  jobs.set(job.name, state);
+  return state;
+}
+
+/**
+ * Start the job timers (idempotent). The first run of each job lands at a
+ * random point within its first interval.
+ */
+export function startCleanupScheduler(jobList: CleanupJob[] = DEFAULT_JOBS): boolean {
+  if (started || !CLEANUP_SCHEDULER_CONFIG.ENABLED) return false;
+  started = true;
+
+  for (const job of jobList) {
+    const state = jobs.get(job.name) ?? registerJob(job);
+    scheduleNext(state, Math.round(Math.random() * job.intervalMs));
+  }
+
+  console.log(`[cleanup-scheduler] Started ${jobList.length} jobs on ${instanceId}`);
+  return true;
+}
+
+/**
+ * Stop all timers; in-flight runs finish on their own
+ */
+export function stopCleanupScheduler(): void {
+  started = false;
+  for (const state of jobs.values()) {
+    if (state.timer) clearTimeout(state.timer);
+    state.timer = null;
+    state.stats.nextRunAt = null;
+  }
+}
+
+/**
+ * Scheduler status and per-job metrics. Reads only in-memory state, so it
+ * is cheap enough for health probes.
+ */
+export function getCleanupSchedulerStats() {
+  return {
+    running: started,
+    instanceId,
+    lockBackend: isKVAvailable() ? 'kv' : 'memory',
+    jobs: Array.from(jobs.values(), state => ({ ...state.stats })),
+  };
+}
+
+/**
+ * Stop the scheduler and clear all jobs and metrics (for testing)
+ */
+export function resetCleanupSchedulerState(): void {
+  stopCleanupScheduler();
+  jobs.clear();
+  memLocks.clear();
+}
@@ -0,0 +1,187 @@
+/**
+ * Cold-Start Tracking and Lazy Module Loading
+ *
+ * Heavy modules (consensus engine, model factory, chatroom engine and
+ * persona tables, @vercel/kv) used to be imported at the top of every route,
+ * so a serverless cold start paid for all of them before the first request
+ * could run — including on routes or branches that never used them.
+ * Routes now load them through the lazy loaders below on first use.
+ *
+ * Each loader records how long the module took to load and which route was
+ * waiting on it. Per route, the time its first requests spent waiting on
+ * module loads is compared against COLD_START_CONFIG.ROUTE_BUDGET_MS and
+ * reported by getColdStartStats() (surfaced on /api/health).
+ *
+ * Configuration (environment):
+ *   COLD_START_BUDGET_MS=300   Module load time a route may spend cold
+ */
+
+export const COLD_START_CONFIG = {
+  ROUTE_BUDGET_MS: parseInt(process.env.COLD_START_BUDGET_MS || '300', 10),
+};
+
+export interface ModuleLoadRecord {
+  name: string;
+  loadMs: number;
+  loadedAt: number;
+  /** Route whose request triggered the load, if any */
+  loadedBy: string | null;
+}
+
+export interface RouteStartupRecord {
+  route: string;
+  firstRequestAt: number;
+  /** Process uptime when the route served its first request */
+  uptimeAtFirstRequestMs: number;
+  requests: number;
+  /** Time this route's requests spent waiting on lazy module loads */
+  moduleLoadMs: number;
+  modules: string[];
+  budgetMs: number;
+  overBudget: boolean;
+}
+
+export interface LazyModule<T> {
+  /** Load (once) and return the module; `route` attributes the wait */
+  (route?: string): Promise<T>;
+  /** The module if it has already loaded, without triggering a load */
+  peek(): T | null;
+}
+
+const moduleLoads = new Map<string, ModuleLoadRecord>();
+const routeStartups = new Map<string, RouteStartupRecord>();
+const lazyModules = new Set<{ reset(): void }>();
+
+function now(): number {
+  return typeof performance !== 'undefined' ? performance.now() : Date.now();
+}
+
+function uptimeMs(): number {
+  return typeof process !== 'undefined' && typeof process.uptime === 'function'
+    ? Math.round(process.uptime() * 1000)
+    : 0;
+}
+
+function routeRecord(route: string): RouteStartupRecord {
+  let record = routeStartups.get(route);
+  if (!record) {
+    record = {
+      route,
+      firstRequestAt: Date.now(),
+      uptimeAtFirstRequestMs: uptimeMs(),
+      requests: 0,
+      moduleLoadMs: 0,
+      modules: [],
+      budgetMs: COLD_START_CONFIG.ROUTE_BUDGET_MS,
+      overBudget: false,
+    };
+    routeStartups.set(route, record);
+  }
+  return record;
+}
+
+function recordRouteWait(route: string, moduleName: string, waitedMs: number): void {
+  const record = routeRecord(route);
+  record.moduleLoadMs += waitedMs;
+  if (!record.modules.includes(moduleName)) record.modules.push(moduleName);
+
+  if (!record.overBudget && record.moduleLoadMs > record.budgetMs) {
+    record.overBudget = true;
+    console.warn(
+      `[cold-start] ${route} spent ${Math.round(record.moduleLoadMs)}ms loading ${record.modules.join(', ')} ` +
+      `(budget ${record.budgetMs}ms)`
+    );
+  }
+}
+
+/**
+ * Wrap a dynamic import so it runs once, on first use, and is timed
+ */
+export function lazyModule<T>(name: string, loader: () => Promise<T>): LazyModule<T> {
+  let loaded: T | null = null;
+  let pending: Promise<T> | null = null;
+
+  const load = (async (route?: string) => {
+    if (loaded) return loaded;
+
+    const waitStartedAt = now();
+    if (!pending) {
+      const startedAt = waitStartedAt;
+      pending = loader().then(
+        value => {
+          loaded = value;
+          moduleLoads.set(name, {
+            name,
+            loadMs: Math.round(now() - startedAt),
+            loadedAt: Date.now(),
+            loadedBy: route ?? null,
+          });
+          return value;
+        },
+        error => {
+          // Let the next request retry the import
+          pending = null;
+          throw error;
+        }
+      );
+    }
+
+    const value = await pending;
+    if (route) recordRouteWait(route, name, now() - waitStartedAt);
+    return value;
+  }) as LazyModule<T>;
+
+  load.peek = () => loaded;
+
+  lazyModules.add({
+    reset: () => {
+      loaded = null;
+      pending = null;
+    },
+  });
+  return load;
+}
+
+/**
+ * Count a request to `route`; the first call marks the route's cold start
+ */
+export function trackRouteRequest(route: string): void {
+  routeRecord(route).requests++;
+}
+
+/**
+ * Module load times and per-route startup cost against the budget
+ */
+export function getColdStartStats() {
+  const routes = Array.from(routeStartups.values(), record => ({
+    ...record,
+    moduleLoadMs: Math.round(record.moduleLoadMs),
+    modules: [...record.modules],
+  }));
+  return {
+    budgetMs: COLD_START_CONFIG.ROUTE_BUDGET_MS,
+    modules: Array.from(moduleLoads.values(), record => ({ ...record })),
+    routes,
+    routesOverBudget: routes.filter(route => route.overBudget).map(route => route.route),
+  };
+}
+
+/**
+ * Forget loaded modules and route records (for testing)
+ */
+export function resetColdStartState(): void {
+  moduleLoads.clear();
+  routeStartups.clear();
+  for (const lazy of lazyModules) lazy.reset();
+}
+
+// ---------------------------------------------------------------------------
+// Shared loaders for the heavy modules
+// ---------------------------------------------------------------------------
+
+export const loadConsensusEngine = lazyModule('consensus-engine', () => import('./consensus-engine'));
+export const loadModelFactory = lazyModule('model-factory', () => import('./model-factory'));
+export const loadModels = lazyModule('models', () => import('./models'));
+export const loadChatroomEngine = lazyModule('chatroom-engine', () => import('./chatroom/chatroom-engine-enhanced'));
+export const loadPersonas = lazyModule('personas', () => import('./chatroom/personas'));
+export const loadKV = lazyModule('@vercel/kv', () => import('@vercel/kv'));
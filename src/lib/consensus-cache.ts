@@ -0,0 +1,319 @@
+/**
+ * Consensus Result Cache keyed by Market-State Fingerprint
+ *
+ * A consensus answer depends on the market it was asked about, not on the
+ * clock. Instead of a fixed CACHE_TTL.CONSENSUS, each cached result carries
+ * the quantized market state it was computed for:
+ *
+ * - price bucket: log-scale steps of PRICE_STEP_PCT
+ * - 24h change bucket: steps of CHANGE_STEP_PCT percentage points
+ * - chatroom consensus direction and strength bucket (STRENGTH_STEP), when
+ *   the chatroom is debating the same asset
+ *
+ * A lookup reads the current fingerprint (market data is itself cached for
+ * CACHE_TTL.PRICE, the chatroom state is one KV read). While it matches, the
+ * result is reused for up to MAX_AGE_MS; as soon as any bucket moves, the
+ * entry is dropped and recomputed. If the fingerprint cannot be read, or
+ * the market data is stale (CoinGecko down, last cached value or built-in
+ * fallback), the old wall-clock TTL applies. Concurrent identical requests
+ * share one computation, like RequestMemoizer.
+ *
+ * Degraded results are not held for the market state: one with a failed
+ * analyst only gets CACHE_TTL.CONSENSUS, and INSUFFICIENT_RESPONSES is not
+ * cached at all, so a model outage is retried once it is over.
+ *
+ * Hit ratio, invalidations by reason and the age of served results are in
+ * getConsensusCacheStats() (/api/health performance.consensus_cache).
+ *
+ * Configuration (environment):
+ *   CONSENSUS_CACHE_PRICE_STEP_PCT=0.5   Price bucket width (% of price)
+ *   CONSENSUS_CACHE_CHANGE_STEP_PCT=1    24h change bucket width (points)
+ *   CONSENSUS_CACHE_STRENGTH_STEP=20     Chatroom strength bucket width (0-100)
+ *   CONSENSUS_CACHE_MAX_AGE_MS=900000    Longest reuse of an unchanged state
+ *   CONSENSUS_CACHE_MAX_ENTRIES=200      Cached results kept (oldest dropped)
+ */
+
+import { CACHE_TTL, generateCacheKeySync } from './cache';
+import { fetchMarketData, type MarketData } from './chatroom/market-data';
+import { getState } from './chatroom/kv-store';
+import { registerSizeGauge } from './process-metrics';
+
+export const CONSENSUS_CACHE_CONFIG = {
+  PRICE_STEP_PCT: parseFloat(process.env.CONSENSUS_CACHE_PRICE_STEP_PCT || '0.5'),
+  CHANGE_STEP_PCT: parseFloat(process.env.CONSENSUS_CACHE_CHANGE_STEP_PCT || '1'),
+  STRENGTH_STEP: parseInt(process.env.CONSENSUS_CACHE_STRENGTH_STEP || '20', 10),
+  MAX_AGE_MS: parseInt(process.env.CONSENSUS_CACHE_MAX_AGE_MS || '900000', 10),
+  MAX_ENTRIES: parseInt(process.env.CONSENSUS_CACHE_MAX_ENTRIES || '200', 10),
+};
+
+export interface MarketStateInputs {
+  price: number;
+  priceChangePercentage24h: number;
+  chatroomDirection?: string | null;
+  chatroomStrength?: number;
+}
+
+export interface MarketFingerprint {
+  priceBucket: number;
+  changeBucket: number;
+  direction: string;
+  strengthBucket: number;
+}
+
+export type ConsensusCacheStatus = 'hit' | 'miss' | 'shared';
+
+export interface ConsensusCacheResult<T> {
+  value: T;
+  status: ConsensusCacheStatus;
+  /** Age of the returned result (0 when just computed) */
+  ageMs: number;
+  fingerprint: string | null;
+}
+
+type InvalidationReason = 'fingerprint' | 'maxAge' | 'ttl' | 'evicted';
+
+/**
+ * How far a computed result can be reused: 'ok' for the market state,
+ * 'degraded' for the wall-clock TTL only, 'unusable' not at all
+ */
+export type ConsensusResultQuality = 'ok' | 'degraded' | 'unusable';
+
+export interface ConsensusResultCacheOptions<T> {
+  assess?: (value: T) => ConsensusResultQuality;
+}
+
+interface CacheEntry<T> {
+  value: T;
+  fingerprint: string | null;
+  computedAt: number;
+}
+
+/**
+ * Quantize market inputs into buckets; equal buckets mean the cached
+ * consensus still describes the market
+ */
+export function quantizeMarketState(inputs: MarketStateInputs): MarketFingerprint {
+  const priceStep = Math.log1p(CONSENSUS_CACHE_CONFIG.PRICE_STEP_PCT / 100);
+  const priceBucket = inputs.price > 0 ? Math.floor(Math.log(inputs.price) / priceStep) : 0;
+  const change = Number.isFinite(inputs.priceChangePercentage24h) ? inputs.priceChangePercentage24h : 0;
+  const direction = inputs.chatroomDirection || 'none';
+
+  return {
+    priceBucket,
+    changeBucket: Math.floor(change / CONSENSUS_CACHE_CONFIG.CHANGE_STEP_PCT),
+    direction,
+    // Strength means nothing without a direction
+    strengthBucket: direction === 'none'
+      ? 0
+      : Math.floor((inputs.chatroomStrength || 0) / CONSENSUS_CACHE_CONFIG.STRENGTH_STEP),
+  };
+}
+
+export function fingerprintKey(fingerprint: MarketFingerprint): string {
+  return `p${fingerprint.priceBucket}|c${fingerprint.changeBucket}|${fingerprint.direction}${fingerprint.strengthBucket}`;
+}
+
+function baseAsset(asset: string): string {
+  return asset.toUpperCase().split('/')[0];
+}
+
+/**
+ * Read the current market-state fingerprint for an asset, or null if the
+ * inputs are unavailable. Callers that already fetched the market data
+ * (batch consensus) pass it in.
+ */
+export async function readMarketFingerprint(asset: string, marketData?: MarketData): Promise<string | null> {
+  try {
+    const [market, chatroom] = await Promise.all([
+      marketData ?? fetchMarketData(baseAsset(asset)),
+      getState(),
+    ]);
+    // Stale data would pin results to an old market state for MAX_AGE_MS
+    if (!market || !(market.price > 0) || market.stale) return null;
+
+    // The chatroom debates one asset; its mood only says something about that one
+    const sameAsset = baseAsset(chatroom.currentAsset || 'BTC') === baseAsset(asset);
+    return fingerprintKey(quantizeMarketState({
+      price: market.price,
+      priceChangePercentage24h: market.priceChangePercentage24h,
+      chatroomDirection: sameAsset ? chatroom.consensusDirection : null,
+      chatroomStrength: sameAsset ? chatroom.consensusStrength : 0,
+    }));
+  } catch (error) {
+    console.warn('[consensus-cache] Market fingerprint unavailable:', error);
+    return null;
+  }
+}
+
+/**
+ * Quality of a consensus response: any failed or timed-out analyst makes it
+ * degraded, too few responses makes it unusable
+ */
+export function assessConsensusResult(value: unknown): ConsensusResultQuality {
+  if (!value || typeof value !== 'object') return 'ok';
+  const result = value as { consensus_status?: string; individual_votes?: Array<{ status?: string }> };
+  if (result.consensus_status === 'INSUFFICIENT_RESPONSES') return 'unusable';
+  if (result.individual_votes?.some(vote => vote.status !== 'success')) return 'degraded';
+  return 'ok';
+}
+
+/**
+ * Result cache whose entries stay valid while their fingerprint matches
+ */
+export class ConsensusResultCache<T> {
+  private results = new Map<string, CacheEntry<T>>();
+  private pending = new Map<string, Promise<T>>();
+  private hits = 0;
+  private misses = 0;
+  private shared = 0;
+  private invalidations: Record<InvalidationReason, number> = { fingerprint: 0, maxAge: 0, ttl: 0, evicted: 0 };
+  private hitAgeTotalMs = 0;
+  private maxHitAgeMs = 0;
+  private replacedAgeTotalMs = 0;
+  private degraded = 0;
+  private notCached = 0;
+
+  constructor(private options: ConsensusResultCacheOptions<T> = {}) {}
+
+  /**
+   * Return the cached result for key if it was computed for the same
+   * fingerprint, otherwise compute it (sharing concurrent computations)
+   */
+  async execute(key: string, fingerprint: string | null, fn: () => Promise<T>): Promise<ConsensusCacheResult<T>> {
+    const now = Date.now();
+    const cached = this.results.get(key);
+
+    if (cached) {
+      const ageMs = now - cached.computedAt;
+      const reason = this.invalidationReason(cached, fingerprint, ageMs);
+      if (!reason) {
+        this.hits++;
+        this.hitAgeTotalMs += ageMs;
+        this.maxHitAgeMs = Math.max(this.maxHitAgeMs, ageMs);
+        return { value: cached.value, status: 'hit', ageMs, fingerprint };
+      }
+      this.invalidations[reason]++;
+      if (reason === 'fingerprint') this.replacedAgeTotalMs += ageMs;
+      this.results.delete(key);
+    }
+
+    const pendingKey = `${key}@${fingerprint ?? '-'}`;
+    const pending = this.pending.get(pendingKey);
+    if (pending) {
+      this.shared++;
+      return { value: await pending, status: 'shared', ageMs: 0, fingerprint };
+    }
+
+    this.misses++;
+    const promise = fn().then(value => {
+      const quality = this.options.assess?.(value) ?? 'ok';
+      if (quality === 'unusable') {
+        this.notCached++;
+      } else {
+        if (quality === 'degraded') this.degraded++;
+        // Without a fingerprint the entry only lives for the wall-clock TTL
+        this.store(key, { value, fingerprint: quality === 'ok' ? fingerprint : null, computedAt: Date.now() });
+      }
+      return value;
+    }).finally(() => {
+      this.pending.delete(pendingKey);
+    });
+    this.pending.set(pendingKey, promise);
+
+    return { value: await promise, status: 'miss', ageMs: 0, fingerprint };
+  }
+
+  private invalidationReason(entry: CacheEntry<T>, fingerprint: string | null, ageMs: number): InvalidationReason | null {
+    if (fingerprint === null || entry.fingerprint === null) {
+      // No market state to compare: fall back to the wall-clock TTL
+      return ageMs < CACHE_TTL.CONSENSUS * 1000 ? null : 'ttl';
+    }
+    if (entry.fingerprint !== fingerprint) return 'fingerprint';
+    if (ageMs >= CONSENSUS_CACHE_CONFIG.MAX_AGE_MS) return 'maxAge';
+    return null;
+  }
+
+  private store(key: string, entry: CacheEntry<T>): void {
+    this.results.delete(key);
+    this.results.set(key, entry);
+    while (this.results.size > CONSENSUS_CACHE_CONFIG.MAX_ENTRIES) {
+      const oldest = this.results.keys().next().value as string;
+      this.results.delete(oldest);
+      this.invalidations.evicted++;
+    }
+  }
+
+  invalidateAll(): void {
+    this.results.clear();
+    this.pending.clear();
+  }
+
+  get size(): number {
+    return this.results.size;
+  }
+
+  getStats() {
+    const lookups = this.hits + this.misses + this.shared;
+    return {
+      entries: this.results.size,
+      pending: this.pending.size,
+      hits: this.hits,
+      misses: this.misses,
+      shared: this.shared,
+      hitRatio: lookups > 0 ? Math.round(((this.hits + this.shared) / lookups) * 1000) / 1000 : 0,
+      invalidations: { ...this.invalidations },
+      // How old served results were, and how long results lived before the market moved
+      avgHitAgeMs: this.hits > 0 ? Math.round(this.hitAgeTotalMs / this.hits) : 0,
+      maxHitAgeMs: this.maxHitAgeMs,
+      avgLifetimeBeforeChangeMs: this.invalidations.fingerprint > 0
+        ? Math.round(this.replacedAgeTotalMs / this.invalidations.fingerprint)
+        : 0,
+      maxAgeMs: CONSENSUS_CACHE_CONFIG.MAX_AGE_MS,
+      // Results cached for the wall-clock TTL only / not cached
+      degraded: this.degraded,
+      notCached: this.notCached,
+    };
+  }
+
+  resetStats(): void {
+    this.hits = 0;
+    this.misses = 0;
+    this.shared = 0;
+    this.invalidations = { fingerprint: 0, maxAge: 0, ttl: 0, evicted: 0 };
+    this.hitAgeTotalMs = 0;
+    this.maxHitAgeMs = 0;
+    this.replacedAgeTotalMs = 0;
+    this.degraded = 0;
+    this.notCached = 0;
+  }
+}
+
+export const consensusResultCache = new ConsensusResultCache<unknown>({ assess: assessConsensusResult });
+registerSizeGauge('consensus.resultCache', () => consensusResultCache.size);
+
+/**
+ * Run (or reuse) detailed consensus for asset + context, keyed by the
+ * current market-state fingerprint
+ */
+export async function getCachedConsensusResult<T>(
+  asset: string,
+  context: string | undefined,
+  fn: () => Promise<T>,
+  marketData?: MarketData
+): Promise<ConsensusCacheResult<T>> {
+  const key = generateCacheKeySync('consensus', { asset, context: context || '' });
+  const fingerprint = await readMarketFingerprint(asset, marketData);
+  return consensusResultCache.execute(key, fingerprint, fn) as Promise<ConsensusCacheResult<T>>;
+}
+
+export function getConsensusCacheStats() {
+  return consensusResultCache.getStats();
+}
+
+/**
+ * Reset cache state (for testing)
+ */
+export function resetConsensusCacheState(): void {
+  consensusResultCache.invalidateAll();
+  consensusResultCache.resetStats();
+}
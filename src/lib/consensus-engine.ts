@@ -30,7 +30,13 @@ import type { UserFacingError, ProgressUpdate } from './types';
 import { proxyFetch, isProxyConfigured, ProxyError, ProxyErrorType, isRetryableProxyError } from './proxy-fetch';
 import { withAICaching, consensusDeduplicator, getPerformanceMetrics as getAIPerformanceMetrics, AI_CACHE_TTL } from './ai-cache';
 import { recordTiming, recordCacheEvent } from './performance-metrics';
-import { getDebateContextForConsensus, mergeDebateContextWithUserContext, type DebateContextInjection } from './chatroom/consensus-context-bridge';
+import { getPromptContext, getPromptContextStats, type PromptContext } from './prompt-context';
+import { recordModelLatency, rankModels, getAdaptiveTimeout, getRouterSnapshot, type ModelRoutingSignals } from './model-router';
+import { hedgedRequest, getHedgeDelay, getHedgeStats } from './hedged-request';
+import { ErrorRateRing, type ErrorRateSummary } from './error-rate-ring';
+import { CorrelationLogBuffer, emitLog } from './log-pipeline';
+import { registerSizeGauge } from './process-metrics';
+import { getRuntimeSummary } from './runtime-metrics';
 
 // Rate limiting - track last request time per model
 const lastRequestTime: Record<string, number> = {};
@@ -120,16 +126,32 @@ export function generateCorrelationId(): string {
   return `cv-${Date.now()}-${Math.random().toString(36).substring(2, 15)}`;
 }
 
-// Structured logger for consensus engine
+interface ConsensusLogEntry {
+  timestamp: Date;
+  level: 'info' | 'warn' | 'error';
+  message: string;
+  correlationId?: string;
+  metadata?: Record<string, any>;
+}
+
+function formatConsensusLogEntry(entry: ConsensusLogEntry): string {
+  const corrId = entry.correlationId ? `[${entry.correlationId}]` : '';
+  let metadata = '';
+  if (entry.metadata) {
+    try {
+      metadata = ` ${JSON.stringify(entry.metadata)}`;
+    } catch {
+      metadata = ' [unserializable metadata]';
+    }
+  }
+  return `[${entry.timestamp.toISOString()}] ${entry.level.toUpperCase()} ${corrId} ${entry.message}${metadata}`;
+}
+
+// Structured logger for consensus engine. Recent entries are kept in bounded
+// per-correlation-id rings; output goes through the sampled, batched log pipeline.
 class ConsensusLogger {
   private static instance: ConsensusLogger;
-  private logs: Array<{
-    timestamp: Date;
-    level: 'info' | 'warn' | 'error';
-    message: string;
-    correlationId?: string;
-    metadata?: Record<string, any>;
-  }> = [];
+  private logs = new CorrelationLogBuffer<ConsensusLogEntry>();
 
   static getInstance(): ConsensusLogger {
     if (!ConsensusLogger.instance) {
@@ -156,7 +178,7 @@ class ConsensusLogger {
     correlationId?: string,
     metadata?: Record<string, any>
   ) {
-    const logEntry = {
+    const logEntry: ConsensusLogEntry = {
       timestamp: new Date(),
       level,
       message,
@@ -164,12 +186,8 @@ class ConsensusLogger {
       metadata,
     };
 
-    this.logs.push(logEntry);
-
-    // Console output for development
-    const timestamp = logEntry.timestamp.toISOString();
-    const corrId = correlationId ? `[${correlationId}]` : '';
-    console.log(`[${timestamp}] ${level.toUpperCase()} ${corrId} ${message}`, metadata || '');
+    this.logs.push(correlationId, logEntry);
+    emitLog(level, () => formatConsensusLogEntry(logEntry), { correlationId });
 
     // Integration point for external logging services (Sentry, etc.)
     this.sendToExternalServices(level, message, correlationId, metadata);
@@ -203,16 +221,21 @@ class ConsensusLogger {
   }
 
   getLogs(correlationId?: string) {
-    if (!correlationId) return this.logs;
-    return this.logs.filter(log => log.correlationId === correlationId);
+    if (!correlationId) return this.logs.all();
+    return this.logs.get(correlationId);
   }
 
   clear() {
-    this.logs = [];
+    this.logs.clear();
+  }
+
+  get size(): number {
+    return this.logs.entryCount;
   }
 }
 
 export const logger = ConsensusLogger.getInstance();
+registerSizeGauge('consensus.logBuffer', () => logger.size);
 
 /**
  * Create user-facing error messages with recovery guidance
@@ -708,77 +731,40 @@ const CIRCUIT_BREAKER_CONFIG = {
 const circuitBreakerStates: Record<string, CircuitBreakerState> = {};
 
 // Error rate tracking for time windows (for smarter circuit breaker decisions)
-interface ErrorRateEntry {
-  timestamp: number;
-  success: boolean;
-  modelId: string;
-  errorType?: ConsensusErrorType;
-}
-
 const ERROR_RATE_WINDOWS = {
   SHORT: 5 * 60 * 1000, // 5 minutes
   MEDIUM: 15 * 60 * 1000, // 15 minutes
   LONG: 60 * 60 * 1000, // 1 hour
 };
 
-// Circular buffer for error rate tracking (max 1000 entries per window)
-const errorHistory: ErrorRateEntry[] = [];
-const MAX_ERROR_HISTORY = 1000;
+// Time-bucketed counters covering the LONG window: one ring per model plus
+// one across all models, so neither query has to combine the other
+const modelErrorRates = new Map<string, ErrorRateRing>();
+const allModelsErrorRate = new ErrorRateRing();
 
 /**
  * Record an error or success for rate tracking
  */
 function recordErrorRateEvent(success: boolean, modelId: string, errorType?: ConsensusErrorType): void {
-  errorHistory.push({
-    timestamp: Date.now(),
-    success,
-    modelId,
-    errorType,
-  });
-
-  // Trim history if it gets too large
-  if (errorHistory.length > MAX_ERROR_HISTORY) {
-    errorHistory.shift();
+  const now = Date.now();
+  let ring = modelErrorRates.get(modelId);
+  if (!ring) {
+    ring = new ErrorRateRing();
+    modelErrorRates.set(modelId, ring);
   }
+  ring.record(success, errorType, now);
+  allModelsErrorRate.record(success, errorType, now);
 }
 
 /**
  * Calculate error rate for a specific time window and model
  */
-function getErrorRate(windowMs: number, modelId?: string): {
-  totalRequests: number;
-  errorCount: number;
-  errorRate: number; // 0-1
-  errorTypes: Record<string, number>;
-} {
-  const now = Date.now();
-  const cutoff = now - windowMs;
-
-  const filteredEntries = errorHistory.filter(entry => {
-    const withinWindow = entry.timestamp >= cutoff;
-    const matchesModel = !modelId || entry.modelId === modelId;
-    return withinWindow && matchesModel;
-  });
-
-  const totalRequests = filteredEntries.length;
-  const errorCount = filteredEntries.filter(e => !e.success).length;
-  const errorRate = totalRequests > 0 ? errorCount / totalRequests : 0;
-
-  // Count error types
-  const errorTypes: Record<string, number> = {};
-  filteredEntries
-    .filter(e => !e.success && e.errorType)
-    .forEach(e => {
-      const type = e.errorType!;
-      errorTypes[type] = (errorTypes[type] || 0) + 1;
-    });
-
-  return {
-    totalRequests,
-    errorCount,
-    errorRate,
-    errorTypes,
-  };
+function getErrorRate(windowMs: number, modelId?: string): ErrorRateSummary {
+  const ring = modelId ? modelErrorRates.get(modelId) : allModelsErrorRate;
+  if (!ring) {
+    return { totalRequests: 0, errorCount: 0, errorRate: 0, errorTypes: {} };
+  }
+  return ring.window(windowMs);
 }
 
 /**
@@ -902,6 +888,26 @@ function recordCircuitBreakerSuccess(modelId: string): void {
   recordErrorRateEvent(true, modelId);
 }
 
+/**
+ * Live health signals for the adaptive router
+ */
+function getRoutingSignals(modelId: string): ModelRoutingSignals {
+  const state = circuitBreakerStates[modelId];
+  return {
+    errorRate: getErrorRate(ERROR_RATE_WINDOWS.SHORT, modelId).errorRate,
+    circuitOpen: isCircuitOpen(modelId),
+    halfOpen: !!state && !state.isOpen && state.failureCount > 0,
+  };
+}
+
+/**
+ * Order fallback candidates by live health (EWMA latency, error rate,
+ * circuit state), keeping the configured order as the tie-breaker
+ */
+export function rankFallbackModels(modelIds: string[]): string[] {
+  return rankModels(modelIds, getRoutingSignals);
+}
+
 /**
  * Update performance metrics for a model
  */
@@ -1019,87 +1025,13 @@ export function getSystemHealthSummary() {
   return {
     overall: overallHealth,
     models: healthStatuses,
+    routing: getRouterSnapshot(),
+    hedging: getHedgeStats(),
+    promptContext: getPromptContextStats(),
+    runtime: getRuntimeSummary(),
   };
 }
 
-/**
- * Build enhanced prompt with better structure and context
- */
-/**
- * CVAULT-190: Build enhanced prompt with debate context injection
- * 
- * This function has been enhanced to optionally include recent debate insights
- * from the chatroom debate phase, allowing consensus analysts to benefit
- * from the AI panel's collective reasoning before reaching consensus.
- */
-async function buildEnhancedPrompt(asset: string, context?: string): Promise<string> {
-  const basePrompt = `Analyze ${asset.toUpperCase()} for a trading signal.`;
-
-  try {
-    // Check for recent debate context
-    const debateContext: DebateContextInjection = await getDebateContextForConsensus();
-    
-    if (debateContext.shouldInclude) {
-      console.log('[CVAULT-190] Including debate context in consensus prompt:', {
-        direction: debateContext.metadata.debateDirection,
-        strength: debateContext.metadata.debateStrength,
-        ageMinutes: Math.round(debateContext.metadata.ageMs / 60000),
-        reason: debateContext.metadata.reason
-      });
-      
-      // Merge debate context with user context
-      const mergedContext = mergeDebateContextWithUserContext(
-        debateContext.contextString,
-        context?.trim()
-      );
-      
-      return `${basePrompt}
-
-${mergedContext}
-
-Instructions:
-1. Consider the provided context and debate insights alongside your specialized expertise
-2. Reference specific arguments or data points from the debate that influence your analysis
-3. Focus on actionable insights relevant to current market conditions
-4. Be specific about key levels, metrics, or indicators
-5. Provide clear, concise reasoning for your signal
-6. Note how (if at all) the debate insights influenced your final decision
-
-Remember: Respond ONLY with valid JSON in the exact format specified.`;
-    } else {
-      console.log('[CVAULT-190] Skipping debate context:', debateContext.metadata.reason);
-    }
-  } catch (error) {
-    console.warn('[CVAULT-190] Error fetching debate context, proceeding without:', error);
-  }
-
-  // Fallback to original prompt without debate context
-  if (context && context.trim()) {
-    return `${basePrompt}
-
-Additional Context: ${context}
-
-Instructions:
-1. Consider the provided context alongside your specialized expertise
-2. Focus on actionable insights relevant to current market conditions
-3. Be specific about key levels, metrics, or indicators
-4. Provide a clear, concise reasoning for your signal
-
-Remember: Respond ONLY with valid JSON in the exact format specified.`;
-  }
-
-  return `${basePrompt}
-
-Instructions:
-1. Analyze current market conditions for ${asset.toUpperCase()}
-2. Apply your specialized analytical framework
-3. Identify the most significant factors influencing the market
-4. Provide clear, specific reasoning for your signal
-5. Base confidence on the strength and alignment of your signals
-
-Remember: Respond ONLY with valid JSON in the exact format specified.`;
-}
-
 /**
  * Call a single AI model with the analysis prompt
  *
@@ -1114,6 +1046,8 @@ Remember: Respond ONLY with valid JSON in the exact format specified.`;
  * @param asset - Crypto asset symbol to analyze
  * @param context - Optional user-provided context
  * @param retryCount - Current retry attempt (internal, starts at 0)
+ * @param signal - Optional cancellation signal (e.g. a hedged call that lost)
+ * @param promptContext - Prompt shared by every analyst in the run (built on demand if omitted)
  * @returns Parsed model response with signal, confidence, reasoning
  * @throws {ConsensusError} - On API errors, timeouts, network issues, etc.
  *
@@ -1127,8 +1061,14 @@ async function callModel(
   config: ModelConfig,
   asset: string,
   context?: string,
-  retryCount = 0
+  retryCount = 0,
+  signal?: AbortSignal,
+  promptContext?: PromptContext
 ): Promise<ModelResponse> {
+  if (signal?.aborted) {
+    throw new ConsensusError('Request cancelled', ConsensusErrorType.TIMEOUT, config.id);
+  }
+
   // Circuit breaker check - skip models that are consistently failing
   if (isCircuitOpen(config.id)) {
     throw new ConsensusError(
@@ -1163,20 +1103,28 @@ async function callModel(
 
   // Enhanced user prompt with better context and structure
   // CVAULT-190: Enhanced to include debate context when available
-  const userPrompt = await buildEnhancedPrompt(asset, context);
-
-  // Ensure timeout is within acceptable bounds
-  const timeout = Math.min(
-    Math.max(config.timeout, TIMEOUT_CONFIG.MIN_TIMEOUT),
-    TIMEOUT_CONFIG.MAX_TIMEOUT
+  const userPrompt = (promptContext ?? await getPromptContext(asset, context)).userPrompt;
+
+  // Ensure timeout is within acceptable bounds, then tighten it to what
+  // this model has actually been taking (adaptive routing)
+  const timeout = getAdaptiveTimeout(
+    config.id,
+    Math.min(
+      Math.max(config.timeout, TIMEOUT_CONFIG.MIN_TIMEOUT),
+      TIMEOUT_CONFIG.MAX_TIMEOUT
+    ),
+    TIMEOUT_CONFIG.MIN_TIMEOUT
   );
+  const requestStart = Date.now();
 
-  // Create abort controller for timeout
+  // Create abort controller for timeout (also aborted by the caller's signal)
   const controller = new AbortController();
   const timeoutId = setTimeout(() => {
     console.warn(`[${config.id}] Request timeout after ${timeout}ms`);
     controller.abort();
   }, timeout);
+  const onCancel = () => controller.abort();
+  signal?.addEventListener('abort', onCancel, { once: true });
 
   try {
     let response: Response;
@@ -1314,8 +1262,9 @@ async function callModel(
       }
 
       const result = parseModelResponse(text, config.id);
-      // Success - record for circuit breaker
+      // Success - record for circuit breaker and latency routing
       recordCircuitBreakerSuccess(config.id);
+      recordModelLatency(config.id, Date.now() - requestStart, true);
       return result;
     } else if (config.provider === 'anthropic') {
       // Anthropic-compatible API (GLM, Kimi)
@@ -1444,8 +1393,9 @@ async function callModel(
       }
 
       const result = parseModelResponse(text, config.id);
-      // Success - record for circuit breaker
+      // Success - record for circuit breaker and latency routing
       recordCircuitBreakerSuccess(config.id);
+      recordModelLatency(config.id, Date.now() - requestStart, true);
       return result;
     } else {
       // OpenAI-compatible API (DeepSeek, MiniMax)
@@ -1580,8 +1530,9 @@ async function callModel(
       }
 
       const result = parseModelResponse(text, config.id);
-      // Success - record for circuit breaker
+      // Success - record for circuit breaker and latency routing
       recordCircuitBreakerSuccess(config.id);
+      recordModelLatency(config.id, Date.now() - requestStart, true);
       return result;
     }
   } catch (error) {
@@ -1589,6 +1540,11 @@ async function callModel(
 
     // Handle abort/timeout errors
     if (error instanceof Error && error.name === 'AbortError') {
+      if (signal?.aborted) {
+        // Cancelled by the caller, not a timeout - don't count it against the model
+        throw new ConsensusError('Request cancelled', ConsensusErrorType.TIMEOUT, config.id, error);
+      }
+      recordModelLatency(config.id, Date.now() - requestStart, false);
       throw new ConsensusError(
         `Request timed out after ${timeout}ms`,
         ConsensusErrorType.TIMEOUT,
@@ -1658,7 +1614,7 @@ async function callModel(
           `[${config.id}] Retrying after ${error.type} (attempt ${retryCount + 1}/${MAX_RETRIES}, delay: ${delay}ms)`
         );
         await new Promise((resolve) => setTimeout(resolve, delay));
-        return callModel(config, asset, context, retryCount + 1);
+        return callModel(config, asset, context, retryCount + 1, signal, promptContext);
       }
       throw error;
     }
@@ -1675,6 +1631,7 @@ async function callModel(
     throw wrappedError;
   } finally {
     clearTimeout(timeoutId);
+    signal?.removeEventListener('abort', onCancel);
     // Ensure AbortController is cleaned up to prevent memory leaks
     if (!controller.signal.aborted) {
       controller.abort();
@@ -1798,6 +1755,44 @@ function parseModelResponse(text: string, modelId: string): ModelResponse {
   }
 }
 
+/**
+ * Build the config for running a fallback model under the primary's role.
+ * Returns null if the fallback isn't active or has no API key configured.
+ */
+function buildFallbackConfig(
+  primaryConfig: ModelConfig,
+  fallbackId: string,
+  activeModels: ModelConfig[]
+): ModelConfig | null {
+  const fallbackProvider = activeModels.find((m) => m.id === fallbackId);
+  if (!fallbackProvider) return null;
+
+  // Check if fallback has an API key configured
+  const fallbackKey = fallbackProvider.provider === 'google'
+    ? getGeminiApiKey()
+    : process.env[fallbackProvider.apiKeyEnv];
+  if (!fallbackKey) return null;
+
+  // Create config that uses fallback's provider but primary's role prompt
+  return {
+    ...fallbackProvider,
+    systemPrompt: primaryConfig.systemPrompt, // Keep the role identity
+  };
+}
+
+/**
+ * Pick the backup model for hedging a straggling primary call:
+ * the best-ranked configured fallback whose circuit is closed
+ */
+function selectHedgeBackup(primaryConfig: ModelConfig, activeModels: ModelConfig[]): ModelConfig | null {
+  for (const fallbackId of rankFallbackModels(getFallbackOrder(primaryConfig.id))) {
+    if (isCircuitOpen(fallbackId)) continue;
+    const fallbackConfig = buildFallbackConfig(primaryConfig, fallbackId, activeModels);
+    if (fallbackConfig) return fallbackConfig;
+  }
+  return null;
+}
+
 /**
  * Get analysis from a single model, with fallback to alternative models
  *
@@ -1810,6 +1805,10 @@ function parseModelResponse(text: string, modelId: string): ModelResponse {
  * - Keeps original role identity (e.g., "Technical Analyst via Gemini")
  * - Uses the same system prompt to maintain analytical perspective
  *
+ * **Hedging:**
+ * - If the primary call runs past its latency percentile (see hedged-request.ts),
+ *   a backup call goes to the best-ranked fallback and the first answer wins
+ *
  * **Error Handling:**
  * - All errors are wrapped in UserFacingError objects
  * - Results include error field if all models fail
@@ -1819,6 +1818,12 @@ function parseModelResponse(text: string, modelId: string): ModelResponse {
  * @param asset - Crypto asset symbol to analyze
  * @param context - Optional user-provided context
  * @param onProgress - Optional callback for progress updates
+ * @param models - Optional active model list captured by the caller, so every
+ *   analyst in one consensus run sees the same config even across a hot reload
+ * @param promptContext - Optional prompt built once by the caller and shared by
+ *   every analyst in the run (see prompt-context.ts)
+ * @param signal - Optional run cancellation; stops the fallback chain (the
+ *   primary call may be shared through the AI cache and runs to completion)
  * @returns AnalystResult with response time, or error details if all models fail
  *
  * @example
@@ -1835,10 +1840,13 @@ export async function getAnalystOpinion(
   modelId: string,
   asset: string,
   context?: string,
-  onProgress?: (progress: ProgressUpdate) => void
+  onProgress?: (progress: ProgressUpdate) => void,
+  models?: ModelConfig[],
+  promptContext?: PromptContext,
+  signal?: AbortSignal
 ): Promise<{ result: AnalystResult; responseTime: number }> {
   const startTime = Date.now();
-  const activeModels = getActiveAnalystModels();
+  const activeModels = models ?? getActiveAnalystModels();
   const primaryConfig = activeModels.find((m) => m.id === modelId);
 
   if (!primaryConfig) {
@@ -1869,28 +1877,45 @@ export async function getAnalystOpinion(
   try {
     sendProgress('processing', 'Analyzing market data...');
     
-    // Use AI caching to avoid duplicate API calls
-    const { result: response, cached, responseTimeMs } = await withAICaching(
+    // Use AI caching to avoid duplicate API calls; hedge a straggling
+    // primary call with its best fallback. A backup's answer is cached with
+    // its id, so cache hits (here or on another instance) still credit it.
+    const hedgeBackup = selectHedgeBackup(primaryConfig, activeModels);
+    const { result: response, cached, responseTimeMs } = await withAICaching<ModelResponse & { answeredBy?: string }>(
       primaryConfig.id,
       asset,
       context,
-      () => callModel(primaryConfig, asset, context),
+      async () => {
+        const { value, winner } = await hedgedRequest(
+          (signal) => callModel(primaryConfig, asset, context, 0, signal, promptContext),
+          hedgeBackup ? (signal) => callModel(hedgeBackup, asset, context, 0, signal, promptContext) : null,
+          getHedgeDelay(primaryConfig.id),
+          () => {
+            console.log(`[${primaryConfig.id}] Slow primary, hedging with ${hedgeBackup?.id}`);
+            sendProgress('slow', `Taking longer than expected, also asking ${hedgeBackup?.name}...`);
+          }
+        );
+        return winner === 'backup' && hedgeBackup ? { ...value, answeredBy: hedgeBackup.id } : value;
+      },
       { ttlSeconds: AI_CACHE_TTL.MODEL_RESPONSE, trackPerformance: true }
     );
     
     const totalResponseTime = Date.now() - startTime;
-    updateMetrics(primaryConfig.id, true, totalResponseTime);
+    const answeredBy = response.answeredBy
+      ? activeModels.find((m) => m.id === response.answeredBy) ?? { id: response.answeredBy, name: response.answeredBy }
+      : null;
+    updateMetrics(answeredBy ? answeredBy.id : primaryConfig.id, true, totalResponseTime);
     
     if (cached) {
       sendProgress('completed', 'Analysis complete (cached)');
     } else {
-      sendProgress('completed', 'Analysis complete');
+      sendProgress('completed', answeredBy ? 'Analysis complete (hedged)' : 'Analysis complete');
     }
 
     return {
       result: {
         id: primaryConfig.id,
-        name: primaryConfig.name,
+        name: answeredBy ? `${primaryConfig.name} (via ${answeredBy.name})` : primaryConfig.name,
         sentiment: signalToSentiment(response.signal),
         confidence: response.confidence,
         reasoning: response.reasoning,
@@ -1918,28 +1943,18 @@ export async function getAnalystOpinion(
     sendProgress('failed', `Primary model failed: ${userError.message}`);
 
     // Try fallback models with the SAME role prompt
-    // CVAULT-236: Use dynamic fallback order
-    const fallbackIds = getFallbackOrder(modelId);
+    // CVAULT-236: Use dynamic fallback order, ranked by live health
+    const fallbackIds = rankFallbackModels(getFallbackOrder(modelId));
     for (const fallbackId of fallbackIds) {
-      const fallbackProvider = activeModels.find((m) => m.id === fallbackId);
-      if (!fallbackProvider) continue;
-
-      // Check if fallback has an API key configured
-      const fallbackKey = fallbackProvider.provider === 'google'
-        ? getGeminiApiKey()
-        : process.env[fallbackProvider.apiKeyEnv];
-      if (!fallbackKey) continue;
-
-      // Create config that uses fallback's provider but primary's role prompt
-      const fallbackConfig: ModelConfig = {
-        ...fallbackProvider,
-        systemPrompt: primaryConfig.systemPrompt, // Keep the role identity
-      };
+      // Nobody is waiting for this run any more
+      if (signal?.aborted) break;
+      const fallbackConfig = buildFallbackConfig(primaryConfig, fallbackId, activeModels);
+      if (!fallbackConfig) continue;
 
       try {
         console.log(`[${primaryConfig.id}] Trying fallback: ${fallbackId}`);
-        sendProgress('processing', `Trying fallback: ${fallbackProvider.name}...`);
-        const response = await callModel(fallbackConfig, asset, context);
+        sendProgress('processing', `Trying fallback: ${fallbackConfig.name}...`);
+        const response = await callModel(fallbackConfig, asset, context, 0, signal, promptContext);
         const responseTime = Date.now() - startTime;
         updateMetrics(fallbackId, true, responseTime);
         sendProgress('completed', 'Fallback analysis complete');
@@ -1947,7 +1962,7 @@ export async function getAnalystOpinion(
         return {
           result: {
             id: primaryConfig.id, // Keep original role identity
-            name: `${primaryConfig.name} (via ${fallbackProvider.name})`,
+            name: `${primaryConfig.name} (via ${fallbackConfig.name})`,
             sentiment: signalToSentiment(response.signal),
             confidence: response.confidence,
             reasoning: response.reasoning,
@@ -2008,6 +2023,7 @@ export async function getAnalystOpinion(
  * @param context - Optional user-provided context
  * @param onProgress - Optional callback when each analyst completes
  * @param onModelProgress - Optional callback for model execution progress
+ * @param signal - Optional cancellation for a run nobody is waiting for
  * @returns Aggregated consensus with all analyst results and timing data
  *
  * @example
@@ -2027,7 +2043,8 @@ export async function runConsensusAnalysis(
   asset: string,
   context?: string,
   onProgress?: (result: AnalystResult) => void,
-  onModelProgress?: (progress: ProgressUpdate) => void
+  onModelProgress?: (progress: ProgressUpdate) => void,
+  signal?: AbortSignal
 ): Promise<{
   analysts: AnalystResult[];
   consensus: ReturnType<typeof calculateConsensus>;
@@ -2045,10 +2062,12 @@ export async function runConsensusAnalysis(
 
   // CVAULT-236: Use dynamic model configuration
   const activeModels = getActiveAnalystModels();
+  // Build the shared analyst prompt once for the whole run
+  const promptContext = await getPromptContext(asset, context);
 
   // Run all models in parallel using Promise.allSettled for resilience
   const promises = activeModels.map(async (config) => {
-    const { result, responseTime } = await getAnalystOpinion(config.id, asset, context, onModelProgress);
+    const { result, responseTime } = await getAnalystOpinion(config.id, asset, context, onModelProgress, activeModels, promptContext, signal);
     responseTimes.set(config.id, responseTime);
 
     // Track failures for partial failure reporting
@@ -2131,10 +2150,12 @@ export async function runDetailedConsensusAnalysis(
 
   // CVAULT-236: Use dynamic model configuration
   const activeModels = getActiveAnalystModels();
+  // Build the shared analyst prompt once for the whole run
+  const promptContext = await getPromptContext(asset, context);
 
   // Run all models in parallel using Promise.allSettled for resilience
   const promises = activeModels.map(async (config) => {
-    const { result, responseTime } = await getAnalystOpinion(config.id, asset, context, onModelProgress);
+    const { result, responseTime } = await getAnalystOpinion(config.id, asset, context, onModelProgress, activeModels, promptContext);
     responseTimes.set(config.id, responseTime);
     return result;
   });
@@ -2175,10 +2196,11 @@ export async function* streamConsensusAnalysis(
 
   // CVAULT-236: Use dynamic model configuration
   const activeModels = getActiveAnalystModels();
+  const promptContext = await getPromptContext(asset, context);
 
   // Create promises that yield as they complete
   const promises = activeModels.map(async (config) => {
-    const { result } = await getAnalystOpinion(config.id, asset, context, onModelProgress);
+    const { result } = await getAnalystOpinion(config.id, asset, context, onModelProgress, activeModels, promptContext);
     return result;
   });
 
@@ -0,0 +1,210 @@
+/**
+ * Replayable Consensus Stream Runs
+ *
+ * Each GET /api/consensus stream is a "run" that publishes its events to its
+ * own SseChannel, using the run id as the event id epoch. A client that drops
+ * mid-analysis and reconnects with Last-Event-ID is re-attached to the same
+ * run and only receives the events it missed, instead of starting a second
+ * five-model fan-out.
+ *
+ * Runs keep executing while their client is briefly disconnected and are
+ * kept for RUN_RETENTION_MS after they complete. A run that has had no
+ * subscriber for ORPHAN_GRACE_MS is aborted and dropped, so nobody pays for
+ * model calls no client will see.
+ *
+ * Configuration (environment):
+ *   CONSENSUS_RUN_ORPHAN_GRACE_MS=15000   How long a run waits for a reconnect
+ */
+
+import { SseChannel, parseSseEventId, type SseSubscriber, type SseSubscription } from './sse-channel';
+
+export const CONSENSUS_RUN_CONFIG = {
+  RUN_RETENTION_MS: 2 * 60 * 1000,
+  // Runs that never complete (hung provider calls) are dropped after this
+  MAX_RUN_AGE_MS: 10 * 60 * 1000,
+  // In-flight runs without a subscriber are aborted after this
+  ORPHAN_GRACE_MS: parseInt(process.env.CONSENSUS_RUN_ORPHAN_GRACE_MS || '15000', 10),
+  MAX_RETAINED_RUNS: 100,
+  // A run publishes at most a couple of dozen events
+  REPLAY_SIZE: 64,
+};
+
+export interface ConsensusRun {
+  runId: string;
+  asset: string;
+  channel: SseChannel;
+  /** Aborted when the run is evicted or abandoned by its clients */
+  signal: AbortSignal;
+}
+
+interface RunEntry {
+  run: ConsensusRun;
+  controller: AbortController;
+  createdAt: number;
+  completedAt: number | null;
+  subscribers: number;
+  orphanTimer: ReturnType<typeof setTimeout> | null;
+}
+
+const runs = new Map<string, RunEntry>();
+
+const stats = {
+  created: 0,
+  resumed: 0,
+  resumeMisses: 0,
+  evicted: 0,
+  orphaned: 0,
+};
+
+function clearOrphanTimer(entry: RunEntry): void {
+  if (entry.orphanTimer) {
+    clearTimeout(entry.orphanTimer);
+    entry.orphanTimer = null;
+  }
+}
+
+function evict(runId: string, entry: RunEntry): void {
+  clearOrphanTimer(entry);
+  entry.controller.abort();
+  entry.run.channel.close();
+  runs.delete(runId);
+  stats.evicted++;
+}
+
+/**
+ * Drop completed runs past retention, then the oldest runs if over capacity
+ */
+function pruneRuns(now: number = Date.now()): void {
+  for (const [runId, entry] of runs) {
+    const expiresAt = entry.completedAt !== null
+      ? entry.completedAt + CONSENSUS_RUN_CONFIG.RUN_RETENTION_MS
+      : entry.createdAt + CONSENSUS_RUN_CONFIG.MAX_RUN_AGE_MS;
+    if (now > expiresAt) {
+      evict(runId, entry);
+    }
+  }
+
+  // Map iteration order is insertion order, so this drops the oldest runs
+  for (const [runId, entry] of runs) {
+    if (runs.size <= CONSENSUS_RUN_CONFIG.MAX_RETAINED_RUNS) break;
+    evict(runId, entry);
+  }
+}
+
+/**
+ * Start a new run with its own replayable channel
+ */
+export function createConsensusRun(asset: string): ConsensusRun {
+  pruneRuns();
+
+  const runId = `run${Date.now().toString(36)}${Math.random().toString(36).slice(2, 6)}`;
+  const controller = new AbortController();
+  const run: ConsensusRun = {
+    runId,
+    asset,
+    channel: new SseChannel(`consensus:${asset}`, {
+      epoch: runId,
+      replaySize: CONSENSUS_RUN_CONFIG.REPLAY_SIZE,
+    }),
+    signal: controller.signal,
+  };
+
+  runs.set(runId, { run, controller, createdAt: Date.now(), completedAt: null, subscribers: 0, orphanTimer: null });
+  stats.created++;
+  return run;
+}
+
+/**
+ * Mark a run finished; it stays resumable for RUN_RETENTION_MS
+ */
+export function completeConsensusRun(runId: string): void {
+  const entry = runs.get(runId);
+  if (!entry) return;
+  entry.completedAt = Date.now();
+  clearOrphanTimer(entry);
+}
+
+/**
+ * Subscribe a connection to a run's channel. When the last subscriber of
+ * an in-flight run leaves, the run is aborted unless someone re-attaches
+ * within ORPHAN_GRACE_MS.
+ */
+export function subscribeToConsensusRun(
+  run: ConsensusRun,
+  subscriber: SseSubscriber,
+  lastEventId?: string | null
+): SseSubscription {
+  const subscription = run.channel.subscribe(subscriber, lastEventId);
+  const entry = runs.get(run.runId);
+  if (!entry) return subscription;
+
+  entry.subscribers++;
+  clearOrphanTimer(entry);
+
+  let attached = true;
+  return {
+    ...subscription,
+    unsubscribe: () => {
+      subscription.unsubscribe();
+      if (!attached) return;
+      attached = false;
+      entry.subscribers--;
+      if (entry.subscribers > 0 || entry.completedAt !== null || runs.get(run.runId) !== entry) return;
+
+      entry.orphanTimer = setTimeout(() => {
+        entry.orphanTimer = null;
+        if (entry.subscribers > 0 || entry.completedAt !== null || runs.get(run.runId) !== entry) return;
+        console.log(`[consensus-runs] Aborting ${run.runId} (${run.asset}): no subscribers for ${CONSENSUS_RUN_CONFIG.ORPHAN_GRACE_MS}ms`);
+        stats.orphaned++;
+        evict(run.runId, entry);
+      }, CONSENSUS_RUN_CONFIG.ORPHAN_GRACE_MS);
+      entry.orphanTimer.unref?.();
+    },
+  };
+}
+
+/**
+ * Find the run a Last-Event-ID belongs to (null if unknown or expired)
+ */
+export function findConsensusRun(lastEventId: string): ConsensusRun | null {
+  pruneRuns();
+
+  const parsed = parseSseEventId(lastEventId);
+  const entry = parsed ? runs.get(parsed.epoch) : undefined;
+  if (!entry) {
+    stats.resumeMisses++;
+    return null;
+  }
+
+  stats.resumed++;
+  return entry.run;
+}
+
+export function getConsensusRunStats() {
+  let active = 0;
+  for (const entry of runs.values()) {
+    if (entry.completedAt === null) active++;
+  }
+  return {
+    retained: runs.size,
+    active,
+    ...stats,
+  };
+}
+
+/**
+ * Reset all runs (for testing)
+ */
+export function resetConsensusRuns(): void {
+  for (const [runId, entry] of runs) {
+    clearOrphanTimer(entry);
+    entry.controller.abort();
+    entry.run.channel.close();
+    runs.delete(runId);
+  }
+  stats.created = 0;
+  stats.resumed = 0;
+  stats.resumeMisses = 0;
+  stats.evicted = 0;
+  stats.orphaned = 0;
+}
@@ -0,0 +1,27 @@
+/**
+ * Access check for /api/debug/* routes
+ *
+ * Debug endpoints are disabled in production unless DEBUG_ENDPOINTS_ENABLED=true
+ * or DEBUG_METRICS_SECRET is set; when DEBUG_METRICS_SECRET is set, requests
+ * need `Authorization: Bearer <secret>`.
+ */
+
+import { NextRequest, NextResponse } from 'next/server';
+
+/**
+ * The error response to return, or null when the request may proceed
+ */
+export function checkDebugAccess(request: NextRequest, tag: string): NextResponse | null {
+  const secret = process.env.DEBUG_METRICS_SECRET;
+  const enabled = process.env.NODE_ENV !== 'production' ||
+    process.env.DEBUG_ENDPOINTS_ENABLED === 'true' || !!secret;
+
+  if (!enabled) {
+    return NextResponse.json({ error: 'Not found' }, { status: 404 });
+  }
+  if (secret && request.headers.get('authorization') !== `Bearer ${secret}`) {
+    console.warn(`[${tag}] Unauthorized request attempt`);
+    return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+  }
+  return null;
+}
@@ -0,0 +1,117 @@
+/**
+ * Bucketed Error-Rate Ring
+ *
+ * Success/error counts for the circuit breaker, kept in fixed time buckets
+ * (10s by default) in a ring that covers a full hour. Recording is O(1) and
+ * a window query sums at most horizon / bucket buckets, however many
+ * requests there were — unlike a capped event list, the last hour really is
+ * the last hour under load.
+ *
+ * Each slot remembers which bucket it holds; a slot left over from a
+ * previous lap of the ring is reset on write and skipped on read, so idle
+ * periods need no cleanup pass.
+ *
+ * Windows are bucket-aligned: a query includes every bucket that overlaps
+ * the window, so it may reach up to one bucket further back than asked.
+ */
+
+export const ERROR_RATE_RING_CONFIG = {
+  BUCKET_MS: 10 * 1000,
+  HORIZON_MS: 60 * 60 * 1000,
+};
+
+export interface ErrorRateSummary {
+  totalRequests: number;
+  errorCount: number;
+  errorRate: number; // 0-1
+  errorTypes: Record<string, number>;
+}
+
+interface Bucket {
+  /** Bucket number (timestamp / bucketMs) this slot currently holds */
+  index: number;
+  total: number;
+  errors: number;
+  errorTypes: Record<string, number> | null;
+}
+
+export class ErrorRateRing {
+  private readonly buckets: Bucket[];
+
+  constructor(
+    private readonly bucketMs: number = ERROR_RATE_RING_CONFIG.BUCKET_MS,
+    horizonMs: number = ERROR_RATE_RING_CONFIG.HORIZON_MS
+  ) {
+    // One extra slot so a full-horizon window still has its oldest
+    // (partially covered) bucket when the current bucket is partial
+    const size = Math.ceil(horizonMs / bucketMs) + 1;
+    this.buckets = Array.from({ length: size }, () => ({ index: -1, total: 0, errors: 0, errorTypes: null }));
+  }
+
+  /**
+   * Count one request outcome
+   */
+  record(success: boolean, errorType?: string, now: number = Date.now()): void {
+    const index = Math.floor(now / this.bucketMs);
+    const bucket = this.buckets[index % this.buckets.length];
+    if (bucket.index !== index) {
+      bucket.index = index;
+      bucket.total = 0;
+      bucket.errors = 0;
+      bucket.errorTypes = null;
+    }
+
+    bucket.total++;
+    if (!success) {
+      bucket.errors++;
+      if (errorType) {
+        bucket.errorTypes ??= {};
+        bucket.errorTypes[errorType] = (bucket.errorTypes[errorType] || 0) + 1;
+      }
+    }
+  }
+
+  /**
+   * Totals for the last `windowMs` (capped at the ring's horizon)
+   */
+  window(windowMs: number, now: number = Date.now()): ErrorRateSummary {
+    const current = Math.floor(now / this.bucketMs);
+    const oldest = Math.max(
+      Math.floor((now - windowMs) / this.bucketMs),
+      current - this.buckets.length + 1
+    );
+
+    let totalRequests = 0;
+    let errorCount = 0;
+    const errorTypes: Record<string, number> = {};
+
+    for (let index = current; index >= oldest; index--) {
+      const bucket = this.buckets[index % this.buckets.length];
+      if (bucket.index !== index) continue; // Empty, or left from an earlier lap
+
+      totalRequests += bucket.total;
+      errorCount += bucket.errors;
+      if (bucket.errorTypes) {
+        for (const [type, count] of Object.entries(bucket.errorTypes)) {
+          errorTypes[type] = (errorTypes[type] || 0) + count;
+        }
+      }
+    }
+
+    return {
+      totalRequests,
+      errorCount,
+      errorRate: totalRequests > 0 ? errorCount / totalRequests : 0,
+      errorTypes,
+    };
+  }
+
+  clear(): void {
+    for (const bucket of this.buckets) {
+      bucket.index = -1;
+      bucket.total = 0;
+      bucket.errors = 0;
+      bucket.errorTypes = null;
+    }
+  }
+}
@@ -0,0 +1,167 @@
+/**
+ * Hedged Requests for Straggling Analyst Calls
+ *
+ * When a model call runs past a latency percentile of its own recent
+ * history, fire one backup call (the analyst's best-ranked fallback model)
+ * and take whichever answers first. The loser is aborted.
+ *
+ * Hedging is budgeted with a token bucket that is refilled by primary
+ * calls: each primary call earns MAX_HEDGE_RATIO of a hedge, capped at
+ * BURST. During a provider outage every call is slow, but the bucket
+ * drains and hedging stops instead of doubling load on the fallbacks.
+ *
+ * Configuration (environment):
+ *   HEDGE_REQUESTS=false       Disable hedging
+ *   HEDGE_PERCENTILE=95        Latency percentile that triggers a hedge
+ *   HEDGE_MAX_RATIO=0.1        Max hedges per primary call (long run)
+ */
+
+import { getLatencyPercentile } from './model-router';
+
+export const HEDGE_CONFIG = {
+  ENABLED: process.env.HEDGE_REQUESTS !== 'false',
+  PERCENTILE: parseFloat(process.env.HEDGE_PERCENTILE || '95'),
+  DEFAULT_DELAY_MS: 15000, // Used until a model has latency history (matches the "slow" threshold)
+  MIN_DELAY_MS: 2000, // Never hedge sooner than this
+  MAX_HEDGE_RATIO: parseFloat(process.env.HEDGE_MAX_RATIO || '0.1'),
+  BURST: 3, // Max hedges that can be spent back to back
+};
+
+export type HedgeWinner = 'primary' | 'backup';
+
+export interface HedgedResult<T> {
+  value: T;
+  winner: HedgeWinner;
+  hedged: boolean; // Whether a backup call was actually started
+}
+
+// Hedge budget (token bucket refilled by primary calls)
+let hedgeTokens = HEDGE_CONFIG.BURST;
+
+const hedgeStats = {
+  primaryCalls: 0,
+  hedgesStarted: 0,
+  hedgesWon: 0,
+  hedgesSkippedBudget: 0,
+};
+
+/**
+ * Delay after which a call to this model should be hedged
+ */
+export function getHedgeDelay(modelId: string): number {
+  const percentileLatency = getLatencyPercentile(modelId, HEDGE_CONFIG.PERCENTILE);
+  if (percentileLatency === undefined) {
+    return HEDGE_CONFIG.DEFAULT_DELAY_MS;
+  }
+  return Math.max(HEDGE_CONFIG.MIN_DELAY_MS, Math.round(percentileLatency));
+}
+
+function recordPrimaryCall(): void {
+  hedgeStats.primaryCalls++;
+  hedgeTokens = Math.min(HEDGE_CONFIG.BURST, hedgeTokens + HEDGE_CONFIG.MAX_HEDGE_RATIO);
+}
+
+function tryAcquireHedge(): boolean {
+  if (hedgeTokens >= 1) {
+    hedgeTokens -= 1;
+    return true;
+  }
+  hedgeStats.hedgesSkippedBudget++;
+  return false;
+}
+
+/**
+ * Run `primary`, and if it hasn't settled after `delayMs`, also run
+ * `backup` (budget permitting). Resolves with the first success and aborts
+ * the other call. Rejects with the primary's error if both fail, or
+ * immediately if the primary fails before a hedge was started.
+ *
+ * Both callbacks receive an AbortSignal that fires when the other side wins.
+ */
+export function hedgedRequest<T>(
+  primary: (signal: AbortSignal) => Promise<T>,
+  backup: ((signal: AbortSignal) => Promise<T>) | null,
+  delayMs: number,
+  onHedge?: () => void
+): Promise<HedgedResult<T>> {
+  recordPrimaryCall();
+
+  const primaryController = new AbortController();
+  if (!HEDGE_CONFIG.ENABLED || !backup) {
+    return primary(primaryController.signal).then(value => ({ value, winner: 'primary' as const, hedged: false }));
+  }
+
+  return new Promise<HedgedResult<T>>((resolve, reject) => {
+    const backupController = new AbortController();
+    let settled = false;
+    let hedged = false;
+    let primaryError: unknown = null;
+    let pendingCalls = 1;
+    let hedgeTimer: ReturnType<typeof setTimeout> | null = null;
+
+    const win = (value: T, winner: HedgeWinner) => {
+      if (settled) return;
+      settled = true;
+      if (hedgeTimer) clearTimeout(hedgeTimer);
+      if (winner === 'primary') {
+        backupController.abort();
+      } else {
+        hedgeStats.hedgesWon++;
+        primaryController.abort();
+      }
+      resolve({ value, winner, hedged });
+    };
+
+    const lose = (error: unknown, side: HedgeWinner) => {
+      if (side === 'primary') primaryError = error;
+      pendingCalls--;
+      if (settled) return;
+      // Primary failed fast: let the caller's own fallback logic take over
+      if (side === 'primary' && !hedged) {
+        settled = true;
+        if (hedgeTimer) clearTimeout(hedgeTimer);
+        reject(error);
+        return;
+      }
+      if (pendingCalls === 0) {
+        settled = true;
+        reject(primaryError ?? error);
+      }
+    };
+
+    primary(primaryController.signal).then(value => win(value, 'primary'), error => lose(error, 'primary'));
+
+    hedgeTimer = setTimeout(() => {
+      hedgeTimer = null;
+      if (settled || !tryAcquireHedge()) return;
+      hedged = true;
+      pendingCalls++;
+      hedgeStats.hedgesStarted++;
+      onHedge?.();
+      backup(backupController.signal).then(value => win(value, 'backup'), error => lose(error, 'backup'));
+    }, delayMs);
+  });
+}
+
+/**
+ * Hedging counters for health/metrics endpoints
+ */
+export function getHedgeStats() {
+  return {
+    ...hedgeStats,
+    hedgeRate: hedgeStats.primaryCalls > 0 ? hedgeStats.hedgesStarted / hedgeStats.primaryCalls : 0,
+    backupWinRate: hedgeStats.hedgesStarted > 0 ? hedgeStats.hedgesWon / hedgeStats.hedgesStarted : 0,
+    availableHedges: Math.floor(hedgeTokens),
+  };
+}
+
+/**
+ * Reset hedge budget and counters (for tests)
+ */
+export function resetHedgeState(): void {
+  hedgeTokens = HEDGE_CONFIG.BURST;
+  hedgeStats.primaryCalls = 0;
+  hedgeStats.hedgesStarted = 0;
+  hedgeStats.hedgesWon = 0;
+  hedgeStats.hedgesSkippedBudget = 0;
+}
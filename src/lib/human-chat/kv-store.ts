@@ -1,3 +1,21 @@
+/**
+ * Human chat storage (Vercel KV with in-memory fallback)
+ *
+ * Everything a post touches is keyed per user or updated atomically, so
+ * concurrent posts never read-modify-write a shared map:
+ * - user:<id> holds the user's profile with a PRESENCE_TTL_MS expiry,
+ *   refreshed whenever the user connects or posts
+ * - the presence sorted set (score = lastSeenAt) gives the online count
+ *   with one ZCOUNT
+ * - posts:<id> is an INCR counter of the user's messages
+ * - last-post:<id> is the rate limit slot, taken with SET NX PX so two
+ *   simultaneous posts cannot both pass
+ * - messages are a list (RPUSH + LTRIM); totals are INCR counters
+ *
+ * The pre-sharding keys (one JSON array of messages, one users map, one
+ * state blob) are migrated on first use.
+ */
+
 import {
   HumanChatMessage,
   HumanChatUser,
@@ -6,38 +24,124 @@ import {
   RATE_LIMIT_MS,
   MAX_HUMAN_CHAT_MESSAGES,
 } from './types';
+import { registerSizeGauge } from '../process-metrics';
 
 const KEYS = {
-  messages: 'human-chat:messages',
-  users: 'human-chat:users',
-  state: 'human-chat:state',
-  rateLimits: 'human-chat:rate-limits',
+  messages: 'human-chat:message-list',
+  user: (userId: string) => `human-chat:user:${userId}`,
+  postCount: (userId: string) => `human-chat:posts:${userId}`,
+  lastPost: (userId: string) => `human-chat:last-post:${userId}`,
+  presence: 'human-chat:presence',
+  messageCount: 'human-chat:message-count',
+  lastMessageAt: 'human-chat:last-message-at',
+  // Pre-sharding single-blob keys, migrated on first use
+  legacyMessages: 'human-chat:messages',
+  legacyUsers: 'human-chat:users',
+  legacyState: 'human-chat:state',
+  legacyRateLimits: 'human-chat:rate-limits',
+  legacyMigrated: 'human-chat:legacy-migrated',
+};
+
+export const HUMAN_CHAT_STORE_CONFIG = {
+  // Users not seen (connect or post) for this long are offline
+  PRESENCE_TTL_MS: 5 * 60 * 1000,
+  // Per-user message counters outlive presence so returning users keep them
+  POST_COUNT_TTL_SECONDS: 7 * 24 * 60 * 60,
 };
 
 // In-memory fallback
 let memMessages: HumanChatMessage[] = [];
-let memUsers: Record<string, HumanChatUser> = {};
-let memState: HumanChatState | null = null;
-let memRateLimits: Record<string, number> = {};
+const memUsers = new Map<string, HumanChatUser>();
+const memPostCounts = new Map<string, number>();
+const memLastPost = new Map<string, number>();
+let memMessageCount = 0;
+let memLastMessageAt: number | null = null;
+registerSizeGauge('humanChat.memMessages', () => memMessages.length);
+registerSizeGauge('humanChat.memUsers', () => memUsers.size);
+registerSizeGauge('humanChat.memPostCounts', () => memPostCounts.size);
+
+let legacyMigration: Promise<void> | null = null;
 
 function isKVAvailable(): boolean {
   return !!(process.env.KV_REST_API_URL && process.env.KV_REST_API_TOKEN);
 }
 
-function defaultState(): HumanChatState {
-  return {
-    messageCount: 0,
-    activeUsers: 0,
-    lastMessageAt: null,
-  };
+function presenceCutoff(now: number = Date.now()): number {
+  return now - HUMAN_CHAT_STORE_CONFIG.PRESENCE_TTL_MS;
+}
+
+/**
+ * Move the pre-sharding blobs to the per-user keys. The migrated flag is
+ * claimed with SET NX so only one instance copies the history.
+ * Rate limit slots are short-lived and are not carried over.
+ */
+async function migrateLegacyStore(): Promise<void> {
+  const { kv } = await import('@vercel/kv');
+  const claimed = await kv.set(KEYS.legacyMigrated, Date.now(), { nx: true });
+  if (claimed !== 'OK') return;
+
+  try {
+    const [legacyMessages, legacyUsers, legacyState] = await kv.mget<[
+      HumanChatMessage[] | null,
+      Record<string, HumanChatUser> | null,
+      HumanChatState | null,
+    ]>(KEYS.legacyMessages, KEYS.legacyUsers, KEYS.legacyState);
+    if (!legacyMessages && !legacyUsers && !legacyState) return;
+
+    const writes: Promise<unknown>[] = [];
+    if (legacyMessages?.length) {
+      // Older history goes in front of anything posted since the deploy
+      writes.push(
+        kv.lpush(KEYS.messages, ...[...legacyMessages].reverse())
+          .then(() => kv.ltrim(KEYS.messages, -MAX_HUMAN_CHAT_MESSAGES, -1))
+      );
+    }
+    const cutoff = presenceCutoff();
+    for (const user of Object.values(legacyUsers ?? {})) {
+      if (user.messageCount > 0) {
+        writes.push(
+          kv.incrby(KEYS.postCount(user.userId), user.messageCount)
+            .then(() => kv.expire(KEYS.postCount(user.userId), HUMAN_CHAT_STORE_CONFIG.POST_COUNT_TTL_SECONDS))
+        );
+      }
+      if (user.lastSeenAt > cutoff) {
+        writes.push(
+          kv.set(KEYS.user(user.userId), user, { px: user.lastSeenAt - cutoff, nx: true }),
+          kv.zadd(KEYS.presence, { score: user.lastSeenAt, member: user.userId })
+        );
+      }
+    }
+    if (legacyState) {
+      if (legacyState.messageCount > 0) writes.push(kv.incrby(KEYS.messageCount, legacyState.messageCount));
+      if (legacyState.lastMessageAt) writes.push(kv.set(KEYS.lastMessageAt, legacyState.lastMessageAt, { nx: true }));
+    }
+    await Promise.all(writes);
+    await kv.del(KEYS.legacyMessages, KEYS.legacyUsers, KEYS.legacyState, KEYS.legacyRateLimits);
+    console.log(`[human-chat-kv] Migrated legacy store: ${legacyMessages?.length ?? 0} messages, ${Object.keys(legacyUsers ?? {}).length} users`);
+  } catch (error) {
+    // Let a later call retry
+    await kv.del(KEYS.legacyMigrated);
+    throw error;
+  }
+}
+
+async function getKV() {
+  const { kv } = await import('@vercel/kv');
+  if (!legacyMigration) {
+    legacyMigration = migrateLegacyStore().catch(error => {
+      legacyMigration = null;
+      console.error('[human-chat-kv] Error migrating legacy store:', error);
+    });
+  }
+  await legacyMigration;
+  return kv;
 }
 
 export async function getMessages(): Promise<HumanChatMessage[]> {
   if (isKVAvailable()) {
     try {
-      const { kv } = await import('@vercel/kv');
-      const messages = await kv.get<HumanChatMessage[]>(KEYS.messages);
-      return messages || [];
+      const kv = await getKV();
+      return await kv.lrange<HumanChatMessage>(KEYS.messages, 0, -1);
     } catch (error) {
       console.error('[human-chat-kv] Error fetching messages:', error);
     }
@@ -45,17 +149,20 @@ export async function getMessages(): Promise<HumanChatMessage[]> {
   return memMessages;
 }
 
+/**
+ * Append a message and bump the room totals (no read-modify-write)
+ */
 export async function appendMessage(message: HumanChatMessage): Promise<void> {
   if (isKVAvailable()) {
     try {
-      const { kv } = await import('@vercel/kv');
-      const messages = (await kv.get<HumanChatMessage[]>(KEYS.messages)) || [];
-      messages.push(message);
+      const kv = await getKV();
+      await kv.rpush(KEYS.messages, message);
       // Keep only the last MAX_HUMAN_CHAT_MESSAGES
-      const trimmed = messages.length > MAX_HUMAN_CHAT_MESSAGES
-        ? messages.slice(messages.length - MAX_HUMAN_CHAT_MESSAGES)
-        : messages;
-      await kv.set(KEYS.messages, trimmed);
+      await Promise.all([
+        kv.ltrim(KEYS.messages, -MAX_HUMAN_CHAT_MESSAGES, -1),
+        kv.incr(KEYS.messageCount),
+        kv.set(KEYS.lastMessageAt, message.timestamp),
+      ]);
       return;
     } catch (error) {
       console.error('[human-chat-kv] Error appending message:', error);
@@ -65,99 +172,174 @@ export async function appendMessage(message: HumanChatMessage): Promise<void> {
   if (memMessages.length > MAX_HUMAN_CHAT_MESSAGES) {
     memMessages = memMessages.slice(memMessages.length - MAX_HUMAN_CHAT_MESSAGES);
   }
+  memMessageCount++;
+  memLastMessageAt = message.timestamp;
 }
 
 export async function getState(): Promise<HumanChatState> {
   if (isKVAvailable()) {
     try {
-      const { kv } = await import('@vercel/kv');
-      const state = await kv.get<HumanChatState>(KEYS.state);
-      return state || defaultState();
+      const kv = await getKV();
+      const [[messageCount, lastMessageAt], activeUsers] = await Promise.all([
+        kv.mget<[number | null, number | null]>(KEYS.messageCount, KEYS.lastMessageAt),
+        getOnlineCount(),
+      ]);
+      return {
+        messageCount: messageCount || 0,
+        activeUsers,
+        lastMessageAt: lastMessageAt ?? null,
+      };
     } catch (error) {
       console.error('[human-chat-kv] Error fetching state:', error);
     }
   }
-  return memState || defaultState();
+  return {
+    messageCount: memMessageCount,
+    activeUsers: await getOnlineCount(),
+    lastMessageAt: memLastMessageAt,
+  };
 }
 
-export async function setState(state: HumanChatState): Promise<void> {
+/**
+ * Number of users seen within PRESENCE_TTL_MS
+ */
+export async function getOnlineCount(): Promise<number> {
+  const cutoff = presenceCutoff();
   if (isKVAvailable()) {
     try {
-      const { kv } = await import('@vercel/kv');
-      await kv.set(KEYS.state, state);
-      return;
+      const kv = await getKV();
+      return await kv.zcount(KEYS.presence, cutoff, '+inf');
+    } catch (error) {
+      console.error('[human-chat-kv] Error counting online users:', error);
+    }
+  }
+  let count = 0;
+  for (const user of memUsers.values()) {
+    if (user.lastSeenAt >= cutoff) count++;
+  }
+  return count;
+}
+
+/**
+ * A user's profile, or null if they have not been seen within PRESENCE_TTL_MS
+ */
+export async function getUser(userId: string): Promise<HumanChatUser | null> {
+  if (isKVAvailable()) {
+    try {
+      const kv = await getKV();
+      const [user, messageCount] = await kv.mget<[HumanChatUser | null, number | null]>(
+        KEYS.user(userId),
+        KEYS.postCount(userId)
+      );
+      return user ? { ...user, messageCount: messageCount || 0 } : null;
     } catch (error) {
-      console.error('[human-chat-kv] Error setting state:', error);
+      console.error('[human-chat-kv] Error fetching user:', error);
     }
   }
-  memState = state;
+  const user = memUsers.get(userId);
+  if (!user || user.lastSeenAt < presenceCutoff()) return null;
+  return { ...user, messageCount: memPostCounts.get(userId) || 0 };
 }
 
+/**
+ * All online users (for listings; the post path never needs this)
+ */
 export async function getUsers(): Promise<Record<string, HumanChatUser>> {
   if (isKVAvailable()) {
     try {
-      const { kv } = await import('@vercel/kv');
-      const users = await kv.get<Record<string, HumanChatUser>>(KEYS.users);
-      return users || {};
+      const kv = await getKV();
+      const userIds = await kv.zrange<string[]>(KEYS.presence, presenceCutoff(), '+inf', { byScore: true });
+      if (userIds.length === 0) return {};
+      const users = await kv.mget<(HumanChatUser | null)[]>(...userIds.map(KEYS.user));
+      const result: Record<string, HumanChatUser> = {};
+      for (const user of users) {
+        if (user) result[user.userId] = user;
+      }
+      return result;
     } catch (error) {
       console.error('[human-chat-kv] Error fetching users:', error);
     }
   }
-  return memUsers;
+  const cutoff = presenceCutoff();
+  const result: Record<string, HumanChatUser> = {};
+  for (const [userId, user] of memUsers) {
+    if (user.lastSeenAt >= cutoff) result[userId] = user;
+  }
+  return result;
 }
 
-export async function setUsers(users: Record<string, HumanChatUser>): Promise<void> {
+/**
+ * Store a user's profile and mark them online (refreshes the presence TTL)
+ */
+export async function updateUser(user: HumanChatUser): Promise<void> {
   if (isKVAvailable()) {
     try {
-      const { kv } = await import('@vercel/kv');
-      await kv.set(KEYS.users, users);
+      const kv = await getKV();
+      await Promise.all([
+        kv.set(KEYS.user(user.userId), user, { px: HUMAN_CHAT_STORE_CONFIG.PRESENCE_TTL_MS }),
+        kv.zadd(KEYS.presence, { score: user.lastSeenAt, member: user.userId }),
+      ]);
       return;
     } catch (error) {
-      console.error('[human-chat-kv] Error setting users:', error);
+      console.error('[human-chat-kv] Error updating user:', error);
     }
   }
-  memUsers = users;
+  memUsers.set(user.userId, user);
 }
 
-export async function updateUser(user: HumanChatUser): Promise<void> {
-  const users = await getUsers();
-  users[user.userId] = user;
-  await setUsers(users);
+export async function removeUser(userId: string): Promise<void> {
+  if (isKVAvailable()) {
+    try {
+      const kv = await getKV();
+      await Promise.all([kv.del(KEYS.user(userId)), kv.zrem(KEYS.presence, userId)]);
+      return;
+    } catch (error) {
+      console.error('[human-chat-kv] Error removing user:', error);
+    }
+  }
+  memUsers.delete(userId);
 }
 
-export async function removeUser(userId: string): Promise<void> {
-  const users = await getUsers();
-  delete users[userId];
-  await setUsers(users);
+/**
+ * Count a post for the user; returns their new message count
+ */
+export async function incrementUserPostCount(userId: string): Promise<number> {
+  if (isKVAvailable()) {
+    try {
+      const kv = await getKV();
+      const count = await kv.incr(KEYS.postCount(userId));
+      await kv.expire(KEYS.postCount(userId), HUMAN_CHAT_STORE_CONFIG.POST_COUNT_TTL_SECONDS);
+      return count;
+    } catch (error) {
+      console.error('[human-chat-kv] Error incrementing post count:', error);
+    }
+  }
+  const count = (memPostCounts.get(userId) || 0) + 1;
+  memPostCounts.set(userId, count);
+  return count;
 }
 
 /**
- * Check rate limit for a user
+ * Check rate limit for a user without taking a slot
  * Returns RateLimitInfo indicating if user can post and remaining time
  */
 export async function checkRateLimit(userId: string): Promise<RateLimitInfo> {
   const now = Date.now();
-  
+
   if (isKVAvailable()) {
     try {
-      const { kv } = await import('@vercel/kv');
-      const rateLimits = await kv.get<Record<string, number>>(KEYS.rateLimits) || {};
-      const lastPostTime = rateLimits[userId] || 0;
+      const kv = await getKV();
+      const lastPostTime = (await kv.get<number>(KEYS.lastPost(userId))) || 0;
       const remainingTimeMs = Math.max(0, RATE_LIMIT_MS - (now - lastPostTime));
-      
-      return {
-        allowed: remainingTimeMs === 0,
-        remainingTimeMs,
-        lastPostTime,
-      };
+      return { allowed: remainingTimeMs === 0, remainingTimeMs, lastPostTime };
     } catch (error) {
       console.error('[human-chat-kv] Error checking rate limit:', error);
     }
   }
-  
-  const lastPostTime = memRateLimits[userId] || 0;
+
+  const lastPostTime = memLastPost.get(userId) || 0;
   const remainingTimeMs = Math.max(0, RATE_LIMIT_MS - (now - lastPostTime));
-  
+
   return {
     allowed: remainingTimeMs === 0,
     remainingTimeMs,
@@ -166,42 +348,71 @@ export async function checkRateLimit(userId: string): Promise<RateLimitInfo> {
 }
 
 /**
- * Record a message post for rate limiting
+ * Atomically check the rate limit and record the post.
+ * The slot key expires after RATE_LIMIT_MS, so only one post per window
+ * can take it, even when several arrive at once.
  */
-export async function recordPost(userId: string): Promise<void> {
+export async function reservePostSlot(userId: string): Promise<RateLimitInfo> {
   const now = Date.now();
-  
+
   if (isKVAvailable()) {
     try {
-      const { kv } = await import('@vercel/kv');
-      const rateLimits = await kv.get<Record<string, number>>(KEYS.rateLimits) || {};
-      rateLimits[userId] = now;
-      await kv.set(KEYS.rateLimits, rateLimits, { ex: 3600 }); // Expire after 1 hour
-      return;
+      const kv = await getKV();
+      const taken = await kv.set(KEYS.lastPost(userId), now, { nx: true, px: RATE_LIMIT_MS });
+      if (taken === 'OK') {
+        return { allowed: true, remainingTimeMs: 0, lastPostTime: now };
+      }
+      return { ...(await checkRateLimit(userId)), allowed: false };
     } catch (error) {
-      console.error('[human-chat-kv] Error recording post:', error);
+      console.error('[human-chat-kv] Error reserving post slot:', error);
     }
   }
-  
-  memRateLimits[userId] = now;
+
+  const lastPostTime = memLastPost.get(userId) || 0;
+  const remainingTimeMs = Math.max(0, RATE_LIMIT_MS - (now - lastPostTime));
+  if (remainingTimeMs > 0) {
+    return { allowed: false, remainingTimeMs, lastPostTime };
+  }
+  memLastPost.set(userId, now);
+  return { allowed: true, remainingTimeMs: 0, lastPostTime: now };
 }
 
 /**
- * Clean up old users (not seen in last 5 minutes)
+ * Drop users not seen within PRESENCE_TTL_MS from the presence set.
+ * Profiles expire on their own (KV TTL); this only trims the index.
  */
-export async function cleanupInactiveUsers(): Promise<void> {
-  const fiveMinutesAgo = Date.now() - 5 * 60 * 1000;
-  const users = await getUsers();
-  let changed = false;
-  
-  for (const [userId, user] of Object.entries(users)) {
-    if (user.lastSeenAt < fiveMinutesAgo) {
-      delete users[userId];
-      changed = true;
+export async function cleanupInactiveUsers(): Promise<{ removed: number }> {
+  const cutoff = presenceCutoff();
+
+  if (isKVAvailable()) {
+    try {
+      const kv = await getKV();
+      const removed = await kv.zremrangebyscore(KEYS.presence, '-inf', cutoff - 1);
+      return { removed };
+    } catch (error) {
+      console.error('[human-chat-kv] Error cleaning up presence:', error);
     }
   }
-  
-  if (changed) {
-    await setUsers(users);
+
+  let removed = 0;
+  for (const [userId, user] of memUsers) {
+    if (user.lastSeenAt < cutoff) {
+      memUsers.delete(userId);
+      removed++;
+    }
   }
+  return { removed };
+}
+
+/**
+ * Clear in-memory state (for testing)
+ */
+export function resetHumanChatStore(): void {
+  memMessages = [];
+  memUsers.clear();
+  memPostCounts.clear();
+  memLastPost.clear();
+  memMessageCount = 0;
+  memLastMessageAt = null;
+  legacyMigration = null;
 }
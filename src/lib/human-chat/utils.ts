@@ -1,37 +1,49 @@
 /**
  * Shared utilities for human chat functionality
+ *
+ * Broadcasts go through a single SseChannel: each event is serialized once,
+ * numbered, and kept in a replay buffer so reconnecting clients only receive
+ * the events they missed. Frames are coalesced when SSE_COALESCE_MS is set.
  */
 
+import { SseChannel, coalesceOptionsFromEnv, type SseSubscription } from '../sse-channel';
+
+const humanChatChannel = new SseChannel('human-chat', {
+  coalesce: coalesceOptionsFromEnv(),
+});
+
 // Track active connections for broadcasting
-const activeConnections = new Map<string, ReadableStreamDefaultController>();
+const activeConnections = new Map<string, SseSubscription>();
 
 /**
  * Broadcast a message to all connected clients
  */
 export function broadcastToAll(eventType: string, data: unknown) {
-  const encoder = new TextEncoder();
-  const message = `event: ${eventType}\ndata: ${JSON.stringify(data)}\n\n`;
-  
-  activeConnections.forEach((controller) => {
-    try {
-      controller.enqueue(encoder.encode(message));
-    } catch {
-      // Controller closed, will be cleaned up on next iteration
-    }
-  });
+  humanChatChannel.publish(eventType, data);
 }
 
 /**
- * Register a new connection for broadcasting
+ * Register a new connection for broadcasting.
+ * Events after `lastEventId` that are still buffered are replayed first.
  */
-export function registerConnection(connectionId: string, controller: ReadableStreamDefaultController) {
-  activeConnections.set(connectionId, controller);
+export function registerConnection(
+  connectionId: string,
+  controller: ReadableStreamDefaultController,
+  lastEventId?: string | null
+): SseSubscription {
+  const subscription = humanChatChannel.subscribe(
+    bytes => controller.enqueue(bytes),
+    lastEventId
+  );
+  activeConnections.set(connectionId, subscription);
+  return subscription;
 }
 
 /**
  * Unregister a connection from broadcasting
  */
 export function unregisterConnection(connectionId: string) {
+  activeConnections.get(connectionId)?.unsubscribe();
   activeConnections.delete(connectionId);
 }
 
@@ -40,4 +52,11 @@ export function unregisterConnection(connectionId: string) {
  */
 export function getActiveConnectionCount(): number {
   return activeConnections.size;
-}
\ No newline at end of file
+}
+
+/**
+ * Broadcast channel stats (events published, frames written, replays)
+ */
+export function getHumanChatChannelStats() {
+  return humanChatChannel.getStats();
+}
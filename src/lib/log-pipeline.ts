@@ -0,0 +1,400 @@
+/**
+ * Log Pipeline
+ *
+ * Shared output path for ConsensusLogger and ApiLogger. Both used to call
+ * console.* synchronously for every line, and ConsensusLogger also kept every
+ * entry in an unbounded array for the life of the process.
+ *
+ * - Sampling: debug/info lines are kept per level and per route
+ *   (LOG_SAMPLE_RATES, LOG_ROUTE_SAMPLE_RATES). The decision is hashed from
+ *   the correlation id, so a sampled request keeps all of its lines and a
+ *   dropped one loses all of them. warn and error are never sampled out.
+ * - Lazy formatting: callers pass a formatter that only runs for lines that
+ *   are actually emitted, so sanitizing and serializing are skipped for
+ *   sampled-out lines.
+ * - Batched async flush: emitted lines are queued and written in batches
+ *   (stdout/stderr, plus LOG_FILE if set) off the request path. The queue is
+ *   bounded; when it is full, new debug/info lines are dropped and counted.
+ *   warn/error lines flush the queue immediately instead of waiting for the
+ *   timer. LOG_FLUSH_INTERVAL_MS=0 writes synchronously (the old behaviour).
+ * - CorrelationLogBuffer: a bounded ring of recent entries per correlation
+ *   id, with a cap on how many ids are retained (oldest id evicted first).
+ *
+ * Configuration (environment):
+ *   LOG_SAMPLE_RATES=info=0.5,debug=0.1        Per-level keep rate (default 1)
+ *   LOG_ROUTE_SAMPLE_RATES=/api/health=0.05    Per-route keep rate (prefix match)
+ *   LOG_FLUSH_INTERVAL_MS=250                  Flush delay; 0 = synchronous
+ *   LOG_FLUSH_BATCH_SIZE=200                   Flush early at this many lines
+ *   LOG_MAX_PENDING=5000                       Queue bound before dropping
+ *   LOG_BUFFER_PER_ID=50                       Entries kept per correlation id
+ *   LOG_MAX_CORRELATION_IDS=500                Correlation ids kept in memory
+ *   LOG_FILE=/var/log/consensus-vault.log      Also append batches to a file
+ */
+
+export type PipelineLogLevel = 'debug' | 'info' | 'warn' | 'error';
+
+function parseRates(value: string | undefined): Record<string, number> {
+  const rates: Record<string, number> = {};
+  if (!value) return rates;
+  for (const pair of value.split(',')) {
+    const [key, rate] = pair.split('=').map(part => part.trim());
+    const parsed = parseFloat(rate);
+    if (key && !isNaN(parsed)) {
+      rates[key] = Math.min(1, Math.max(0, parsed));
+    }
+  }
+  return rates;
+}
+
+export const LOG_PIPELINE_CONFIG = {
+  SAMPLE_RATES: parseRates(process.env.LOG_SAMPLE_RATES) as Partial<Record<PipelineLogLevel, number>>,
+  ROUTE_SAMPLE_RATES: parseRates(process.env.LOG_ROUTE_SAMPLE_RATES),
+  FLUSH_INTERVAL_MS: parseInt(process.env.LOG_FLUSH_INTERVAL_MS || '250', 10),
+  FLUSH_BATCH_SIZE: parseInt(process.env.LOG_FLUSH_BATCH_SIZE || '200', 10),
+  MAX_PENDING: parseInt(process.env.LOG_MAX_PENDING || '5000', 10),
+  BUFFER_PER_ID: parseInt(process.env.LOG_BUFFER_PER_ID || '50', 10),
+  MAX_CORRELATION_IDS: parseInt(process.env.LOG_MAX_CORRELATION_IDS || '500', 10),
+  FILE: process.env.LOG_FILE || '',
+};
+
+interface PendingLine {
+  line: string;
+  stderr: boolean;
+}
+
+export interface LogSink {
+  write(lines: PendingLine[]): void | Promise<void>;
+}
+
+const stats = {
+  emitted: 0,
+  sampledOut: 0,
+  dropped: 0,
+  written: 0,
+  flushes: 0,
+  flushErrors: 0,
+  /** Time spent formatting/queueing (or writing, when synchronous) on the caller's path */
+  emitMs: 0,
+  /** Time spent writing batches, off the request path */
+  flushMs: 0,
+};
+
+let pending: PendingLine[] = [];
+let flushTimer: ReturnType<typeof setTimeout> | null = null;
+let flushing: Promise<void> | null = null;
+let exitHookInstalled = false;
+let sinkOverride: LogSink | null = null;
+
+function now(): number {
+  return typeof performance !== 'undefined' ? performance.now() : Date.now();
+}
+
+/**
+ * Stable [0, 1) value for a correlation id (FNV-1a)
+ */
+function sampleKey(correlationId: string): number {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < correlationId.length; i++) {
+    hash ^= correlationId.charCodeAt(i);
+    hash = Math.imul(hash, 0x01000193);
+  }
+  return (hash >>> 0) / 0x100000000;
+}
+
+function routeSampleRate(route: string): number {
+  let matched = '';
+  let rate = 1;
+  for (const [prefix, prefixRate] of Object.entries(LOG_PIPELINE_CONFIG.ROUTE_SAMPLE_RATES)) {
+    if (route.startsWith(prefix) && prefix.length > matched.length) {
+      matched = prefix;
+      rate = prefixRate;
+    }
+  }
+  return rate;
+}
+
+/**
+ * Whether a line at `level` for this route/correlation id would be emitted
+ */
+export function isLogSampled(level: PipelineLogLevel, route?: string, correlationId?: string): boolean {
+  if (level === 'warn' || level === 'error') return true;
+
+  const rate = Math.min(
+    LOG_PIPELINE_CONFIG.SAMPLE_RATES[level] ?? 1,
+    route ? routeSampleRate(route) : 1
+  );
+  if (rate >= 1) return true;
+  if (rate <= 0) return false;
+  return (correlationId ? sampleKey(correlationId) : Math.random()) < rate;
+}
+
+const defaultSink: LogSink = {
+  write(lines) {
+    const out = lines.filter(entry => !entry.stderr).map(entry => entry.line);
+    const err = lines.filter(entry => entry.stderr).map(entry => entry.line);
+
+    if (typeof process !== 'undefined' && process.stdout?.write) {
+      if (out.length) process.stdout.write(out.join('\n') + '\n');
+      if (err.length) process.stderr.write(err.join('\n') + '\n');
+    } else {
+      if (out.length) console.log(out.join('\n'));
+      if (err.length) console.error(err.join('\n'));
+    }
+
+    // Console output above is synchronous; only the file append is awaited
+    if (LOG_PIPELINE_CONFIG.FILE && process.env.NEXT_RUNTIME !== 'edge') {
+      return import('fs/promises').then(({ appendFile }) =>
+        appendFile(LOG_PIPELINE_CONFIG.FILE, lines.map(entry => entry.line).join('\n') + '\n')
+      );
+    }
+  },
+};
+
+function installExitHook(): void {
+  if (exitHookInstalled) return;
+  exitHookInstalled = true;
+  // The flush timer is unref'd; write whatever is left before the process exits
+  if (typeof process !== 'undefined' && typeof process.once === 'function') {
+    process.once('beforeExit', () => {
+      void flushLogs();
+    });
+  }
+}
+
+function scheduleFlush(): void {
+  installExitHook();
+  if (pending.length >= LOG_PIPELINE_CONFIG.FLUSH_BATCH_SIZE) {
+    if (flushTimer) clearTimeout(flushTimer);
+    flushTimer = null;
+    void flushLogs();
+    return;
+  }
+  if (flushTimer) return;
+  flushTimer = setTimeout(() => {
+    flushTimer = null;
+    void flushLogs();
+  }, LOG_PIPELINE_CONFIG.FLUSH_INTERVAL_MS);
+  (flushTimer as any).unref?.();
+}
+
+/**
+ * Emit one log line. `format` only runs if the line passes sampling.
+ * Returns whether the line was emitted.
+ */
+export function emitLog(
+  level: PipelineLogLevel,
+  format: () => string,
+  options: { route?: string; correlationId?: string } = {}
+): boolean {
+  if (!isLogSampled(level, options.route, options.correlationId)) {
+    stats.sampledOut++;
+    return false;
+  }
+
+  const startedAt = now();
+  const stderr = level === 'warn' || level === 'error';
+
+  if (!stderr && pending.length >= LOG_PIPELINE_CONFIG.MAX_PENDING) {
+    stats.dropped++;
+    return false;
+  }
+
+  let line: string;
+  try {
+    line = format();
+  } catch (error) {
+    line = `[log-pipeline] failed to format ${level} line: ${error instanceof Error ? error.message : String(error)}`;
+  }
+  stats.emitted++;
+
+  if (LOG_PIPELINE_CONFIG.FLUSH_INTERVAL_MS <= 0) {
+    void writeBatch([{ line, stderr }]);
+  } else {
+    pending.push({ line, stderr });
+    if (stderr) {
+      // warn/error don't wait for the unref'd timer: the instance may be
+      // frozen or exit before it fires. Queued lines go out first, in order.
+      installExitHook();
+      void flushLogs();
+    } else {
+      scheduleFlush();
+    }
+  }
+
+  stats.emitMs += now() - startedAt;
+  return true;
+}
+
+/**
+ * Write one batch. Returns a promise only if the sink is still writing
+ * (e.g. the LOG_FILE append), so console-only batches finish synchronously.
+ */
+function writeBatch(batch: PendingLine[]): Promise<void> | void {
+  const startedAt = now();
+  const finish = (failed: boolean, error?: unknown) => {
+    if (failed) {
+      stats.flushErrors++;
+      console.error('[log-pipeline] Flush failed:', error);
+    } else {
+      stats.written += batch.length;
+    }
+    stats.flushes++;
+    stats.flushMs += now() - startedAt;
+  };
+
+  let result: void | Promise<void>;
+  try {
+    result = (sinkOverride ?? defaultSink).write(batch);
+  } catch (error) {
+    finish(true, error);
+    return;
+  }
+  if (result instanceof Promise) {
+    return result.then(() => finish(false), error => finish(true, error));
+  }
+  finish(false);
+}
+
+/**
+ * Write all queued lines now
+ */
+export async function flushLogs(): Promise<void> {
+  if (flushTimer) {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+  }
+  // Keep batches in order: wait for a flush already in progress
+  while (flushing) await flushing;
+  if (pending.length === 0) return;
+
+  const batch = pending;
+  pending = [];
+  const written = writeBatch(batch);
+  if (!written) return;
+  flushing = written.finally(() => {
+    flushing = null;
+  });
+  await flushing;
+}
+
+/**
+ * Replace the output sink (null restores stdout/file)
+ */
+export function setLogSink(sink: LogSink | null): void {
+  sinkOverride = sink;
+}
+
+export function getLogPipelineStats() {
+  return {
+    emitted: stats.emitted,
+    sampledOut: stats.sampledOut,
+    dropped: stats.dropped,
+    written: stats.written,
+    pending: pending.length,
+    flushes: stats.flushes,
+    flushErrors: stats.flushErrors,
+    emitMs: Math.round(stats.emitMs * 1000) / 1000,
+    flushMs: Math.round(stats.flushMs * 1000) / 1000,
+    avgEmitUs: stats.emitted > 0 ? Math.round((stats.emitMs / stats.emitted) * 1000) : 0,
+    flushIntervalMs: LOG_PIPELINE_CONFIG.FLUSH_INTERVAL_MS,
+    sampleRates: { ...LOG_PIPELINE_CONFIG.SAMPLE_RATES },
+    routeSampleRates: { ...LOG_PIPELINE_CONFIG.ROUTE_SAMPLE_RATES },
+  };
+}
+
+/**
+ * Drop queued lines and counters (for testing)
+ */
+export function resetLogPipelineState(): void {
+  if (flushTimer) clearTimeout(flushTimer);
+  flushTimer = null;
+  pending = [];
+  flushing = null;
+  for (const key of Object.keys(stats) as Array<keyof typeof stats>) {
+    stats[key] = 0;
+  }
+}
+
+// ---------------------------------------------------------------------------
+// Per-correlation-id ring buffers
+// ---------------------------------------------------------------------------
+
+interface Ring<T> {
+  items: T[];
+  /** Index the next entry is written to once the ring is full */
+  next: number;
+}
+
+/**
+ * Recent entries grouped by correlation id. Each id keeps at most
+ * `perId` entries (oldest overwritten) and at most `maxIds` ids are kept
+ * (least recently written evicted). Entries without an id share one ring.
+ */
+export class CorrelationLogBuffer<T> {
+  private readonly rings = new Map<string, Ring<T>>();
+
+  constructor(
+    private readonly perId: number = LOG_PIPELINE_CONFIG.BUFFER_PER_ID,
+    private readonly maxIds: number = LOG_PIPELINE_CONFIG.MAX_CORRELATION_IDS
+  ) {}
+
+  push(correlationId: string | undefined, entry: T): void {
+    const key = correlationId ?? '';
+    let ring = this.rings.get(key);
+    if (ring) {
+      // Re-insert so Map order tracks the most recently written ids
+      this.rings.delete(key);
+    } else {
+      ring = { items: [], next: 0 };
+      if (this.rings.size >= this.maxIds) {
+        const oldest = this.rings.keys().next().value;
+        if (oldest !== undefined) this.rings.delete(oldest);
+      }
+    }
+    this.rings.set(key, ring);
+
+    if (ring.items.length < this.perId) {
+      ring.items.push(entry);
+    } else {
+      ring.items[ring.next] = entry;
+      ring.next = (ring.next + 1) % this.perId;
+    }
+  }
+
+  /**
+   * Entries for one id, oldest first
+   */
+  get(correlationId: string): T[] {
+    const ring = this.rings.get(correlationId);
+    if (!ring) return [];
+    return ring.items.slice(ring.next).concat(ring.items.slice(0, ring.next));
+  }
+
+  /**
+   * Entries for every retained id, grouped by id (least recently written id first)
+   */
+  all(): T[] {
+    const entries: T[] = [];
+    for (const key of this.rings.keys()) {
+      entries.push(...this.get(key));
+    }
+    return entries;
+  }
+
+  get size(): number {
+    return this.rings.size;
+  }
+
+  /**
+   * Retained entries across all ids
+   */
+  get entryCount(): number {
+    let count = 0;
+    for (const ring of this.rings.values()) count += ring.items.length;
+    return count;
+  }
+
+  clear(): void {
+    this.rings.clear();
+  }
+}
@@ -13,6 +13,7 @@
  * - Backward compatibility with existing ANALYST_MODELS
  * - Runtime model switching for cost optimization
  * - Token crisis management through model fallbacks
+ * - Non-blocking config file watcher with atomic snapshot swaps
  */
 
 import { ModelConfig, ANALYST_MODELS } from './models';
@@ -49,20 +50,59 @@ export interface ModelConfigurationFile {
   fallbackChains?: Record<string, string[]>; // Fallback model IDs by priority
 }
 
+/**
+ * Immutable view of the model configuration at a point in time.
+ *
+ * A new snapshot is built off to the side and published with a single
+ * reference swap, so readers never observe a half-applied reload and
+ * callers that hold on to a snapshot (e.g. an in-flight consensus run)
+ * keep a consistent view even if the config changes underneath them.
+ */
+export interface ModelConfigSnapshot {
+  version: number;
+  loadedAt: number;
+  source: string | null; // Config file path, or null for defaults + env only
+  models: ReadonlyMap<string, Readonly<DynamicModelConfig>>;
+  fallbackChains: Readonly<Record<string, string[]>>;
+}
+
 /**
  * Environment variable prefix for model overrides
  */
 const ENV_PREFIX = 'MODEL_';
 
+/**
+ * Config file locations, relative to process.cwd(), in lookup order
+ */
+const CONFIG_FILE_NAMES = [
+  ['model-config.json'],
+  ['.model-config.json'],
+  ['config', 'models.json'],
+];
+
+/**
+ * Config watcher settings
+ * MODEL_CONFIG_WATCH=true enables polling of the config file locations
+ */
+const CONFIG_WATCH_INTERVAL_MS = parseInt(process.env.MODEL_CONFIG_WATCH_INTERVAL_MS || '2000', 10);
+const CONFIG_RELOAD_DEBOUNCE_MS = 250;
+
 /**
  * Singleton instance of the model factory
  */
 class ModelFactory {
   private static instance: ModelFactory;
+  // Published config state. These are only ever replaced wholesale by
+  // publish(), never mutated in place, so readers need no locking.
   private configCache: Map<string, DynamicModelConfig> = new Map();
   private configFile: ModelConfigurationFile | null = null;
+  private configSource: string | null = null;
+  private snapshotVersion = 0;
+  private snapshotLoadedAt = 0;
   private initialized = false;
   private initPromise: Promise<void> | null = null;
+  private reloadPromise: Promise<ModelConfigSnapshot> | null = null;
+  private unwatchConfig: (() => void) | null = null;
 
   private constructor() {}
 
@@ -85,15 +125,11 @@ class ModelFactory {
       return;
     }
 
-    // Load default models first (synchronous)
-    this.loadDefaultModels();
-
-    // Apply environment variable overrides (synchronous)
-    this.applyEnvOverrides();
-
-    // Config file loading is optional and happens asynchronously
-    // We don't load it here to avoid Edge runtime issues
-    // It will be loaded on-demand via ensureInitialized() if needed
+    // Defaults + environment overrides only (synchronous).
+    // Config file loading happens asynchronously to avoid Edge runtime
+    // issues and blocking the event loop; it is picked up via
+    // ensureInitialized() or reloadAsync().
+    this.publish(this.buildConfig(null), null, null);
 
     this.initialized = true;
     console.log('[ModelFactory] Initialized with', this.configCache.size, 'model configurations');
@@ -123,93 +159,126 @@ class ModelFactory {
       return;
     }
 
-    // Load default models first
-    this.loadDefaultModels();
-
-    // Apply environment variable overrides
-    this.applyEnvOverrides();
-
     // Try to load config file (optional)
+    let loaded: { file: ModelConfigurationFile; source: string } | null = null;
     try {
-      await this.loadConfigFileAsync();
+      loaded = await this.loadConfigFileAsync();
     } catch (error) {
       // Config file loading is optional
       console.log('[ModelFactory] Config file not loaded (optional):', error instanceof Error ? error.message : 'Unknown error');
     }
 
+    this.publish(this.buildConfig(loaded?.file ?? null), loaded?.file ?? null, loaded?.source ?? null);
     this.initialized = true;
     console.log('[ModelFactory] Initialized with', this.configCache.size, 'model configurations');
+
+    if (process.env.MODEL_CONFIG_WATCH === 'true') {
+      await this.watchConfigFile();
+    }
   }
 
   /**
-   * Load default ANALYST_MODELS into cache
+   * Build a fresh model map from all sources
+   * Priority (lowest to highest): ANALYST_MODELS defaults, config file, env vars
    */
-  private loadDefaultModels(): void {
+  private buildConfig(configFile: ModelConfigurationFile | null): Map<string, DynamicModelConfig> {
+    const models = new Map<string, DynamicModelConfig>();
+
     for (const model of ANALYST_MODELS) {
-      this.configCache.set(model.id, {
+      models.set(model.id, {
         ...model,
         priority: 'primary',
         enabled: true,
       });
     }
+
+    if (configFile?.models) {
+      for (const [modelId, config] of Object.entries(configFile.models)) {
+        const existing = models.get(modelId);
+        models.set(modelId, existing ? { ...existing, ...config } : { ...config });
+      }
+    }
+
+    this.applyEnvOverrides(models);
+    return models;
+  }
+
+  /**
+   * Atomically replace the published configuration.
+   * Every entry is frozen so a snapshot handed to a reader stays immutable.
+   */
+  private publish(
+    models: Map<string, DynamicModelConfig>,
+    configFile: ModelConfigurationFile | null,
+    source: string | null
+  ): void {
+    for (const config of models.values()) {
+      Object.freeze(config);
+    }
+    this.configCache = models;
+    this.configFile = configFile;
+    this.configSource = source;
+    this.snapshotVersion++;
+    this.snapshotLoadedAt = Date.now();
+  }
+
+  /**
+   * Copy-on-write update of a single model in the published config
+   */
+  private updateModel(modelId: string, updates: Partial<DynamicModelConfig>): boolean {
+    const config = this.configCache.get(modelId);
+    if (!config) {
+      return false;
+    }
+
+    const models = new Map(this.configCache);
+    models.set(modelId, { ...config, ...updates });
+    this.publish(models, this.configFile, this.configSource);
+    return true;
   }
 
   /**
-   * Load configuration from model-config.json if it exists
-   * Uses dynamic imports to support both Node.js and Edge runtimes
+   * Read model-config.json (or an alternate location) if it exists.
+   * Uses fs/promises through a dynamic import so the read never blocks the
+   * event loop and Edge/browser bundles don't pull in fs.
    */
-  private async loadConfigFileAsync(): Promise<void> {
+  private async loadConfigFileAsync(): Promise<{ file: ModelConfigurationFile; source: string } | null> {
     // Only load config file in Node.js environment (not Edge runtime or browser)
     if (typeof window !== 'undefined' || typeof process === 'undefined') {
-      return;
+      return null;
     }
 
+    let fs: typeof import('fs/promises');
+    let path: typeof import('path');
     try {
       // Dynamic import to avoid Edge runtime issues
-      const fs = await import('fs');
-      const path = await import('path');
-
-      const configPaths = [
-        path.join(process.cwd(), 'model-config.json'),
-        path.join(process.cwd(), '.model-config.json'),
-        path.join(process.cwd(), 'config', 'models.json'),
-      ];
-
-      for (const configPath of configPaths) {
-        if (fs.existsSync(configPath)) {
-          try {
-            const content = fs.readFileSync(configPath, 'utf-8');
-            this.configFile = JSON.parse(content);
-            this.mergeConfigFile();
-            console.log('[ModelFactory] Loaded config from', configPath);
-            return;
-          } catch (error) {
-            console.warn('[ModelFactory] Failed to load config from', configPath, error);
-          }
-        }
-      }
+      fs = await import('fs/promises');
+      path = await import('path');
     } catch (error) {
       // fs/path not available (Edge runtime) - this is expected
       console.log('[ModelFactory] Config file loading skipped (Edge runtime or fs not available)');
+      return null;
     }
-  }
 
-  /**
-   * Merge config file settings into cache
-   */
-  private mergeConfigFile(): void {
-    if (!this.configFile) return;
-
-    for (const [modelId, config] of Object.entries(this.configFile.models)) {
-      const existing = this.configCache.get(modelId);
-      if (existing) {
-        // Merge with existing config
-        this.configCache.set(modelId, { ...existing, ...config });
-      } else {
-        // Add new model
-        this.configCache.set(modelId, config);
+    for (const segments of CONFIG_FILE_NAMES) {
+      const configPath = path.join(process.cwd(), ...segments);
+      let content: string;
+      try {
+        content = await fs.readFile(configPath, 'utf-8');
+      } catch {
+        continue; // Not present at this location
+      }
+
+      try {
+        const file = JSON.parse(content) as ModelConfigurationFile;
+        console.log('[ModelFactory] Loaded config from', configPath);
+        return { file, source: configPath };
+      } catch (error) {
+        console.warn('[ModelFactory] Failed to load config from', configPath, error);
       }
     }
+
+    return null;
   }
 
   /**
@@ -221,7 +290,7 @@ class ModelFactory {
    *   MODEL_DEEPSEEK_MODEL=deepseek-chat-v2
    *   MODEL_DEEPSEEK_PRIORITY=secondary
    */
-  private applyEnvOverrides(): void {
+  private applyEnvOverrides(models: Map<string, DynamicModelConfig>): void {
     for (const [key, value] of Object.entries(process.env)) {
       if (!key.startsWith(ENV_PREFIX)) continue;
       if (!value) continue;
@@ -233,7 +302,7 @@ class ModelFactory {
       const modelId = parts[0].toLowerCase();
       const setting = parts.slice(1).join('_').toLowerCase();
 
-      const config = this.configCache.get(modelId);
+      const config = models.get(modelId);
       if (!config) {
         console.warn('[ModelFactory] Unknown model ID in env var:', modelId);
         continue;
@@ -391,20 +460,21 @@ class ModelFactory {
 
     // Check config file first
     if (this.configFile?.fallbackChains?.[modelId]) {
-      return this.configFile.fallbackChains[modelId];
+      return [...this.configFile.fallbackChains[modelId]];
     }
 
     // Default fallback: all other models of same provider, then other providers
-    const primaryModel = this.configCache.get(modelId);
+    const models = this.configCache;
+    const primaryModel = models.get(modelId);
     if (!primaryModel) {
       return [];
     }
 
-    const sameProvider = Array.from(this.configCache.values())
+    const sameProvider = Array.from(models.values())
       .filter(m => m.id !== modelId && m.provider === primaryModel.provider && m.enabled !== false)
       .map(m => m.id);
 
-    const otherProviders = Array.from(this.configCache.values())
+    const otherProviders = Array.from(models.values())
       .filter(m => m.id !== modelId && m.provider !== primaryModel.provider && m.enabled !== false)
       .map(m => m.id);
 
@@ -555,9 +625,7 @@ class ModelFactory {
       this.initialize();
     }
 
-    const config = this.configCache.get(modelId);
-    if (config) {
-      config.enabled = enabled;
+    if (this.updateModel(modelId, { enabled })) {
       console.log(`[ModelFactory] Model ${modelId} ${enabled ? 'enabled' : 'disabled'}`);
     }
   }
@@ -572,24 +640,153 @@ class ModelFactory {
       this.initialize();
     }
 
-    const config = this.configCache.get(modelId);
-    if (config) {
-      config.priority = priority;
+    if (this.updateModel(modelId, { priority })) {
       console.log(`[ModelFactory] Model ${modelId} priority set to ${priority}`);
     }
   }
 
   /**
-   * Reload configuration (for hot-reloading without restart)
+   * Get the current immutable configuration snapshot.
+   * Hold on to the returned object to keep a consistent view across a
+   * multi-step operation; later reloads publish a new snapshot instead of
+   * mutating this one.
+   */
+  getSnapshot(): ModelConfigSnapshot {
+    if (!this.initialized) {
+      this.initialize();
+    }
+
+    return {
+      version: this.snapshotVersion,
+      loadedAt: this.snapshotLoadedAt,
+      source: this.configSource,
+      models: this.configCache,
+      fallbackChains: this.configFile?.fallbackChains ?? {},
+    };
+  }
+
+  /**
+   * Monotonic version of the published configuration.
+   * Derived caches (e.g. active models in models.ts) compare against this
+   * to know when to recompute.
+   */
+  getSnapshotVersion(): number {
+    return this.snapshotVersion;
+  }
+
+  /**
+   * Whether the config file watcher is running
+   */
+  isWatching(): boolean {
+    return this.unwatchConfig !== null;
+  }
+
+  /**
+   * Reload configuration synchronously from defaults and environment
+   * variables (for hot-reloading without restart). Does not touch disk;
+   * use reloadAsync() to re-read the config file.
    */
   reload(): void {
-    this.initialized = false;
-    this.configCache.clear();
-    this.configFile = null;
     this.initPromise = null;
-    this.initialize();
+    this.publish(this.buildConfig(null), null, null);
+    this.initialized = true;
     console.log('[ModelFactory] Configuration reloaded');
   }
+
+  /**
+   * Re-read the config file and environment without blocking the event loop,
+   * then swap in the new snapshot. Concurrent callers share one reload.
+   * If the file exists but is invalid, the current snapshot is kept.
+   */
+  async reloadAsync(): Promise<ModelConfigSnapshot> {
+    if (this.reloadPromise) {
+      return this.reloadPromise;
+    }
+
+    this.reloadPromise = (async () => {
+      try {
+        const loaded = await this.loadConfigFileAsync();
+        const models = this.buildConfig(loaded?.file ?? null);
+
+        const invalid = Array.from(models.values())
+          .map(config => ({ id: config.id, ...this.validateConfig(config) }))
+          .filter(result => !result.valid);
+        if (loaded && invalid.length > 0) {
+          console.warn('[ModelFactory] Reload rejected, keeping current config:', invalid.map(r => `${r.id}: ${r.errors.join('; ')}`));
+          return this.getSnapshot();
+        }
+
+        this.publish(models, loaded?.file ?? null, loaded?.source ?? null);
+        this.initialized = true;
+        console.log(`[ModelFactory] Configuration reloaded (version ${this.snapshotVersion}, source: ${loaded?.source ?? 'defaults'})`);
+        return this.getSnapshot();
+      } finally {
+        this.reloadPromise = null;
+      }
+    })();
+
+    return this.reloadPromise;
+  }
+
+  /**
+   * Watch the config file locations and hot-reload on change.
+   * Uses stat polling (fs.watchFile) so files that don't exist yet are
+   * picked up when created; the watcher is non-persistent so it never keeps
+   * the process alive. Returns a function that stops watching.
+   */
+  async watchConfigFile(intervalMs: number = CONFIG_WATCH_INTERVAL_MS): Promise<() => void> {
+    if (this.unwatchConfig) {
+      return this.unwatchConfig;
+    }
+    if (typeof window !== 'undefined' || typeof process === 'undefined') {
+      return () => {};
+    }
+
+    let fs: typeof import('fs');
+    let path: typeof import('path');
+    try {
+      fs = await import('fs');
+      path = await import('path');
+    } catch {
+      console.log('[ModelFactory] Config watching skipped (fs not available)');
+      return () => {};
+    }
+
+    let debounce: ReturnType<typeof setTimeout> | null = null;
+    const onChange = (curr: import('fs').Stats, prev: import('fs').Stats) => {
+      if (curr.mtimeMs === prev.mtimeMs && curr.size === prev.size) return;
+      if (debounce) clearTimeout(debounce);
+      debounce = setTimeout(() => {
+        debounce = null;
+        this.reloadAsync().catch(error => {
+          console.warn('[ModelFactory] Hot reload failed:', error instanceof Error ? error.message : error);
+        });
+      }, CONFIG_RELOAD_DEBOUNCE_MS);
+    };
+
+    const watchedPaths = CONFIG_FILE_NAMES.map(segments => path.join(process.cwd(), ...segments));
+    for (const configPath of watchedPaths) {
+      fs.watchFile(configPath, { interval: intervalMs, persistent: false }, onChange);
+    }
+
+    this.unwatchConfig = () => {
+      if (debounce) clearTimeout(debounce);
+      for (const configPath of watchedPaths) {
+        fs.unwatchFile(configPath, onChange);
+      }
+      this.unwatchConfig = null;
+    };
+
+    console.log('[ModelFactory] Watching config files every', intervalMs, 'ms');
+    return this.unwatchConfig;
+  }
+
+  /**
+   * Stop the config file watcher if running
+   */
+  stopWatching(): void {
+    this.unwatchConfig?.();
+  }
 }
 
 /**
@@ -631,3 +828,10 @@ export function validateModelConfigs(): { valid: boolean; modelErrors: Record<st
 export function getModelStatistics(): ReturnType<typeof modelFactory.getStatistics> {
   return modelFactory.getStatistics();
 }
+
+/**
+ * Get the current immutable model configuration snapshot
+ */
+export function getModelConfigSnapshot(): ModelConfigSnapshot {
+  return modelFactory.getSnapshot();
+}
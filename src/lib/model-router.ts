@@ -0,0 +1,192 @@
+/**
+ * Adaptive Model Router
+ *
+ * Scores analyst models from live health signals so a degraded provider
+ * stops dominating consensus tail latency:
+ * - EWMA latency per model (fast to react, cheap to update)
+ * - Latency percentiles from a small per-model ring of recent samples
+ * - Recent error rate and circuit breaker state (supplied by the caller)
+ *
+ * Used by the consensus engine to order fallbacks, derive per-model
+ * timeouts from observed latency instead of a fixed ceiling, and to know
+ * when a call is running past its p95 (the hedging trigger).
+ *
+ * Set ADAPTIVE_ROUTING=false to fall back to static ordering and timeouts.
+ */
+
+export const ROUTER_CONFIG = {
+  ENABLED: process.env.ADAPTIVE_ROUTING !== 'false',
+  EWMA_ALPHA: 0.2, // Weight of the newest sample
+  SAMPLE_WINDOW: 64, // Recent latency samples kept per model for percentiles
+  MIN_SAMPLES: 5, // Samples needed before latency data overrides defaults
+  DEFAULT_EXPECTED_LATENCY: 10000, // ms, assumed for models with no history
+  TIMEOUT_P95_MULTIPLIER: 2, // Adaptive timeout = p95 * multiplier ...
+  TIMEOUT_EWMA_MULTIPLIER: 3, // ... or EWMA * multiplier, whichever is larger
+  ERROR_RATE_WEIGHT: 4, // Expected cost multiplier per unit of error rate
+  HALF_OPEN_PENALTY: 5000, // ms added for a model recovering from failures
+};
+
+/**
+ * Health signals the router cannot observe itself
+ */
+export interface ModelRoutingSignals {
+  errorRate: number; // 0-1 over a recent window
+  circuitOpen: boolean;
+  halfOpen: boolean;
+}
+
+export interface LatencyStats {
+  samples: number;
+  ewmaMs: number;
+  p50Ms: number;
+  p95Ms: number;
+  p99Ms: number;
+}
+
+interface LatencyState {
+  ring: Float64Array;
+  next: number;
+  count: number;
+  ewma: number;
+}
+
+const latencyState: Record<string, LatencyState> = {};
+
+/**
+ * Record one observed model call latency.
+ * Failed calls are recorded too: a timeout is the strongest latency signal
+ * a degraded provider gives us.
+ */
+export function recordModelLatency(modelId: string, latencyMs: number, success: boolean = true): void {
+  if (!Number.isFinite(latencyMs) || latencyMs < 0) return;
+
+  let state = latencyState[modelId];
+  if (!state) {
+    state = latencyState[modelId] = {
+      ring: new Float64Array(ROUTER_CONFIG.SAMPLE_WINDOW),
+      next: 0,
+      count: 0,
+      ewma: latencyMs,
+    };
+  } else {
+    state.ewma = ROUTER_CONFIG.EWMA_ALPHA * latencyMs + (1 - ROUTER_CONFIG.EWMA_ALPHA) * state.ewma;
+  }
+
+  // Only successful calls describe the latency distribution; failures
+  // still move the EWMA so scoring reacts to a stalling provider.
+  if (success) {
+    state.ring[state.next] = latencyMs;
+    state.next = (state.next + 1) % state.ring.length;
+    state.count = Math.min(state.count + 1, state.ring.length);
+  }
+}
+
+function percentileOf(sorted: Float64Array, percentile: number): number {
+  if (sorted.length === 0) return 0;
+  const index = Math.ceil((percentile / 100) * sorted.length) - 1;
+  return sorted[Math.max(0, Math.min(sorted.length - 1, index))];
+}
+
+/**
+ * Latency percentile for a model, or undefined until MIN_SAMPLES are seen
+ */
+export function getLatencyPercentile(modelId: string, percentile: number): number | undefined {
+  const state = latencyState[modelId];
+  if (!state || state.count < ROUTER_CONFIG.MIN_SAMPLES) return undefined;
+
+  const sorted = state.ring.slice(0, state.count).sort();
+  return percentileOf(sorted, percentile);
+}
+
+/**
+ * Latency summary for a model (zeros if never observed)
+ */
+export function getLatencyStats(modelId: string): LatencyStats {
+  const state = latencyState[modelId];
+  if (!state) {
+    return { samples: 0, ewmaMs: 0, p50Ms: 0, p95Ms: 0, p99Ms: 0 };
+  }
+
+  const sorted = state.ring.slice(0, state.count).sort();
+  return {
+    samples: state.count,
+    ewmaMs: Math.round(state.ewma),
+    p50Ms: Math.round(percentileOf(sorted, 50)),
+    p95Ms: Math.round(percentileOf(sorted, 95)),
+    p99Ms: Math.round(percentileOf(sorted, 99)),
+  };
+}
+
+/**
+ * Expected cost of routing a request to a model, in milliseconds.
+ * Lower is better; an open circuit is never preferred.
+ */
+export function scoreModel(modelId: string, signals: ModelRoutingSignals): number {
+  if (signals.circuitOpen) return Number.POSITIVE_INFINITY;
+
+  const state = latencyState[modelId];
+  const expectedLatency = state && state.count >= ROUTER_CONFIG.MIN_SAMPLES
+    ? state.ewma
+    : ROUTER_CONFIG.DEFAULT_EXPECTED_LATENCY;
+
+  const errorPenalty = 1 + Math.max(0, Math.min(1, signals.errorRate)) * ROUTER_CONFIG.ERROR_RATE_WEIGHT;
+  const recoveryPenalty = signals.halfOpen ? ROUTER_CONFIG.HALF_OPEN_PENALTY : 0;
+
+  return expectedLatency * errorPenalty + recoveryPenalty;
+}
+
+/**
+ * Order candidate models by score. Ties keep the input order, so the
+ * static fallback order still decides when there is no data.
+ */
+export function rankModels(
+  modelIds: string[],
+  getSignals: (modelId: string) => ModelRoutingSignals
+): string[] {
+  if (!ROUTER_CONFIG.ENABLED) return [...modelIds];
+
+  return modelIds
+    .map((id, index) => ({ id, index, score: scoreModel(id, getSignals(id)) }))
+    .sort((a, b) => (a.score - b.score) || (a.index - b.index))
+    .map(entry => entry.id);
+}
+
+/**
+ * Per-model timeout derived from observed latency.
+ * Never exceeds the configured timeout (so a healthy model fails fast when
+ * it stalls) and never drops below minTimeout.
+ */
+export function getAdaptiveTimeout(modelId: string, configuredTimeout: number, minTimeout: number): number {
+  if (!ROUTER_CONFIG.ENABLED) return configuredTimeout;
+
+  const state = latencyState[modelId];
+  const p95 = getLatencyPercentile(modelId, 95);
+  if (!state || p95 === undefined) return configuredTimeout;
+
+  const adaptive = Math.max(
+    p95 * ROUTER_CONFIG.TIMEOUT_P95_MULTIPLIER,
+    state.ewma * ROUTER_CONFIG.TIMEOUT_EWMA_MULTIPLIER
+  );
+
+  return Math.round(Math.min(configuredTimeout, Math.max(minTimeout, adaptive)));
+}
+
+/**
+ * Routing state for all observed models (for health endpoints)
+ */
+export function getRouterSnapshot(): Record<string, LatencyStats> {
+  const snapshot: Record<string, LatencyStats> = {};
+  for (const modelId of Object.keys(latencyState)) {
+    snapshot[modelId] = getLatencyStats(modelId);
+  }
+  return snapshot;
+}
+
+/**
+ * Clear all latency history (for tests)
+ */
+export function resetRouterState(): void {
+  for (const modelId of Object.keys(latencyState)) {
+    delete latencyState[modelId];
+  }
+}
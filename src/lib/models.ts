@@ -71,12 +71,32 @@ import {
  */
 let activeModelsCache: ModelConfig[] | null = null;
 
+/**
+ * Factory snapshot version the cache was computed from.
+ * A hot reload in the factory bumps its version, which invalidates the cache.
+ */
+let activeModelsCacheVersion = -1;
+
+/**
+ * Current factory snapshot version, or -1 while the factory module is still
+ * being evaluated (models.ts and model-factory.ts import each other, and
+ * ANALYST_MODELS below is computed at module load).
+ */
+function getFactorySnapshotVersion(): number {
+  try {
+    return modelFactory.getSnapshotVersion();
+  } catch {
+    return -1;
+  }
+}
+
 /**
  * Clear the active models cache
  * Call this when configuration changes to force recalculation
  */
 export function clearActiveModelsCache(): void {
   activeModelsCache = null;
+  activeModelsCacheVersion = -1;
 }
 
 /**
@@ -125,8 +145,9 @@ function applyEnvOverrides(config: ModelConfig, modelId: string): ModelConfig {
  * @returns Array of active ModelConfig objects with all overrides applied
  */
 export function getActiveModelConfigs(): ModelConfig[] {
-  // Return cached result if available
-  if (activeModelsCache !== null) {
+  // Return cached result if available and the factory config hasn't changed
+  const factoryVersion = getFactorySnapshotVersion();
+  if (activeModelsCache !== null && activeModelsCacheVersion === factoryVersion) {
     return activeModelsCache;
   }
   
@@ -138,6 +159,7 @@ export function getActiveModelConfigs(): ModelConfig[] {
     // Fall back to factory's enabled models
     const factoryModels = getAllEnabledModels();
     activeModelsCache = factoryModels.map(model => applyEnvOverrides(model as ModelConfig, model.id));
+    activeModelsCacheVersion = getFactorySnapshotVersion();
     return activeModelsCache;
   }
   
@@ -156,6 +178,7 @@ export function getActiveModelConfigs(): ModelConfig[] {
   
   // Cache the result
   activeModelsCache = configs;
+  activeModelsCacheVersion = getFactorySnapshotVersion();
   
   // Log selection for debugging
   console.log('[models] Active models:', configs.map(c => c.id).join(', '));
@@ -7,6 +7,9 @@
  * @module prediction-market/betting-pool
  */
 
+import { registerSizeGauge } from '../process-metrics';
+import { measureBlock } from '../runtime-metrics';
+
 // ============================================================================
 // CONSTANTS
 // ============================================================================
@@ -92,6 +95,7 @@ export interface Payout {
 
 /** In-memory storage for all betting pools, keyed by roundId */
 const poolStorage = new Map<string, BettingPool>();
+registerSizeGauge('predictionMarket.poolStorage', () => poolStorage.size);
 
 // ============================================================================
 // FUNCTIONS
@@ -249,6 +253,10 @@ export function calculatePayouts(
   pool: BettingPool,
   winningSide: 'agree' | 'disagree'
 ): Payout[] {
+  return measureBlock('prediction-market.calculatePayouts', () => computePayouts(pool, winningSide));
+}
+
+function computePayouts(pool: BettingPool, winningSide: 'agree' | 'disagree'): Payout[] {
   const winningBets = pool.bets.filter(bet => bet.side === winningSide);
   
   if (winningBets.length === 0) {
@@ -0,0 +1,68 @@
+/**
+ * Round State Delta Encoding
+ *
+ * After the first full `round_state` of a round, the round driver only
+ * broadcasts the top-level fields that changed (`round_delta`). Deltas carry
+ * absolute values, so applying one to any state at or after its base is safe.
+ * Pure functions, shared by the server driver and the client hooks.
+ *
+ * @module prediction-market/round-delta
+ */
+
+import type { RoundState } from './types';
+
+/**
+ * Changed fields of a round since the previous broadcast
+ */
+export interface RoundStateDelta {
+  /** Round the delta applies to */
+  roundId: string;
+
+  /** New values of the fields that changed */
+  changes: Partial<RoundState>;
+
+  /** Fields that were removed */
+  removed: string[];
+}
+
+/**
+ * Compute the delta between two states of the same round
+ * (null when nothing changed)
+ */
+export function diffRoundState(previous: RoundState, next: RoundState): RoundStateDelta | null {
+  const prev = previous as unknown as Record<string, unknown>;
+  const curr = next as unknown as Record<string, unknown>;
+  const changes: Record<string, unknown> = {};
+  const removed: string[] = [];
+
+  for (const key of Object.keys(curr)) {
+    const value = curr[key];
+    if (value === undefined) {
+      if (prev[key] !== undefined) removed.push(key);
+      continue;
+    }
+    // Nested objects (bettingPool, consensusSnapshot) compare by value
+    if (value !== prev[key] && JSON.stringify(value) !== JSON.stringify(prev[key])) {
+      changes[key] = value;
+    }
+  }
+  for (const key of Object.keys(prev)) {
+    if (!(key in curr) && prev[key] !== undefined) removed.push(key);
+  }
+
+  if (Object.keys(changes).length === 0 && removed.length === 0) return null;
+  return { roundId: next.id, changes: changes as Partial<RoundState>, removed };
+}
+
+/**
+ * Apply a delta; a delta for a different round leaves the state unchanged
+ */
+export function applyRoundDelta(round: RoundState | null, delta: RoundStateDelta): RoundState | null {
+  if (!round || round.id !== delta.roundId) return round;
+
+  const next = { ...round, ...delta.changes } as unknown as Record<string, unknown>;
+  for (const key of delta.removed) {
+    delete next[key];
+  }
+  return next as unknown as RoundState;
+}
@@ -0,0 +1,612 @@
+/**
+ * Prediction Market Round Driver
+ *
+ * Runs the round phase machine (SCANNING → ... → SETTLEMENT) once per asset
+ * and broadcasts its events to every SSE viewer through an SseChannel.
+ *
+ * Previously each /api/prediction-market/stream connection ran its own copy
+ * of the loop, so N viewers meant N consensus polls and N racing
+ * transitionToPhase calls. Now the first subscriber elects the driver for
+ * the asset and later subscribers only attach to its event stream; the
+ * driver stops when the last viewer leaves and resumes from the shared
+ * round state when one returns.
+ *
+ * After the first full `round_state` of a round, state changes go out as
+ * `round_delta` events with only the changed fields (see round-delta.ts).
+ * The channel coalesces frames when SSE_COALESCE_MS is set.
+ *
+ * Round state lives in this instance's memory (see state.ts), so election
+ * is per process: exactly one loop per asset per instance.
+ *
+ * Demo Mode Configuration:
+ * - Scanning interval: 15 seconds (not production 60s)
+ * - Force BUY signal: If no consensus after 3 polls, force a BUY signal to progress the demo
+ * - Force exit: After 2 minutes in POSITION_OPEN, force exit regardless of profit target
+ * - Target: Complete full round cycle in under 5 minutes
+ */
+
+import { runDetailedConsensusAnalysis } from '../consensus-engine';
+import {
+  SseChannel,
+  coalesceOptionsFromEnv,
+  type SseSubscriber,
+  type SseSubscription,
+} from '../sse-channel';
+import { diffRoundState } from './round-delta';
+import { RoundPhase, RoundState, PredictionMarketConfig } from './types';
+import {
+  getCurrentRound,
+  setCurrentRound,
+  updateRoundPhase,
+  getCurrentPool,
+} from './state';
+
+// Demo mode configuration - reads from environment variable
+const IS_DEMO_MODE = process.env.DEMO_MODE === 'true';
+
+export const DEMO_CONFIG = {
+  SCANNING_INTERVAL: IS_DEMO_MODE ? 15000 : 60000, // 15s demo, 60s production
+  FORCE_BUY_AFTER_POLLS: IS_DEMO_MODE ? 3 : 10, // Force signal after N polls
+  FORCE_EXIT_AFTER_MS: IS_DEMO_MODE ? 120000 : 24 * 60 * 60 * 1000, // 2min demo, 24h production
+  PRICE_UPDATE_INTERVAL: IS_DEMO_MODE ? 15000 : 5000, // 15s demo, 5s production
+  MAX_ROUND_DURATION: IS_DEMO_MODE ? 300000 : 24 * 60 * 60 * 1000, // 5min demo, 24h production
+} as const;
+
+// Mock price data for demo
+const mockPrices: Record<string, number> = {
+  'BTC': 45000,
+  'ETH': 2500,
+  'SOL': 100,
+};
+
+/**
+ * Initialize shared round state if not already set
+ */
+export function ensureCurrentRound(): RoundState {
+  const existing = getCurrentRound();
+  if (existing) return existing;
+
+  const initialRound: RoundState = {
+    id: `round_${Date.now()}`,
+    phase: RoundPhase.SCANNING,
+    asset: 'BTC',
+    entryPrice: 0,
+    direction: 'long',
+    consensusLevel: 0,
+    consensusVotes: 0,
+    totalVotes: 0,
+    createdAt: new Date().toISOString(),
+    minBet: PredictionMarketConfig.MIN_BET,
+    maxBet: PredictionMarketConfig.MAX_BET,
+    bettingPool: {
+      totalLong: 0,
+      totalShort: 0,
+      totalPool: 0,
+      longBetCount: 0,
+      shortBetCount: 0,
+      totalBetCount: 0,
+      avgLongBet: 0,
+      avgShortBet: 0,
+      longOdds: 0,
+      shortOdds: 0,
+    },
+    consensusSnapshot: {
+      id: `snapshot_${Date.now()}`,
+      timestamp: new Date().toISOString(),
+      asset: 'BTC',
+      signal: 'hold',
+      consensusLevel: 0,
+      agreementCount: 0,
+      totalAgents: 5,
+      votes: [],
+      rationale: '',
+      averageConfidence: 0,
+      threshold: 75,
+      forced: false,
+    },
+  };
+  setCurrentRound(initialRound);
+  return initialRound;
+}
+
+export class RoundDriver {
+  readonly asset: string;
+  readonly channel: SseChannel;
+  private running = false;
+  private loopsStarted = 0;
+
+  // Demo progression state
+  private scanningPolls = 0;
+  private positionOpenStartTime = 0;
+  private roundStartTime = Date.now();
+
+  // Last round state broadcast, the base for the next delta
+  private lastRoundState: RoundState | null = null;
+  private roundStateStats = { full: 0, deltas: 0, unchanged: 0 };
+
+  constructor(asset: string) {
+    this.asset = asset;
+    this.channel = new SseChannel(`prediction-market:${asset}`, {
+      coalesce: coalesceOptionsFromEnv(),
+    });
+  }
+
+  get isRunning(): boolean {
+    return this.running;
+  }
+
+  /**
+   * Attach a viewer; starts the phase loop if nobody is driving it yet
+   */
+  subscribe(subscriber: SseSubscriber, lastEventId?: string | null): SseSubscription {
+    const subscription = this.channel.subscribe(subscriber, lastEventId);
+    this.ensureRunning();
+    return subscription;
+  }
+
+  getStats() {
+    return {
+      asset: this.asset,
+      running: this.running,
+      loopsStarted: this.loopsStarted,
+      scanningPolls: this.scanningPolls,
+      roundState: { ...this.roundStateStats },
+      channel: this.channel.getStats(),
+    };
+  }
+
+  private send(eventType: string, data: unknown): void {
+    this.channel.publish(eventType, data);
+  }
+
+  /**
+   * Broadcast a round state: in full for a new round, otherwise only the
+   * fields that changed since the last broadcast
+   */
+  private sendRoundState(round: RoundState): void {
+    const previous = this.lastRoundState;
+    this.lastRoundState = round;
+
+    if (!previous || previous.id !== round.id) {
+      this.roundStateStats.full++;
+      this.send('round_state', round);
+      return;
+    }
+
+    const delta = diffRoundState(previous, round);
+    if (!delta) {
+      this.roundStateStats.unchanged++;
+      return;
+    }
+    this.roundStateStats.deltas++;
+    this.send('round_delta', delta);
+  }
+
+  private ensureRunning(): void {
+    // Single-threaded check-and-set: only one loop per driver
+    if (this.running) return;
+    this.running = true;
+    this.loopsStarted++;
+
+    this.run()
+      .catch(err => {
+        console.error('[round-driver] Main loop error:', err);
+      })
+      .finally(() => {
+        this.running = false;
+      });
+  }
+
+  /**
+   * Main prediction market loop; runs while anyone is watching
+   */
+  private async run(): Promise<void> {
+    while (this.channel.subscriberCount > 0) {
+      try {
+        const currentRound = getCurrentRound();
+        if (!currentRound) {
+          await new Promise(resolve => setTimeout(resolve, 1000));
+          continue;
+        }
+
+        const now = Date.now();
+        const roundDuration = now - this.roundStartTime;
+
+        // Check if round has exceeded maximum duration
+        if (roundDuration > DEMO_CONFIG.MAX_ROUND_DURATION) {
+          console.log('[round-driver] Round exceeded max duration, forcing settlement');
+          await this.transitionToPhase(RoundPhase.SETTLEMENT);
+          break;
+        }
+
+        // Handle current phase logic
+        switch (currentRound.phase) {
+          case RoundPhase.SCANNING:
+            await this.handleScanningPhase();
+            break;
+
+          case RoundPhase.BETTING_WINDOW:
+            await this.handleBettingWindowPhase();
+            break;
+
+          case RoundPhase.POSITION_OPEN:
+            await this.handlePositionOpenPhase();
+            break;
+
+          case RoundPhase.SETTLEMENT:
+            await this.handleSettlementPhase();
+            // Round complete, stop driving
+            this.send('round_complete', {
+              roundId: currentRound.id,
+              duration: roundDuration
+            });
+            return;
+
+          default:
+            // Other phases just wait
+            await new Promise(resolve => setTimeout(resolve, 5000));
+            break;
+        }
+
+        // Wait before next iteration
+        await new Promise(resolve => setTimeout(resolve, 1000));
+      } catch (error) {
+        console.error('[round-driver] Loop error:', error);
+        this.send('error', { message: 'Internal server error' });
+
+        // Wait before retrying
+        await new Promise(resolve => setTimeout(resolve, 5000));
+      }
+    }
+  }
+
+  /**
+   * Handle SCANNING phase logic
+   */
+  private async handleScanningPhase(): Promise<void> {
+    const currentRound = getCurrentRound();
+    if (!currentRound) return;
+
+    console.log('[round-driver] Scanning for consensus...');
+
+    // Run consensus analysis
+    const consensusData = await runDetailedConsensusAnalysis(currentRound.asset);
+
+    // Update scanning poll count
+    this.scanningPolls++;
+
+    // Send consensus update
+    this.send('consensus_update', {
+      ...consensusData,
+      scanningPoll: this.scanningPolls,
+      forced: false, // Normal consensus, not forced
+    });
+
+    // Check if we have consensus or need to force it for demo
+    if (consensusData.consensus_status === 'CONSENSUS_REACHED' && consensusData.consensus_signal === 'buy') {
+      console.log('[round-driver] Consensus reached for BUY signal');
+
+      // Update round with consensus snapshot
+      const updatedRound = {
+        ...currentRound,
+        consensusSnapshot: {
+          id: `snapshot_${Date.now()}`,
+          timestamp: new Date().toISOString(),
+          asset: currentRound.asset,
+          signal: 'buy' as const,
+          consensusLevel: 85, // Mock high consensus for demo
+          agreementCount: 4,
+          totalAgents: 5,
+          votes: [], // Would be populated from consensusData
+          rationale: 'Strong consensus across multiple analysts for bullish momentum',
+          averageConfidence: 85,
+          threshold: 75,
+          forced: false, // Organic consensus
+        },
+        consensusLevel: 85,
+        consensusVotes: 4,
+        totalVotes: 5,
+        direction: 'long' as const,
+      };
+
+      setCurrentRound(updatedRound);
+
+      // Transition to ENTRY_SIGNAL phase
+      await this.transitionToPhase(RoundPhase.ENTRY_SIGNAL);
+
+    } else if (this.scanningPolls >= DEMO_CONFIG.FORCE_BUY_AFTER_POLLS) {
+      // Force BUY signal for demo progression
+      console.log('[round-driver] Forcing BUY signal for demo after', this.scanningPolls, 'polls');
+
+      // Send consensus update with forced flag
+      this.send('consensus_update', {
+        ...consensusData,
+        scanningPoll: this.scanningPolls,
+        forced: true, // Forced signal for demo
+        rationale: 'Demo mode: Forced BUY signal to progress demonstration',
+      });
+
+      const updatedRound = {
+        ...currentRound,
+        consensusSnapshot: {
+          id: `snapshot_${Date.now()}`,
+          timestamp: new Date().toISOString(),
+          asset: currentRound.asset,
+          signal: 'buy' as const,
+          consensusLevel: 80,
+          agreementCount: 4,
+          totalAgents: 5,
+          votes: [],
+          rationale: 'Demo mode: Forced BUY signal to progress demonstration',
+          averageConfidence: 80,
+          threshold: 75,
+          forced: true, // Forced signal for demo
+        },
+        consensusLevel: 80,
+        consensusVotes: 4,
+        totalVotes: 5,
+        direction: 'long' as const,
+      };
+
+      setCurrentRound(updatedRound);
+
+      // Transition to ENTRY_SIGNAL phase
+      await this.transitionToPhase(RoundPhase.ENTRY_SIGNAL);
+    } else {
+      // Wait for next scanning interval
+      console.log(`[round-driver] No consensus yet, waiting ${DEMO_CONFIG.SCANNING_INTERVAL}ms`);
+      await new Promise(resolve => setTimeout(resolve, DEMO_CONFIG.SCANNING_INTERVAL));
+    }
+  }
+
+  /**
+   * Handle BETTING_WINDOW phase logic
+   */
+  private async handleBettingWindowPhase(): Promise<void> {
+    const currentRound = getCurrentRound();
+    if (!currentRound) return;
+
+    // Set betting window timestamps if not already set
+    if (!currentRound.bettingWindowStart) {
+      const updatedRound = {
+        ...currentRound,
+        bettingWindowStart: new Date().toISOString(),
+        bettingWindowEnd: new Date(Date.now() + 30000).toISOString(), // 30 second betting window for demo
+      };
+      setCurrentRound(updatedRound);
+
+      // Update and send round state
+      this.sendRoundState(updatedRound);
+      return;
+    }
+
+    // Simulate betting activity for demo
+    const timeRemaining = new Date(currentRound.bettingWindowEnd!).getTime() - Date.now();
+
+    if (timeRemaining <= 0) {
+      // Betting window closed, transition to POSITION_OPEN
+      console.log('[round-driver] Betting window closed');
+
+      // Get actual pool state from shared state
+      const pool = getCurrentPool();
+
+      // Update round with actual pool data
+      const updatedRound = {
+        ...currentRound,
+        bettingPool: {
+          totalLong: pool.totalUp,
+          totalShort: pool.totalDown,
+          totalPool: pool.totalUp + pool.totalDown,
+          longBetCount: pool.bets.filter(b => b.direction === 'long').length,
+          shortBetCount: pool.bets.filter(b => b.direction === 'short').length,
+          totalBetCount: pool.bets.length,
+          avgLongBet: pool.totalUp > 0 ? pool.totalUp / Math.max(1, pool.bets.filter(b => b.direction === 'long').length) : 0,
+          avgShortBet: pool.totalDown > 0 ? pool.totalDown / Math.max(1, pool.bets.filter(b => b.direction === 'short').length) : 0,
+          longOdds: pool.totalUp > 0 ? (pool.totalUp + pool.totalDown) / pool.totalUp : 0,
+          shortOdds: pool.totalDown > 0 ? (pool.totalUp + pool.totalDown) / pool.totalDown : 0,
+        },
+        entryPrice: mockPrices[currentRound.asset],
+        positionOpenedAt: new Date().toISOString(),
+      };
+
+      setCurrentRound(updatedRound);
+      this.positionOpenStartTime = Date.now();
+
+      await this.transitionToPhase(RoundPhase.POSITION_OPEN);
+    } else {
+      // Send pool updates during betting window
+      const pool = getCurrentPool();
+      const poolUpdate = {
+        roundId: currentRound.id,
+        timeRemaining,
+        pool: {
+          totalLong: pool.totalUp,
+          totalShort: pool.totalDown,
+          totalPool: pool.totalUp + pool.totalDown,
+          longBetCount: pool.bets.filter(b => b.direction === 'long').length,
+          shortBetCount: pool.bets.filter(b => b.direction === 'short').length,
+          totalBetCount: pool.bets.length,
+        },
+        recentBets: pool.bets.slice(-5).map(b => ({
+          user: b.userAddress,
+          amount: b.amount,
+          direction: b.direction,
+          timestamp: b.timestamp,
+        })),
+      };
+
+      this.send('pool_update', poolUpdate);
+
+      // Wait before next update
+      await new Promise(resolve => setTimeout(resolve, 5000));
+    }
+  }
+
+  /**
+   * Handle POSITION_OPEN phase logic
+   */
+  private async handlePositionOpenPhase(): Promise<void> {
+    const currentRound = getCurrentRound();
+    if (!currentRound) return;
+
+    const positionDuration = Date.now() - this.positionOpenStartTime;
+
+    // Check if we should force exit for demo
+    if (positionDuration >= DEMO_CONFIG.FORCE_EXIT_AFTER_MS) {
+      console.log('[round-driver] Forcing exit after', positionDuration, 'ms in POSITION_OPEN');
+
+      // Set exit price (simulate profit for demo)
+      const updatedRound = {
+        ...currentRound,
+        exitPrice: currentRound.entryPrice * 1.05, // 5% profit
+        exitSignalAt: new Date().toISOString(),
+      };
+      setCurrentRound(updatedRound);
+
+      // Transition to EXIT_SIGNAL phase with forced flag
+      await this.transitionToPhase(RoundPhase.EXIT_SIGNAL, true); // true = forced exit
+      return;
+    }
+
+    // Update current price (simulate market movement)
+    const priceChange = Math.sin(Date.now() / 10000) * 0.02; // Oscillating +/- 2%
+    const currentPrice = currentRound.entryPrice * (1 + priceChange);
+
+    const updatedRound = {
+      ...currentRound,
+      currentPrice,
+    };
+    setCurrentRound(updatedRound);
+
+    // Send price update
+    this.send('price_update', {
+      roundId: currentRound.id,
+      currentPrice,
+      entryPrice: currentRound.entryPrice,
+      profitLossPercent: ((currentPrice - currentRound.entryPrice) / currentRound.entryPrice) * 100,
+      positionDuration,
+    });
+
+    // Check exit conditions (simulate hitting profit target)
+    const profitPercent = ((currentPrice - currentRound.entryPrice) / currentRound.entryPrice) * 100;
+    if (profitPercent >= 3) { // 3% profit target for demo
+      console.log('[round-driver] Profit target hit:', profitPercent.toFixed(2), '%');
+
+      const settledRound = {
+        ...updatedRound,
+        exitPrice: currentPrice,
+        exitSignalAt: new Date().toISOString(),
+      };
+      setCurrentRound(settledRound);
+
+      await this.transitionToPhase(RoundPhase.EXIT_SIGNAL);
+      return;
+    }
+
+    // Wait for next price update
+    await new Promise(resolve => setTimeout(resolve, DEMO_CONFIG.PRICE_UPDATE_INTERVAL));
+  }
+
+  /**
+   * Handle SETTLEMENT phase logic
+   */
+  private async handleSettlementPhase(): Promise<void> {
+    const currentRound = getCurrentRound();
+    if (!currentRound) return;
+
+    console.log('[round-driver] Calculating settlement...');
+
+    // Calculate settlement result
+    const priceChangePercent = ((currentRound.exitPrice! - currentRound.entryPrice) / currentRound.entryPrice) * 100;
+    const isProfitable = priceChangePercent > 0;
+    const winningSide: 'long' | 'short' = currentRound.direction === 'long' && isProfitable ? 'long' : 'short';
+
+    // Mock settlement for demo
+    const settlementResult = {
+      id: `settlement_${Date.now()}`,
+      roundId: currentRound.id,
+      winningSide,
+      exitPrice: currentRound.exitPrice!,
+      entryPrice: currentRound.entryPrice,
+      priceChangePercent,
+      isProfitable,
+      profitLossPercent: priceChangePercent,
+      totalPayout: 21000, // Mock payout
+      totalLoss: 7500, // Mock loss
+      platformFee: 400,
+      feePercentage: 0.02,
+      calculatedAt: new Date().toISOString(),
+      payouts: [], // Would be populated with actual payouts
+    };
+
+    const settledRound = {
+      ...currentRound,
+      settlementResult,
+      settledAt: new Date().toISOString(),
+    };
+    setCurrentRound(settledRound);
+
+    // Send final round state
+    this.sendRoundState(settledRound);
+    this.send('settlement_complete', settlementResult);
+
+    // Wait a moment before ending
+    await new Promise(resolve => setTimeout(resolve, 3000));
+  }
+
+  /**
+   * Transition to a new phase and send phase_change event
+   */
+  private async transitionToPhase(newPhase: RoundPhase, forced: boolean = false): Promise<void> {
+    const currentRound = getCurrentRound();
+    if (!currentRound) return;
+
+    const oldPhase = currentRound.phase;
+
+    // Update phase using shared state
+    updateRoundPhase(newPhase);
+
+    console.log(`[round-driver] Phase change: ${oldPhase} → ${newPhase}${forced ? ' (forced)' : ''}`);
+
+    // Send phase change event
+    this.send('phase_change', {
+      roundId: currentRound.id,
+      from: oldPhase,
+      to: newPhase,
+      timestamp: new Date().toISOString(),
+      forced: forced, // Flag if this phase change was forced by demo mode
+    });
+
+    // Send updated round state
+    const updatedRound = getCurrentRound();
+    if (updatedRound) {
+      this.sendRoundState(updatedRound);
+    }
+
+    // Brief pause for demo visibility
+    await new Promise(resolve => setTimeout(resolve, 1000));
+  }
+}
+
+// One driver per asset
+const drivers = new Map<string, RoundDriver>();
+
+/**
+ * Get (or create) the round driver for an asset
+ */
+export function getRoundDriver(asset: string): RoundDriver {
+  const key = asset.toUpperCase();
+  let driver = drivers.get(key);
+  if (!driver) {
+    driver = new RoundDriver(key);
+    drivers.set(key, driver);
+  }
+  return driver;
+}
+
+/**
+ * Driver and channel stats for health/metrics endpoints
+ */
+export function getRoundDriverStats() {
+  return Array.from(drivers.values()).map(driver => driver.getStats());
+}
@@ -1,17 +1,38 @@
 /**
  * Price Service - Fetch real-time crypto prices
  * Uses CoinGecko free API for BTC/USD pricing
+ *
+ * Every fetched price is also recorded in the local price store
+ * (price-store.ts), which serves getHistoricalPrice. The store uses the
+ * filesystem, so it is loaded lazily and skipped on the edge runtime.
+ *
+ * Current prices are cached in-process and in the shared KV tier
+ * (tiered-cache.ts), so instances share one CoinGecko call per TTL and a
+ * failing CoinGecko is not retried by every instance at once.
  */
 
+import { TieredCache } from './tiered-cache';
+
+type PriceStoreModule = typeof import('./price-store');
+
 const COINGECKO_API = 'https://api.coingecko.com/api/v3';
 const PRICE_CACHE_TTL = 30000; // 30 seconds
 
-interface PriceCache {
-  price: number;
-  timestamp: number;
-}
+const priceCache = new TieredCache<number>('price', { ttlMs: PRICE_CACHE_TTL });
+
+let priceStore: Promise<PriceStoreModule | null> | null = null;
 
-const priceCache = new Map<string, PriceCache>();
+/**
+ * The local price store, or null where there is no filesystem (edge)
+ */
+function getPriceStore(): Promise<PriceStoreModule | null> {
+  if (process.env.NEXT_RUNTIME === 'edge') return Promise.resolve(null);
+  priceStore ??= import('./price-store').catch((error) => {
+    console.warn('[price-service] Price store unavailable:', error);
+    return null;
+  });
+  return priceStore;
+}
 
 /**
  * Map asset symbol to CoinGecko ID
@@ -26,52 +47,52 @@ const ASSET_ID_MAP: Record<string, string> = {
 };
 
 /**
- * Fetch current price for an asset
+ * Fetch a price from CoinGecko and record it in the price store
  */
-export async function getCurrentPrice(asset: string): Promise<number> {
-  const coinId = ASSET_ID_MAP[asset] || ASSET_ID_MAP['BTC'];
+async function fetchPrice(coinId: string, asset: string): Promise<number> {
+  const response = await fetch(
+    `${COINGECKO_API}/simple/price?ids=${coinId}&vs_currencies=usd`,
+    {
+      headers: {
+        'Accept': 'application/json',
+      },
+    }
+  );
 
-  // Check cache first
-  const cached = priceCache.get(coinId);
-  if (cached && Date.now() - cached.timestamp < PRICE_CACHE_TTL) {
-    return cached.price;
+  if (!response.ok) {
+    throw new Error(`CoinGecko API error: ${response.status}`);
   }
 
-  try {
-    const response = await fetch(
-      `${COINGECKO_API}/simple/price?ids=${coinId}&vs_currencies=usd`,
-      {
-        headers: {
-          'Accept': 'application/json',
-        },
-      }
-    );
-
-    if (!response.ok) {
-      throw new Error(`CoinGecko API error: ${response.status}`);
-    }
+  const data = await response.json();
+  const price = data[coinId]?.usd;
 
-    const data = await response.json();
-    const price = data[coinId]?.usd;
+  if (!price) {
+    throw new Error(`Price not found for ${asset}`);
+  }
 
-    if (!price) {
-      throw new Error(`Price not found for ${asset}`);
-    }
+  const store = await getPriceStore();
+  store?.recordPrice(coinId, price, Date.now());
 
-    // Update cache
-    priceCache.set(coinId, {
-      price,
-      timestamp: Date.now(),
-    });
+  return price;
+}
 
-    return price;
+/**
+ * Fetch current price for an asset
+ */
+export async function getCurrentPrice(asset: string): Promise<number> {
+  const coinId = ASSET_ID_MAP[asset] || ASSET_ID_MAP['BTC'];
+
+  try {
+    const { value } = await priceCache.getOrCompute(coinId, () => fetchPrice(coinId, asset));
+    return value;
   } catch (error) {
     console.error('Error fetching price:', error);
 
     // Return cached price if available, even if stale
-    if (cached) {
+    const stale = priceCache.peekStale(coinId);
+    if (stale !== undefined) {
       console.warn('Using stale price from cache');
-      return cached.price;
+      return stale;
     }
 
     // Fallback to a reasonable default for demo purposes
@@ -80,12 +101,19 @@ export async function getCurrentPrice(asset: string): Promise<number> {
 }
 
 /**
- * Get historical price (for demo, returns current price with slight randomization)
- * In production, would use actual historical API
+ * Get the price at a point in time from the local price store (close of the
+ * bar covering that time). Falls back to the current price when the store
+ * has no bar near that time.
  */
 export async function getHistoricalPrice(asset: string, timestamp: string): Promise<number> {
-  // For demo purposes, use current price with small random variation
-  const currentPrice = await getCurrentPrice(asset);
-  const variation = (Math.random() - 0.5) * 0.05; // ±2.5% variation
-  return currentPrice * (1 + variation);
+  const coinId = ASSET_ID_MAP[asset] || ASSET_ID_MAP['BTC'];
+  const at = new Date(timestamp).getTime();
+
+  if (!isNaN(at)) {
+    const store = await getPriceStore();
+    const bar = await store?.getPriceAt(coinId, at);
+    if (bar) return bar.close;
+  }
+
+  return getCurrentPrice(asset);
 }
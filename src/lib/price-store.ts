@@ -0,0 +1,360 @@
+/**
+ * Local Historical Price Store
+ *
+ * One append-only file of OHLC bars per asset, fed by the price service's
+ * fetches, so historical prices (stale trade closes, settlements,
+ * backtests, charts) come from real observed prices instead of upstream
+ * calls or noise around the current price.
+ *
+ * File format: fixed-width little-endian records, 5 x float64 per bar:
+ *   [time (bar start, ms), open, high, low, close]
+ * Bars are in ascending time order, so a point-in-time lookup is a binary
+ * search using positional reads (O(log n) reads of 8 bytes) and a range scan
+ * is one contiguous read. Reads go through the OS page cache, which gives
+ * the access pattern of a memory-mapped file without a native addon. All
+ * file I/O uses fs/promises handles, so lookups never block the event loop.
+ *
+ * The bar for the current interval is kept in memory and appended once the
+ * next interval starts (or on flush). Appends to one asset run one at a
+ * time; before each, a partial trailing record (from a crashed writer) is
+ * truncated away and the last record on disk is checked, so concurrent
+ * writers never break the record alignment or the time order.
+ *
+ * seed_price_store.py writes the same format (offline fixtures, CSV imports,
+ * CoinGecko OHLC history).
+ *
+ * Configuration (environment):
+ *   PRICE_STORE_DIR=.data/prices    Where the per-asset files live
+ *   PRICE_STORE_BAR_MS=60000        Bar interval
+ *   PRICE_STORE_MAX_GAP_MS=900000   Max distance from a stored bar for a lookup
+ */
+
+import { mkdir, open, type FileHandle } from 'fs/promises';
+import path from 'path';
+
+export const PRICE_STORE_CONFIG = {
+  DIR: process.env.PRICE_STORE_DIR || path.join(process.cwd(), '.data', 'prices'),
+  BAR_MS: parseInt(process.env.PRICE_STORE_BAR_MS || '60000', 10),
+  MAX_GAP_MS: parseInt(process.env.PRICE_STORE_MAX_GAP_MS || '900000', 10),
+};
+
+export interface PriceBar {
+  /** Bar start (ms since epoch) */
+  time: number;
+  open: number;
+  high: number;
+  low: number;
+  close: number;
+}
+
+const FIELDS = 5;
+const RECORD_BYTES = FIELDS * 8;
+
+const openBars = new Map<string, PriceBar>();
+/** Read-only handles (lookups) and 'a+' handles (appends and lookups) */
+const readHandles = new Map<string, Promise<FileHandle | null>>();
+const writeHandles = new Map<string, Promise<FileHandle>>();
+/** Tail of each asset's append chain, so appends never interleave */
+const appendQueues = new Map<string, Promise<unknown>>();
+const stats = {
+  samples: 0,
+  barsAppended: 0,
+  lookups: 0,
+  lookupHits: 0,
+  rangeScans: 0,
+  writeErrors: 0,
+  truncatedBytes: 0,
+};
+let writesDisabled = false;
+let exitHookInstalled = false;
+
+function storeFile(asset: string): string {
+  return path.join(PRICE_STORE_CONFIG.DIR, `${asset.replace(/[^a-zA-Z0-9_-]/g, '_')}.bin`);
+}
+
+/**
+ * Handle for appending to an asset's store (created if missing)
+ */
+function writeHandle(asset: string): Promise<FileHandle> {
+  let handle = writeHandles.get(asset);
+  if (!handle) {
+    handle = mkdir(PRICE_STORE_CONFIG.DIR, { recursive: true }).then(() => open(storeFile(asset), 'a+'));
+    // Let a later append retry after a failed open
+    handle.catch(() => writeHandles.delete(asset));
+    writeHandles.set(asset, handle);
+  }
+  return handle;
+}
+
+/**
+ * Handle for lookups, or null if the asset has no store yet
+ */
+async function readHandle(asset: string): Promise<FileHandle | null> {
+  const writable = writeHandles.get(asset);
+  if (writable) return writable;
+
+  let handle = readHandles.get(asset);
+  if (!handle) {
+    handle = open(storeFile(asset), 'r').catch((error: NodeJS.ErrnoException) => {
+      if (error.code !== 'ENOENT') throw error;
+      return null;
+    });
+    readHandles.set(asset, handle);
+  }
+  const opened = await handle;
+  // Not created yet: check again on the next lookup
+  if (!opened) readHandles.delete(asset);
+  return opened;
+}
+
+async function recordCount(handle: FileHandle): Promise<number> {
+  return Math.floor((await handle.stat()).size / RECORD_BYTES);
+}
+
+async function readTime(handle: FileHandle, index: number): Promise<number> {
+  const buffer = Buffer.alloc(8);
+  await handle.read(buffer, 0, 8, index * RECORD_BYTES);
+  return buffer.readDoubleLE(0);
+}
+
+async function readBars(handle: FileHandle, start: number, count: number): Promise<PriceBar[]> {
+  if (count <= 0) return [];
+  const buffer = Buffer.alloc(count * RECORD_BYTES);
+  const { bytesRead } = await handle.read(buffer, 0, buffer.length, start * RECORD_BYTES);
+  const bars: PriceBar[] = [];
+  for (let offset = 0; offset + RECORD_BYTES <= bytesRead; offset += RECORD_BYTES) {
+    bars.push({
+      time: buffer.readDoubleLE(offset),
+      open: buffer.readDoubleLE(offset + 8),
+      high: buffer.readDoubleLE(offset + 16),
+      low: buffer.readDoubleLE(offset + 24),
+      close: buffer.readDoubleLE(offset + 32),
+    });
+  }
+  return bars;
+}
+
+/**
+ * Index of the first stored bar with time > `at` (upper bound)
+ */
+async function upperBound(handle: FileHandle, count: number, at: number): Promise<number> {
+  let lo = 0;
+  let hi = count;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (await readTime(handle, mid) <= at) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+/**
+ * Index of the first stored bar with time >= `at` (lower bound)
+ */
+async function lowerBound(handle: FileHandle, count: number, at: number): Promise<number> {
+  let lo = 0;
+  let hi = count;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (await readTime(handle, mid) < at) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+function withinGap(bar: PriceBar, at: number): boolean {
+  return at - (bar.time + PRICE_STORE_CONFIG.BAR_MS) <= PRICE_STORE_CONFIG.MAX_GAP_MS;
+}
+
+function installExitHook(): void {
+  if (exitHookInstalled) return;
+  exitHookInstalled = true;
+  if (typeof process.once === 'function') {
+    process.once('beforeExit', () => {
+      void flushPriceStore();
+    });
+  }
+}
+
+/**
+ * Append bars (sorted; bars at or before the last stored bar are skipped).
+ * Resolves to how many were written.
+ */
+export function appendBars(asset: string, bars: PriceBar[]): Promise<number> {
+  if (writesDisabled || bars.length === 0) return Promise.resolve(0);
+
+  const queued = (appendQueues.get(asset) ?? Promise.resolve()).then(() => writeBars(asset, bars));
+  const tail = queued.catch(() => undefined);
+  appendQueues.set(asset, tail);
+  tail.then(() => {
+    if (appendQueues.get(asset) === tail) appendQueues.delete(asset);
+  });
+  return queued;
+}
+
+async function writeBars(asset: string, bars: PriceBar[]): Promise<number> {
+  if (writesDisabled) return 0;
+
+  try {
+    const handle = await writeHandle(asset);
+    const { size } = await handle.stat();
+    const partial = size % RECORD_BYTES;
+    if (partial > 0) {
+      // A writer died mid-record; appending after it would shift every later bar
+      await handle.truncate(size - partial);
+      stats.truncatedBytes += partial;
+      console.warn(`[price-store] Truncated ${partial} byte(s) of a partial record from ${storeFile(asset)}`);
+    }
+
+    const count = (size - partial) / RECORD_BYTES;
+    const lastTime = count > 0 ? await readTime(handle, count - 1) : -Infinity;
+    const fresh = [...bars].sort((a, b) => a.time - b.time).filter((bar, i, sorted) =>
+      bar.time > lastTime && (i === 0 || bar.time > sorted[i - 1].time)
+    );
+    if (fresh.length === 0) return 0;
+
+    const buffer = Buffer.alloc(fresh.length * RECORD_BYTES);
+    fresh.forEach((bar, i) => {
+      const offset = i * RECORD_BYTES;
+      buffer.writeDoubleLE(bar.time, offset);
+      buffer.writeDoubleLE(bar.open, offset + 8);
+      buffer.writeDoubleLE(bar.high, offset + 16);
+      buffer.writeDoubleLE(bar.low, offset + 24);
+      buffer.writeDoubleLE(bar.close, offset + 32);
+    });
+    await handle.write(buffer);
+    stats.barsAppended += fresh.length;
+    return fresh.length;
+  } catch (error) {
+    stats.writeErrors++;
+    // Read-only filesystem (e.g. serverless): keep serving lookups, stop writing
+    writesDisabled = true;
+    console.warn(`[price-store] Disabling writes to ${PRICE_STORE_CONFIG.DIR}:`, error);
+    return 0;
+  }
+}
+
+/**
+ * Record an observed price; updates the in-memory bar for its interval and
+ * appends the previous bar once a new interval starts
+ */
+export function recordPrice(asset: string, price: number, at: number = Date.now()): void {
+  if (!Number.isFinite(price) || price <= 0) return;
+  stats.samples++;
+  installExitHook();
+
+  const barTime = Math.floor(at / PRICE_STORE_CONFIG.BAR_MS) * PRICE_STORE_CONFIG.BAR_MS;
+  const bar = openBars.get(asset);
+
+  if (bar && bar.time === barTime) {
+    bar.high = Math.max(bar.high, price);
+    bar.low = Math.min(bar.low, price);
+    bar.close = price;
+    return;
+  }
+  if (bar && barTime < bar.time) return; // Late sample for a finished interval
+
+  if (bar) void appendBars(asset, [bar]);
+  openBars.set(asset, { time: barTime, open: price, high: price, low: price, close: price });
+}
+
+/**
+ * The bar covering `at` (the latest bar starting at or before it), or null
+ * if nothing is stored within PRICE_STORE_MAX_GAP_MS of that time
+ */
+export async function getPriceAt(asset: string, at: number): Promise<PriceBar | null> {
+  stats.lookups++;
+
+  const current = openBars.get(asset);
+  if (current && current.time <= at) {
+    if (!withinGap(current, at)) return null;
+    stats.lookupHits++;
+    return { ...current };
+  }
+
+  const handle = await readHandle(asset);
+  if (!handle) return null;
+
+  const index = (await upperBound(handle, await recordCount(handle), at)) - 1;
+  if (index < 0) return null;
+  const [bar] = await readBars(handle, index, 1);
+  if (!bar || !withinGap(bar, at)) return null;
+
+  stats.lookupHits++;
+  return bar;
+}
+
+/**
+ * Bars starting within [from, to], oldest first (at most `limit`)
+ */
+export async function getPriceRange(asset: string, from: number, to: number, limit: number = 10000): Promise<PriceBar[]> {
+  stats.rangeScans++;
+  const bars: PriceBar[] = [];
+
+  const handle = await readHandle(asset);
+  if (handle) {
+    const count = await recordCount(handle);
+    const start = await lowerBound(handle, count, from);
+    const end = Math.min(await upperBound(handle, count, to), start + limit);
+    bars.push(...await readBars(handle, start, end - start));
+  }
+
+  const current = openBars.get(asset);
+  if (current && current.time >= from && current.time <= to && bars.length < limit &&
+      (bars.length === 0 || current.time > bars[bars.length - 1].time)) {
+    bars.push({ ...current });
+  }
+  return bars;
+}
+
+/**
+ * Write every in-progress bar to disk
+ */
+export async function flushPriceStore(): Promise<void> {
+  await Promise.all([...openBars].map(([asset, bar]) => appendBars(asset, [bar])));
+}
+
+export async function getPriceStoreStats() {
+  const assets: Record<string, { bars: number; firstBarAt: string | null; lastBarAt: string | null }> = {};
+  for (const asset of new Set([...readHandles.keys(), ...writeHandles.keys()])) {
+    const handle = await readHandle(asset).catch(() => null);
+    if (!handle) continue;
+    const count = await recordCount(handle);
+    assets[asset] = {
+      bars: count,
+      firstBarAt: count > 0 ? new Date(await readTime(handle, 0)).toISOString() : null,
+      lastBarAt: count > 0 ? new Date(await readTime(handle, count - 1)).toISOString() : null,
+    };
+  }
+  return {
+    dir: PRICE_STORE_CONFIG.DIR,
+    barMs: PRICE_STORE_CONFIG.BAR_MS,
+    writesDisabled,
+    ...stats,
+    assets,
+  };
+}
+
+/**
+ * Wait for pending appends, close files and drop in-memory bars and
+ * counters (for testing)
+ */
+export async function resetPriceStoreState(): Promise<void> {
+  await Promise.all(appendQueues.values());
+  const handles = [...readHandles.values(), ...writeHandles.values()];
+  readHandles.clear();
+  writeHandles.clear();
+  appendQueues.clear();
+  await Promise.all(handles.map(async handle => {
+    try {
+      await (await handle)?.close();
+    } catch {
+      // Never opened or already closed
+    }
+  }));
+  openBars.clear();
+  writesDisabled = false;
+  for (const key of Object.keys(stats) as Array<keyof typeof stats>) {
+    stats[key] = 0;
+  }
+}
@@ -0,0 +1,219 @@
+/**
+ * Process Memory and Event-Loop Metrics
+ *
+ * Long-lived server processes keep several in-memory structures (betting
+ * pools, AI response cache, request memoizers, rate-limit and chat
+ * fallbacks, consensus log buffers) whose growth only shows over hours.
+ * This module samples process.memoryUsage() into a bounded history ring,
+ * keeps an event-loop delay histogram (perf_hooks.monitorEventLoopDelay),
+ * and reads the current size of every structure registered with
+ * registerSizeGauge(), so soak_test.py can fit growth trends from
+ * /api/debug/memory.
+ *
+ * Node.js runtime only: startProcessMetrics() is a no-op on the edge
+ * runtime and getProcessMetrics() then reports gauges alone.
+ *
+ * Configuration (environment):
+ *   PROCESS_METRICS_SAMPLE_MS=10000   Memory sampling interval
+ *   PROCESS_METRICS_HISTORY=360       Memory samples kept (1h at 10s)
+ *   EVENT_LOOP_RESOLUTION_MS=20       Event-loop delay sampling resolution
+ */
+
+export const PROCESS_METRICS_CONFIG = {
+  SAMPLE_INTERVAL_MS: parseInt(process.env.PROCESS_METRICS_SAMPLE_MS || '10000', 10),
+  HISTORY_SIZE: parseInt(process.env.PROCESS_METRICS_HISTORY || '360', 10),
+  LOOP_RESOLUTION_MS: parseInt(process.env.EVENT_LOOP_RESOLUTION_MS || '20', 10),
+};
+
+export interface MemorySample {
+  at: number;
+  rssBytes: number;
+  heapUsedBytes: number;
+  heapTotalBytes: number;
+  externalBytes: number;
+  arrayBuffersBytes: number;
+  /** Event-loop delay p99 since the previous sample */
+  loopDelayP99Ms: number | null;
+}
+
+export interface EventLoopDelayStats {
+  minMs: number;
+  meanMs: number;
+  p50Ms: number;
+  p90Ms: number;
+  p99Ms: number;
+  maxMs: number;
+  /** Since the last histogram reset */
+  sinceMs: number;
+}
+
+interface DelayHistogram {
+  min: number;
+  max: number;
+  mean: number;
+  percentile(pct: number): number;
+  enable(): boolean;
+  disable(): boolean;
+  reset(): void;
+}
+
+const sizeGauges = new Map<string, () => number>();
+const history: MemorySample[] = [];
+let historyNext = 0;
+
+// Lifetime histogram for reports, interval histogram for per-sample p99
+let loopHistogram: DelayHistogram | null = null;
+let sampleHistogram: DelayHistogram | null = null;
+let loopHistogramSince = Date.now();
+let sampleTimer: ReturnType<typeof setInterval> | null = null;
+let starting: Promise<void> | null = null;
+
+function nsToMs(ns: number): number {
+  return Math.round((ns / 1e6) * 100) / 100;
+}
+
+function isNodeRuntime(): boolean {
+  return typeof process !== 'undefined' && typeof process.memoryUsage === 'function' &&
+    process.env.NEXT_RUNTIME !== 'edge';
+}
+
+/**
+ * Report the size (entries) of an in-memory structure with every metrics read.
+ * Registering the same name again replaces the reader.
+ */
+export function registerSizeGauge(name: string, read: () => number): void {
+  sizeGauges.set(name, read);
+}
+
+export function readSizeGauges(): Record<string, number | null> {
+  const sizes: Record<string, number | null> = {};
+  for (const [name, read] of sizeGauges) {
+    try {
+      sizes[name] = read();
+    } catch {
+      sizes[name] = null;
+    }
+  }
+  return sizes;
+}
+
+function readMemory(): MemorySample {
+  const memory = process.memoryUsage();
+  return {
+    at: Date.now(),
+    rssBytes: memory.rss,
+    heapUsedBytes: memory.heapUsed,
+    heapTotalBytes: memory.heapTotal,
+    externalBytes: memory.external,
+    arrayBuffersBytes: memory.arrayBuffers,
+    loopDelayP99Ms: sampleHistogram ? nsToMs(sampleHistogram.percentile(99)) : null,
+  };
+}
+
+function recordSample(): MemorySample {
+  const sample = readMemory();
+  sampleHistogram?.reset();
+
+  if (history.length < PROCESS_METRICS_CONFIG.HISTORY_SIZE) {
+    history.push(sample);
+  } else {
+    history[historyNext] = sample;
+    historyNext = (historyNext + 1) % PROCESS_METRICS_CONFIG.HISTORY_SIZE;
+  }
+  return sample;
+}
+
+/**
+ * Start memory sampling and event-loop delay monitoring (idempotent)
+ */
+export function startProcessMetrics(): Promise<void> {
+  if (!isNodeRuntime()) return Promise.resolve();
+  if (starting) return starting;
+
+  starting = (async () => {
+    try {
+      const { monitorEventLoopDelay } = await import('perf_hooks');
+      const resolution = Math.max(1, PROCESS_METRICS_CONFIG.LOOP_RESOLUTION_MS);
+      loopHistogram = monitorEventLoopDelay({ resolution });
+      sampleHistogram = monitorEventLoopDelay({ resolution });
+      loopHistogram.enable();
+      sampleHistogram.enable();
+      loopHistogramSince = Date.now();
+    } catch (error) {
+      console.warn('[process-metrics] Event-loop delay monitoring unavailable:', error);
+    }
+
+    recordSample();
+    if (PROCESS_METRICS_CONFIG.SAMPLE_INTERVAL_MS > 0) {
+      sampleTimer = setInterval(recordSample, PROCESS_METRICS_CONFIG.SAMPLE_INTERVAL_MS);
+      // Never keep the process alive just for sampling
+      if (typeof sampleTimer === 'object' && sampleTimer && 'unref' in sampleTimer) {
+        sampleTimer.unref();
+      }
+    }
+  })();
+  return starting;
+}
+
+export function getEventLoopDelay(): EventLoopDelayStats | null {
+  if (!loopHistogram) return null;
+  // The histogram is empty until the first resolution interval has passed
+  const empty = !Number.isFinite(loopHistogram.mean);
+  return {
+    minMs: empty ? 0 : nsToMs(loopHistogram.min),
+    meanMs: empty ? 0 : nsToMs(loopHistogram.mean),
+    p50Ms: empty ? 0 : nsToMs(loopHistogram.percentile(50)),
+    p90Ms: empty ? 0 : nsToMs(loopHistogram.percentile(90)),
+    p99Ms: empty ? 0 : nsToMs(loopHistogram.percentile(99)),
+    maxMs: empty ? 0 : nsToMs(loopHistogram.max),
+    sinceMs: Date.now() - loopHistogramSince,
+  };
+}
+
+/**
+ * Start a new event-loop delay window
+ */
+export function resetEventLoopDelay(): void {
+  if (!loopHistogram) return;
+  loopHistogram.reset();
+  loopHistogramSince = Date.now();
+}
+
+/**
+ * Memory, event-loop delay and structure sizes. `resetLoopDelay` starts a
+ * new histogram window after reading, so periodic readers get per-interval
+ * delay stats.
+ */
+export function getProcessMetrics(options: { resetLoopDelay?: boolean } = {}) {
+  const node = isNodeRuntime();
+  const current = node ? readMemory() : null;
+  const eventLoopDelay = getEventLoopDelay();
+  if (options.resetLoopDelay) resetEventLoopDelay();
+
+  return {
+    runtime: node ? 'nodejs' : 'edge',
+    uptimeSeconds: node ? Math.round(process.uptime()) : null,
+    pid: node ? process.pid : null,
+    memory: current,
+    eventLoopDelay,
+    sizes: readSizeGauges(),
+    sampleIntervalMs: PROCESS_METRICS_CONFIG.SAMPLE_INTERVAL_MS,
+    history: history.slice(historyNext).concat(history.slice(0, historyNext)),
+  };
+}
+
+/**
+ * Stop sampling and drop history and histograms (for testing).
+ * Registered gauges are kept; modules register them once at load.
+ */
+export function resetProcessMetricsState(): void {
+  if (sampleTimer) clearInterval(sampleTimer);
+  sampleTimer = null;
+  loopHistogram?.disable();
+  sampleHistogram?.disable();
+  loopHistogram = null;
+  sampleHistogram = null;
+  starting = null;
+  history.length = 0;
+  historyNext = 0;
+}
@@ -0,0 +1,308 @@
+/**
+ * Shared Prompt Context
+ *
+ * Every analyst in a consensus run gets the same user prompt: the asset,
+ * the caller's context and (CVAULT-190) the latest chatroom debate
+ * insights. This module builds that prompt once per run and caches it
+ * briefly, so five analysts (plus retries, hedges and fallbacks) share one
+ * debate-summary read instead of each doing their own.
+ *
+ * Entries are keyed by asset, caller context and the in-process debate
+ * summary version, so a new summary saved by this instance is picked up
+ * immediately; summaries saved elsewhere are picked up within TTL_MS.
+ * Concurrent requests for the same key share one in-flight build.
+ *
+ * The debate context read itself is shared the same way (keyed by summary
+ * version), so routes can prefetch it alongside their other reads and the
+ * prompt build that follows finds it ready.
+ *
+ * The chatroom side gets the same treatment for its market data section,
+ * keyed by the market data's own lastUpdated stamp.
+ *
+ * Configuration (environment):
+ *   PROMPT_CONTEXT_TTL_MS=5000   How long a built prompt context is reused
+ */
+
+import {
+  getDebateContextForConsensus,
+  mergeDebateContextWithUserContext,
+  type DebateContextInjection,
+} from './chatroom/consensus-context-bridge';
+import { getDebateSummaryVersion } from './chatroom/kv-store';
+import { MarketData, formatMarketDataForPrompt, getMarketTalkingPoints } from './chatroom/market-data';
+
+export const PROMPT_CONTEXT_CONFIG = {
+  TTL_MS: parseInt(process.env.PROMPT_CONTEXT_TTL_MS || '5000', 10),
+  MAX_ENTRIES: 100, // Distinct asset/context pairs kept at once
+  MAX_TALKING_POINTS: 3,
+};
+
+/**
+ * Everything an analyst call needs that does not depend on the analyst
+ */
+export interface PromptContext {
+  asset: string;
+  userPrompt: string;
+  debateIncluded: boolean;
+  debateReason: string;
+  builtAt: number;
+}
+
+interface PromptContextEntry {
+  value: PromptContext;
+  expiresAt: number;
+}
+
+const promptContextCache = new Map<string, PromptContextEntry>();
+const inflightBuilds = new Map<string, Promise<PromptContext>>();
+const marketSectionCache = new Map<string, string>();
+
+let debateContextEntry: { version: number; value: DebateContextInjection; expiresAt: number } | null = null;
+let debateContextInflight: { version: number; promise: Promise<DebateContextInjection> } | null = null;
+
+const promptContextStats = {
+  hits: 0,
+  misses: 0,
+  sharedBuilds: 0, // Callers that joined an in-flight build
+  debateContextReads: 0,
+  marketSectionHits: 0,
+  marketSectionMisses: 0,
+};
+
+function cacheKey(asset: string, context?: string): string {
+  return `${asset.toUpperCase()}|${getDebateSummaryVersion()}|${context?.trim() ?? ''}`;
+}
+
+function buildUserPrompt(asset: string, context: string | undefined, debateContext: DebateContextInjection | null): string {
+  const basePrompt = `Analyze ${asset.toUpperCase()} for a trading signal.`;
+
+  if (debateContext?.shouldInclude) {
+    // Merge debate context with user context
+    const mergedContext = mergeDebateContextWithUserContext(
+      debateContext.contextString,
+      context?.trim()
+    );
+
+    return `${basePrompt}
+
+${mergedContext}
+
+Instructions:
+1. Consider the provided context and debate insights alongside your specialized expertise
+2. Reference specific arguments or data points from the debate that influence your analysis
+3. Focus on actionable insights relevant to current market conditions
+4. Be specific about key levels, metrics, or indicators
+5. Provide clear, concise reasoning for your signal
+6. Note how (if at all) the debate insights influenced your final decision
+
+Remember: Respond ONLY with valid JSON in the exact format specified.`;
+  }
+
+  // Original prompt without debate context
+  if (context && context.trim()) {
+    return `${basePrompt}
+
+Additional Context: ${context}
+
+Instructions:
+1. Consider the provided context alongside your specialized expertise
+2. Focus on actionable insights relevant to current market conditions
+3. Be specific about key levels, metrics, or indicators
+4. Provide a clear, concise reasoning for your signal
+
+Remember: Respond ONLY with valid JSON in the exact format specified.`;
+  }
+
+  return `${basePrompt}
+
+Instructions:
+1. Analyze current market conditions for ${asset.toUpperCase()}
+2. Apply your specialized analytical framework
+3. Identify the most significant factors influencing the market
+4. Provide clear, specific reasoning for your signal
+5. Base confidence on the strength and alignment of your signals
+
+Remember: Respond ONLY with valid JSON in the exact format specified.`;
+}
+
+/**
+ * Debate context for consensus prompts, read at most once per TTL_MS and
+ * summary version. Concurrent callers share one read.
+ */
+export function getDebateContext(): Promise<DebateContextInjection> {
+  const version = getDebateSummaryVersion();
+  if (debateContextEntry && debateContextEntry.version === version && debateContextEntry.expiresAt > Date.now()) {
+    return Promise.resolve(debateContextEntry.value);
+  }
+  if (debateContextInflight && debateContextInflight.version === version) {
+    return debateContextInflight.promise;
+  }
+
+  promptContextStats.debateContextReads++;
+  const promise = getDebateContextForConsensus()
+    .then(value => {
+      debateContextEntry = { version, value, expiresAt: Date.now() + PROMPT_CONTEXT_CONFIG.TTL_MS };
+      return value;
+    })
+    .finally(() => {
+      if (debateContextInflight?.promise === promise) debateContextInflight = null;
+    });
+  debateContextInflight = { version, promise };
+  return promise;
+}
+
+/**
+ * CVAULT-190: Build the analyst prompt, including recent debate insights
+ * from the chatroom when they are strong and fresh enough
+ */
+export async function buildPromptContext(asset: string, context?: string): Promise<PromptContext> {
+  let debateContext: DebateContextInjection | null = null;
+
+  try {
+    debateContext = await getDebateContext();
+
+    if (debateContext.shouldInclude) {
+      console.log('[CVAULT-190] Including debate context in consensus prompt:', {
+        direction: debateContext.metadata.debateDirection,
+        strength: debateContext.metadata.debateStrength,
+        ageMinutes: Math.round(debateContext.metadata.ageMs / 60000),
+        reason: debateContext.metadata.reason
+      });
+    } else {
+      console.log('[CVAULT-190] Skipping debate context:', debateContext.metadata.reason);
+    }
+  } catch (error) {
+    console.warn('[CVAULT-190] Error fetching debate context, proceeding without:', error);
+  }
+
+  return {
+    asset: asset.toUpperCase(),
+    userPrompt: buildUserPrompt(asset, context, debateContext),
+    debateIncluded: debateContext?.shouldInclude ?? false,
+    debateReason: debateContext?.metadata.reason ?? 'Error fetching debate context',
+    builtAt: Date.now(),
+  };
+}
+
+/**
+ * Prompt context for a consensus run, reused for TTL_MS across runs
+ */
+export async function getPromptContext(asset: string, context?: string): Promise<PromptContext> {
+  const key = cacheKey(asset, context);
+  const now = Date.now();
+
+  const entry = promptContextCache.get(key);
+  if (entry && entry.expiresAt > now) {
+    promptContextStats.hits++;
+    return entry.value;
+  }
+
+  const inflight = inflightBuilds.get(key);
+  if (inflight) {
+    promptContextStats.sharedBuilds++;
+    return inflight;
+  }
+
+  promptContextStats.misses++;
+  const build = buildPromptContext(asset, context)
+    .then(value => {
+      if (promptContextCache.size >= PROMPT_CONTEXT_CONFIG.MAX_ENTRIES) {
+        // Map iteration is insertion order: drop the oldest entry
+        const oldestKey = promptContextCache.keys().next().value;
+        if (oldestKey !== undefined) promptContextCache.delete(oldestKey);
+      }
+      promptContextCache.delete(key);
+      promptContextCache.set(key, { value, expiresAt: Date.now() + PROMPT_CONTEXT_CONFIG.TTL_MS });
+      return value;
+    })
+    .finally(() => {
+      inflightBuilds.delete(key);
+    });
+
+  inflightBuilds.set(key, build);
+  return build;
+}
+
+/**
+ * Market data section for chatroom persona prompts.
+ * Formatted once per asset and market data update, then shared by every
+ * persona turn until the data changes.
+ */
+export function getMarketPromptSection(
+  data: MarketData,
+  asset: string = 'BTC',
+  includeTalkingPoints: boolean = false
+): string {
+  const key = `${asset}|${data.lastUpdated}|${data.price}|${includeTalkingPoints ? 1 : 0}`;
+  const cached = marketSectionCache.get(key);
+  if (cached !== undefined) {
+    promptContextStats.marketSectionHits++;
+    return cached;
+  }
+
+  promptContextStats.marketSectionMisses++;
+  let section = formatMarketDataForPrompt(data, asset);
+
+  if (includeTalkingPoints) {
+    const talkingPoints = getMarketTalkingPoints(data);
+    if (talkingPoints.length > 0) {
+      section += '\nKey observations you might reference:\n';
+      talkingPoints.slice(0, PROMPT_CONTEXT_CONFIG.MAX_TALKING_POINTS).forEach(point => {
+        section += `- ${point}\n`;
+      });
+    }
+  }
+
+  // Market data only moves forward; older versions are never asked for again
+  for (const existing of marketSectionCache.keys()) {
+    if (existing.startsWith(`${asset}|`) && existing.endsWith(`|${includeTalkingPoints ? 1 : 0}`)) {
+      marketSectionCache.delete(existing);
+    }
+  }
+  marketSectionCache.set(key, section);
+  return section;
+}
+
+/**
+ * Cache counters for health/metrics endpoints
+ */
+export function getPromptContextStats() {
+  const lookups = promptContextStats.hits + promptContextStats.misses + promptContextStats.sharedBuilds;
+  return {
+    ...promptContextStats,
+    entries: promptContextCache.size,
+    hitRate: lookups > 0 ? (promptContextStats.hits + promptContextStats.sharedBuilds) / lookups : 0,
+  };
+}
+
+/**
+ * Drop cached prompt contexts (all, or for one asset)
+ */
+export function invalidatePromptContext(asset?: string): void {
+  if (!asset) {
+    promptContextCache.clear();
+    debateContextEntry = null;
+    return;
+  }
+  const prefix = `${asset.toUpperCase()}|`;
+  for (const key of promptContextCache.keys()) {
+    if (key.startsWith(prefix)) promptContextCache.delete(key);
+  }
+}
+
+/**
+ * Clear caches and counters (for tests)
+ */
+export function resetPromptContextState(): void {
+  promptContextCache.clear();
+  inflightBuilds.clear();
+  marketSectionCache.clear();
+  debateContextEntry = null;
+  debateContextInflight = null;
+  promptContextStats.hits = 0;
+  promptContextStats.misses = 0;
+  promptContextStats.sharedBuilds = 0;
+  promptContextStats.debateContextReads = 0;
+  promptContextStats.marketSectionHits = 0;
+  promptContextStats.marketSectionMisses = 0;
+}
@@ -12,6 +12,7 @@
  */
 
 import { NextRequest, NextResponse } from 'next/server';
+import { registerSizeGauge } from './process-metrics';
 
 // Rate limit configuration
 export interface RateLimitConfig {
@@ -44,6 +45,7 @@ interface RateLimitEntry {
 }
 
 const inMemoryStore = new Map<string, RateLimitEntry>();
+registerSizeGauge('rateLimit.inMemoryStore', () => inMemoryStore.size);
 
 /**
  * Check if Vercel KV is available
@@ -0,0 +1,398 @@
+/**
+ * Event-Loop Stall, GC and CPU Instrumentation
+ *
+ * Chatroom generation, settlement math or a large JSON.stringify that blocks
+ * the event loop stalls every SSE stream on the instance at once. This
+ * module makes those stalls visible and attributable:
+ *
+ * - A probe timer fires every PROBE_INTERVAL_MS; when it fires more than
+ *   STALL_THRESHOLD_MS late, the loop was blocked and a stall is recorded
+ *   with what was running: the work in flight (beginWork / SSE connections),
+ *   the measured synchronous blocks (measureBlock) and GC pauses that
+ *   overlapped the blocked interval.
+ * - measureBlock() times named synchronous hot spots (wall and CPU time).
+ * - Process CPU time between probe ticks is split across the work in flight,
+ *   giving an approximate per-route CPU time.
+ * - GC pauses are collected with a PerformanceObserver, by kind.
+ * - Active handles/resources and open SSE connections are counted.
+ *
+ * Event-loop delay percentiles come from process-metrics.ts. Everything is
+ * reported on /api/debug/metrics; getRuntimeSummary() is included in
+ * getSystemHealthSummary(). Node.js runtime only: on the edge runtime (and
+ * in the browser) the trackers are cheap no-ops.
+ *
+ * Configuration (environment):
+ *   RUNTIME_PROBE_INTERVAL_MS=50     Stall probe interval
+ *   RUNTIME_STALL_THRESHOLD_MS=100   Probe lateness counted as a stall
+ *   RUNTIME_MAX_STALLS=100           Recent stalls kept
+ *   RUNTIME_BLOCK_RECORD_MS=1        Shortest block kept for stall attribution
+ */
+
+import { getEventLoopDelay, startProcessMetrics } from './process-metrics';
+
+export const RUNTIME_METRICS_CONFIG = {
+  PROBE_INTERVAL_MS: parseInt(process.env.RUNTIME_PROBE_INTERVAL_MS || '50', 10),
+  STALL_THRESHOLD_MS: parseInt(process.env.RUNTIME_STALL_THRESHOLD_MS || '100', 10),
+  MAX_STALLS: parseInt(process.env.RUNTIME_MAX_STALLS || '100', 10),
+  BLOCK_RECORD_MS: parseFloat(process.env.RUNTIME_BLOCK_RECORD_MS || '1'),
+};
+
+const RECENT_BLOCKS = 256;
+const RECENT_GC = 256;
+const GC_KINDS: Record<number, string> = { 1: 'minor', 4: 'major', 8: 'incremental', 16: 'weakcb' };
+
+export interface StallRecord {
+  at: string;
+  /** How late the probe fired: roughly how long the loop was blocked */
+  lagMs: number;
+  /** Work in flight when the loop was blocked, by label */
+  inFlight: Record<string, number>;
+  /** Measured blocks that overlapped the blocked interval, longest first */
+  blocks: Array<{ label: string; durationMs: number; cpuMs: number }>;
+  gcPauses: Array<{ kind: string; durationMs: number }>;
+}
+
+interface TimedEntry {
+  label: string;
+  start: number;
+  end: number;
+  cpuMs: number;
+}
+
+interface WorkStats {
+  attributedCpuMs: number;
+  blocks: number;
+  blockMs: number;
+  blockCpuMs: number;
+  maxBlockMs: number;
+  stalls: number;
+}
+
+const inFlight = new Map<string, number>();
+const sseConnections = new Map<string, number>();
+const workStats = new Map<string, WorkStats>();
+const recentBlocks: TimedEntry[] = [];
+const recentGc: TimedEntry[] = [];
+const stalls: StallRecord[] = [];
+const gcStats = new Map<string, { count: number; totalMs: number; maxMs: number }>();
+const totals = { probes: 0, stalls: 0, stallMs: 0, maxStallMs: 0 };
+
+let probeTimer: ReturnType<typeof setTimeout> | null = null;
+let gcObserver: { disconnect(): void } | null = null;
+let lastProbeAt = 0;
+let lastCpu: { user: number; system: number } | null = null;
+let lastElu: unknown = null;
+let perfHooks: typeof import('perf_hooks') | null = null;
+let starting: Promise<void> | null = null;
+
+function now(): number {
+  return typeof performance !== 'undefined' ? performance.now() : Date.now();
+}
+
+function hasCpuUsage(): boolean {
+  return typeof process !== 'undefined' && typeof process.cpuUsage === 'function' &&
+    process.env.NEXT_RUNTIME !== 'edge';
+}
+
+function round(ms: number): number {
+  return Math.round(ms * 100) / 100;
+}
+
+function stats(label: string): WorkStats {
+  let entry = workStats.get(label);
+  if (!entry) {
+    entry = { attributedCpuMs: 0, blocks: 0, blockMs: 0, blockCpuMs: 0, maxBlockMs: 0, stalls: 0 };
+    workStats.set(label, entry);
+  }
+  return entry;
+}
+
+function pushBounded<T>(list: T[], item: T, max: number): void {
+  list.push(item);
+  if (list.length > max) list.splice(0, list.length - max);
+}
+
+/**
+ * Mark work as in flight until the returned function is called (idempotent).
+ * Stalls and CPU time while it runs are attributed to `label`.
+ */
+export function beginWork(label: string): () => void {
+  inFlight.set(label, (inFlight.get(label) ?? 0) + 1);
+  let ended = false;
+  return () => {
+    if (ended) return;
+    ended = true;
+    const count = (inFlight.get(label) ?? 1) - 1;
+    if (count > 0) inFlight.set(label, count);
+    else inFlight.delete(label);
+  };
+}
+
+/**
+ * Count an open SSE connection (also in-flight work) until the request is
+ * aborted or the returned function is called
+ */
+export function trackSseConnection(route: string, signal?: AbortSignal): () => void {
+  const endWork = beginWork(route);
+  sseConnections.set(route, (sseConnections.get(route) ?? 0) + 1);
+  let closed = false;
+  const close = () => {
+    if (closed) return;
+    closed = true;
+    endWork();
+    const count = (sseConnections.get(route) ?? 1) - 1;
+    if (count > 0) sseConnections.set(route, count);
+    else sseConnections.delete(route);
+  };
+  if (signal) {
+    if (signal.aborted) close();
+    else signal.addEventListener('abort', close, { once: true });
+  }
+  return close;
+}
+
+/**
+ * Run a synchronous block and record its wall and CPU time under `label`
+ */
+export function measureBlock<T>(label: string, fn: () => T): T {
+  const cpuStart = hasCpuUsage() ? process.cpuUsage() : null;
+  const start = now();
+  try {
+    return fn();
+  } finally {
+    const end = now();
+    const durationMs = end - start;
+    let cpuMs = durationMs;
+    if (cpuStart) {
+      const cpu = process.cpuUsage(cpuStart);
+      cpuMs = (cpu.user + cpu.system) / 1000;
+    }
+
+    const entry = stats(label);
+    entry.blocks++;
+    entry.blockMs += durationMs;
+    entry.blockCpuMs += cpuMs;
+    entry.maxBlockMs = Math.max(entry.maxBlockMs, durationMs);
+    if (durationMs >= RUNTIME_METRICS_CONFIG.BLOCK_RECORD_MS) {
+      pushBounded(recentBlocks, { label, start, end, cpuMs }, RECENT_BLOCKS);
+    }
+  }
+}
+
+function overlapping(entries: TimedEntry[], from: number, to: number): TimedEntry[] {
+  return entries.filter(entry => entry.end >= from && entry.start <= to);
+}
+
+function probe(): void {
+  const at = now();
+  totals.probes++;
+
+  // Split CPU time since the previous tick across the work in flight
+  if (lastCpu) {
+    const cpu = process.cpuUsage();
+    const deltaMs = (cpu.user - lastCpu.user + cpu.system - lastCpu.system) / 1000;
+    lastCpu = cpu;
+    const running = Array.from(inFlight.entries());
+    const weight = running.reduce((sum, [, count]) => sum + count, 0);
+    if (weight === 0) {
+      stats('(idle)').attributedCpuMs += deltaMs;
+    } else {
+      for (const [label, count] of running) {
+        stats(label).attributedCpuMs += (deltaMs * count) / weight;
+      }
+    }
+  }
+
+  const lagMs = at - lastProbeAt - RUNTIME_METRICS_CONFIG.PROBE_INTERVAL_MS;
+  if (lagMs > RUNTIME_METRICS_CONFIG.STALL_THRESHOLD_MS) {
+    const blocks = overlapping(recentBlocks, lastProbeAt, at)
+      .sort((a, b) => (b.end - b.start) - (a.end - a.start))
+      .slice(0, 5);
+    const record: StallRecord = {
+      at: new Date().toISOString(),
+      lagMs: round(lagMs),
+      inFlight: Object.fromEntries(inFlight),
+      blocks: blocks.map(block => ({
+        label: block.label,
+        durationMs: round(block.end - block.start),
+        cpuMs: round(block.cpuMs),
+      })),
+      gcPauses: overlapping(recentGc, lastProbeAt, at).map(gc => ({
+        kind: gc.label,
+        durationMs: round(gc.end - gc.start),
+      })),
+    };
+    pushBounded(stalls, record, RUNTIME_METRICS_CONFIG.MAX_STALLS);
+    totals.stalls++;
+    totals.stallMs += lagMs;
+    totals.maxStallMs = Math.max(totals.maxStallMs, lagMs);
+    for (const label of new Set([...Object.keys(record.inFlight), ...record.blocks.map(b => b.label)])) {
+      stats(label).stalls++;
+    }
+  }
+
+  lastProbeAt = at;
+  scheduleProbe();
+}
+
+function scheduleProbe(): void {
+  probeTimer = setTimeout(probe, RUNTIME_METRICS_CONFIG.PROBE_INTERVAL_MS);
+  // Never keep the process alive just for probing
+  if (typeof probeTimer === 'object' && probeTimer && 'unref' in probeTimer) {
+    probeTimer.unref();
+  }
+}
+
+/**
+ * Start the stall probe and GC observer (idempotent; Node.js runtime only)
+ */
+export function startRuntimeMetrics(): Promise<void> {
+  if (!hasCpuUsage()) return Promise.resolve();
+  if (starting) return starting;
+
+  starting = (async () => {
+    await startProcessMetrics();
+    try {
+      perfHooks = await import('perf_hooks');
+      const observer = new perfHooks.PerformanceObserver(list => {
+        for (const entry of list.getEntries()) {
+          const detail = (entry as { detail?: { kind?: number } }).detail;
+          const kind = GC_KINDS[detail?.kind ?? (entry as { kind?: number }).kind ?? 0] ?? 'other';
+          const gc = gcStats.get(kind) ?? { count: 0, totalMs: 0, maxMs: 0 };
+          gc.count++;
+          gc.totalMs += entry.duration;
+          gc.maxMs = Math.max(gc.maxMs, entry.duration);
+          gcStats.set(kind, gc);
+          pushBounded(recentGc, { label: kind, start: entry.startTime, end: entry.startTime + entry.duration, cpuMs: entry.duration }, RECENT_GC);
+        }
+      });
+      observer.observe({ entryTypes: ['gc'] });
+      gcObserver = observer;
+      lastElu = perfHooks.performance.eventLoopUtilization();
+    } catch (error) {
+      console.warn('[runtime-metrics] GC observation unavailable:', error);
+    }
+
+    lastCpu = process.cpuUsage();
+    lastProbeAt = now();
+    scheduleProbe();
+  })();
+  return starting;
+}
+
+function activeResources(): Record<string, number> | null {
+  const getInfo = (process as { getActiveResourcesInfo?: () => string[] }).getActiveResourcesInfo;
+  if (typeof getInfo !== 'function') return null;
+  const counts: Record<string, number> = {};
+  for (const type of getInfo.call(process)) {
+    counts[type] = (counts[type] ?? 0) + 1;
+  }
+  return counts;
+}
+
+function eventLoopUtilization(): number | null {
+  if (!perfHooks) return null;
+  const { eventLoopUtilization: elu } = perfHooks.performance;
+  const current = elu();
+  const sinceLast = elu(current, lastElu as ReturnType<typeof elu>);
+  lastElu = current;
+  return Math.round(sinceLast.utilization * 1000) / 1000;
+}
+
+function sumCounts(counts: Map<string, number>): number {
+  let total = 0;
+  for (const count of counts.values()) total += count;
+  return total;
+}
+
+/**
+ * Full instrumentation snapshot for /api/debug/metrics
+ */
+export function getRuntimeMetrics() {
+  const work: Record<string, WorkStats> = {};
+  for (const [label, entry] of workStats) {
+    work[label] = {
+      attributedCpuMs: round(entry.attributedCpuMs),
+      blocks: entry.blocks,
+      blockMs: round(entry.blockMs),
+      blockCpuMs: round(entry.blockCpuMs),
+      maxBlockMs: round(entry.maxBlockMs),
+      stalls: entry.stalls,
+    };
+  }
+  const gc: Record<string, { count: number; totalMs: number; maxMs: number }> = {};
+  for (const [kind, entry] of gcStats) {
+    gc[kind] = { count: entry.count, totalMs: round(entry.totalMs), maxMs: round(entry.maxMs) };
+  }
+
+  return {
+    probing: probeTimer !== null,
+    eventLoop: {
+      delay: getEventLoopDelay(),
+      /** Share of time the loop was busy since the previous read */
+      utilization: eventLoopUtilization(),
+      probes: totals.probes,
+      stalls: totals.stalls,
+      stallMs: round(totals.stallMs),
+      maxStallMs: round(totals.maxStallMs),
+      stallThresholdMs: RUNTIME_METRICS_CONFIG.STALL_THRESHOLD_MS,
+    },
+    gc,
+    handles: activeResources(),
+    sseConnections: { total: sumCounts(sseConnections), byRoute: Object.fromEntries(sseConnections) },
+    inFlight: Object.fromEntries(inFlight),
+    work,
+    recentStalls: [...stalls],
+  };
+}
+
+/**
+ * Compact view for getSystemHealthSummary()
+ */
+export function getRuntimeSummary() {
+  const delay = getEventLoopDelay();
+  let gcCount = 0;
+  let gcMs = 0;
+  let gcMaxMs = 0;
+  for (const entry of gcStats.values()) {
+    gcCount += entry.count;
+    gcMs += entry.totalMs;
+    gcMaxMs = Math.max(gcMaxMs, entry.maxMs);
+  }
+  return {
+    eventLoopP99Ms: delay ? delay.p99Ms : null,
+    eventLoopMaxMs: delay ? delay.maxMs : null,
+    stalls: totals.stalls,
+    maxStallMs: round(totals.maxStallMs),
+    lastStall: stalls.length > 0 ? stalls[stalls.length - 1] : null,
+    gcPauses: gcCount,
+    gcPauseMs: round(gcMs),
+    gcMaxPauseMs: round(gcMaxMs),
+    sseConnections: sumCounts(sseConnections),
+    inFlight: sumCounts(inFlight),
+  };
+}
+
+/**
+ * Stop probing and drop all counters (for testing)
+ */
+export function resetRuntimeMetricsState(): void {
+  if (probeTimer) clearTimeout(probeTimer);
+  probeTimer = null;
+  gcObserver?.disconnect();
+  gcObserver = null;
+  starting = null;
+  lastCpu = null;
+  lastElu = null;
+  inFlight.clear();
+  sseConnections.clear();
+  workStats.clear();
+  gcStats.clear();
+  recentBlocks.length = 0;
+  recentGc.length = 0;
+  stalls.length = 0;
+  totals.probes = 0;
+  totals.stalls = 0;
+  totals.stallMs = 0;
+  totals.maxStallMs = 0;
+}
@@ -0,0 +1,330 @@
+/**
+ * Broadcast Channel for Server-Sent Events
+ *
+ * One producer publishes events; any number of SSE connections subscribe.
+ * Each event is numbered and serialized once, and the same encoded frame is
+ * written to every subscriber, so per-connection work is just the write.
+ *
+ * The last `replaySize` frames are kept in a ring so a client reconnecting
+ * with Last-Event-ID only receives the events it missed. Event ids are
+ * `<epoch>-<seq>`: ids from before a server restart never match the current
+ * epoch, so those clients are told to resync instead of getting a wrong gap.
+ *
+ * Busy channels can opt into coalescing: frames published within `flushMs`
+ * (or until `maxEvents` pile up) go out to each subscriber as one write.
+ */
+
+import { measureBlock } from './runtime-metrics';
+
+const encoder = new TextEncoder();
+
+const DEFAULT_REPLAY_SIZE = 256;
+const DEFAULT_KEEPALIVE_MS = 15000;
+
+const KEEPALIVE_FRAME = encoder.encode(': keepalive\n\n');
+
+export interface SseFrame {
+  seq: number;
+  event: string;
+  bytes: Uint8Array;
+}
+
+export type SseSubscriber = (bytes: Uint8Array) => void;
+
+export interface SseSubscription {
+  unsubscribe: () => void;
+  /** Frames re-sent from the replay buffer */
+  replayed: number;
+  /**
+   * The client's Last-Event-ID is unknown or older than the replay buffer.
+   * Some events are lost; the caller should send a full state snapshot.
+   */
+  missedEvents: boolean;
+  /**
+   * Newest event id at subscribe time. A per-connection snapshot sent right
+   * after subscribing can carry it, so a later resume starts from there.
+   */
+  lastEventId: string | null;
+}
+
+export interface SseCoalesceOptions {
+  /** Longest a published frame waits before being written */
+  flushMs: number;
+  /** Flush early once this many frames are pending */
+  maxEvents: number;
+}
+
+export interface SseChannelOptions {
+  replaySize?: number;
+  keepaliveMs?: number;
+  /** Id prefix; defaults to the channel's creation time */
+  epoch?: string;
+  /** Batch frames into fewer writes (off by default) */
+  coalesce?: SseCoalesceOptions;
+}
+
+/**
+ * Coalescing settings from SSE_COALESCE_MS / SSE_COALESCE_MAX_EVENTS.
+ * Undefined (no coalescing) unless SSE_COALESCE_MS is set.
+ */
+export function coalesceOptionsFromEnv(): SseCoalesceOptions | undefined {
+  const flushMs = Number(process.env.SSE_COALESCE_MS);
+  if (!(flushMs > 0)) return undefined;
+  return {
+    flushMs,
+    maxEvents: Number(process.env.SSE_COALESCE_MAX_EVENTS) || 32,
+  };
+}
+
+function concatBytes(chunks: Uint8Array[]): Uint8Array {
+  if (chunks.length === 1) return chunks[0];
+  let length = 0;
+  for (const chunk of chunks) length += chunk.byteLength;
+  const out = new Uint8Array(length);
+  let offset = 0;
+  for (const chunk of chunks) {
+    out.set(chunk, offset);
+    offset += chunk.byteLength;
+  }
+  return out;
+}
+
+/**
+ * Encode a single SSE frame (for per-connection events that are not broadcast)
+ */
+export function encodeSseFrame(event: string, data: unknown, id?: string): Uint8Array {
+  const idLine = id ? `id: ${id}\n` : '';
+  return encoder.encode(`${idLine}event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+}
+
+/**
+ * Last event id sent by a reconnecting client.
+ * EventSource sends the Last-Event-ID header on automatic reconnects; clients
+ * that reconnect by hand can pass ?lastEventId= instead.
+ */
+export function getLastEventId(request: Request): string | null {
+  const header = request.headers.get('last-event-id');
+  if (header) return header;
+  return new URL(request.url).searchParams.get('lastEventId');
+}
+
+/**
+ * Split an `<epoch>-<seq>` event id
+ */
+export function parseSseEventId(id: string): { epoch: string; seq: number } | null {
+  const dash = id.lastIndexOf('-');
+  if (dash <= 0) return null;
+  const seq = Number(id.slice(dash + 1));
+  if (!Number.isInteger(seq) || seq < 0) return null;
+  return { epoch: id.slice(0, dash), seq };
+}
+
+export class SseChannel {
+  readonly name: string;
+  readonly epoch: string;
+  private readonly encodeLabel: string;
+  private readonly replaySize: number;
+  private readonly keepaliveMs: number;
+  private readonly coalesce: SseCoalesceOptions | undefined;
+  private readonly ring: Array<SseFrame | undefined>;
+  private nextSeq = 1;
+  private readonly subscribers = new Set<SseSubscriber>();
+  private keepaliveTimer: ReturnType<typeof setInterval> | null = null;
+  private pending: Uint8Array[] = [];
+  private flushTimer: ReturnType<typeof setTimeout> | null = null;
+
+  private stats = {
+    published: 0,
+    bytesPublished: 0,
+    framesWritten: 0,
+    writes: 0,
+    batches: 0,
+    replayedFrames: 0,
+    resyncs: 0,
+  };
+
+  constructor(name: string, options: SseChannelOptions = {}) {
+    this.name = name;
+    this.epoch = options.epoch ?? Date.now().toString(36);
+    this.encodeLabel = `sse.encode ${name}`;
+    this.replaySize = options.replaySize ?? DEFAULT_REPLAY_SIZE;
+    this.keepaliveMs = options.keepaliveMs ?? DEFAULT_KEEPALIVE_MS;
+    this.coalesce = options.coalesce;
+    this.ring = new Array(this.replaySize);
+  }
+
+  /** Id of the most recently published event (null before the first) */
+  get lastEventId(): string | null {
+    return this.nextSeq > 1 ? this.formatId(this.nextSeq - 1) : null;
+  }
+
+  get subscriberCount(): number {
+    return this.subscribers.size;
+  }
+
+  /**
+   * Serialize an event once and write it to every subscriber
+   * (immediately, or with the next batch when coalescing)
+   */
+  publish(event: string, data: unknown): SseFrame {
+    const seq = this.nextSeq++;
+    // Serialization is the synchronous cost that grows with payload size
+    const bytes = measureBlock(this.encodeLabel, () => encodeSseFrame(event, data, this.formatId(seq)));
+    const frame: SseFrame = { seq, event, bytes };
+    this.ring[seq % this.replaySize] = frame;
+
+    this.stats.published++;
+    this.stats.bytesPublished += frame.bytes.byteLength;
+
+    if (!this.coalesce) {
+      for (const subscriber of this.subscribers) {
+        this.deliver(subscriber, frame.bytes, 1);
+      }
+      return frame;
+    }
+
+    this.pending.push(frame.bytes);
+    if (this.pending.length >= this.coalesce.maxEvents) {
+      this.flush();
+    } else if (!this.flushTimer) {
+      this.flushTimer = setTimeout(() => this.flush(), this.coalesce.flushMs);
+    }
+    return frame;
+  }
+
+  /**
+   * Write any pending coalesced frames to every subscriber as one chunk
+   */
+  flush(): void {
+    if (this.flushTimer) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+    if (this.pending.length === 0) return;
+
+    const count = this.pending.length;
+    const bytes = concatBytes(this.pending);
+    this.pending = [];
+    this.stats.batches++;
+
+    for (const subscriber of this.subscribers) {
+      this.deliver(subscriber, bytes, count);
+    }
+  }
+
+  /**
+   * Subscribe to future events, first replaying anything published after
+   * `lastEventId` that is still in the buffer
+   */
+  subscribe(subscriber: SseSubscriber, lastEventId?: string | null): SseSubscription {
+    let replayed = 0;
+    let missedEvents = false;
+
+    // Existing subscribers get pending frames first; the ring already holds
+    // them for the replay below
+    this.flush();
+
+    if (lastEventId) {
+      const lastSeq = this.parseId(lastEventId);
+      const newestSeq = this.nextSeq - 1;
+      const oldestSeq = Math.max(1, newestSeq - this.replaySize + 1);
+
+      if (lastSeq === null || lastSeq > newestSeq) {
+        missedEvents = true;
+      } else {
+        if (lastSeq + 1 < oldestSeq) missedEvents = true;
+        const gap: Uint8Array[] = [];
+        for (let seq = Math.max(lastSeq + 1, oldestSeq); seq <= newestSeq; seq++) {
+          const frame = this.ring[seq % this.replaySize];
+          if (frame && frame.seq === seq) gap.push(frame.bytes);
+        }
+        // The whole gap goes out as a single write
+        if (gap.length > 0) {
+          this.deliver(subscriber, concatBytes(gap), gap.length);
+          replayed = gap.length;
+        }
+      }
+    }
+
+    this.stats.replayedFrames += replayed;
+    if (missedEvents) this.stats.resyncs++;
+
+    this.subscribers.add(subscriber);
+    this.startKeepalive();
+
+    return {
+      unsubscribe: () => this.unsubscribe(subscriber),
+      replayed,
+      missedEvents,
+      lastEventId: this.lastEventId,
+    };
+  }
+
+  getStats() {
+    return {
+      name: this.name,
+      subscribers: this.subscribers.size,
+      lastEventId: this.lastEventId,
+      coalescing: this.coalesce ?? null,
+      ...this.stats,
+      framesPerWrite: this.stats.writes > 0
+        ? Math.round((this.stats.framesWritten / this.stats.writes) * 100) / 100
+        : 0,
+    };
+  }
+
+  /**
+   * Drop all subscribers and stop the keepalive timer
+   */
+  close(): void {
+    if (this.flushTimer) {
+      clearTimeout(this.flushTimer);
+      this.flushTimer = null;
+    }
+    this.pending = [];
+    this.subscribers.clear();
+    this.stopKeepalive();
+  }
+
+  private unsubscribe(subscriber: SseSubscriber): void {
+    this.subscribers.delete(subscriber);
+    if (this.subscribers.size === 0) this.stopKeepalive();
+  }
+
+  private deliver(subscriber: SseSubscriber, bytes: Uint8Array, frames: number): void {
+    try {
+      subscriber(bytes);
+      this.stats.writes++;
+      this.stats.framesWritten += frames;
+    } catch {
+      // Connection closed underneath us
+      this.unsubscribe(subscriber);
+    }
+  }
+
+  private startKeepalive(): void {
+    if (this.keepaliveTimer || this.keepaliveMs <= 0) return;
+    // One timer per channel, not per connection
+    this.keepaliveTimer = setInterval(() => {
+      for (const subscriber of this.subscribers) {
+        this.deliver(subscriber, KEEPALIVE_FRAME, 0);
+      }
+    }, this.keepaliveMs);
+  }
+
+  private stopKeepalive(): void {
+    if (this.keepaliveTimer) {
+      clearInterval(this.keepaliveTimer);
+      this.keepaliveTimer = null;
+    }
+  }
+
+  private formatId(seq: number): string {
+    return `${this.epoch}-${seq}`;
+  }
+
+  private parseId(id: string): number | null {
+    const parsed = parseSseEventId(id);
+    return parsed && parsed.epoch === this.epoch ? parsed.seq : null;
+  }
+}
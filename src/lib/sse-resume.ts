@@ -0,0 +1,35 @@
+/**
+ * Resumable EventSource helpers (client-side)
+ *
+ * EventSource only sends Last-Event-ID on its own automatic reconnects. Our
+ * hooks close the source on error and reconnect with backoff through a new
+ * EventSource, which would start from scratch, so they remember the last
+ * event id themselves and pass it as ?lastEventId=. The server then replays
+ * only the events the client missed.
+ */
+
+/**
+ * Append ?lastEventId= to a stream URL when there is one to resume from
+ */
+export function withLastEventId(url: string, lastEventId: string | null | undefined): string {
+  if (!lastEventId) return url;
+  const separator = url.includes('?') ? '&' : '?';
+  return `${url}${separator}lastEventId=${encodeURIComponent(lastEventId)}`;
+}
+
+/**
+ * Report the id of every tagged event received on `eventTypes`
+ */
+export function trackLastEventId(
+  eventSource: EventSource,
+  eventTypes: string[],
+  onEventId: (id: string) => void
+): void {
+  const handler = (event: Event) => {
+    const id = (event as MessageEvent).lastEventId;
+    if (id) onEventId(id);
+  };
+  for (const type of eventTypes) {
+    eventSource.addEventListener(type, handler);
+  }
+}
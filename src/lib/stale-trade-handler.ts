@@ -15,7 +15,8 @@
  * 3. Manual invocation via API endpoint
  * 
  * Approach:
- * - Paper trades open longer than STALE_TRADE_THRESHOLD are auto-closed at current market price
+ * - Paper trades open longer than STALE_TRADE_THRESHOLD are auto-closed at the market price
+ *   when they crossed the threshold (local price store; current price if not stored)
  * - Prediction market rounds stuck in non-terminal phases are auto-settled or expired
  * - Prediction market bets in stale rounds get refunded (no winners/losers)
  * - All actions are logged for auditability
@@ -25,7 +26,7 @@
 
 import { Trade } from './trading-types';
 import { getStoredTrades, setStoredTrades } from './storage';
-import { getCurrentPrice } from './price-service';
+import { getHistoricalPrice } from './price-service';
 import { getCurrentRound, setCurrentRound, getCurrentPool, resetPool } from './prediction-market/state';
 import { RoundPhase, PredictionMarketConfig } from './prediction-market/types';
 
@@ -211,7 +212,8 @@ export async function runStaleTradeCleanup(
  * - It has status 'open'
  * - It was opened more than PAPER_TRADE_MAX_AGE_MS ago
  * 
- * Stale trades are closed at the current market price.
+ * Stale trades are closed at the market price when they crossed the
+ * threshold, so a cleanup that runs late doesn't change their P&L.
  */
 async function handleStalePaperTrades(
   log: (msg: string) => void
@@ -240,8 +242,9 @@ async function handleStalePaperTrades(
         log(`Trade ${trade.id} is stale (age: ${Math.round(ageMs / 60000)}min, asset: ${trade.asset})`);
 
         try {
-          // Get current price for the trade's asset
-          const exitPrice = await getCurrentPrice(trade.asset);
+          // Price when the trade went stale (current price if not stored)
+          const staleAt = new Date(tradeTimestamp + STALE_TRADE_CONFIG.PAPER_TRADE_MAX_AGE_MS).toISOString();
+          const exitPrice = await getHistoricalPrice(trade.asset, staleAt);
           
           // Calculate P&L
           const pnl = trade.direction === 'long'
@@ -346,10 +349,10 @@ async function handleStalePaperTrades(
  *   → Action: If no bets, reset to SCANNING
  * 
  * - POSITION_OPEN: Stale if position opened > POSITION_OPEN_MAX_STALE_MS ago
- *   → Action: Auto-settle at current price, calculate winners/losers
+ *   → Action: Auto-settle at the price when it went stale, calculate winners/losers
  * 
  * - EXIT_SIGNAL: Stale if exit signal > 10 minutes ago (should auto-settle quickly)
- *   → Action: Auto-settle at current price
+ *   → Action: Auto-settle at the price at the exit signal
  * 
  * - SETTLEMENT: Not stale (terminal state), but reset if older than 1 hour
  *   → Action: Reset to SCANNING for new round
@@ -466,8 +469,9 @@ async function handleStalePredictionRounds(
           log(`Round ${currentRound.id} stuck in POSITION_OPEN for ${Math.round(positionAge / 60000)}min, auto-settling`);
 
           try {
-            // Get current price for settlement
-            const exitPrice = await getCurrentPrice(currentRound.asset);
+            // Settle at the price when the position went stale (current price if not stored)
+            const staleAt = new Date(positionOpenedAt + STALE_TRADE_CONFIG.POSITION_OPEN_MAX_STALE_MS).toISOString();
+            const exitPrice = await getHistoricalPrice(currentRound.asset, staleAt);
             const pool = getCurrentPool();
             const totalBets = pool.bets.length;
             const totalAmount = pool.totalUp + pool.totalDown;
@@ -552,7 +556,8 @@ async function handleStalePredictionRounds(
           log(`Round ${currentRound.id} stuck in EXIT_SIGNAL for ${Math.round(exitAge / 60000)}min, forcing settlement`);
 
           try {
-            const exitPrice = currentRound.exitPrice || await getCurrentPrice(currentRound.asset);
+            const exitPrice = currentRound.exitPrice
+              || await getHistoricalPrice(currentRound.asset, new Date(exitSignalAt).toISOString());
             
             const settledRound = {
               ...currentRound,
@@ -673,6 +678,41 @@ function resetToFreshRound(asset: string): void {
 // ON-DEMAND CLEANUP CHECK
 // ============================================================================
 
+/**
+ * Quick scan for stale state: open paper trades past their max age, or a
+ * prediction round stuck in a phase. Does not run the cleanup itself.
+ */
+export async function hasStaleTradeState(now: number = Date.now()): Promise<boolean> {
+  // Quick check: any open paper trades older than threshold?
+  const trades = await getStoredTrades();
+  const hasStaleOpenTrades = trades.some(t => 
+    t.status === 'open' && 
+    (now - new Date(t.timestamp).getTime()) > STALE_TRADE_CONFIG.PAPER_TRADE_MAX_AGE_MS
+  );
+  if (hasStaleOpenTrades) return true;
+
+  // Quick check: is the prediction round stale?
+  const currentRound = getCurrentRound();
+  if (!currentRound) return false;
+
+  const roundAge = now - new Date(currentRound.createdAt).getTime();
+
+  if (currentRound.phase === RoundPhase.POSITION_OPEN) {
+    const positionAge = currentRound.positionOpenedAt 
+      ? now - new Date(currentRound.positionOpenedAt).getTime()
+      : roundAge;
+    return positionAge > STALE_TRADE_CONFIG.POSITION_OPEN_MAX_STALE_MS;
+  }
+  if (currentRound.phase === RoundPhase.BETTING_WINDOW && currentRound.bettingWindowEnd) {
+    const timeSinceEnd = now - new Date(currentRound.bettingWindowEnd).getTime();
+    return timeSinceEnd > STALE_TRADE_CONFIG.BETTING_WINDOW_GRACE_PERIOD_MS;
+  }
+  if (currentRound.phase !== RoundPhase.SETTLEMENT) {
+    return roundAge > STALE_TRADE_CONFIG.PREDICTION_ROUND_MAX_AGE_MS;
+  }
+  return false;
+}
+
 /**
  * Lightweight check to determine if cleanup is needed
  * Can be called from any API route without blocking
@@ -688,34 +728,7 @@ export async function checkAndCleanupIfNeeded(): Promise<boolean> {
   }
 
   try {
-    // Quick check: any open paper trades older than threshold?
-    const trades = await getStoredTrades();
-    const hasStaleOpenTrades = trades.some(t => 
-      t.status === 'open' && 
-      (now - new Date(t.timestamp).getTime()) > STALE_TRADE_CONFIG.PAPER_TRADE_MAX_AGE_MS
-    );
-
-    // Quick check: is the prediction round stale?
-    const currentRound = getCurrentRound();
-    let hasStaleRound = false;
-    
-    if (currentRound) {
-      const roundAge = now - new Date(currentRound.createdAt).getTime();
-      
-      if (currentRound.phase === RoundPhase.POSITION_OPEN) {
-        const positionAge = currentRound.positionOpenedAt 
-          ? now - new Date(currentRound.positionOpenedAt).getTime()
-          : roundAge;
-        hasStaleRound = positionAge > STALE_TRADE_CONFIG.POSITION_OPEN_MAX_STALE_MS;
-      } else if (currentRound.phase === RoundPhase.BETTING_WINDOW && currentRound.bettingWindowEnd) {
-        const timeSinceEnd = now - new Date(currentRound.bettingWindowEnd).getTime();
-        hasStaleRound = timeSinceEnd > STALE_TRADE_CONFIG.BETTING_WINDOW_GRACE_PERIOD_MS;
-      } else if (currentRound.phase !== RoundPhase.SETTLEMENT) {
-        hasStaleRound = roundAge > STALE_TRADE_CONFIG.PREDICTION_ROUND_MAX_AGE_MS;
-      }
-    }
-
-    if (hasStaleOpenTrades || hasStaleRound) {
+    if (await hasStaleTradeState(now)) {
       // Run cleanup asynchronously (don't block the calling route)
       runStaleTradeCleanup().catch(err => {
         console.error('[stale-trade-handler] Background cleanup error:', err);
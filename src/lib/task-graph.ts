@@ -0,0 +1,144 @@
+/**
+ * Request Task Graph
+ *
+ * Small dependency-graph executor for route handlers. Each task starts as
+ * soon as the tasks it depends on have resolved, so independent KV reads run
+ * concurrently and the model fan-out starts the moment its inputs exist,
+ * instead of everything running in source order.
+ *
+ * The graph records when each task started and finished and can render a
+ * Server-Timing header with the per-task durations, the wall time of the
+ * graph (`total`), the sum of all task durations (`serial`, what the chain
+ * cost when run in order) and the critical path.
+ *
+ * @example
+ * const graph = new TaskGraph();
+ * const limit = graph.run('rate_limit', () => checkRateLimit(request, CONSENSUS_RATE_LIMIT));
+ * const chatroom = graph.run('chatroom', () => getChatroomConsensus());
+ * const council = graph.after('council', [limit, chatroom], (l, c) => runCouncil(l, c));
+ * headers.set('Server-Timing', graph.serverTiming());
+ */
+
+interface TaskRecord {
+  name: string;
+  deps: string[];
+  startedAt: number;
+  endedAt: number | null;
+  failed: boolean;
+}
+
+type ResolvedValues<T> = { [K in keyof T]: Awaited<T[K]> };
+
+const taskNames = new WeakMap<Promise<unknown>, string>();
+
+function now(): number {
+  return typeof performance !== 'undefined' ? performance.now() : Date.now();
+}
+
+export class TaskGraph {
+  private readonly createdAt = now();
+  private readonly tasks = new Map<string, TaskRecord>();
+
+  /**
+   * Start a task with no dependencies
+   */
+  run<T>(name: string, fn: () => Promise<T> | T): Promise<T> {
+    return this.start(name, [], fn);
+  }
+
+  /**
+   * Start a task once all of `deps` have resolved; it receives their values.
+   * If a dependency rejects, the task does not run and rejects with the same error.
+   */
+  after<D extends readonly Promise<unknown>[], T>(
+    name: string,
+    deps: readonly [...D],
+    fn: (...values: ResolvedValues<D>) => Promise<T> | T
+  ): Promise<T> {
+    const depNames = deps.map(dep => taskNames.get(dep) ?? 'external');
+    const promise = Promise.all(deps).then(values =>
+      this.start(name, depNames, () => fn(...(values as unknown as ResolvedValues<D>)))
+    );
+    promise.catch(() => undefined);
+    taskNames.set(promise, name);
+    return promise;
+  }
+
+  private start<T>(name: string, deps: string[], fn: () => Promise<T> | T): Promise<T> {
+    if (this.tasks.has(name)) {
+      throw new Error(`Duplicate task name: ${name}`);
+    }
+    const record: TaskRecord = { name, deps, startedAt: now(), endedAt: null, failed: false };
+    this.tasks.set(name, record);
+
+    const promise = Promise.resolve()
+      .then(fn)
+      .then(
+        value => {
+          record.endedAt = now();
+          return value;
+        },
+        error => {
+          record.endedAt = now();
+          record.failed = true;
+          throw error;
+        }
+      );
+
+    // Callers may return early (e.g. rate limited) without awaiting every
+    // task; a rejection then must not surface as an unhandled rejection
+    promise.catch(() => undefined);
+    taskNames.set(promise, name);
+    return promise;
+  }
+
+  /**
+   * Names of the tasks on the longest dependency chain, in order
+   */
+  criticalPath(): string[] {
+    let last: TaskRecord | null = null;
+    for (const task of this.tasks.values()) {
+      if (task.endedAt !== null && (!last || task.endedAt > (last.endedAt ?? 0))) last = task;
+    }
+
+    const path: string[] = [];
+    while (last) {
+      path.unshift(last.name);
+      let next: TaskRecord | null = null;
+      for (const dep of last.deps) {
+        const record = this.tasks.get(dep);
+        if (record?.endedAt != null && (!next || record.endedAt > (next.endedAt ?? 0))) next = record;
+      }
+      last = next;
+    }
+    return path;
+  }
+
+  /**
+   * Per-task timings relative to graph creation (finished tasks only)
+   */
+  getTimings() {
+    const tasks = Array.from(this.tasks.values())
+      .filter(task => task.endedAt !== null)
+      .map(task => ({
+        name: task.name,
+        startMs: Math.round(task.startedAt - this.createdAt),
+        durationMs: Math.round((task.endedAt as number) - task.startedAt),
+        failed: task.failed,
+      }));
+    const totalMs = tasks.reduce((max, task) => Math.max(max, task.startMs + task.durationMs), 0);
+    const serialMs = tasks.reduce((sum, task) => sum + task.durationMs, 0);
+    return { tasks, totalMs, serialMs, criticalPath: this.criticalPath() };
+  }
+
+  /**
+   * Server-Timing header value
+   */
+  serverTiming(): string {
+    const { tasks, totalMs, serialMs, criticalPath } = this.getTimings();
+    const entries = tasks.map(task => `${task.name};dur=${task.durationMs}`);
+    entries.push(`total;dur=${totalMs};desc="${criticalPath.join('>')}"`);
+    entries.push(`serial;dur=${serialMs}`);
+    return entries.join(', ');
+  }
+}
@@ -0,0 +1,453 @@
+/**
+ * Two-Tier Cache: in-process L1 backed by a shared KV L2
+ *
+ * Every serverless instance starts with empty in-process caches, so each
+ * one used to pay for its own model and CoinGecko calls for identical
+ * requests. A TieredCache keeps the per-process Map (L1) and adds a shared
+ * KV tier (L2):
+ *
+ * - L2 keys are versioned (`cache:<CACHE_KEY_VERSION>:<cache>:<key>`), so a
+ *   deploy that changes a value's shape bumps the version instead of
+ *   reading old entries.
+ * - Cross-instance single-flight: on an L2 miss an instance takes a
+ *   `<key>:lock` key (SET NX with LOCK_TTL_MS) and computes; the others
+ *   poll L2 for its result for up to LOCK_WAIT_MS, then compute themselves.
+ *   Within an instance, concurrent callers share one computation.
+ * - Negative caching: an upstream failure is stored for NEGATIVE_TTL_MS in
+ *   both tiers, so a failing provider is not hit again by every request
+ *   and instance. Callers get a CachedFailureError until it expires.
+ *   Aborts are not cached (the caller gave up, the upstream did not fail).
+ *
+ * L2 is Vercel KV when configured. Without KV the caches are L1-only;
+ * setL2Store(createMemoryL2Store()) gives a local stand-in that several
+ * caches can share, as separate instances would share KV.
+ * L2 errors are logged and the call continues as an L2 miss.
+ *
+ * Hits are counted per tier (getTieredCacheStats(), /api/health
+ * performance.tiered_cache).
+ *
+ * Configuration (environment):
+ *   CACHE_KEY_VERSION=v1        L2 key version
+ *   CACHE_L2_ENABLED=true       Use KV as L2 when it is configured
+ *   CACHE_LOCK_TTL_MS=30000     Single-flight lock lifetime
+ *   CACHE_LOCK_WAIT_MS=20000    How long to wait for another instance
+ *   CACHE_LOCK_POLL_MS=100      L2 poll interval while waiting
+ *   CACHE_NEGATIVE_TTL_MS=5000  How long an upstream failure is cached
+ *   CACHE_L1_MAX_ENTRIES=1000   Entries per cache in L1 (oldest dropped)
+ */
+
+import { loadKV } from './cold-start';
+import { registerSizeGauge } from './process-metrics';
+
+export const TIERED_CACHE_CONFIG = {
+  KEY_VERSION: process.env.CACHE_KEY_VERSION || 'v1',
+  L2_ENABLED: process.env.CACHE_L2_ENABLED !== 'false',
+  LOCK_TTL_MS: parseInt(process.env.CACHE_LOCK_TTL_MS || '30000', 10),
+  LOCK_WAIT_MS: parseInt(process.env.CACHE_LOCK_WAIT_MS || '20000', 10),
+  LOCK_POLL_MS: parseInt(process.env.CACHE_LOCK_POLL_MS || '100', 10),
+  NEGATIVE_TTL_MS: parseInt(process.env.CACHE_NEGATIVE_TTL_MS || '5000', 10),
+  L1_MAX_ENTRIES: parseInt(process.env.CACHE_L1_MAX_ENTRIES || '1000', 10),
+};
+
+/**
+ * Shared key-value tier
+ */
+export interface L2Store {
+  readonly kind: string;
+  get<T>(key: string): Promise<T | null>;
+  set(key: string, value: unknown, ttlMs: number): Promise<void>;
+  /** Set only if the key does not exist; true if this call set it */
+  setIfAbsent(key: string, value: unknown, ttlMs: number): Promise<boolean>;
+  del(key: string): Promise<void>;
+}
+
+export type TieredCacheSource = 'l1' | 'l2' | 'computed' | 'shared';
+
+export interface TieredCacheResult<T> {
+  value: T;
+  source: TieredCacheSource;
+}
+
+export interface TieredCacheOptions {
+  /** Default lifetime of a computed value */
+  ttlMs: number;
+  /** Lifetime of a cached failure (0 disables negative caching) */
+  negativeTtlMs?: number;
+  maxEntries?: number;
+}
+
+/**
+ * Thrown while a recent upstream failure is negatively cached
+ */
+export class CachedFailureError extends Error {
+  constructor(public readonly cacheName: string, message: string) {
+    super(message);
+    this.name = 'CachedFailureError';
+  }
+}
+
+/** Entry as stored in both tiers: a value, or the message of a failure */
+interface StoredEntry<T> {
+  v?: T;
+  e?: string;
+  /** Absolute expiry, so L1 copies of L2 entries expire with them */
+  exp: number;
+}
+
+function isKVAvailable(): boolean {
+  return !!(process.env.KV_REST_API_URL && process.env.KV_REST_API_TOKEN);
+}
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+const kvL2Store: L2Store = {
+  kind: 'kv',
+  async get<T>(key: string) {
+    const { kv } = await loadKV();
+    return kv.get<T>(key);
+  },
+  async set(key, value, ttlMs) {
+    const { kv } = await loadKV();
+    await kv.set(key, value, { px: Math.max(1, ttlMs) });
+  },
+  async setIfAbsent(key, value, ttlMs) {
+    const { kv } = await loadKV();
+    return (await kv.set(key, value, { px: Math.max(1, ttlMs), nx: true })) === 'OK';
+  },
+  async del(key) {
+    const { kv } = await loadKV();
+    await kv.del(key);
+  },
+};
+
+/**
+ * In-memory L2 stand-in for local development and tests. Values are
+ * JSON round-tripped like KV does.
+ */
+export function createMemoryL2Store(): L2Store & { readonly size: number } {
+  const entries = new Map<string, { json: string; expiresAt: number }>();
+  const live = (key: string) => {
+    const entry = entries.get(key);
+    if (entry && entry.expiresAt <= Date.now()) {
+      entries.delete(key);
+      return undefined;
+    }
+    return entry;
+  };
+
+  return {
+    kind: 'memory',
+    async get<T>(key: string) {
+      const entry = live(key);
+      return entry ? JSON.parse(entry.json) as T : null;
+    },
+    async set(key, value, ttlMs) {
+      entries.set(key, { json: JSON.stringify(value), expiresAt: Date.now() + ttlMs });
+    },
+    async setIfAbsent(key, value, ttlMs) {
+      if (live(key)) return false;
+      entries.set(key, { json: JSON.stringify(value), expiresAt: Date.now() + ttlMs });
+      return true;
+    },
+    async del(key) {
+      entries.delete(key);
+    },
+    get size() {
+      return entries.size;
+    },
+  };
+}
+
+// undefined: choose from the environment; null: L1 only
+let l2Override: L2Store | null | undefined;
+
+/**
+ * Replace the L2 tier (null disables it); undefined restores the default
+ */
+export function setL2Store(store: L2Store | null | undefined): void {
+  l2Override = store;
+}
+
+function getL2Store(): L2Store | null {
+  if (l2Override !== undefined) return l2Override;
+  return TIERED_CACHE_CONFIG.L2_ENABLED && isKVAvailable() ? kvL2Store : null;
+}
+
+function createTierStats() {
+  return {
+    l1Hits: 0,
+    l1Misses: 0,
+    l2Hits: 0,
+    l2Misses: 0,
+    l2Errors: 0,
+    computes: 0,
+    shared: 0,
+    negativeHits: 0,
+    negativeStored: 0,
+    lockWaits: 0,
+    lockTimeouts: 0,
+  };
+}
+
+const ratio = (hits: number, misses: number) =>
+  hits + misses > 0 ? Math.round((hits / (hits + misses)) * 1000) / 1000 : 0;
+
+const caches = new Map<string, TieredCache<unknown>>();
+let lockCounter = 0;
+
+export class TieredCache<T> {
+  private l1 = new Map<string, StoredEntry<T>>();
+  private pending = new Map<string, Promise<TieredCacheResult<T>>>();
+  // Lock key -> token of the locks this instance holds
+  private lockOwners = new Map<string, string>();
+  private stats = createTierStats();
+
+  constructor(readonly name: string, private options: TieredCacheOptions) {
+    caches.set(name, this as TieredCache<unknown>);
+    registerSizeGauge(`tieredCache.${name}`, () => this.l1.size);
+  }
+
+  /**
+   * Return the cached value for key (L1, then L2) or compute it, with
+   * single-flight within and across instances
+   */
+  async getOrCompute(key: string, fn: () => Promise<T>, ttlMs: number = this.options.ttlMs): Promise<TieredCacheResult<T>> {
+    const local = this.l1.get(key);
+    if (local && local.exp > Date.now()) {
+      this.stats.l1Hits++;
+      return this.settle(local, 'l1');
+    }
+    this.stats.l1Misses++;
+
+    const pending = this.pending.get(key);
+    if (pending) {
+      this.stats.shared++;
+      return { value: (await pending).value, source: 'shared' };
+    }
+
+    const promise = this.load(key, fn, ttlMs).finally(() => {
+      this.pending.delete(key);
+    });
+    this.pending.set(key, promise);
+    return promise;
+  }
+
+  /**
+   * Last value held in L1 for key, even if expired (for stale fallbacks)
+   */
+  peekStale(key: string): T | undefined {
+    return this.l1.get(key)?.v;
+  }
+
+  /**
+   * Drop key from both tiers
+   */
+  async invalidate(key: string): Promise<void> {
+    this.l1.delete(key);
+    const l2 = getL2Store();
+    if (!l2) return;
+    try {
+      await l2.del(this.l2Key(key));
+    } catch (error) {
+      this.stats.l2Errors++;
+      console.warn(`[tiered-cache] ${this.name}: L2 delete failed:`, error);
+    }
+  }
+
+  /**
+   * Drop matching keys from L1 (L2 entries expire on their own; bump
+   * CACHE_KEY_VERSION to drop them everywhere)
+   */
+  invalidateWhere(predicate: (key: string) => boolean): void {
+    for (const key of this.l1.keys()) {
+      if (predicate(key)) this.l1.delete(key);
+    }
+  }
+
+  clear(): void {
+    this.l1.clear();
+    this.pending.clear();
+  }
+
+  get size(): number {
+    return this.l1.size;
+  }
+
+  getStats() {
+    const s = this.stats;
+    return {
+      entries: this.l1.size,
+      l1: { hits: s.l1Hits, misses: s.l1Misses, hitRate: ratio(s.l1Hits, s.l1Misses) },
+      l2: { hits: s.l2Hits, misses: s.l2Misses, errors: s.l2Errors, hitRate: ratio(s.l2Hits, s.l2Misses) },
+      computes: s.computes,
+      shared: s.shared,
+      negativeHits: s.negativeHits,
+      negativeStored: s.negativeStored,
+      lockWaits: s.lockWaits,
+      lockTimeouts: s.lockTimeouts,
+    };
+  }
+
+  resetStats(): void {
+    this.stats = createTierStats();
+  }
+
+  private l2Key(key: string): string {
+    return `cache:${TIERED_CACHE_CONFIG.KEY_VERSION}:${this.name}:${key}`;
+  }
+
+  private async load(key: string, fn: () => Promise<T>, ttlMs: number): Promise<TieredCacheResult<T>> {
+    const l2 = getL2Store();
+    if (!l2) return this.compute(key, fn, ttlMs, null);
+
+    let claim: { entry: StoredEntry<T> } | { lock: string | null };
+    try {
+      claim = await this.claim(l2, key);
+    } catch (error) {
+      this.stats.l2Errors++;
+      this.stats.l2Misses++;
+      console.warn(`[tiered-cache] ${this.name}: L2 unavailable, computing locally:`, error);
+      return this.compute(key, fn, ttlMs, null);
+    }
+
+    if ('entry' in claim) {
+      this.stats.l2Hits++;
+      this.writeL1(key, claim.entry);
+      return this.settle(claim.entry, 'l2');
+    }
+    this.stats.l2Misses++;
+    return this.compute(key, fn, ttlMs, l2, claim.lock);
+  }
+
+  /**
+   * Read key from L2, or take its lock; while another instance holds the
+   * lock, poll for its result until LOCK_WAIT_MS (then compute unlocked)
+   */
+  private async claim(l2: L2Store, key: string): Promise<{ entry: StoredEntry<T> } | { lock: string | null }> {
+    const l2Key = this.l2Key(key);
+    const lockKey = `${l2Key}:lock`;
+    const owner = `${Date.now().toString(36)}-${(++lockCounter).toString(36)}-${Math.random().toString(36).slice(2, 8)}`;
+    const deadline = Date.now() + TIERED_CACHE_CONFIG.LOCK_WAIT_MS;
+    let waiting = false;
+
+    for (;;) {
+      const found = await l2.get<StoredEntry<T>>(l2Key);
+      if (found && found.exp > Date.now()) return { entry: found };
+
+      if (await l2.setIfAbsent(lockKey, owner, TIERED_CACHE_CONFIG.LOCK_TTL_MS)) {
+        this.lockOwners.set(lockKey, owner);
+        return { lock: lockKey };
+      }
+
+      if (!waiting) {
+        waiting = true;
+        this.stats.lockWaits++;
+      }
+      if (Date.now() >= deadline) {
+        this.stats.lockTimeouts++;
+        return { lock: null };
+      }
+      await sleep(TIERED_CACHE_CONFIG.LOCK_POLL_MS);
+    }
+  }
+
+  /**
+   * Release a lock this instance took, unless it expired and was taken over
+   */
+  private async releaseLock(l2: L2Store, lockKey: string): Promise<void> {
+    const owner = this.lockOwners.get(lockKey);
+    this.lockOwners.delete(lockKey);
+    try {
+      if (await l2.get<string>(lockKey) === owner) await l2.del(lockKey);
+    } catch (error) {
+      this.stats.l2Errors++;
+      console.warn(`[tiered-cache] ${this.name}: lock release failed:`, error);
+    }
+  }
+
+  private async compute(
+    key: string,
+    fn: () => Promise<T>,
+    ttlMs: number,
+    l2: L2Store | null,
+    lockKey: string | null = null
+  ): Promise<TieredCacheResult<T>> {
+    this.stats.computes++;
+    try {
+      const value = await fn();
+      const entry: StoredEntry<T> = { v: value, exp: Date.now() + ttlMs };
+      this.writeL1(key, entry);
+      if (l2) await this.writeL2(l2, key, entry, ttlMs);
+      return { value, source: 'computed' };
+    } catch (error) {
+      const negativeTtlMs = this.options.negativeTtlMs ?? TIERED_CACHE_CONFIG.NEGATIVE_TTL_MS;
+      const aborted = error instanceof Error && error.name === 'AbortError';
+      if (negativeTtlMs > 0 && !aborted) {
+        const entry: StoredEntry<T> = {
+          e: error instanceof Error ? error.message : String(error),
+          exp: Date.now() + negativeTtlMs,
+        };
+        this.stats.negativeStored++;
+        this.writeL1(key, entry);
+        if (l2) await this.writeL2(l2, key, entry, negativeTtlMs);
+      }
+      throw error;
+    } finally {
+      if (l2 && lockKey) await this.releaseLock(l2, lockKey);
+    }
+  }
+
+  private async writeL2(l2: L2Store, key: string, entry: StoredEntry<T>, ttlMs: number): Promise<void> {
+    try {
+      await l2.set(this.l2Key(key), entry, ttlMs);
+    } catch (error) {
+      this.stats.l2Errors++;
+      console.warn(`[tiered-cache] ${this.name}: L2 write failed:`, error);
+    }
+  }
+
+  private writeL1(key: string, entry: StoredEntry<T>): void {
+    const previous = this.l1.get(key);
+    this.l1.delete(key);
+    // A failure keeps the last good value around for peekStale()
+    this.l1.set(key, entry.e !== undefined && previous?.v !== undefined ? { ...entry, v: previous.v } : entry);
+    const maxEntries = this.options.maxEntries ?? TIERED_CACHE_CONFIG.L1_MAX_ENTRIES;
+    while (this.l1.size > maxEntries) {
+      const oldest = this.l1.keys().next().value as string;
+      this.l1.delete(oldest);
+    }
+  }
+
+  private settle(entry: StoredEntry<T>, source: TieredCacheSource): TieredCacheResult<T> {
+    if (entry.e !== undefined) {
+      this.stats.negativeHits++;
+      throw new CachedFailureError(this.name, entry.e);
+    }
+    return { value: entry.v as T, source };
+  }
+}
+
+/**
+ * Per-tier stats of every tiered cache, and which L2 is in use
+ */
+export function getTieredCacheStats() {
+  const l2 = getL2Store();
+  return {
+    l2: l2 ? l2.kind : 'off',
+    keyVersion: TIERED_CACHE_CONFIG.KEY_VERSION,
+    caches: Object.fromEntries(
+      Array.from(caches.values(), cache => [cache.name, cache.getStats()])
+    ),
+  };
+}
+
+/**
+ * Reset cache state (for testing)
+ */
+export function resetTieredCacheState(): void {
+  for (const cache of caches.values()) {
+    cache.clear();
+    cache.resetStats();
+  }
+  l2Override = undefined;
+}
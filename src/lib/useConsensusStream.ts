@@ -1,7 +1,8 @@
 'use client';
 
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { Analyst, ConsensusData } from './types';
+import { withLastEventId } from './sse-resume';
 
 // Mock analyst data - will be replaced with actual SSE endpoint
 const MOCK_ANALYSTS: Analyst[] = [
@@ -79,6 +80,7 @@ export function useConsensusStream(apiEndpoint: string = '/api/consensus') {
   const [isRetryable, setIsRetryable] = useState(false);
   const [retryCount, setRetryCount] = useState(0);
   const [progressUpdates, setProgressUpdates] = useState<Map<string, string>>(new Map());
+  const lastEventIdRef = useRef<string | null>(null);
   const maxRetries = 3;
 
   const calculateConsensus = useCallback((analysts: Analyst[]) => {
@@ -118,6 +120,11 @@ export function useConsensusStream(apiEndpoint: string = '/api/consensus') {
     return 'HOLD';
   }, []);
 
+  // A different endpoint is a different run: never resume across them
+  useEffect(() => {
+    lastEventIdRef.current = null;
+  }, [apiEndpoint]);
+
   // SSE Connection Effect
   useEffect(() => {
     if (!useSSE) return;
@@ -127,10 +134,12 @@ export function useConsensusStream(apiEndpoint: string = '/api/consensus') {
 
     const connectSSE = () => {
       try {
-        eventSource = new EventSource(apiEndpoint);
+        // Reconnects re-attach to the same run and only get the missed events
+        eventSource = new EventSource(withLastEventId(apiEndpoint, lastEventIdRef.current));
         setSSEError(null);
 
         eventSource.onmessage = (event) => {
+          if (event.lastEventId) lastEventIdRef.current = event.lastEventId;
           try {
             const data = JSON.parse(event.data);
             setRetryCount(0); // Reset retry count on successful message
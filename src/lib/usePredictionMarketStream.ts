@@ -2,6 +2,8 @@
 
 import { useState, useEffect, useCallback, useRef } from 'react';
 import { RoundState, RoundPhase, BettingPool, ConsensusSnapshot } from './prediction-market/types';
+import { applyRoundDelta, type RoundStateDelta } from './prediction-market/round-delta';
+import { trackLastEventId, withLastEventId } from './sse-resume';
 
 interface UsePredictionMarketStreamOptions {
   enabled?: boolean;
@@ -42,6 +44,7 @@ export function usePredictionMarketStream({
   const eventSourceRef = useRef<EventSource | null>(null);
   const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
   const retryCountRef = useRef(0);
+  const lastEventIdRef = useRef<string | null>(null);
   const maxRetries = 5;
 
   const connect = useCallback(() => {
@@ -52,8 +55,14 @@ export function usePredictionMarketStream({
     console.log('[usePredictionMarketStream] Connecting to', apiUrl);
 
     try {
-      const eventSource = new EventSource(apiUrl);
+      // Resume from the last event seen so only missed events are replayed
+      const eventSource = new EventSource(withLastEventId(apiUrl, lastEventIdRef.current));
       eventSourceRef.current = eventSource;
+      trackLastEventId(
+        eventSource,
+        ['round_state', 'round_delta', 'consensus_update', 'phase_change', 'pool_update', 'price_update', 'settlement_complete', 'round_complete'],
+        (id) => { lastEventIdRef.current = id; }
+      );
 
       eventSource.onopen = () => {
         console.log('[usePredictionMarketStream] Connected');
@@ -98,6 +107,19 @@ export function usePredictionMarketStream({
         }
       });
 
+      // Handle round_delta event (only the fields that changed)
+      eventSource.addEventListener('round_delta', (event: MessageEvent) => {
+        try {
+          const delta: RoundStateDelta = JSON.parse(event.data);
+          setRound(prev => applyRoundDelta(prev, delta));
+          if (delta.changes.currentPrice) setCurrentPrice(delta.changes.currentPrice);
+          if (delta.changes.bettingPool) setPool(delta.changes.bettingPool);
+          if (delta.changes.consensusSnapshot) setConsensusSnapshot(delta.changes.consensusSnapshot);
+        } catch (err) {
+          console.error('[usePredictionMarketStream] Failed to parse round_delta:', err);
+        }
+      });
+
       // Handle consensus_update event
       eventSource.addEventListener('consensus_update', (event: MessageEvent) => {
         try {
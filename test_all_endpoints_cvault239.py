@@ -141,6 +141,12 @@ class EndpointTester:
                           data={}, expect_error=True))
         self.results.append(self.test_endpoint("Consensus Detailed", "GET", "/api/consensus-detailed", params={"asset": "BTC"}))
         self.results.append(self.test_endpoint("Consensus Enhanced", "GET", "/api/consensus-enhanced", params={"asset": "BTC"}))
+        self.results.append(self.test_endpoint("Consensus Batch (SSE)", "GET", "/api/consensus-batch",
+                          params={"assets": "BTC,ETH,SOL"}, is_sse=True))
+        self.results.append(self.test_endpoint("Consensus Batch (POST - Missing Assets)", "POST", "/api/consensus-batch",
+                          data={}, expect_error=True))
+        self.results.append(self.test_endpoint("Consensus Batch (POST - Unsupported Asset)", "POST", "/api/consensus-batch",
+                          data={"assets": ["BTC", "NOTACOIN"]}, expect_error=True))
         
         # Test Council Endpoints
         print(f"\n{BLUE}### COUNCIL ENDPOINTS ###{RESET}")
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Chatroom Turn KV Round Trip Test
+Measures how long a chatroom generation turn holds the generation lock and
+how many KV round trips it makes, before and after write-behind turns.
+
+The server reports both in GET /api/health (`chatroomStore`): `lock` has
+the hold times and KV round trips per lock hold, `commits` the time and
+round trips of each write-behind commit. The script keeps an SSE
+connection to /api/chatroom/stream open until TURNS new chat messages have
+been broadcast (or PHASE_TIMEOUT_SECONDS pass) and compares the counters.
+
+With START_CMD set, the server is started twice:
+  baseline      CHATROOM_WRITE_BEHIND=false: every mutation of a turn is
+                its own awaited KV call while the lock is held, as before
+  write-behind  the turn's mutations staged and written in one MULTI
+Without START_CMD, only the running server is measured.
+
+Round trips are only counted against KV (KV_REST_API_URL/TOKEN set); with
+the in-memory store they stay at 0. Lock hold time still includes the
+message generation and the simulated typing delays.
+
+Usage:
+    START_CMD="npm run start" python3 test_chatroom_turn_kv.py
+    TURNS=5 PHASE_TIMEOUT_SECONDS=600 START_CMD="npm run start" python3 test_chatroom_turn_kv.py
+    BASE_URL=http://host:3000 python3 test_chatroom_turn_kv.py
+"""
+
+import json
+import os
+import shlex
+import signal
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+TIMEOUT = 30
+START_CMD = os.environ.get("START_CMD", "")
+STARTUP_TIMEOUT_SECONDS = float(os.environ.get("STARTUP_TIMEOUT_SECONDS", "60"))
+TURNS = int(os.environ.get("TURNS", "3"))
+# Messages are generated every 60-90s during a debate
+PHASE_TIMEOUT_SECONDS = float(os.environ.get("PHASE_TIMEOUT_SECONDS", "300"))
+
+BASELINE_ENV = {"CHATROOM_WRITE_BEHIND": "false"}
+WRITE_BEHIND_ENV = {"CHATROOM_WRITE_BEHIND": "true"}
+
+# Color codes for terminal output
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+BLUE = "\033[94m"
+RESET = "\033[0m"
+
+
+def wait_for_port(timeout):
+    parsed = urlparse(BASE_URL)
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((parsed.hostname, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def start_server(env_overrides):
+    process = subprocess.Popen(
+        shlex.split(START_CMD),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        env={**os.environ, **env_overrides},
+    )
+    if not wait_for_port(STARTUP_TIMEOUT_SECONDS):
+        stop_server(process)
+        raise RuntimeError(f"server did not open its port within {STARTUP_TIMEOUT_SECONDS}s")
+    return process
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def store_stats():
+    """The server's chatroom store counters (None if unavailable)"""
+    try:
+        body = requests.get(f"{BASE_URL}/api/health", timeout=TIMEOUT).json()
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+    return body.get("chatroomStore")
+
+
+def wait_for_turns(turns, timeout):
+    """Listen on the chatroom stream until `turns` new messages arrive"""
+    messages = 0
+    deadline = time.time() + timeout
+    event = None
+    with requests.get(f"{BASE_URL}/api/chatroom/stream", stream=True, timeout=(TIMEOUT, 15)) as response:
+        response.raise_for_status()
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if line and line.startswith("event:"):
+                    event = line.split(":", 1)[1].strip()
+                elif not line:
+                    if event == "message":
+                        messages += 1
+                        print(f"  message {messages}/{turns}")
+                    event = None
+                if messages >= turns or time.time() > deadline:
+                    break
+        except requests.exceptions.ConnectionError:
+            # Read timeout between keepalives after the deadline
+            pass
+    return messages
+
+
+def measure(label):
+    before = store_stats()
+    started = time.perf_counter()
+    messages = wait_for_turns(TURNS, PHASE_TIMEOUT_SECONDS)
+    elapsed = time.perf_counter() - started
+    # The lock is released after the next speaker's typing indicator
+    time.sleep(3)
+    after = store_stats()
+
+    result = {
+        "label": label,
+        "messages": messages,
+        "elapsed_seconds": round(elapsed, 1),
+        "server_stats": after,
+    }
+    if before and after:
+        holds = after["lock"]["holds"] - before["lock"]["holds"]
+        commits = after["commits"]["count"] - before["commits"]["count"]
+        result.update({
+            "backend": after["backend"],
+            "write_behind": after["writeBehind"],
+            "lock_holds": holds,
+            "kv_round_trips": after["kvRoundTrips"] - before["kvRoundTrips"],
+            "avg_lock_hold_ms": after["lock"]["avgHoldMs"],
+            "p95_lock_hold_ms": after["lock"]["p95HoldMs"],
+            "max_lock_hold_ms": after["lock"]["maxHoldMs"],
+            "round_trips_per_hold": after["lock"]["avgRoundTripsPerHold"],
+            "commits": commits,
+            "avg_commit_ms": after["commits"]["avgMs"],
+            "round_trips_per_commit": after["commits"]["avgRoundTrips"],
+        })
+    return result
+
+
+def run_phase(label, env_overrides):
+    process = None
+    try:
+        if START_CMD:
+            process = start_server(env_overrides)
+        return measure(label)
+    except (requests.exceptions.RequestException, RuntimeError) as e:
+        return {"label": label, "error": str(e)}
+    finally:
+        if process:
+            stop_server(process)
+
+
+def print_result(result):
+    if "error" in result:
+        print(f"{RED}❌ {result['label']:12} {result['error']}{RESET}")
+        return
+    print(f"{BLUE}{result['label']}{RESET}: {result['messages']} message(s) in {result['elapsed_seconds']}s")
+    if "lock_holds" not in result:
+        print(f"{YELLOW}⚠️  No chatroomStore stats in /api/health{RESET}")
+        return
+    print(f"  backend {result['backend']}, write-behind {result['write_behind']}, "
+          f"{result['lock_holds']} lock hold(s)")
+    print(f"  lock hold: avg {result['avg_lock_hold_ms']}ms  p95 {result['p95_lock_hold_ms']}ms  "
+          f"max {result['max_lock_hold_ms']}ms  KV round trips per hold: {result['round_trips_per_hold']}")
+    if result["commits"]:
+        print(f"  commits: {result['commits']}  avg {result['avg_commit_ms']}ms  "
+              f"{result['round_trips_per_commit']} round trip(s) each")
+
+
+def main():
+    print(f"{BLUE}{'=' * 80}{RESET}")
+    print(f"{BLUE}Chatroom Turn KV Round Trip Test - {BASE_URL} "
+          f"({TURNS} turns, timeout {PHASE_TIMEOUT_SECONDS:.0f}s per phase){RESET}")
+    print(f"{BLUE}{'=' * 80}{RESET}")
+
+    phases = []
+    if START_CMD:
+        phases.append(run_phase("baseline", BASELINE_ENV))
+        phases.append(run_phase("write-behind", WRITE_BEHIND_ENV))
+    else:
+        print(f"{YELLOW}⚠️  START_CMD not set: measuring the running server only{RESET}")
+        phases.append(run_phase("current", {}))
+
+    for result in phases:
+        print_result(result)
+
+    failures = []
+    for result in phases:
+        if "error" in result:
+            failures.append(f"{result['label']}: {result['error']}")
+        elif "lock_holds" not in result:
+            failures.append(f"{result['label']}: chatroom store stats unavailable")
+        elif result["messages"] == 0:
+            failures.append(f"{result['label']}: no message generated within {PHASE_TIMEOUT_SECONDS:.0f}s")
+        elif result["backend"] == "memory":
+            print(f"{YELLOW}⚠️  {result['label']}: in-memory store, KV round trips not measured "
+                  f"(set KV_REST_API_URL and KV_REST_API_TOKEN){RESET}")
+
+    summary = {}
+    by_label = {r["label"]: r for r in phases if r.get("lock_holds")}
+    if "baseline" in by_label and "write-behind" in by_label:
+        baseline, batched = by_label["baseline"], by_label["write-behind"]
+        summary = {
+            "round_trips_per_hold_saved": round(
+                baseline["round_trips_per_hold"] - batched["round_trips_per_hold"], 1),
+            "avg_lock_hold_delta_ms": round(batched["avg_lock_hold_ms"] - baseline["avg_lock_hold_ms"], 1),
+        }
+        print(f"\nKV round trips per lock hold: {baseline['round_trips_per_hold']} → "
+              f"{batched['round_trips_per_hold']}  "
+              f"(avg lock hold {summary['avg_lock_hold_delta_ms']:+}ms)")
+        if batched["backend"] == "kv" and batched["round_trips_per_hold"] > baseline["round_trips_per_hold"]:
+            failures.append("write-behind turns make more KV round trips per lock hold than the baseline")
+
+    out_file = os.environ.get("RESULTS_FILE", "chatroom_turn_kv_results.json")
+    with open(out_file, "w") as f:
+        json.dump({"timestamp": datetime.utcnow().isoformat(), "base_url": BASE_URL, "turns": TURNS,
+                   "phases": phases, "summary": summary}, f, indent=2)
+    print(f"\n{GREEN}Results saved to: {out_file}{RESET}")
+
+    if failures:
+        for failure in failures:
+            print(f"{RED}❌ {failure}{RESET}")
+        return 1
+    print(f"{GREEN}✅ Chatroom turn lock holds and KV round trips measured{RESET}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
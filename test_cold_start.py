@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Cold-Start Test
+Times the first request to each route on a freshly started server against
+warm requests to the same route.
+
+With START_CMD set, the server is restarted before every route, so each
+route's first request is a true cold start (module loads included). Without
+it, the script measures the running server as-is, which is only meaningful
+right after a fresh start.
+
+After each route's warm requests, the server-side cold-start report from
+GET /api/health (`coldStart`) is read: how long the route's first requests
+spent loading heavy modules lazily, and whether that exceeded the per-route
+budget (COLD_START_BUDGET_MS). A route over budget fails the run.
+
+Streaming routes are timed to the first byte.
+
+Usage:
+    START_CMD="npm run start" python3 test_cold_start.py
+    BASE_URL=http://host:3000 WARM_REQUESTS=10 python3 test_cold_start.py
+    INCLUDE_AI_ROUTES=1 START_CMD="npm run start" python3 test_cold_start.py
+"""
+
+import json
+import os
+import shlex
+import signal
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+TIMEOUT = 60
+START_CMD = os.environ.get("START_CMD", "")
+STARTUP_TIMEOUT_SECONDS = float(os.environ.get("STARTUP_TIMEOUT_SECONDS", "60"))
+WARM_REQUESTS = int(os.environ.get("WARM_REQUESTS", "5"))
+INCLUDE_AI_ROUTES = os.environ.get("INCLUDE_AI_ROUTES") == "1"
+
+# (method, path, server-side route name, streaming)
+ROUTES = [
+    ("GET", "/api/health", "/api/health", False),
+    ("HEAD", "/api/health", "/api/health", False),
+    ("GET", "/api/health/models", "/api/health/models", False),
+    ("GET", "/api/admin/models", "/api/admin/models", False),
+    ("GET", "/api/chatroom/stream", "/api/chatroom/stream", True),
+    ("GET", "/api/human-chat/stream", None, True),
+    ("GET", "/api/price?asset=BTC", None, False),
+]
+AI_ROUTES = [
+    ("GET", "/api/consensus-detailed?asset=BTC", "/api/consensus-detailed", False),
+    ("GET", "/api/consensus-enhanced?asset=BTC", "/api/consensus-enhanced", False),
+]
+
+# Color codes for terminal output
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+BLUE = "\033[94m"
+RESET = "\033[0m"
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 1)
+
+
+def wait_for_port(timeout):
+    parsed = urlparse(BASE_URL)
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((parsed.hostname, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def start_server():
+    process = subprocess.Popen(
+        shlex.split(START_CMD),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    if not wait_for_port(STARTUP_TIMEOUT_SECONDS):
+        stop_server(process)
+        raise RuntimeError(f"server did not open its port within {STARTUP_TIMEOUT_SECONDS}s")
+    return process
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def timed_request(method, path, streaming):
+    """Latency in ms (to first byte for streams) and status code"""
+    started = time.perf_counter()
+    response = requests.request(method, f"{BASE_URL}{path}", timeout=TIMEOUT, stream=streaming)
+    try:
+        if streaming:
+            next(response.iter_content(chunk_size=1), None)
+        else:
+            response.content
+        return (time.perf_counter() - started) * 1000, response.status_code
+    finally:
+        response.close()
+
+
+def server_report(route_name):
+    """This route's entry in the server's cold-start report (None if unavailable)"""
+    if not route_name:
+        return None
+    try:
+        body = requests.get(f"{BASE_URL}/api/health", timeout=TIMEOUT).json()
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+    for route in (body.get("coldStart") or {}).get("routes", []):
+        if route.get("route") == route_name:
+            return route
+    return None
+
+
+def measure(method, path, route_name, streaming):
+    cold_ms, cold_status = timed_request(method, path, streaming)
+    warm = [timed_request(method, path, streaming) for _ in range(WARM_REQUESTS)]
+    warm_ms = [latency for latency, _ in warm]
+    statuses = [cold_status] + [status for _, status in warm]
+    report = server_report(route_name)
+    warm_p50 = percentile(warm_ms, 50)
+    return {
+        "route": f"{method} {path}",
+        "cold_ms": round(cold_ms, 1),
+        "warm_p50_ms": warm_p50,
+        "cold_overhead_ms": round(cold_ms - warm_p50, 1) if warm_p50 is not None else None,
+        "statuses": statuses,
+        "server_module_load_ms": report.get("moduleLoadMs") if report else None,
+        "server_modules": report.get("modules") if report else None,
+        "budget_ms": report.get("budgetMs") if report else None,
+        "over_budget": report.get("overBudget") if report else None,
+    }
+
+
+def main():
+    routes = ROUTES + (AI_ROUTES if INCLUDE_AI_ROUTES else [])
+
+    print(f"{BLUE}{'=' * 80}{RESET}")
+    print(f"{BLUE}Cold-Start Test - {BASE_URL} ({len(routes)} routes, {WARM_REQUESTS} warm requests each){RESET}")
+    print(f"{BLUE}{'=' * 80}{RESET}")
+    if not START_CMD:
+        print(f"{YELLOW}⚠️  START_CMD not set: measuring the running server without restarts{RESET}")
+
+    results = []
+    for method, path, route_name, streaming in routes:
+        process = None
+        try:
+            if START_CMD:
+                process = start_server()
+            result = measure(method, path, route_name, streaming)
+        except (requests.exceptions.RequestException, RuntimeError) as e:
+            result = {"route": f"{method} {path}", "error": str(e)}
+        finally:
+            if process:
+                stop_server(process)
+        results.append(result)
+
+        if "error" in result:
+            print(f"{RED}❌ {result['route']:45} {result['error']}{RESET}")
+            continue
+        ok = result["over_budget"] is not True and all(s and s < 500 for s in result["statuses"])
+        icon = f"{GREEN}✅{RESET}" if ok else f"{RED}❌{RESET}"
+        modules = ""
+        if result["server_module_load_ms"] is not None:
+            modules = (f" | modules {result['server_module_load_ms']}ms/{result['budget_ms']}ms "
+                       f"{','.join(result['server_modules'] or []) or '-'}")
+        print(f"{icon} {result['route']:45} cold {result['cold_ms']:8.1f}ms  "
+              f"warm p50 {result['warm_p50_ms']:7.1f}ms{modules}")
+
+    failures = [
+        r for r in results
+        if "error" in r or r["over_budget"] is True or not all(s and s < 500 for s in r["statuses"])
+    ]
+
+    out_file = os.environ.get("RESULTS_FILE", "cold_start_results.json")
+    with open(out_file, "w") as f:
+        json.dump({"timestamp": datetime.utcnow().isoformat(), "base_url": BASE_URL,
+                   "restarted": bool(START_CMD), "routes": results}, f, indent=2)
+    print(f"\n{GREEN}Results saved to: {out_file}{RESET}")
+
+    if failures:
+        print(f"{RED}❌ {len(failures)} route(s) failed or went over the startup budget{RESET}")
+        return 1
+    print(f"{GREEN}✅ All routes within the startup budget{RESET}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
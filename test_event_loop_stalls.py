@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Event-Loop Stall Watch
+Runs a load (SSE listeners on the chatroom, prediction market and human chat
+streams plus a steady request mix) while polling /api/debug/metrics, and
+connects each event-loop stall the server recorded to the work that caused
+it: the measured synchronous blocks (SSE encoding, settlement math, ...),
+the routes in flight and any GC pauses in the blocked interval.
+
+Client side, every SSE listener records gaps between received chunks, so a
+stall shows up both as server lag and as streams going quiet together.
+
+The run fails if the worst stall exceeds MAX_STALL_MS or the event-loop
+delay p99 of any poll window exceeds MAX_LOOP_P99_MS.
+
+Needs the debug endpoints enabled on the server:
+    DEBUG_ENDPOINTS_ENABLED=true npm run start
+
+Usage:
+    python3 test_event_loop_stalls.py
+    DURATION_SECONDS=120 SSE_CLIENTS=20 RATE=20 python3 test_event_loop_stalls.py
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+TIMEOUT = 30
+DURATION_SECONDS = float(os.environ.get("DURATION_SECONDS", "60"))
+POLL_INTERVAL_SECONDS = float(os.environ.get("POLL_INTERVAL_SECONDS", "1"))
+SSE_CLIENTS = int(os.environ.get("SSE_CLIENTS", "5"))  # per stream
+RATE = float(os.environ.get("RATE", "10"))  # requests per second
+CONCURRENCY = int(os.environ.get("CONCURRENCY", "16"))
+MAX_STALL_MS = float(os.environ.get("MAX_STALL_MS", "250"))
+MAX_LOOP_P99_MS = float(os.environ.get("MAX_LOOP_P99_MS", "100"))
+STREAM_GAP_MS = float(os.environ.get("STREAM_GAP_MS", "1000"))
+DEBUG_METRICS_SECRET = os.environ.get("DEBUG_METRICS_SECRET")
+RESULTS_FILE = os.environ.get("RESULTS_FILE", "event_loop_stalls_results.json")
+
+STREAMS = ["/api/chatroom/stream", "/api/prediction-market/stream", "/api/human-chat/stream"]
+
+# Color codes for terminal output
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+BLUE = "\033[94m"
+RESET = "\033[0m"
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 1)
+
+
+def wallet(i):
+    return "0x" + f"{i:040x}"[-40:]
+
+
+def listen(path, stop, gaps, started):
+    """Hold an SSE connection open and record gaps between chunks"""
+    try:
+        with requests.get(f"{BASE_URL}{path}", stream=True, timeout=(TIMEOUT, None)) as response:
+            last = time.perf_counter()
+            for _ in response.iter_content(chunk_size=None):
+                now = time.perf_counter()
+                gap_ms = (now - last) * 1000
+                if gap_ms >= STREAM_GAP_MS:
+                    gaps.append({"stream": path, "t": round(now - started, 2), "gap_ms": round(gap_ms)})
+                last = now
+                if stop.is_set():
+                    break
+    except requests.exceptions.RequestException:
+        pass
+
+
+def load_request(session, rng):
+    kind = rng.choice(["health", "history", "bet", "post"])
+    try:
+        if kind == "health":
+            session.get(f"{BASE_URL}/api/health", timeout=TIMEOUT)
+        elif kind == "history":
+            session.get(f"{BASE_URL}/api/chatroom/history", params={"limitMessages": 50}, timeout=TIMEOUT)
+        elif kind == "bet":
+            session.post(f"{BASE_URL}/api/prediction-market/bet", timeout=TIMEOUT, json={
+                "address": wallet(rng.randrange(500)), "amount": 100 + rng.randrange(900),
+                "side": rng.choice(["up", "down"])})
+        else:
+            user = wallet(rng.randrange(500))
+            session.post(f"{BASE_URL}/api/human-chat/post", timeout=TIMEOUT, json={
+                "userId": user, "handle": user[-8:], "content": f"stall watch {rng.randrange(10 ** 6)}"})
+    except requests.exceptions.RequestException:
+        pass
+
+
+def drive_load(stop):
+    rng = random.Random(7)
+    local = threading.local()
+
+    def send(seed):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        load_request(local.session, random.Random(seed))
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        start = time.perf_counter()
+        sent = 0
+        while not stop.is_set():
+            delay = start + sent / RATE - time.perf_counter()
+            if delay > 0:
+                stop.wait(delay)
+                continue
+            pool.submit(send, rng.random())
+            sent += 1
+
+
+def read_metrics(session):
+    headers = {"Authorization": f"Bearer {DEBUG_METRICS_SECRET}"} if DEBUG_METRICS_SECRET else {}
+    response = session.get(f"{BASE_URL}/api/debug/metrics", params={"reset": "true"},
+                           headers=headers, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def culprit(stall):
+    """The most likely cause of a stall: the longest measured block, else GC, else in-flight work"""
+    if stall.get("blocks"):
+        return stall["blocks"][0]["label"]
+    if stall.get("gcPauses"):
+        return f"gc:{max(stall['gcPauses'], key=lambda g: g['durationMs'])['kind']}"
+    if stall.get("inFlight"):
+        return "in flight: " + ", ".join(sorted(stall["inFlight"]))
+    return "(unattributed)"
+
+
+def main():
+    session = requests.Session()
+    print(f"{BLUE}{'=' * 80}{RESET}")
+    print(f"{BLUE}Event-Loop Stall Watch - {BASE_URL} ({DURATION_SECONDS:.0f}s, "
+          f"{SSE_CLIENTS} listeners per stream, {RATE} req/s){RESET}")
+    print(f"{BLUE}{'=' * 80}{RESET}")
+
+    try:
+        before = read_metrics(session)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"{RED}❌ Cannot read /api/debug/metrics: {e}{RESET}")
+        print(f"{YELLOW}   Start the server with DEBUG_ENDPOINTS_ENABLED=true{RESET}")
+        return 1
+
+    stop = threading.Event()
+    started = time.perf_counter()
+    gaps = []
+    listeners = [threading.Thread(target=listen, args=(path, stop, gaps, started), daemon=True)
+                 for path in STREAMS for _ in range(SSE_CLIENTS)]
+    for listener in listeners:
+        listener.start()
+    driver = threading.Thread(target=drive_load, args=(stop,), daemon=True)
+    driver.start()
+
+    seen = {stall["at"] for stall in before.get("recentStalls", [])}
+    stalls, windows = [], []
+    try:
+        while time.perf_counter() - started < DURATION_SECONDS:
+            time.sleep(POLL_INTERVAL_SECONDS)
+            try:
+                metrics = read_metrics(session)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"{RED}❌ Metrics read failed: {e}{RESET}")
+                continue
+            t = round(time.perf_counter() - started, 2)
+            delay = metrics["eventLoop"].get("delay") or {}
+            windows.append({"t": t, "p99_ms": delay.get("p99Ms"), "max_ms": delay.get("maxMs"),
+                            "utilization": metrics["eventLoop"].get("utilization"),
+                            "sse": metrics["sseConnections"]["total"]})
+            for stall in metrics.get("recentStalls", []):
+                if stall["at"] in seen:
+                    continue
+                seen.add(stall["at"])
+                stall = dict(stall, t=t, culprit=culprit(stall))
+                stalls.append(stall)
+                gc = ", ".join(f"{g['kind']} {g['durationMs']}ms" for g in stall["gcPauses"]) or "none"
+                print(f"{YELLOW}[{t:6.1f}s] stall {stall['lagMs']:.0f}ms ← {stall['culprit']}  "
+                      f"(in flight: {stall['inFlight']}, gc: {gc}){RESET}")
+    except KeyboardInterrupt:
+        print(f"{YELLOW}Interrupted{RESET}")
+    finally:
+        stop.set()
+
+    after = read_metrics(session)
+
+    by_culprit = {}
+    for stall in stalls:
+        entry = by_culprit.setdefault(stall["culprit"], {"stalls": 0, "total_lag_ms": 0, "max_lag_ms": 0})
+        entry["stalls"] += 1
+        entry["total_lag_ms"] = round(entry["total_lag_ms"] + stall["lagMs"], 1)
+        entry["max_lag_ms"] = max(entry["max_lag_ms"], stall["lagMs"])
+
+    # Client-side gaps within a poll interval of a server stall were caused by it
+    for gap in gaps:
+        near = [s for s in stalls if abs(s["t"] - gap["t"]) <= POLL_INTERVAL_SECONDS + 0.5]
+        gap["stall_culprit"] = near[0]["culprit"] if near else None
+
+    print(f"\n{BLUE}Stalls by cause:{RESET}")
+    for name, entry in sorted(by_culprit.items(), key=lambda item: -item[1]["total_lag_ms"]):
+        print(f"   {name:45} {entry['stalls']:4} stalls  total {entry['total_lag_ms']:8.0f}ms  "
+              f"max {entry['max_lag_ms']:.0f}ms")
+    if not stalls:
+        print(f"   {GREEN}none{RESET}")
+
+    top_cpu = sorted(after.get("work", {}).items(), key=lambda item: -item[1]["attributedCpuMs"])[:8]
+    print(f"\n{BLUE}CPU time by work (attributed):{RESET}")
+    for name, entry in top_cpu:
+        print(f"   {name:45} {entry['attributedCpuMs']:9.0f}ms  blocks {entry['blocks']:6}  "
+              f"max block {entry['maxBlockMs']}ms")
+    gc = after.get("gc", {})
+    print(f"\n{BLUE}GC:{RESET} " + (", ".join(f"{kind} {e['count']}x total {e['totalMs']:.0f}ms max {e['maxMs']:.0f}ms"
+                                         for kind, e in gc.items()) or "no pauses observed"))
+    attributed_gaps = sum(1 for g in gaps if g["stall_culprit"])
+    print(f"Client stream gaps ≥ {STREAM_GAP_MS:.0f}ms: {len(gaps)} ({attributed_gaps} during server stalls)")
+
+    p99s = [w["p99_ms"] for w in windows if w["p99_ms"] is not None]
+    worst_stall = max((s["lagMs"] for s in stalls), default=0)
+    failures = []
+    if worst_stall > MAX_STALL_MS:
+        failures.append(f"worst stall {worst_stall:.0f}ms > {MAX_STALL_MS:.0f}ms")
+    if p99s and max(p99s) > MAX_LOOP_P99_MS:
+        failures.append(f"event-loop p99 {max(p99s)}ms > {MAX_LOOP_P99_MS:.0f}ms")
+
+    with open(RESULTS_FILE, "w") as f:
+        json.dump({"timestamp": datetime.utcnow().isoformat(), "base_url": BASE_URL,
+                   "duration_seconds": DURATION_SECONDS, "sse_clients_per_stream": SSE_CLIENTS, "rate": RATE,
+                   "loop_p99_ms": {"median": percentile(p99s, 50), "worst": max(p99s) if p99s else None},
+                   "stalls": stalls, "stalls_by_cause": by_culprit, "stream_gaps": gaps,
+                   "work": after.get("work", {}), "gc": gc, "windows": windows, "failures": failures}, f, indent=2)
+    print(f"{GREEN}Results saved to: {RESULTS_FILE}{RESET}")
+
+    if failures:
+        print(f"{RED}❌ {'; '.join(failures)}{RESET}")
+        return 1
+    print(f"{GREEN}✅ No stall over {MAX_STALL_MS:.0f}ms; event-loop p99 within {MAX_LOOP_P99_MS:.0f}ms{RESET}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
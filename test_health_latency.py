@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Health Endpoint Latency Test
+Probes GET and HEAD /api/health for a while and checks that latency stays
+flat. Health probes used to run the stale trade check inline, so some probes
+paid for a KV scan; with cleanup in the background scheduler every probe
+should cost the same.
+
+The run is split into windows. Latency is flat when the slowest window's p95
+stays within FLAT_RATIO of the fastest window's p95 (plus FLAT_SLACK_MS for
+network noise). The scheduler's job counters are read before and after, so
+the report shows whether cleanup ran during the probe window.
+
+Usage:
+    python3 test_health_latency.py
+    BASE_URL=http://host:3000 DURATION_SECONDS=360 python3 test_health_latency.py
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+TIMEOUT = 10
+# Long enough to cover a stale-trade interval (5 min) for a full check
+DURATION_SECONDS = float(os.environ.get("DURATION_SECONDS", "60"))
+PROBE_INTERVAL_SECONDS = float(os.environ.get("PROBE_INTERVAL_SECONDS", "0.1"))
+WINDOW_SECONDS = float(os.environ.get("WINDOW_SECONDS", "5"))
+FLAT_RATIO = float(os.environ.get("FLAT_RATIO", "3"))
+FLAT_SLACK_MS = float(os.environ.get("FLAT_SLACK_MS", "20"))
+
+# Color codes for terminal output
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+BLUE = "\033[94m"
+RESET = "\033[0m"
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 1)
+
+
+def summarize(latencies):
+    return {
+        "count": len(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": round(max(latencies), 1) if latencies else None,
+        "mean_ms": round(statistics.mean(latencies), 1) if latencies else None,
+    }
+
+
+def scheduler_jobs(session):
+    """Per-job run counters from the health payload (None if unavailable)"""
+    try:
+        body = session.get(f"{BASE_URL}/api/health", timeout=TIMEOUT).json()
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+    scheduler = body.get("cleanupScheduler")
+    if not scheduler:
+        return None
+    return {job["name"]: job for job in scheduler.get("jobs", [])}
+
+
+def probe(session, method):
+    start = time.perf_counter()
+    response = session.request(method, f"{BASE_URL}/api/health", timeout=TIMEOUT)
+    if method == "GET":
+        response.content  # include body transfer
+    return (time.perf_counter() - start) * 1000, response.status_code
+
+
+def run_method(session, method, duration):
+    samples = []  # (offset_seconds, latency_ms)
+    errors = 0
+    started = time.monotonic()
+    while time.monotonic() - started < duration:
+        offset = time.monotonic() - started
+        try:
+            latency, status = probe(session, method)
+            if status >= 500 and status != 503:
+                errors += 1
+            samples.append((offset, latency))
+        except requests.exceptions.RequestException:
+            errors += 1
+        time.sleep(PROBE_INTERVAL_SECONDS)
+    return samples, errors
+
+
+def flatness(samples):
+    windows = {}
+    for offset, latency in samples:
+        windows.setdefault(int(offset // WINDOW_SECONDS), []).append(latency)
+    window_p95 = [percentile(values, 95) for _, values in sorted(windows.items()) if len(values) >= 5]
+    if len(window_p95) < 2:
+        return None, window_p95
+    fastest, slowest = min(window_p95), max(window_p95)
+    return slowest <= fastest * FLAT_RATIO + FLAT_SLACK_MS, window_p95
+
+
+def main():
+    print(f"{BLUE}{'=' * 80}{RESET}")
+    print(f"{BLUE}Health Latency Test - {BASE_URL} ({DURATION_SECONDS:.0f}s per method){RESET}")
+    print(f"{BLUE}{'=' * 80}{RESET}")
+
+    session = requests.Session()
+    jobs_before = scheduler_jobs(session)
+    if jobs_before is None:
+        print(f"{YELLOW}⚠️  health payload has no cleanupScheduler section{RESET}")
+
+    results = []
+    for method in ("GET", "HEAD"):
+        samples, errors = run_method(session, method, DURATION_SECONDS)
+        latencies = [latency for _, latency in samples]
+        flat, window_p95 = flatness(samples)
+        result = {"method": method, "errors": errors, "flat": flat,
+                  "window_p95_ms": window_p95, **summarize(latencies)}
+        results.append(result)
+
+        icon = f"{GREEN}✅{RESET}" if flat and not errors else (f"{YELLOW}⚠️{RESET}" if flat is None else f"{RED}❌{RESET}")
+        print(
+            f"{icon} {method:5} n={result['count']:>5} p50 {result['p50_ms']}ms "
+            f"p95 {result['p95_ms']}ms p99 {result['p99_ms']}ms max {result['max_ms']}ms "
+            f"errors {errors}"
+        )
+        if window_p95:
+            print(f"   window p95 (ms, {WINDOW_SECONDS:.0f}s windows): {window_p95}")
+
+    jobs_after = scheduler_jobs(session)
+    cleanup_runs = {}
+    if jobs_before and jobs_after:
+        for name, job in jobs_after.items():
+            before = jobs_before.get(name, {})
+            cleanup_runs[name] = {
+                "runs": job.get("runs", 0) - before.get("runs", 0),
+                "skippedLocked": job.get("skippedLocked", 0) - before.get("skippedLocked", 0),
+                "lastDurationMs": job.get("lastDurationMs"),
+            }
+        print("\nCleanup jobs during the run:")
+        for name, delta in cleanup_runs.items():
+            print(f"   {name:18} runs +{delta['runs']}  lock skips +{delta['skippedLocked']}  "
+                  f"last {delta['lastDurationMs']}ms")
+
+    out_file = os.environ.get("RESULTS_FILE", "health_latency_results.json")
+    with open(out_file, "w") as f:
+        json.dump({"timestamp": datetime.utcnow().isoformat(), "base_url": BASE_URL,
+                   "results": results, "cleanup_runs": cleanup_runs}, f, indent=2)
+    print(f"\n{GREEN}Results saved to: {out_file}{RESET}")
+
+    return 1 if any(r["flat"] is False or r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
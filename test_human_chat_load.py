@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Human Chat Load Test
+Simulates many wallets posting to /api/human-chat/post at the same moment
+and checks the store keeps up:
+
+- every accepted post is counted (room messageCount grows by exactly the
+  number of 200 responses, i.e. no lost updates)
+- every poster shows up as online (activeUsers)
+- the per-wallet rate limit holds under races: RACE_POSTERS wallets send
+  two posts at once and exactly one of each pair may succeed
+
+Room counters are read from the `history` event of /api/human-chat/stream.
+
+Usage:
+    python3 test_human_chat_load.py
+    BASE_URL=http://host:3000 POSTERS=1000 CONCURRENCY=250 python3 test_human_chat_load.py
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+TIMEOUT = 30
+POSTERS = int(os.environ.get("POSTERS", "1000"))
+# Wallets (out of POSTERS) that send two posts at once
+RACE_POSTERS = min(POSTERS, int(os.environ.get("RACE_POSTERS", "50")))
+# Threads posting at once; defaults to every request in flight together
+CONCURRENCY = int(os.environ.get("CONCURRENCY", str(POSTERS + RACE_POSTERS)))
+
+# Color codes for terminal output
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+BLUE = "\033[94m"
+RESET = "\033[0m"
+
+
+def wallet(run_id, i):
+    return "0x" + f"{run_id}{i:08x}".rjust(40, "0")[-40:]
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 1)
+
+
+def read_room_state():
+    """messageCount / activeUsers from the stream's history event"""
+    with requests.get(f"{BASE_URL}/api/human-chat/stream", stream=True, timeout=TIMEOUT) as response:
+        event = None
+        for raw in response.iter_lines(decode_unicode=True):
+            if raw.startswith("event:"):
+                event = raw[6:].strip()
+            elif raw.startswith("data:") and event == "history":
+                data = json.loads(raw[5:].strip())
+                state = data.get("state", {})
+                return {
+                    "messageCount": state.get("messageCount", 0),
+                    "activeUsers": data.get("activeUsers", state.get("activeUsers", 0)),
+                }
+    return None
+
+
+def post(session, user_id, start_gate):
+    start_gate.wait(TIMEOUT)
+    started = time.perf_counter()
+    try:
+        response = session.post(
+            f"{BASE_URL}/api/human-chat/post",
+            json={"userId": user_id, "handle": user_id[:10], "content": f"load test {uuid.uuid4().hex[:6]}"},
+            timeout=TIMEOUT,
+        )
+        status = response.status_code
+    except requests.exceptions.RequestException:
+        status = None
+    return user_id, status, (time.perf_counter() - started) * 1000
+
+
+def main():
+    print(f"{BLUE}{'=' * 80}{RESET}")
+    print(f"{BLUE}Human Chat Load Test - {BASE_URL} ({POSTERS} posters, {CONCURRENCY} threads){RESET}")
+    print(f"{BLUE}{'=' * 80}{RESET}")
+
+    try:
+        before = read_room_state()
+    except requests.exceptions.RequestException as e:
+        print(f"{RED}❌ Cannot read room state: {e}{RESET}")
+        return 1
+
+    run_id = uuid.uuid4().hex[:8]
+    wallets = [wallet(run_id, i) for i in range(POSTERS)]
+    # Racing wallets appear twice, back to back, so each pair is in flight together
+    jobs = [user_id for user_id in wallets[:RACE_POSTERS] for _ in range(2)] + wallets[RACE_POSTERS:]
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=CONCURRENCY, pool_maxsize=CONCURRENCY)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    # Workers hold at the gate until every job is queued, then fire together
+    start_gate = threading.Event()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        futures = [pool.submit(post, session, user_id, start_gate) for user_id in jobs]
+        started = time.perf_counter()
+        start_gate.set()
+        results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - started
+
+    # Let async work (counters, presence) settle
+    time.sleep(1)
+    after = read_room_state()
+
+    statuses = {}
+    for _, status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    accepted = statuses.get("200", 0)
+    latencies = [latency for _, status, latency in results if status is not None]
+
+    per_wallet = {}
+    for user_id, status, _ in results:
+        per_wallet.setdefault(user_id, []).append(status)
+    race_violations = sum(1 for user_id in wallets[:RACE_POSTERS] if per_wallet[user_id].count(200) > 1)
+
+    counted = (after["messageCount"] - before["messageCount"]) if before and after else None
+    lost_updates = accepted - counted if counted is not None else None
+
+    summary = {
+        "posters": POSTERS,
+        "concurrency": CONCURRENCY,
+        "requests": len(jobs),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(jobs) / elapsed, 1) if elapsed > 0 else None,
+        "statuses": statuses,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": round(max(latencies), 1) if latencies else None,
+        "messages_counted": counted,
+        "lost_updates": lost_updates,
+        "active_users_after": after["activeUsers"] if after else None,
+        "rate_limit_race_violations": race_violations,
+    }
+
+    print(f"requests {summary['requests']} in {summary['elapsed_s']}s ({summary['throughput_rps']} req/s)")
+    print(f"statuses {statuses}")
+    print(f"latency p50 {summary['p50_ms']}ms p95 {summary['p95_ms']}ms p99 {summary['p99_ms']}ms max {summary['max_ms']}ms")
+
+    checks = [
+        ("no lost updates", lost_updates == 0, f"{accepted} accepted, {counted} counted"),
+        ("posters online", after is not None and after["activeUsers"] >= accepted,
+         f"activeUsers {summary['active_users_after']}"),
+        ("rate limit holds under races", race_violations == 0,
+         f"{race_violations} of {RACE_POSTERS} wallets got two posts through"),
+        ("no server errors", not any(s.startswith("5") or s == "None" for s in statuses), ""),
+    ]
+    for name, ok, detail in checks:
+        icon = f"{GREEN}✅{RESET}" if ok else f"{RED}❌{RESET}"
+        print(f"{icon} {name:30} {detail}")
+
+    out_file = os.environ.get("RESULTS_FILE", "human_chat_load_results.json")
+    with open(out_file, "w") as f:
+        json.dump({"timestamp": datetime.utcnow().isoformat(), "base_url": BASE_URL,
+                   "summary": summary, "checks": {name: ok for name, ok, _ in checks}}, f, indent=2)
+    print(f"\n{GREEN}Results saved to: {out_file}{RESET}")
+
+    return 0 if all(ok for _, ok, _ in checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
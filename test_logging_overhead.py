@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Logging Overhead Test
+Measures how much time request logging adds to each request, before and
+after the log pipeline (sampling + batched async flush).
+
+The server reports its logging cost in GET /api/health (`logging`):
+`emitMs` is the time spent on the request path formatting and queueing log
+lines (or writing them, when flushing synchronously), `flushMs` the time
+spent writing batches off the request path. The script fires REQUESTS
+requests at LOG_ROUTE and divides the change in those counters by the
+number of requests.
+
+With START_CMD set, the server is started twice:
+  baseline  LOG_FLUSH_INTERVAL_MS=0 and no sampling: every line formatted
+            and written synchronously on the request path, as before
+  pipeline  the log settings from the current environment (defaults:
+            250ms batched flush, no sampling; set LOG_SAMPLE_RATES /
+            LOG_ROUTE_SAMPLE_RATES to sample)
+Without START_CMD, only the running server is measured.
+
+The default route is rate-limited, so most requests take the cheap 429 path
+(request line + rate-limit warning) and logging is a large share of the
+work; the first few may run a real consensus analysis.
+
+Usage:
+    START_CMD="npm run start" python3 test_logging_overhead.py
+    LOG_SAMPLE_RATES=info=0.1 START_CMD="npm run start" python3 test_logging_overhead.py
+    BASE_URL=http://host:3000 REQUESTS=500 python3 test_logging_overhead.py
+"""
+
+import json
+import os
+import shlex
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+TIMEOUT = 60
+START_CMD = os.environ.get("START_CMD", "")
+STARTUP_TIMEOUT_SECONDS = float(os.environ.get("STARTUP_TIMEOUT_SECONDS", "60"))
+LOG_ROUTE = os.environ.get("LOG_ROUTE", "/api/consensus-enhanced?asset=BTC")
+REQUESTS = int(os.environ.get("REQUESTS", "300"))
+CONCURRENCY = int(os.environ.get("CONCURRENCY", "10"))
+WARMUP_REQUESTS = int(os.environ.get("WARMUP_REQUESTS", "5"))
+
+BASELINE_ENV = {
+    "LOG_FLUSH_INTERVAL_MS": "0",
+    "LOG_SAMPLE_RATES": "",
+    "LOG_ROUTE_SAMPLE_RATES": "",
+}
+
+# Color codes for terminal output
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+BLUE = "\033[94m"
+RESET = "\033[0m"
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 1)
+
+
+def wait_for_port(timeout):
+    parsed = urlparse(BASE_URL)
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((parsed.hostname, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def start_server(env_overrides):
+    process = subprocess.Popen(
+        shlex.split(START_CMD),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        env={**os.environ, **env_overrides},
+    )
+    if not wait_for_port(STARTUP_TIMEOUT_SECONDS):
+        stop_server(process)
+        raise RuntimeError(f"server did not open its port within {STARTUP_TIMEOUT_SECONDS}s")
+    return process
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def logging_stats():
+    """The server's log pipeline counters (None if unavailable)"""
+    try:
+        body = requests.get(f"{BASE_URL}/api/health", timeout=TIMEOUT).json()
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+    return body.get("logging")
+
+
+def timed_request(_):
+    started = time.perf_counter()
+    try:
+        response = requests.get(f"{BASE_URL}{LOG_ROUTE}", timeout=TIMEOUT)
+        return (time.perf_counter() - started) * 1000, response.status_code
+    except requests.exceptions.RequestException:
+        return (time.perf_counter() - started) * 1000, None
+
+
+def measure(label):
+    for i in range(WARMUP_REQUESTS):
+        timed_request(i)
+
+    before = logging_stats()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        results = list(pool.map(timed_request, range(REQUESTS)))
+    elapsed = time.perf_counter() - started
+    # Let the last batch flush before reading the counters
+    time.sleep(0.5)
+    after = logging_stats()
+
+    # Errors are often much faster or slower than real responses, so latency
+    # and throughput only cover the 2xx ones
+    latencies = [latency for latency, status in results if status and 200 <= status < 300]
+    statuses = {}
+    for _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    result = {
+        "label": label,
+        "requests": REQUESTS,
+        "ok": len(latencies),
+        "errors": REQUESTS - len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else None,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "statuses": statuses,
+        "server_stats": after,
+    }
+    if before and after:
+        def delta(key):
+            return (after.get(key) or 0) - (before.get(key) or 0)
+
+        result.update({
+            "lines_per_request": round(delta("emitted") / REQUESTS, 2),
+            "sampled_out_per_request": round(delta("sampledOut") / REQUESTS, 2),
+            "dropped": delta("dropped"),
+            "flush_errors": delta("flushErrors"),
+            "request_path_us_per_request": round(delta("emitMs") * 1000 / REQUESTS, 1),
+            "flush_us_per_request": round(delta("flushMs") * 1000 / REQUESTS, 1),
+        })
+    return result
+
+
+def run_phase(label, env_overrides):
+    process = None
+    try:
+        if START_CMD:
+            process = start_server(env_overrides)
+        return measure(label)
+    except (requests.exceptions.RequestException, RuntimeError) as e:
+        return {"label": label, "error": str(e)}
+    finally:
+        if process:
+            stop_server(process)
+
+
+def print_result(result):
+    if "error" in result:
+        print(f"{RED}❌ {result['label']:9} {result['error']}{RESET}")
+        return
+    print(f"{BLUE}{result['label']}{RESET}: p50 {result['p50_ms']}ms  p95 {result['p95_ms']}ms  "
+          f"p99 {result['p99_ms']}ms  {result['throughput_rps']} req/s (2xx only)")
+    if result["errors"]:
+        print(f"{RED}  {result['errors']}/{result['requests']} request(s) failed: statuses {result['statuses']}{RESET}")
+    if "request_path_us_per_request" not in result:
+        print(f"{YELLOW}⚠️  No logging stats in /api/health{RESET}")
+        return
+    print(f"  logging on request path: {result['request_path_us_per_request']}µs/request  "
+          f"flush: {result['flush_us_per_request']}µs/request  "
+          f"lines: {result['lines_per_request']}/request  "
+          f"sampled out: {result['sampled_out_per_request']}/request  dropped: {result['dropped']}")
+
+
+def main():
+    print(f"{BLUE}{'=' * 80}{RESET}")
+    print(f"{BLUE}Logging Overhead Test - {BASE_URL}{LOG_ROUTE} "
+          f"({REQUESTS} requests, concurrency {CONCURRENCY}){RESET}")
+    print(f"{BLUE}{'=' * 80}{RESET}")
+
+    phases = []
+    if START_CMD:
+        phases.append(run_phase("baseline", BASELINE_ENV))
+        phases.append(run_phase("pipeline", {}))
+    else:
+        print(f"{YELLOW}⚠️  START_CMD not set: measuring the running server only{RESET}")
+        phases.append(run_phase("current", {}))
+
+    for result in phases:
+        print_result(result)
+
+    failures = []
+    for result in phases:
+        if "error" in result:
+            failures.append(f"{result['label']}: {result['error']}")
+        elif result["errors"]:
+            failures.append(f"{result['label']}: {result['errors']} non-2xx or failed request(s) "
+                            f"(statuses {result['statuses']})")
+        elif "request_path_us_per_request" not in result:
+            failures.append(f"{result['label']}: logging stats unavailable")
+        elif result["flush_errors"]:
+            failures.append(f"{result['label']}: {result['flush_errors']} flush error(s)")
+
+    summary = {}
+    by_label = {r["label"]: r for r in phases if "request_path_us_per_request" in r and not r["errors"]}
+    if "baseline" in by_label and "pipeline" in by_label:
+        baseline, pipeline = by_label["baseline"], by_label["pipeline"]
+        summary = {
+            "request_path_us_saved_per_request": round(
+                baseline["request_path_us_per_request"] - pipeline["request_path_us_per_request"], 1),
+            "p50_delta_ms": round(pipeline["p50_ms"] - baseline["p50_ms"], 1),
+            "p95_delta_ms": round(pipeline["p95_ms"] - baseline["p95_ms"], 1),
+        }
+        print(f"\nRequest-path logging cost: {baseline['request_path_us_per_request']}µs → "
+              f"{pipeline['request_path_us_per_request']}µs per request "
+              f"(p50 {summary['p50_delta_ms']:+}ms, p95 {summary['p95_delta_ms']:+}ms)")
+        if pipeline["request_path_us_per_request"] > baseline["request_path_us_per_request"]:
+            failures.append("pipeline spends more time logging on the request path than the baseline")
+
+    out_file = os.environ.get("RESULTS_FILE", "logging_overhead_results.json")
+    with open(out_file, "w") as f:
+        json.dump({"timestamp": datetime.utcnow().isoformat(), "base_url": BASE_URL, "route": LOG_ROUTE,
+                   "phases": phases, "summary": summary}, f, indent=2)
+    print(f"\n{GREEN}Results saved to: {out_file}{RESET}")
+
+    if failures:
+        for failure in failures:
+            print(f"{RED}❌ {failure}{RESET}")
+        return 1
+    print(f"{GREEN}✅ Logging overhead measured{RESET}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
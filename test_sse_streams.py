@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+SSE Stream Test
+Resume scenarios kill SSE connections mid-stream, reconnect with
+Last-Event-ID and measure what the reconnect costs: bytes re-sent, events
+replayed, duplicate events and time to catch up. Each is compared against a
+fresh connection (no Last-Event-ID), which is what every reconnect used to
+cost.
+
+The fanout scenario holds many consumers on one stream and reports
+bytes/event and events/read. Each socket read is roughly one server write,
+so events/read shows how well frames are coalesced (SSE_COALESCE_MS).
+
+Usage:
+    python3 test_sse_streams.py                      # resume scenarios
+    python3 test_sse_streams.py human-chat fanout    # selected scenarios
+    BASE_URL=http://host:3000 GAP_SECONDS=20 python3 test_sse_streams.py
+    RESULTS_FILE=before.json python3 test_sse_streams.py fanout   # server without SSE_COALESCE_MS
+    RESULTS_FILE=after.json python3 test_sse_streams.py fanout    # server with SSE_COALESCE_MS=50
+    python3 test_sse_streams.py compare before.json after.json
+"""
+
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+CONNECT_TIMEOUT = 10
+# A stream that is silent this long after (re)connecting has caught up
+CATCHUP_IDLE_SECONDS = float(os.environ.get("CATCHUP_IDLE_SECONDS", "1.5"))
+# How long a killed client stays away before reconnecting
+GAP_SECONDS = float(os.environ.get("GAP_SECONDS", "10"))
+# Fanout scenario: concurrent consumers and events driven through them
+FANOUT_CLIENTS = int(os.environ.get("FANOUT_CLIENTS", "20"))
+FANOUT_MESSAGES = int(os.environ.get("FANOUT_MESSAGES", "30"))
+
+# Color codes for terminal output
+GREEN = "\033[92m"
+RED = "\033[91m"
+YELLOW = "\033[93m"
+BLUE = "\033[94m"
+RESET = "\033[0m"
+
+
+class SSEEvent:
+    def __init__(self, event_id, event, data, size):
+        self.id = event_id
+        self.event = event
+        self.data = data
+        self.size = size
+
+    def json(self):
+        try:
+            return json.loads(self.data)
+        except ValueError:
+            return None
+
+
+class SSEReader:
+    """
+    Minimal SSE client that keeps byte counts.
+    Parses frames straight off the socket so sizes are what went over the wire.
+    A background thread pulls chunks so reads can stop when the stream goes
+    idle without breaking the connection for the next read.
+    """
+
+    def __init__(self, url, params=None, last_event_id=None, idle_timeout=30):
+        headers = {"Accept": "text/event-stream"}
+        if last_event_id:
+            headers["Last-Event-ID"] = last_event_id
+        self.started = time.time()
+        self.response = requests.get(
+            url,
+            params=params,
+            headers=headers,
+            stream=True,
+            timeout=(CONNECT_TIMEOUT, None),
+        )
+        self.status_code = self.response.status_code
+        self.idle_timeout = idle_timeout
+        self.bytes_received = 0
+        # Chunks handed up by the socket; with chunked transfer encoding
+        # each one is roughly one server-side write
+        self.reads = 0
+        self.events = []
+        self.last_event_id = last_event_id
+        self.ended = False
+        self.last_chunk_at = self.started
+        self._buffer = b""
+        self._chunks = queue.Queue()
+        threading.Thread(target=self._pump, daemon=True).start()
+
+    def _pump(self):
+        try:
+            for chunk in self.response.iter_content(chunk_size=None):
+                self._chunks.put(chunk)
+        except (requests.exceptions.RequestException, AttributeError, OSError, ValueError):
+            pass  # closed underneath us
+        self._chunks.put(None)
+
+    def read_events(self, until=None, max_seconds=60):
+        """
+        Read events until `until(event)` is true, the stream is idle for
+        `idle_timeout` or `max_seconds` pass. Returns the events read by this call.
+        """
+        read = []
+        deadline = time.time() + max_seconds
+        while not self.ended and time.time() < deadline:
+            try:
+                chunk = self._chunks.get(timeout=min(self.idle_timeout, max(0.01, deadline - time.time())))
+            except queue.Empty:
+                break
+            if chunk is None:
+                self.ended = True
+                break
+            self.reads += 1
+            self.bytes_received += len(chunk)
+            self.last_chunk_at = time.time()
+            self._buffer += chunk
+            while b"\n\n" in self._buffer:
+                frame, self._buffer = self._buffer.split(b"\n\n", 1)
+                event = self._parse(frame)
+                if event is None:
+                    continue
+                self.events.append(event)
+                read.append(event)
+                if event.id:
+                    self.last_event_id = event.id
+                if until and until(event):
+                    return read
+        return read
+
+    def close(self):
+        """Kill the connection abruptly, as a dropped network would"""
+        self.response.close()
+
+    @property
+    def elapsed_ms(self):
+        return (time.time() - self.started) * 1000
+
+    @property
+    def catchup_ms(self):
+        """Connect to the last chunk received"""
+        return round((self.last_chunk_at - self.started) * 1000)
+
+    @staticmethod
+    def _parse(frame):
+        event_id, event, data = None, "message", []
+        for line in frame.decode("utf-8", errors="replace").split("\n"):
+            if not line or line.startswith(":"):
+                continue
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "id":
+                event_id = value
+            elif field == "event":
+                event = value
+            elif field == "data":
+                data.append(value)
+        if not data:
+            return None  # keepalive / comment
+        return SSEEvent(event_id, event, "\n".join(data), len(frame) + 2)
+
+
+class ResumeTester:
+    def __init__(self):
+        self.results = []
+
+    def measure_reconnect(self, name, endpoint, seen_ids, last_event_id, params=None):
+        """
+        Reconnect once with Last-Event-ID and once without; report the
+        catch-up burst of each
+        """
+        url = f"{BASE_URL}{endpoint}"
+
+        resumed = SSEReader(url, params=params, last_event_id=last_event_id, idle_timeout=CATCHUP_IDLE_SECONDS)
+        resumed.read_events(max_seconds=30)
+        resumed.close()
+
+        fresh = SSEReader(url, params=params, idle_timeout=CATCHUP_IDLE_SECONDS)
+        fresh.read_events(max_seconds=30)
+        fresh.close()
+
+        replayed = [e for e in resumed.events if e.id]
+        duplicates = [e for e in replayed if e.id in seen_ids]
+        result = {
+            "name": name,
+            "endpoint": endpoint,
+            "status_code": resumed.status_code,
+            "last_event_id": last_event_id,
+            "resume_bytes": resumed.bytes_received,
+            "resume_events": len(resumed.events),
+            "replayed_events": len(replayed),
+            "duplicate_events": len(duplicates),
+            "resume_catchup_ms": resumed.catchup_ms,
+            "fresh_bytes": fresh.bytes_received,
+            "fresh_events": len(fresh.events),
+            "fresh_catchup_ms": fresh.catchup_ms,
+        }
+        result["bytes_saved_pct"] = (
+            round(100 * (1 - result["resume_bytes"] / result["fresh_bytes"]), 1)
+            if result["fresh_bytes"] else 0
+        )
+        result["success"] = resumed.status_code == 200 and not duplicates
+        self._print(result)
+        self.results.append(result)
+        return result
+
+    def scenario_human_chat(self):
+        """Drop a client, post messages while it is away, reconnect"""
+        endpoint = "/api/human-chat/stream"
+        url = f"{BASE_URL}{endpoint}"
+
+        client = SSEReader(url, idle_timeout=CATCHUP_IDLE_SECONDS)
+        client.read_events(max_seconds=10)
+        self._post_human_messages(1)
+        client.read_events(max_seconds=5)
+        seen = {e.id for e in client.events if e.id}
+        last_id = client.last_event_id
+        client.close()
+
+        if not last_id:
+            return self._skip("Human chat", "no event ids received (is the stream tagging events?)")
+
+        self._post_human_messages(5)
+        return self.measure_reconnect("Human chat", endpoint, seen, last_id)
+
+    def scenario_prediction_market(self):
+        """Drop a client mid-round, wait for round events, reconnect"""
+        endpoint = "/api/prediction-market/stream"
+        url = f"{BASE_URL}{endpoint}"
+
+        client = SSEReader(url, idle_timeout=30)
+        client.read_events(until=lambda e: e.id is not None, max_seconds=60)
+        seen = {e.id for e in client.events if e.id}
+        last_id = client.last_event_id
+        client.close()
+
+        if not last_id:
+            return self._skip("Prediction market", "no round events within 60s")
+
+        time.sleep(GAP_SECONDS)
+        return self.measure_reconnect("Prediction market", endpoint, seen, last_id)
+
+    def scenario_chatroom(self):
+        """Drop a client after history, wait for new messages, reconnect"""
+        endpoint = "/api/chatroom/stream"
+        url = f"{BASE_URL}{endpoint}"
+
+        client = SSEReader(url, idle_timeout=CATCHUP_IDLE_SECONDS)
+        client.read_events(max_seconds=20)
+        seen = {e.id for e in client.events if e.id and e.event == "message"}
+        last_id = client.last_event_id
+        client.close()
+
+        if not last_id:
+            return self._skip("Chatroom", "no history id received")
+
+        time.sleep(GAP_SECONDS)
+        return self.measure_reconnect("Chatroom", endpoint, seen, last_id)
+
+    def scenario_consensus(self):
+        """Drop a client after the first analyst result, reconnect to the same run"""
+        endpoint = "/api/consensus"
+        url = f"{BASE_URL}{endpoint}"
+        params = {"asset": "BTC"}
+
+        client = SSEReader(url, params=params, idle_timeout=60)
+        client.read_events(until=lambda e: e.id is not None, max_seconds=90)
+        seen = {e.id for e in client.events if e.id}
+        last_id = client.last_event_id
+        first_run_bytes = client.bytes_received
+        client.close()
+
+        if not last_id:
+            return self._skip("Consensus run", "no analyst result within 90s")
+
+        # Resume until the run completes; a fresh run is a full model fan-out,
+        # so its cost is taken from the run itself rather than starting another
+        resumed = SSEReader(url, params=params, last_event_id=last_id, idle_timeout=60)
+        resumed.read_events(until=lambda e: (e.json() or {}).get("type") == "complete", max_seconds=120)
+        resumed.close()
+
+        duplicates = [e for e in resumed.events if e.id and e.id in seen]
+        completed = any((e.json() or {}).get("type") == "complete" for e in resumed.events)
+        result = {
+            "name": "Consensus run",
+            "endpoint": endpoint,
+            "status_code": resumed.status_code,
+            "last_event_id": last_id,
+            "resume_bytes": resumed.bytes_received,
+            "resume_events": len(resumed.events),
+            "replayed_events": len([e for e in resumed.events if e.id]),
+            "duplicate_events": len(duplicates),
+            "resume_catchup_ms": round(resumed.elapsed_ms),
+            "fresh_bytes": first_run_bytes + resumed.bytes_received,
+            "fresh_events": None,
+            "fresh_catchup_ms": None,
+            "resumed_same_run": any((e.json() or {}).get("resumed") for e in resumed.events),
+        }
+        result["bytes_saved_pct"] = round(100 * (1 - result["resume_bytes"] / result["fresh_bytes"]), 1)
+        result["success"] = resumed.status_code == 200 and completed and not duplicates
+        self._print(result)
+        self.results.append(result)
+        return result
+
+    def scenario_fanout(self):
+        """
+        Hold FANOUT_CLIENTS consumers on the human chat stream, post
+        FANOUT_MESSAGES messages in bursts and measure delivery efficiency
+        """
+        endpoint = "/api/human-chat/stream"
+        url = f"{BASE_URL}{endpoint}"
+
+        readers = [SSEReader(url, idle_timeout=CATCHUP_IDLE_SECONDS * 2) for _ in range(FANOUT_CLIENTS)]
+        # Drain connect + history before measuring
+        drains = [threading.Thread(target=r.read_events, kwargs={"max_seconds": 5}) for r in readers]
+        for t in drains:
+            t.start()
+        for t in drains:
+            t.join()
+        baseline = [(r.bytes_received, r.reads, len(r.events)) for r in readers]
+
+        threads = [threading.Thread(target=r.read_events, kwargs={"max_seconds": 60}) for r in readers]
+        for t in threads:
+            t.start()
+        started = time.time()
+        for burst in range(0, FANOUT_MESSAGES, 5):
+            self._post_human_messages(min(5, FANOUT_MESSAGES - burst), parallel=True)
+        for t in threads:
+            t.join()
+        elapsed_ms = (time.time() - started) * 1000
+        for reader in readers:
+            reader.close()
+
+        total_bytes = sum(r.bytes_received - b[0] for r, b in zip(readers, baseline))
+        total_reads = sum(r.reads - b[1] for r, b in zip(readers, baseline))
+        total_events = sum(len(r.events) - b[2] for r, b in zip(readers, baseline))
+        result = {
+            "name": "Fanout (human chat)",
+            "endpoint": endpoint,
+            "clients": FANOUT_CLIENTS,
+            "messages_posted": FANOUT_MESSAGES,
+            "events_received": total_events,
+            "bytes_received": total_bytes,
+            "socket_reads": total_reads,
+            "bytes_per_event": round(total_bytes / total_events, 1) if total_events else None,
+            "events_per_read": round(total_events / total_reads, 2) if total_reads else None,
+            "elapsed_ms": round(elapsed_ms),
+            "success": total_events > 0,
+        }
+        icon = f"{GREEN}✅{RESET}" if result["success"] else f"{RED}❌{RESET}"
+        print(
+            f"{icon} {result['name']:25} {FANOUT_CLIENTS} clients {total_events:>6} events "
+            f"{result['bytes_per_event']} B/event {result['events_per_read']} events/read"
+        )
+        self.results.append(result)
+        return result
+
+    def _post_human_messages(self, count, parallel=False):
+        if parallel:
+            threads = [threading.Thread(target=self._post_human_messages, args=(1,)) for _ in range(count)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            return
+
+        for i in range(count):
+            user_id = f"sse_test_{uuid.uuid4().hex[:8]}"
+            try:
+                requests.post(
+                    f"{BASE_URL}/api/human-chat/post",
+                    json={"userId": user_id, "handle": f"tester{i}", "content": f"resume test {i}"},
+                    timeout=CONNECT_TIMEOUT,
+                )
+            except requests.exceptions.RequestException as e:
+                print(f"{YELLOW}⚠️  post failed: {e}{RESET}")
+
+    def _skip(self, name, reason):
+        print(f"{YELLOW}⚠️  {name:25} skipped: {reason}{RESET}")
+        result = {"name": name, "success": None, "skipped": reason}
+        self.results.append(result)
+        return result
+
+    @staticmethod
+    def _print(r):
+        icon = f"{GREEN}✅{RESET}" if r["success"] else f"{RED}❌{RESET}"
+        fresh = f"{r['fresh_bytes']:>8}B" if r["fresh_bytes"] is not None else "       -"
+        print(
+            f"{icon} {r['name']:25} resume {r['resume_bytes']:>8}B "
+            f"{r['replayed_events']:>3} replayed {r['duplicate_events']:>2} dup "
+            f"{r['resume_catchup_ms']:>6}ms | fresh {fresh} "
+            f"| saved {r['bytes_saved_pct']}%"
+        )
+
+
+SCENARIOS = {
+    "human-chat": ResumeTester.scenario_human_chat,
+    "prediction-market": ResumeTester.scenario_prediction_market,
+    "chatroom": ResumeTester.scenario_chatroom,
+    "consensus": ResumeTester.scenario_consensus,
+    "fanout": ResumeTester.scenario_fanout,
+}
+DEFAULT_SCENARIOS = ["human-chat", "prediction-market", "chatroom", "consensus"]
+COMPARE_METRICS = ["bytes_per_event", "events_per_read", "resume_bytes", "replayed_events", "resume_catchup_ms"]
+
+
+def compare(before_file, after_file):
+    """Print metric changes between two result files"""
+    with open(before_file) as f:
+        before = {r["name"]: r for r in json.load(f)["results"]}
+    with open(after_file) as f:
+        after = {r["name"]: r for r in json.load(f)["results"]}
+
+    print(f"{'scenario':28} {'metric':20} {'before':>12} {'after':>12}")
+    for name, result in after.items():
+        if name not in before:
+            continue
+        for metric in COMPARE_METRICS:
+            old, new = before[name].get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            print(f"{name:28} {metric:20} {old:>12} {new:>12}")
+    return 0
+
+
+def main():
+    if sys.argv[1:2] == ["compare"]:
+        if len(sys.argv) != 4:
+            print("Usage: test_sse_streams.py compare BEFORE.json AFTER.json")
+            return 2
+        return compare(sys.argv[2], sys.argv[3])
+
+    selected = sys.argv[1:] or DEFAULT_SCENARIOS
+    unknown = [s for s in selected if s not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenario(s): {', '.join(unknown)}. Choose from: {', '.join(SCENARIOS)}")
+        return 2
+
+    print(f"{BLUE}{'=' * 80}{RESET}")
+    print(f"{BLUE}SSE Resume Test - {BASE_URL} (gap {GAP_SECONDS}s){RESET}")
+    print(f"{BLUE}{'=' * 80}{RESET}")
+
+    tester = ResumeTester()
+    for name in selected:
+        try:
+            SCENARIOS[name](tester)
+        except requests.exceptions.RequestException as e:
+            print(f"{RED}❌ {name:25} connection error: {e}{RESET}")
+            tester.results.append({"name": name, "success": False, "error": str(e)})
+
+    out_file = os.environ.get("RESULTS_FILE", "sse_resume_results.json")
+    with open(out_file, "w") as f:
+        json.dump({"timestamp": datetime.utcnow().isoformat(), "base_url": BASE_URL,
+                   "results": tester.results}, f, indent=2)
+    print(f"\n{GREEN}Results saved to: {out_file}{RESET}")
+
+    return 1 if any(r.get("success") is False for r in tester.results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
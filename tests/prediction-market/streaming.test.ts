@@ -260,13 +260,13 @@ describe('GET /api/prediction-market/stream', () => {
   });
 
   describe('Stale Trade Cleanup', () => {
-    it('should check for stale trades on connect', async () => {
+    it('should leave stale trades to the cleanup scheduler', async () => {
       const { checkAndCleanupIfNeeded } = await import('@/lib/stale-trade-handler');
 
       const request = new NextRequest('http://localhost/api/prediction-market/stream');
       await GET(request);
 
-      expect(checkAndCleanupIfNeeded).toHaveBeenCalled();
+      expect(checkAndCleanupIfNeeded).not.toHaveBeenCalled();
     });
   });
 });